@@ -4,11 +4,12 @@ from maize.aio.classic.downloader.httpx_downloader import HTTPXDownloader
 from maize.aio.classic.spider.spider import Spider
 from maize.aio.classic.spider.task_spider import TaskSpider
 from maize.base.downloader.base_downloader import BaseDownloader
-from maize.common.constant import LogLevelEnum, Method, PipelineEnum, SpiderDownloaderEnum
+from maize.common.constant import DupeFilterEnum, LogLevelEnum, Method, PipelineEnum, SpiderDownloaderEnum
 from maize.common.http import Request, Response
 from maize.common.items import Item
 from maize.common.items.field import Field
 from maize.core.decorator_entry import SpiderEntry
+from maize.dupefilters import BaseDupeFilter, BloomDupeFilter, MemoryDupeFilter
 from maize.pipelines.base_pipeline import BasePipeline
 from maize.pipelines.empty_pipeline import EmptyPipeline
 from maize.settings.spider_settings import SpiderSettings
@@ -16,12 +17,16 @@ from maize.settings.spider_settings import SpiderSettings
 __all__ = [
     "AioHttpDownloader",
     "BaseDownloader",
+    "BaseDupeFilter",
     "BasePipeline",
+    "BloomDupeFilter",
     "CrawlerProcess",
+    "DupeFilterEnum",
     "Field",
     "HTTPXDownloader",
     "Item",
     "LogLevelEnum",
+    "MemoryDupeFilter",
     "Method",
     "PipelineEnum",
     "Request",
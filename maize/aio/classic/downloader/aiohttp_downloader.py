@@ -1,20 +1,31 @@
+import contextlib
+import importlib.util
+import time
 import typing
 
 from aiohttp import (
+    AsyncResolver,
     BaseConnector,
     BasicAuth,
     ClientResponse,
     ClientSession,
     ClientTimeout,
+    CookieJar,
     TCPConnector,
+    ThreadedResolver,
     TraceConfig,
     TraceRequestStartParams,
 )
+from aiohttp.abc import AbstractResolver
 
 from maize.base.downloader.base_downloader import BaseDownloader
+from maize.base.downloader.stream_writer import StreamWriter
+from maize.common.constant import DnsResolverEnum
 from maize.common.http import Response
 from maize.common.http.request import Request
 from maize.common.model.download_response_model import DownloadResponse
+from maize.exceptions.spider_exception import MaxBodySizeExceededException
+from maize.utils.session_pool import SessionPool
 
 if typing.TYPE_CHECKING:
     from maize.aio.classic.crawler.crawler import Crawler
@@ -34,10 +45,17 @@ class AioHttpDownloader(BaseDownloader):
         self.proxy_tunnel: str | None = None
         self.proxy_auth: BasicAuth | None = None
 
+        self.resolver: AbstractResolver | None = None
+        # 使用请求自身代理（Request.proxy）的 session，按代理地址和认证信息复用，use_session 为 False 时为 None
+        self.proxy_sessions: SessionPool[tuple, ClientSession] | None = None
+        # 默认 session 和代理 session 共享的 cookie，轮换代理时不丢失登录状态
+        self.cookie_jar: CookieJar | None = None
+
     async def open(self):
         await super().open()
 
-        request_timeout = self.crawler.settings.request.request_timeout
+        request_settings = self.crawler.settings.request
+        request_timeout = request_settings.request_timeout
         self._timeout = ClientTimeout(total=request_timeout)
         self._verify_ssl = self.crawler.settings.request.verify_ssl
         self._use_session = self.crawler.settings.request.use_session
@@ -48,36 +66,80 @@ class AioHttpDownloader(BaseDownloader):
         if proxy_tunnel_username and proxy_tunnel_password:
             self.proxy_auth = BasicAuth(proxy_tunnel_username, proxy_tunnel_password)
 
-        self.connector = TCPConnector(verify_ssl=self._verify_ssl)
+        if request_settings.dns_resolver == DnsResolverEnum.ASYNC.value:
+            if importlib.util.find_spec("aiodns") is None:
+                raise ImportError("async dns resolver requires the aiodns package, install it with: pip install aiodns")
+            self.resolver = AsyncResolver()
+        else:
+            self.resolver = ThreadedResolver()
+
         self.trace_config = TraceConfig()
         self.trace_config.on_request_start.append(self.request_start)
         if self._use_session:
-            self.session = ClientSession(
-                connector=self.connector,
-                timeout=self._timeout,
-                trace_configs=[self.trace_config],
+            self.cookie_jar = CookieJar()
+            self.connector = self._create_connector()
+            self.session = self._create_session(self.connector)
+            self.proxy_sessions = SessionPool(
+                lambda _: self._create_session(self._create_connector()),
+                lambda session: session.close(),
+                request_settings.max_sessions,
             )
 
+    def _create_connector(self) -> TCPConnector:
+        request_settings = self.crawler.settings.request
+        return TCPConnector(
+            verify_ssl=self._verify_ssl,
+            limit=request_settings.max_connections,
+            limit_per_host=request_settings.limit_per_host,
+            use_dns_cache=request_settings.dns_cache_ttl != 0,
+            ttl_dns_cache=request_settings.dns_cache_ttl,
+            keepalive_timeout=request_settings.keepalive_expiry,
+            happy_eyeballs_delay=request_settings.happy_eyeballs_delay,
+            resolver=self.resolver,
+        )
+
+    def _create_session(self, connector: BaseConnector) -> ClientSession:
+        return ClientSession(
+            connector=connector, timeout=self._timeout, trace_configs=[self.trace_config], cookie_jar=self.cookie_jar
+        )
+
+    @contextlib.asynccontextmanager
+    async def _session(self, request: Request) -> typing.AsyncIterator[ClientSession]:
+        """
+        获取发送请求的 session：
+        - use_session 为 False 时为每个请求创建新的 session
+        - 请求设置了代理时，复用同一代理地址和认证信息的 session，超出 max_sessions 时关闭最久未使用的空闲 session
+        - 否则使用默认 session
+        """
+        if not self._use_session:
+            async with self._create_session(self._create_connector()) as session:
+                yield session
+        elif request.proxy:
+            key = (request.proxy, request.proxy_username, request.proxy_password)
+            async with self.proxy_sessions.acquire(key) as session:
+                yield session
+        else:
+            yield self.session
+
     async def download(self, request: Request) -> typing.Union[DownloadResponse, Request]:
         await self.random_wait()
+        # 只统计网络请求的耗时，不包含随机等待
+        start_time = time.perf_counter()
         try:
-            if self._use_session:
-                response = await self.send_request(self.session, request)
-                body = await response.content.read()
-                structure_response = self.structure_response(request, response, body)
-                return DownloadResponse(response=structure_response)
-
-            connector = TCPConnector(verify_ssl=self._verify_ssl)
-            async with ClientSession(
-                connector=connector,
-                timeout=self._timeout,
-                trace_configs=[self.trace_config],
-            ) as session:
+            async with self._session(request) as session:
+                if request.get_meta("stream"):
+                    stream_response = await self._stream(session, request)
+                    return DownloadResponse(response=stream_response, latency=time.perf_counter() - start_time)
+
                 response = await self.send_request(session, request)
                 body = await response.content.read()
+            latency = time.perf_counter() - start_time
             structure_response = self.structure_response(request, response, body)
-            return DownloadResponse(response=structure_response)
+            return DownloadResponse(response=structure_response, latency=latency)
 
+        except MaxBodySizeExceededException as e:
+            self.logger.error(str(e))
+            return DownloadResponse(reason=str(e))
         except Exception as e:
             if new_request := await self._download_retry(request, e):
                 return new_request
@@ -85,6 +147,21 @@ class AioHttpDownloader(BaseDownloader):
             self.logger.error(f"Error during request: {e}")
             return DownloadResponse(reason=str(e))
 
+    async def _stream(self, session: ClientSession, request: Request) -> Response[None, ClientResponse]:
+        """
+        流式下载，响应体按块写入文件或 stream_sink
+        """
+        writer = StreamWriter(request, self.crawler.settings.stream)
+        response = await self.send_request(session, request, writer.prepare_headers(await request.get_headers()))
+        try:
+            async with writer:
+                if await writer.start(response.status, response.headers):
+                    async for chunk in response.content.iter_chunked(writer.chunk_size):
+                        await writer.write(chunk)
+        finally:
+            response.release()
+        return writer.apply(self.structure_response(request, response, b""))
+
     @staticmethod
     def structure_response(request: Request, response: ClientResponse, body: bytes) -> Response[None, ClientResponse]:
         return Response[None, ClientResponse](
@@ -96,13 +173,16 @@ class AioHttpDownloader(BaseDownloader):
             source_response=response,
         )
 
-    async def send_request(self, session: ClientSession, request: Request) -> ClientResponse:
+    async def send_request(
+        self, session: ClientSession, request: Request, headers: dict | None = None
+    ) -> ClientResponse:
         if request.proxy_username and request.proxy_password:
             proxy_auth = BasicAuth(request.proxy_username, request.proxy_password)
         else:
             proxy_auth = self.proxy_auth
 
-        headers = await request.get_headers()
+        if headers is None:
+            headers = await request.get_headers()
         return await session.request(
             method=request.method,
             url=request.url,
@@ -122,8 +202,14 @@ class AioHttpDownloader(BaseDownloader):
 
     async def close(self):
         await super().close()
+        if self.proxy_sessions:
+            await self.proxy_sessions.close()
+
         if self.connector:
             await self.connector.close()
 
         if self.session:
             await self.session.close()
+
+        if self.resolver:
+            await self.resolver.close()
@@ -1,12 +1,19 @@
+import contextlib
+import importlib.util
+import time
 import typing
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 
 import httpx
 from httpx import Proxy
 
 from maize.base.downloader.base_downloader import BaseDownloader
+from maize.base.downloader.stream_writer import StreamWriter
 from maize.common.http import Response
 from maize.common.http.request import Request
 from maize.common.model.download_response_model import DownloadResponse
+from maize.exceptions.spider_exception import MaxBodySizeExceededException
+from maize.utils.session_pool import SessionPool
 
 if typing.TYPE_CHECKING:
     from maize.aio.classic.crawler.crawler import Crawler
@@ -17,11 +24,17 @@ class HTTPXDownloader(BaseDownloader):
         super().__init__(crawler)
 
         self._timeout: httpx.Timeout | None = None
+        self._limits: httpx.Limits | None = None
         self.httpx_proxy: Proxy | None = None
+        # 按代理配置、最大重定向次数复用的客户端，use_session 为 False 时为 None
+        self.clients: SessionPool[tuple, httpx.AsyncClient] | None = None
 
     async def open(self):
         await super().open()
-        request_timeout = self.crawler.settings.request.request_timeout
+        request_settings = self.crawler.settings.request
+        request_timeout = request_settings.request_timeout
+        if request_settings.http2 and importlib.util.find_spec("h2") is None:
+            raise ImportError("http2 requires the h2 package, install it with: pip install httpx[http2]")
 
         proxy_tunnel = self.crawler.settings.proxy.proxy_url
         proxy_tunnel_username = self.crawler.settings.proxy.proxy_username
@@ -34,17 +47,63 @@ class HTTPXDownloader(BaseDownloader):
             self.httpx_proxy = Proxy(url=proxy_url)
 
         self._timeout = httpx.Timeout(timeout=request_timeout)
+        self._limits = httpx.Limits(
+            max_connections=request_settings.max_connections,
+            max_keepalive_connections=request_settings.max_keepalive_connections,
+            keepalive_expiry=request_settings.keepalive_expiry,
+        )
+        if request_settings.use_session:
+            self.clients = SessionPool(
+                self._create_pooled_client, lambda client: client.aclose(), request_settings.max_sessions
+            )
+
+    def _create_client(
+        self, proxy: Proxy | None, max_redirects: int, cookies: CookieJar | None = None
+    ) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=self._timeout,
+            proxy=proxy,
+            max_redirects=max_redirects,
+            cookies=cookies,
+            verify=self.crawler.settings.request.verify_ssl,
+            limits=self._limits,
+            http2=self.crawler.settings.request.http2,
+        )
+
+    def _create_pooled_client(self, key: tuple) -> httpx.AsyncClient:
+        proxy_url, proxy_auth, max_redirects = key
+        proxy = Proxy(url=proxy_url, auth=proxy_auth) if proxy_url else None
+        # 复用的客户端被多个请求共享，不保存响应设置的 cookie，避免 cookie 在请求之间泄漏；
+        # 请求自己的 cookies 不受影响，重定向由 _follow_redirects 按请求携带 cookie
+        return self._create_client(proxy, max_redirects, CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])))
+
+    @contextlib.asynccontextmanager
+    async def _client(self, request: Request) -> typing.AsyncIterator[httpx.AsyncClient]:
+        """
+        获取发送请求的客户端：use_session 为 True 时复用同一代理配置的客户端，否则为每个请求创建新的客户端
+        """
+        proxy = self._get_proxy(request)
+        if self.clients is None:
+            async with self._create_client(proxy, request.max_redirects) as client:
+                yield client
+            return
+
+        # 代理地址中的认证信息解析到 Proxy.auth，需要一起作为 key
+        key = (str(proxy.url), proxy.auth, request.max_redirects) if proxy else (None, None, request.max_redirects)
+        async with self.clients.acquire(key) as client:
+            yield client
 
     async def download(self, request: Request) -> typing.Union[DownloadResponse, Request]:
         await self.random_wait()
+        # 只统计网络请求的耗时，不包含随机等待
+        start_time = time.perf_counter()
         try:
-            proxies = self._get_proxy(request)
-            async with httpx.AsyncClient(
-                timeout=self._timeout,
-                proxy=proxies,
-                max_redirects=request.max_redirects,
-            ) as client:
+            async with self._client(request) as client:
                 self.logger.debug(rf"request downloading: {request.url}, method: {request.method}")
+                if request.get_meta("stream"):
+                    stream_response = await self._stream(client, request)
+                    return DownloadResponse(response=stream_response, latency=time.perf_counter() - start_time)
+
                 headers = await request.get_headers()
                 response = await client.request(
                     request.method,
@@ -54,9 +113,14 @@ class HTTPXDownloader(BaseDownloader):
                     json=request.json,
                     params=request.params,
                     cookies=request.cookies,
-                    follow_redirects=request.follow_redirects,
+                    follow_redirects=request.follow_redirects and self.clients is None,
                 )
+                response = await self._follow_redirects(client, request, response)
                 body = await response.aread()
+            latency = time.perf_counter() - start_time
+        except MaxBodySizeExceededException as e:
+            self.logger.error(str(e))
+            return DownloadResponse(reason=str(e))
         except Exception as e:
             if new_request := await self._download_retry(request, e):
                 return new_request
@@ -64,7 +128,58 @@ class HTTPXDownloader(BaseDownloader):
             self.logger.error(f"Error during request: {e}")
             return DownloadResponse(reason=str(e))
         structure_response = self.structure_response(request, response, body)
-        return DownloadResponse(response=structure_response)
+        return DownloadResponse(response=structure_response, latency=latency)
+
+    async def _stream(self, client: httpx.AsyncClient, request: Request) -> Response[None, httpx.Response]:
+        """
+        流式下载，响应体按块写入文件或 stream_sink
+        """
+        writer = StreamWriter(request, self.crawler.settings.stream)
+        httpx_request = client.build_request(
+            request.method,
+            request.url,
+            headers=writer.prepare_headers(await request.get_headers()),
+            data=request.data,
+            json=request.json,
+            params=request.params,
+            cookies=request.cookies,
+        )
+        response = await client.send(
+            httpx_request, stream=True, follow_redirects=request.follow_redirects and self.clients is None
+        )
+        response = await self._follow_redirects(client, request, response, stream=True)
+        try:
+            async with writer:
+                if await writer.start(response.status_code, response.headers):
+                    async for chunk in response.aiter_bytes(writer.chunk_size):
+                        await writer.write(chunk)
+        finally:
+            await response.aclose()
+        return writer.apply(self.structure_response(request, response, b""))
+
+    async def _follow_redirects(
+        self, client: httpx.AsyncClient, request: Request, response: httpx.Response, stream: bool = False
+    ) -> httpx.Response:
+        """
+        复用的客户端不保存 cookie，由这里跟随重定向：每个请求使用自己的 cookie 集合，
+        重定向中响应设置的 cookie 带到重定向后的请求，不会泄漏到其他请求
+        """
+        if self.clients is None or not request.follow_redirects:
+            return response
+
+        cookies = httpx.Cookies(request.cookies)
+        history: list[httpx.Response] = []
+        while (next_request := response.next_request) is not None:
+            await response.aread()
+            history.append(response)
+            if len(history) > client.max_redirects:
+                raise httpx.TooManyRedirects("Exceeded maximum allowed redirects.", request=next_request)
+
+            cookies.extract_cookies(response)
+            cookies.set_cookie_header(next_request)
+            response = await client.send(next_request, stream=stream, follow_redirects=False)
+            response.history = list(history)
+        return response
 
     def _get_proxy(self, request: Request) -> Proxy | None:
         if not request.proxy:
@@ -76,6 +191,11 @@ class HTTPXDownloader(BaseDownloader):
             proxy_url = f"http://{request.proxy}"
         return Proxy(url=proxy_url)
 
+    async def close(self):
+        await super().close()
+        if self.clients:
+            await self.clients.close()
+
     @staticmethod
     def structure_response(request: Request, response: httpx.Response, body: bytes) -> Response[None, httpx.Response]:
         return Response[None, httpx.Response](
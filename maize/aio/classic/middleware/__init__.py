@@ -2,6 +2,7 @@ from maize.middlewares import (
     DefaultHeadersMiddleware,
     DepthMiddleware,
     DownloaderMiddleware,
+    HttpCacheMiddleware,
     HttpErrorMiddleware,
     ItemCleanerMiddleware,
     ItemValidationMiddleware,
@@ -15,6 +16,7 @@ __all__ = [
     "DefaultHeadersMiddleware",
     "DepthMiddleware",
     "DownloaderMiddleware",
+    "HttpCacheMiddleware",
     "HttpErrorMiddleware",
     "ItemCleanerMiddleware",
     "ItemValidationMiddleware",
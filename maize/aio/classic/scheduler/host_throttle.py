@@ -0,0 +1,167 @@
+import math
+import typing
+from urllib.parse import urlparse
+
+if typing.TYPE_CHECKING:
+    from maize import Request
+    from maize.settings.spider_settings import PolitenessSettings
+
+# 回收空闲 HostSlot 的最小间隔，单位：秒
+REAP_INTERVAL = 10.0
+
+
+class HostSlot:
+    """
+    单个 host 的限流状态
+
+    同时限制三个维度：并发数、令牌桶速率（每秒请求数 + 突发量）、相邻两次请求的最小间隔
+    """
+
+    __slots__ = ("active", "burst", "concurrency", "delay", "last_refill", "next_start", "rate", "tokens")
+
+    def __init__(self, concurrency: int, rate: float, burst: int, delay: float, now: float):
+        """
+        :param concurrency: 最大并发数，0 表示不限制
+        :param rate: 每秒请求数，0 表示不限制
+        :param burst: 令牌桶容量，即允许的突发请求数
+        :param delay: 相邻两次请求的最小间隔，单位：秒
+        :param now: 当前时间（事件循环时间）
+        """
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.delay = delay
+
+        self.active: int = 0
+        self.tokens: float = float(self.burst)
+        self.last_refill: float = now
+        self.next_start: float = now
+
+    def _refill(self, now: float):
+        if self.rate > 0:
+            self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def ready_in(self, now: float) -> float:
+        """
+        距离可以发起下一个请求还需等待的时间
+
+        :param now: 当前时间
+        :return: 0 表示可以立即发起；并发已满时返回 inf，需等待在途请求完成
+        """
+        if self.concurrency and self.active >= self.concurrency:
+            return math.inf
+
+        self._refill(now)
+        token_wait = 0.0 if self.rate <= 0 or self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(token_wait, self.next_start - now, 0.0)
+
+    def acquire(self, now: float):
+        self._refill(now)
+        if self.rate > 0:
+            self.tokens -= 1
+        self.next_start = now + self.delay
+        self.active += 1
+
+    def release(self):
+        if self.active > 0:
+            self.active -= 1
+
+    def idle(self, now: float) -> bool:
+        """没有在途请求且限流状态已完全恢复，可以回收"""
+        if self.active:
+            return False
+        self._refill(now)
+        return self.tokens >= self.burst and self.next_start <= now
+
+
+class HostThrottle:
+    """
+    按 host 限流
+
+    host 取请求 URL 的 netloc，每个 host 一个 HostSlot。空闲的 HostSlot 会被回收：
+    请求完成时已空闲的立即回收，设置了 host_rate 或 host_delay 时要等限流状态恢复，由 acquire 定期清理
+    """
+
+    def __init__(self, settings: "PolitenessSettings"):
+        self.settings = settings
+        self._slots: dict[str, HostSlot] = {}
+        # 运行时调整的 host 并发上限（如自适应并发），优先于 host_concurrency 配置
+        self._concurrency: dict[str, int] = {}
+        self._last_reap: float | None = None
+
+    def __len__(self):
+        return len(self._slots)
+
+    @staticmethod
+    def get_host(request: "Request") -> str:
+        return urlparse(request.url).netloc or "unknown"
+
+    def _get_slot(self, host: str, now: float) -> HostSlot:
+        slot = self._slots.get(host)
+        if slot is None:
+            slot = self._slots[host] = HostSlot(
+                concurrency=self._concurrency.get(host, self.settings.host_concurrency),
+                rate=self.settings.host_rate,
+                burst=self.settings.host_burst,
+                delay=self.settings.host_delay,
+                now=now,
+            )
+        return slot
+
+    def set_concurrency(self, host: str, concurrency: int):
+        """
+        运行时调整 host 的并发上限
+
+        :param host: host
+        :param concurrency: 并发上限
+        :return:
+        """
+        self._concurrency[host] = concurrency
+        if slot := self._slots.get(host):
+            slot.concurrency = concurrency
+
+    def reset_concurrency(self, host: str):
+        """
+        恢复 host 的并发上限为 host_concurrency 配置
+
+        :param host: host
+        :return:
+        """
+        self._concurrency.pop(host, None)
+        if slot := self._slots.get(host):
+            slot.concurrency = self.settings.host_concurrency
+
+    def ready_in(self, host: str, now: float) -> float:
+        slot = self._slots.get(host)
+        if slot is None:
+            return 0.0
+        return slot.ready_in(now)
+
+    def acquire(self, host: str, now: float):
+        if self._last_reap is None:
+            self._last_reap = now
+        elif now - self._last_reap >= REAP_INTERVAL:
+            self.reap(now)
+        self._get_slot(host, now).acquire(now)
+
+    def reap(self, now: float) -> int:
+        """
+        回收所有空闲的 HostSlot
+
+        :param now: 当前时间
+        :return: 回收的数量
+        """
+        self._last_reap = now
+        idle_hosts = [host for host, slot in self._slots.items() if slot.idle(now)]
+        for host in idle_hosts:
+            del self._slots[host]
+        return len(idle_hosts)
+
+    def release(self, host: str, now: float):
+        slot = self._slots.get(host)
+        if slot is None:
+            return
+        slot.release()
+        if slot.idle(now):
+            del self._slots[host]
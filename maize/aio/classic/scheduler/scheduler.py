@@ -1,37 +1,207 @@
+import asyncio
+import contextlib
+import math
 import typing
+from collections import deque
 
+from maize.aio.classic.scheduler.host_throttle import HostThrottle
 from maize.utils.priority_queue import SpiderPriorityQueue
+from maize.utils.spill_priority_queue import SpillPriorityQueue
 
 if typing.TYPE_CHECKING:
     from maize import Request
+    from maize.settings.spider_settings import PolitenessSettings, SchedulerSettings
+    from maize.utils.redis_priority_queue import RedisPriorityQueue
 
 
 class Scheduler:
-    def __init__(self):
-        self.request_queue: SpiderPriorityQueue | None = None
+    def __init__(
+        self,
+        settings: "SchedulerSettings | None" = None,
+        spider: typing.Any = None,
+        politeness: "PolitenessSettings | None" = None,
+        frontier: "RedisPriorityQueue | None" = None,
+    ):
+        """
+        :param settings: 调度器配置，为 None 或未限制内存请求数时使用纯内存队列
+        :param spider: 爬虫实例，溢写的请求回填时用于按方法名还原回调函数
+        :param politeness: 按 host 限流配置，为 None 或未启用时不限流
+        :param frontier: 多个实例共享的 Redis 请求队列，不为 None 时优先使用
+        """
+        self.settings = settings
+        self.spider = spider
+        self.frontier = frontier
+        self.request_queue: SpiderPriorityQueue | SpillPriorityQueue | RedisPriorityQueue | None = None
+
+        # 按 host 限流：暂不满足限流条件的请求按 host 暂存在调度器中，不占用下载并发
+        self.throttle: HostThrottle | None = None
+        if politeness is not None and politeness.enabled:
+            self.throttle = HostThrottle(politeness)
+            self._max_deferred_requests = politeness.max_deferred_requests
+        self._deferred: dict[str, deque[Request]] = {}
+        self._deferred_count: int = 0
+
+        # 唤醒信号：请求入队、任务完成、Processor 消费完毕时置位
+        self._wakeup: asyncio.Event = asyncio.Event()
 
     def __len__(self):
         if self.request_queue is None:
             return 0
-        return self.request_queue.qsize()
+        return self.request_queue.qsize() + self._deferred_count
+
+    @property
+    def _queue(self) -> "SpiderPriorityQueue | SpillPriorityQueue | RedisPriorityQueue":
+        if self.request_queue is None:
+            raise AttributeError("scheduler is not opened, request_queue is None")
+        return self.request_queue
 
     def idle(self) -> bool:
         return len(self) == 0
 
     def open(self):
-        self.request_queue = SpiderPriorityQueue()
+        if self.frontier is not None:
+            self.request_queue = self.frontier
+        elif self.settings is not None and self.settings.max_memory_requests_per_priority > 0:
+            self.request_queue = SpillPriorityQueue(
+                spider=self.spider,
+                max_memory_requests_per_priority=self.settings.max_memory_requests_per_priority,
+                batch_size=self.settings.spill_batch_size,
+                path=self.settings.spill_path or None,
+            )
+        else:
+            self.request_queue = SpiderPriorityQueue()
+
+    async def close(self):
+        if isinstance(self.request_queue, SpillPriorityQueue) or (
+            self.frontier is not None and self.request_queue is self.frontier
+        ):
+            await self.request_queue.close()
+
+    def notify(self):
+        """
+        唤醒等待中的 next_request
+
+        可在同步回调（如 Task 的 done_callback）中调用
+        :return:
+        """
+        self._wakeup.set()
 
-    async def next_request(self, gte_priority: int | None = None):
+    async def next_request(self, gte_priority: int | None = None, wait: bool = False):
         """
         获取下一个请求
 
         :param gte_priority: 大于等于优先级，为 None 时不指定优先级
+        :param wait: 没有可用请求时，是否等待唤醒信号。被唤醒后会再尝试获取一次，仍没有可用请求时返回 None，
+            由调用方重新判断爬虫是否已结束
+        :return:
+        """
+        request = await self._pop_request(gte_priority)
+        if request is not None or not wait:
+            return request
+
+        # 有暂存的请求时，最多等到最早可发起请求的 host 解除限流
+        timeout = self._deferred_ready_in(gte_priority)
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._wakeup.wait(), None if math.isinf(timeout) else timeout)
+        self._wakeup.clear()
+        return await self._pop_request(gte_priority)
+
+    def release(self, request: "Request"):
+        """
+        请求处理完毕，释放所属 host 的并发占用
+
+        :param request: next_request 返回的请求
         :return:
         """
+        if self.throttle is None:
+            return
+        self.throttle.release(self.throttle.get_host(request), asyncio.get_running_loop().time())
+        self.notify()
+
+    async def _pop_request(self, gte_priority: int | None = None):
+        if self.throttle is None:
+            return await self._pop_queue(gte_priority)
+
+        now = asyncio.get_running_loop().time()
+        if request := self._pop_deferred(gte_priority, now):
+            return request
+
+        # 最多取出一轮队列中现有的请求，只剩暂存已满的 host 时不会反复取出放回
+        for _ in range(max(1, self._queue.qsize())):
+            request = await self._pop_queue(gte_priority)
+            if request is None:
+                return None
+
+            host = self.throttle.get_host(request)
+            requests = self._deferred.get(host)
+            if requests is None and self.throttle.ready_in(host, now) == 0:
+                self.throttle.acquire(host, now)
+                return request
+
+            if requests is not None and len(requests) >= self._max_deferred_requests:
+                # 该 host 暂存的请求已满，放回队列，继续为其他 host 取请求
+                await self._requeue(request)
+                continue
+
+            self._deferred.setdefault(host, deque()).append(request)
+            self._deferred_count += 1
+        return None
+
+    async def _requeue(self, request: "Request"):
+        await self._queue.put(request)
+        if self.frontier is not None and self.request_queue is self.frontier:
+            # 放回后是新的成员，删除原请求的租约
+            self.frontier.ack(request)
+
+    async def _pop_queue(self, gte_priority: int | None = None):
         if gte_priority is None:
-            return await self.request_queue.get()
+            return await self._queue.get()
+
+        return await self._queue.get_by_priority(gte_priority)
+
+    def _pop_deferred(self, gte_priority: int | None, now: float) -> "Request | None":
+        """从已解除限流的 host 中取出优先级最高的暂存请求"""
+        if self.throttle is None:
+            return None
+
+        best_host = None
+        best_priority = None
+        for host, requests in self._deferred.items():
+            priority = requests[0].priority
+            if gte_priority is not None and priority < gte_priority:
+                continue
+            if best_priority is not None and priority >= best_priority:
+                continue
+            if self.throttle.ready_in(host, now) == 0:
+                best_host, best_priority = host, priority
+
+        if best_host is None:
+            return None
+
+        requests = self._deferred[best_host]
+        request = requests.popleft()
+        if not requests:
+            del self._deferred[best_host]
+        self._deferred_count -= 1
+        self.throttle.acquire(best_host, now)
+        return request
+
+    def _deferred_ready_in(self, gte_priority: int | None) -> float:
+        """暂存请求中，最早可以发起的请求还需等待的时间，并发已满的 host 需等待唤醒"""
+        if self.throttle is None or not self._deferred:
+            return math.inf
 
-        return await self.request_queue.get_by_priority(gte_priority)
+        throttle = self.throttle
+        now = asyncio.get_running_loop().time()
+        return min(
+            (
+                throttle.ready_in(host, now)
+                for host, requests in self._deferred.items()
+                if gte_priority is None or requests[0].priority >= gte_priority
+            ),
+            default=math.inf,
+        )
 
     async def enqueue_request(self, request: "Request"):
-        await self.request_queue.put(request)
+        await self._queue.put(request)
+        self.notify()
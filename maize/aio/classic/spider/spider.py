@@ -89,9 +89,19 @@ class Spider(StandardSpiderInterface):
         async with self._lock:
             if gte_priority is None:
                 self.gte_priority = None
-                return
+            else:
+                self.gte_priority = gte_priority
+            self._notify_scheduler()
+
+    def _notify_scheduler(self):
+        """
+        唤醒等待中的调度器，使引擎立即按新的优先级继续获取请求
 
-            self.gte_priority = gte_priority
+        :return:
+        """
+        engine = self.crawler.engine if self.crawler else None
+        if engine and engine.scheduler:
+            engine.scheduler.notify()
 
     def idle(self) -> bool:
         return self.stats_collector.idle() and not self.is_pause()
@@ -10,10 +10,15 @@ import logging
 import signal
 import time
 import typing
+from pathlib import Path
 from urllib.parse import urlparse
 
+import ujson
+
+from maize.common.constant.setting_constant import DedupBackendEnum
 from maize.common.http import Request, Response
 from maize.common.items import Item
+from maize.utils.bloom_filter import ScalableBloomFilter
 
 
 class LiteCrawler:
@@ -40,6 +45,8 @@ class LiteCrawler:
         self._items: list[Item] = []
         self._seen: set[str] = set()
         self._tie_breaker: int = 0
+        # 已入队但尚未处理完的请求（按 id），写快照时一起保存
+        self._pending: dict[int, Request] = {}
         self._stats: dict[str, int] = {
             "requested": 0,
             "succeeded": 0,
@@ -50,6 +57,7 @@ class LiteCrawler:
         }
         self._domain_semaphores: dict[str, asyncio.Semaphore] = {}
         self._logger = spider.logger
+        self._seen_filter: ScalableBloomFilter | None = self._create_seen_filter()
 
     @property
     def logger(self) -> logging.Logger:
@@ -66,6 +74,103 @@ class LiteCrawler:
         """运行时统计：requested/succeeded/failed/retried/dropped/items"""
         return dict(self._stats)
 
+    def _create_seen_filter(self) -> ScalableBloomFilter | None:
+        """按 spider.dedup_backend 创建布隆过滤器，存在快照文件时从快照恢复；使用 set 去重时返回 None"""
+        if self.spider.dedup_backend != DedupBackendEnum.BLOOM.value:
+            return None
+
+        snapshot_path = self.spider.dedup_snapshot_path
+        if snapshot_path and Path(snapshot_path).exists():
+            seen_filter = ScalableBloomFilter.load(snapshot_path)
+            self.logger.info(f"Restore dedup snapshot: {snapshot_path} (seen={len(seen_filter)})")
+            return seen_filter
+
+        return ScalableBloomFilter(
+            initial_capacity=self.spider.dedup_initial_capacity,
+            error_rate=self.spider.dedup_error_rate,
+        )
+
+    def _request_seen(self, request: Request) -> bool:
+        """判断请求是否已见过，未见过时记录"""
+        if self._seen_filter is not None:
+            return self._seen_filter.add(request.fingerprint)
+
+        req_hash = request.hash
+        if req_hash in self._seen:
+            return True
+        self._seen.add(req_hash)
+        return False
+
+    @property
+    def _pending_path(self) -> Path | None:
+        """未处理请求的快照文件，与布隆过滤器快照放在一起"""
+        snapshot_path = self.spider.dedup_snapshot_path
+        if self._seen_filter is None or not snapshot_path:
+            return None
+        return Path(f"{snapshot_path}.pending")
+
+    def _dump_seen_filter(self) -> None:
+        """
+        将布隆过滤器写入快照文件
+
+        指纹在入队时写入过滤器，收到停止信号时仍未处理的请求（包括 start_requests 不会再产出的跟进链接）
+        一起写入 {dedup_snapshot_path}.pending，重启时直接入队，不会被当作重复丢弃
+        """
+        snapshot_path = self.spider.dedup_snapshot_path
+        pending_path = self._pending_path
+        if self._seen_filter is None or not snapshot_path or pending_path is None:
+            return
+
+        lines = []
+        for request in self._pending.values():
+            try:
+                lines.append(ujson.dumps(request.to_dict(self.spider)))
+            except (ValueError, TypeError, OverflowError) as e:
+                self.logger.warning(f"Skip saving pending request: {request.url}, error: {e}")
+
+        try:
+            # 先写未处理的请求：中途退出时宁可重复抓取，也不丢失请求
+            if lines:
+                tmp_path = pending_path.with_name(f"{pending_path.name}.tmp")
+                tmp_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+                tmp_path.replace(pending_path)
+            else:
+                pending_path.unlink(missing_ok=True)
+            self._seen_filter.dump(snapshot_path)
+            self.logger.info(
+                f"Dump dedup snapshot: {snapshot_path} (seen={len(self._seen_filter)}, pending={len(lines)})"
+            )
+        except OSError as e:
+            self.logger.error(f"Dump dedup snapshot failed: {snapshot_path}, error: {e}")
+
+    async def _restore_pending(self, request_queue: asyncio.PriorityQueue) -> None:
+        """上次停止时未处理的请求直接入队，其指纹已在恢复的布隆过滤器中，不再经过深度控制和去重"""
+        pending_path = self._pending_path
+        if pending_path is None or not pending_path.exists():
+            return
+
+        count = 0
+        with pending_path.open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    request = Request.from_dict(ujson.loads(line), self.spider)
+                except (ValueError, AttributeError) as e:
+                    self.logger.error(f"Restore pending request failed: {line.strip()}, error: {e}")
+                    continue
+                await self._put(request, request_queue)
+                count += 1
+        self.logger.info(f"Restore pending requests: {pending_path} (count={count})")
+
+    async def _put(self, request: Request, request_queue: asyncio.PriorityQueue) -> None:
+        # PriorityQueue 需要可比较的 tuple；tie_breaker 保证同 priority 时按入队顺序出队，
+        # 避免 Request.__lt__ 只比 priority 导致 tuple 第二项比较报错
+        self._tie_breaker += 1
+        await request_queue.put((float(request.priority), self._tie_breaker, request))
+        self._pending[id(request)] = request
+        self._stats["requested"] += 1
+
     async def _enqueue(self, request: Request, request_queue: asyncio.PriorityQueue) -> bool:
         """
         入队前的过滤：深度控制 + 去重，通过则按 priority 入队。
@@ -84,19 +189,12 @@ class LiteCrawler:
             return False
 
         # 去重：spider.dedup 全局开关 + dont_filter 单请求逃生口
-        if self.spider.dedup and not request.meta.get("dont_filter", False):
-            req_hash = request.hash
-            if req_hash in self._seen:
-                self.logger.debug(f"Drop duplicate request: {request.url}")
-                self._stats["dropped"] += 1
-                return False
-            self._seen.add(req_hash)
+        if self.spider.dedup and not request.get_meta("dont_filter", False) and self._request_seen(request):
+            self.logger.debug(f"Drop duplicate request: {request.url}")
+            self._stats["dropped"] += 1
+            return False
 
-        # PriorityQueue 需要可比较的 tuple；tie_breaker 保证同 priority 时按入队顺序出队，
-        # 避免 Request.__lt__ 只比 priority 导致 tuple 第二项比较报错
-        self._tie_breaker += 1
-        await request_queue.put((float(request.priority), self._tie_breaker, request))
-        self._stats["requested"] += 1
+        await self._put(request, request_queue)
         return True
 
     async def crawl(self) -> None:
@@ -133,6 +231,7 @@ class LiteCrawler:
         request_queue: asyncio.PriorityQueue[tuple[float, int, Request | None]] = asyncio.PriorityQueue()
 
         async def feed_start_requests():
+            await self._restore_pending(request_queue)
             try:
                 async for request in self.spider.start_requests():
                     if stop_event.is_set():
@@ -175,6 +274,7 @@ class LiteCrawler:
 
             await self.spider.on_close()
             await self.spider.close()
+            self._dump_seen_filter()
             self._log_stats()
 
     def _log_stats(self) -> None:
@@ -198,7 +298,7 @@ class LiteCrawler:
 
     async def _process(self, request: Request, request_queue: asyncio.PriorityQueue) -> None:
         """处理单个请求：fetch + parse + 处理产出"""
-        parent_depth = request.meta.get("_lite_depth", 0)
+        parent_depth = request.get_meta("_lite_depth", 0)
         start_time = time.monotonic()
         sem = self._get_domain_semaphore(request.url)
 
@@ -216,6 +316,7 @@ class LiteCrawler:
                 f"fetch_failed url={request.url} elapsed={elapsed:.2f}s retry={request.current_retry_count} error={e}"
             )
             self._stats["failed"] += 1
+            self._pending.pop(id(request), None)
             request_queue.task_done()
             return
 
@@ -254,6 +355,7 @@ class LiteCrawler:
                 f"parse_failed url={request.url} status={response.status} elapsed={elapsed:.2f}s error={e}"
             )
         finally:
+            self._pending.pop(id(request), None)
             request_queue.task_done()
 
     async def _fetch_with_retry(self, request: Request) -> Response:
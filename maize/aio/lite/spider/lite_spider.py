@@ -7,6 +7,7 @@ import aiohttp
 
 from maize.aio.lite.crawler import LiteCrawler
 from maize.base.interface.lite_spider_interface import LiteSpiderInterface
+from maize.common.constant.setting_constant import DedupBackendEnum
 from maize.common.http import Request, Response
 from maize.common.items import Item
 from maize.utils.log_util import get_logger
@@ -85,6 +86,38 @@ class LiteSpider(LiteSpiderInterface):
         """
         return True
 
+    @property
+    def dedup_backend(self) -> str:
+        """
+        请求去重存储类型，默认 ``DedupBackendEnum.SET``。
+
+        - ``DedupBackendEnum.SET``：精确去重，每个请求保存一个 32 字符的 hash 字符串
+        - ``DedupBackendEnum.BLOOM``：可扩容布隆过滤器，每个请求约占 2 字节，
+          误判率由 ``dedup_error_rate`` 控制，适合千万级 URL 的大规模抓取
+        """
+        return DedupBackendEnum.SET.value
+
+    @property
+    def dedup_error_rate(self) -> float:
+        """布隆过滤器误判率，仅 ``dedup_backend`` 为 bloom 时生效"""
+        return 0.001
+
+    @property
+    def dedup_initial_capacity(self) -> int:
+        """布隆过滤器第一级容量，达到后自动扩容，仅 ``dedup_backend`` 为 bloom 时生效"""
+        return 1_000_000
+
+    @property
+    def dedup_snapshot_path(self) -> str | None:
+        """
+        布隆过滤器快照文件路径，默认 None 不保存。
+
+        设置后启动时从该文件恢复已见集合，结束时写回，重启的爬虫不会重复抓取。
+        收到停止信号时仍未处理的请求写入 ``{dedup_snapshot_path}.pending``，重启后继续处理。
+        仅 ``dedup_backend`` 为 bloom 时生效。
+        """
+        return None
+
     @property
     def per_domain_concurrency(self) -> int:
         """
@@ -0,0 +1,214 @@
+import asyncio
+import hashlib
+import inspect
+import tempfile
+import typing
+import uuid
+from collections.abc import Mapping
+from pathlib import Path
+from types import TracebackType
+
+from maize.common.http import Response
+from maize.common.http.request import Request
+from maize.exceptions.spider_exception import MaxBodySizeExceededException
+from maize.settings.spider_settings import StreamSettings
+
+
+def _has_header(headers: Mapping[str, typing.Any], name: str) -> bool:
+    name = name.lower()
+    return any(key.lower() == name for key in headers)
+
+
+class StreamWriter:
+    """
+    流式下载写入器
+
+    请求的 meta 中设置 stream=True 时，下载器不再把响应体读入内存，而是按块写入文件或用户提供的写入对象，
+    同时计算摘要、限制响应体大小。meta 支持的配置：
+
+    - stream_path: 保存的文件路径，为空时在 StreamSettings.directory（默认系统临时目录）下生成，
+      生成的路径写回 meta，下载中断后重试的请求继续写入同一个文件
+    - stream_sink: 写入对象，需要实现 write(bytes) 方法（可以是协程），设置后不保存文件，也不能续传
+    - max_body_size: 响应体最大大小，覆盖 StreamSettings.max_body_size
+
+    保存的文件已存在时通过 Range 请求续传，并用上次响应的 ETag / Last-Modified 作为 If-Range，
+    服务端的文件已变化时返回完整内容，重新写入。只写入 200/206 响应的响应体，其他状态码不写入，
+    并删除已有的部分。
+
+    用法::
+
+        writer = StreamWriter(request, settings)
+        headers = writer.prepare_headers(await request.get_headers())
+        # 使用 headers 发送请求
+        async with writer:
+            if await writer.start(status, response_headers):
+                async for chunk in ...:
+                    await writer.write(chunk)
+        writer.apply(response)
+    """
+
+    def __init__(self, request: Request, settings: StreamSettings):
+        """
+        :param request: 请求
+        :param settings: 流式下载配置
+        """
+        self.request = request
+        self.settings = settings
+        self.chunk_size = settings.chunk_size
+        self.max_body_size: int = request.get_meta("max_body_size", settings.max_body_size)
+        self.sink = request.get_meta("stream_sink")
+
+        self.path: Path | None = None
+        # 已写入的字节数，续传时包含已有的部分
+        self.size = 0
+        # 续传的起始位置
+        self._offset = 0
+        self._resumed = False
+        self._exceeded = False
+        self._file: typing.BinaryIO | None = None
+        self._hash = hashlib.new(settings.hash_algorithm)
+
+    def prepare_headers(self, headers: dict | None) -> dict:
+        """
+        确定写入位置，需要续传时添加 Range 请求头
+
+        :param headers: 请求头
+        :return: 发送请求使用的请求头
+        """
+        headers = dict(headers or {})
+        # 响应体被压缩时 Range 的偏移量对应压缩后的内容，要求服务端返回原始内容
+        if not _has_header(headers, "Accept-Encoding"):
+            headers["Accept-Encoding"] = "identity"
+        if self.sink is not None:
+            return headers
+
+        path = self.request.get_meta("stream_path")
+        if not path:
+            directory = self.settings.directory or tempfile.gettempdir()
+            path = self.request.meta["stream_path"] = str(Path(directory) / f"maize-stream-{uuid.uuid4().hex}")
+        self.path = Path(path)
+
+        if self.settings.resume and self.path.is_file():
+            self._offset = self.path.stat().st_size
+        if self._offset:
+            # 续传的偏移量对应原始内容，覆盖请求或 DefaultHeadersMiddleware 设置的 Accept-Encoding
+            for key in [key for key in headers if key.lower() == "accept-encoding"]:
+                del headers[key]
+            headers["Accept-Encoding"] = "identity"
+            headers["Range"] = f"bytes={self._offset}-"
+            validator = self.request.get_meta("stream_validator")
+            if validator:
+                headers["If-Range"] = validator
+        return headers
+
+    async def start(self, status: int, headers: Mapping[str, typing.Any]) -> bool:
+        """
+        收到响应头后调用，打开写入位置
+
+        :param status: 响应状态码
+        :param headers: 响应头
+        :return: 是否需要继续读取响应体，续传时服务端返回 416（文件已完整）或其他非 200/206 的状态码时为 False
+        """
+        headers = {key.lower(): value for key, value in headers.items()}
+        if status not in {200, 206} and not (status == 416 and self._offset):
+            # 错误响应不写入，删除已有的部分，重试时重新下载
+            if self.path is not None:
+                await asyncio.to_thread(self.path.unlink, missing_ok=True)
+                self.request.meta.pop("stream_validator", None)
+                self.path = None
+            self._offset = 0
+            return False
+
+        if self.path is not None and self._offset and status in {206, 416}:
+            content_range = headers.get("content-range", "")
+            if status == 206 and not content_range.startswith(f"bytes {self._offset}-"):
+                # 服务端返回的范围与已有部分不连续，删除后重试时重新下载
+                await asyncio.to_thread(self.path.unlink, missing_ok=True)
+                raise ValueError(f"unexpected content-range {content_range!r} for {self.request.url}")
+            # 继续计算已有部分的摘要
+            self._resumed = True
+            await asyncio.to_thread(self._hash_file, self.path)
+            if status == 416:
+                self.size = self._offset
+                return False
+        else:
+            self._offset = 0
+
+        validator = headers.get("etag") or headers.get("last-modified")
+        if validator and self.sink is None:
+            self.request.meta["stream_validator"] = validator
+
+        content_length = headers.get("content-length")
+        if content_length and content_length.isdigit():
+            self._check_size(self._offset + int(content_length))
+
+        self.size = self._offset
+        if self.path is not None:
+            self._file = await asyncio.to_thread(self._open_file, self.path)
+        return True
+
+    def _open_file(self, path: Path) -> typing.BinaryIO:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path.open("ab" if self._offset else "wb")
+
+    def _hash_file(self, path: Path):
+        with path.open("rb") as f:
+            while chunk := f.read(self.chunk_size):
+                self._hash.update(chunk)
+
+    def _check_size(self, size: int):
+        if self.max_body_size and size > self.max_body_size:
+            self._exceeded = True
+            raise MaxBodySizeExceededException(
+                f"response body of {self.request.url} exceeds max_body_size {self.max_body_size}"
+            )
+
+    async def write(self, chunk: bytes):
+        """
+        写入一块响应体
+
+        :param chunk: 响应体
+        :return:
+        """
+        self._check_size(self.size + len(chunk))
+        self.size += len(chunk)
+        self._hash.update(chunk)
+        if self._file is not None:
+            await asyncio.to_thread(self._file.write, chunk)
+        elif self.sink is not None:
+            result = self.sink.write(chunk)
+            if inspect.isawaitable(result):
+                await result
+
+    async def __aenter__(self) -> "StreamWriter":
+        return self
+
+    async def __aexit__(
+        self, exc_type: type | None, exc_val: BaseException | None, exc_tb: TracebackType | None
+    ) -> bool | None:
+        """
+        关闭文件；响应体超过最大大小时删除文件，其他异常时保留已写入的部分，重试时续传
+        """
+        if self._file is not None:
+            await asyncio.to_thread(self._file.close)
+            self._file = None
+        if self._exceeded and self.path is not None:
+            await asyncio.to_thread(self.path.unlink, missing_ok=True)
+        return None
+
+    @property
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+    def apply(self, response: Response) -> Response:
+        """
+        设置响应的文件路径和摘要，续传成功时状态码为 200，错误响应没有文件路径
+
+        :param response: 下载器生成的响应
+        :return: 响应
+        """
+        response.path = str(self.path) if self.path is not None else None
+        response.body_hash = self.hexdigest
+        if self._resumed:
+            response.status = 200
+        return response
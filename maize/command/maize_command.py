@@ -1,5 +1,10 @@
+import asyncio
+
 import click
 
+from maize.pipelines.dead_letter import replay_dead_letters
+from maize.utils.project_util import get_settings
+
 from .code_generate import CodeGenerate
 
 
@@ -14,3 +19,15 @@ def create(project_name: str):
     """生成项目结构"""
     print(f"{project_name} 成功生成")
     CodeGenerate().generate(project_name)
+
+
+@cli.command()
+@click.argument("path")
+@click.option(
+    "--settings", "settings_path", default="maize.SpiderSettings", help="配置类路径，如 my_project.settings.Settings"
+)
+@click.option("--batch-size", default=5000, show_default=True, help="每批写入的最大 item 数")
+def replay(path: str, settings_path: str, batch_size: int):
+    """把死信目录中的 item 重新写入数据管道"""
+    process_result = asyncio.run(replay_dead_letters(path, get_settings(settings_path), batch_size))
+    click.echo(f"重放完成，成功: {process_result.success_count}，失败: {process_result.fail_count}")
@@ -1,7 +1,12 @@
 from .command_constant import TemplateFile
 from .request_constant import Method
 from .setting_constant import (
+    CallbackExecutionModeEnum,
+    DedupBackendEnum,
+    DnsResolverEnum,
+    DupeFilterEnum,
     LogLevelEnum,
+    MysqlInsertModeEnum,
     PipelineEnum,
     RPADriverTypeEnum,
     RPAResourceTypeEnum,
@@ -9,6 +9,14 @@ class SpiderDownloaderEnum(str, Enum):
     PATCHRIGHT = "maize.downloader.patchright_downloader.PatchrightDownloader"
 
 
+@unique
+class DnsResolverEnum(str, Enum):
+    """AioHttpDownloader DNS 解析器枚举"""
+
+    THREADED = "threaded"  # 在线程池中调用 getaddrinfo
+    ASYNC = "async"  # 使用 aiodns 异步解析，需要安装 aiodns
+
+
 @unique
 class LogLevelEnum(str, Enum):
     CRITICAL = "CRITICAL"
@@ -25,6 +33,38 @@ class PipelineEnum(str, Enum):
     MYSQL = "maize.MysqlPipeline"
 
 
+@unique
+class DupeFilterEnum(str, Enum):
+    MEMORY = "maize.MemoryDupeFilter"
+    BLOOM = "maize.BloomDupeFilter"
+
+
+@unique
+class DedupBackendEnum(str, Enum):
+    """Lite 爬虫请求去重存储类型枚举"""
+
+    SET = "set"  # 精确去重，每个请求保存一个 hash 字符串
+    BLOOM = "bloom"  # 可扩容布隆过滤器，内存占用小，存在误判率
+
+
+@unique
+class MysqlInsertModeEnum(str, Enum):
+    """MysqlPipeline 写入模式枚举"""
+
+    INSERT = "insert"  # insert into
+    IGNORE = "ignore"  # insert ignore into，跳过主键或唯一键冲突的行
+    UPSERT = "upsert"  # insert into ... on duplicate key update，冲突时更新
+
+
+@unique
+class CallbackExecutionModeEnum(str, Enum):
+    """爬虫回调执行模式枚举"""
+
+    INLINE = "inline"  # 在事件循环中执行
+    THREAD = "thread"  # 在线程池中执行，适合 lxml 等释放 GIL 的解析
+    PROCESS = "process"  # 在进程池中执行，响应发送到子进程解析，产出的 Request / Item 发送回主进程
+
+
 @unique
 class RPAResourceTypeEnum(str, Enum):
     """RPA 资源类型枚举"""
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import re
+import typing
+from urllib.parse import quote_plus
+
+if typing.TYPE_CHECKING:
+    from maize.common.http.request import Request
+
+# 指纹摘要长度，单位：字节
+FINGERPRINT_SIZE = 16
+
+# 默认端口后缀，规范化时去掉
+_DEFAULT_PORT_SUFFIXES = {"http": ":80", "https": ":443", "ws": ":80", "wss": ":443"}
+
+
+# 无需转义的查询参数字符，命中时跳过 quote_plus
+_is_safe = re.compile(r"[A-Za-z0-9_.~-]*").fullmatch
+
+
+def _quote(value: typing.Any) -> str:
+    value = str(value)
+    return value if _is_safe(value) else quote_plus(value)
+
+
+def _encode_pairs(params: typing.Any) -> list[str]:
+    """把 dict 或 (key, value) 列表编码为 key=value 形式的查询参数，值为列表时展开"""
+    if not params:
+        return []
+    if isinstance(params, str):
+        return [pair for pair in params.split("&") if pair]
+
+    items = params.items() if isinstance(params, dict) else params
+    pairs: list[str] = []
+    for key, value in items:
+        encoded_key = _quote(key)
+        if isinstance(value, (list, tuple)):
+            pairs.extend(f"{encoded_key}={_quote(v)}" for v in value)
+        else:
+            pairs.append(f"{encoded_key}={_quote(value)}")
+    return pairs
+
+
+def canonicalize_url(url: str, params: typing.Any = None) -> str:
+    """
+    规范化 URL
+
+    - scheme、host 转为小写，去掉默认端口
+    - 空路径补为 /
+    - 查询参数（合并 params）按编码后的 key=value 排序，不重新编码 URL 中已有的查询参数
+    - 去掉 fragment
+
+    :param url: URL
+    :param params: 请求参数，与 URL 中的查询参数合并
+    :return: 规范化后的 URL
+    """
+    # 手动拆分比 urlsplit 快，请求 URL 基本不会重复，urlsplit 的缓存命中率很低
+    base, _, query = url.strip().partition("#")[0].partition("?")
+    scheme, separator, rest = base.partition("://")
+    if separator:
+        netloc, slash, path = rest.partition("/")
+        path = slash + path
+    else:
+        scheme, netloc, path = "", "", base
+    scheme = scheme.lower()
+    netloc = netloc.lower()
+    if netloc.endswith(":"):
+        netloc = netloc[:-1]
+    else:
+        default_port_suffix = _DEFAULT_PORT_SUFFIXES.get(scheme)
+        if default_port_suffix and netloc.endswith(default_port_suffix):
+            netloc = netloc[: -len(default_port_suffix)]
+
+    pairs = [pair for pair in query.split("&") if pair] if query else []
+    if params:
+        pairs.extend(_encode_pairs(params))
+    if len(pairs) > 1:
+        pairs.sort()
+    url = f"{scheme}://{netloc}{path or '/'}" if separator else path
+    return f"{url}?{'&'.join(pairs)}" if pairs else url
+
+
+def _canonical_body(data: typing.Any, json_data: typing.Any) -> bytes:
+    if json_data is not None:
+        return json.dumps(json_data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str).encode()
+    if data is None:
+        return b""
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, str):
+        return data.encode()
+    return "&".join(sorted(_encode_pairs(data))).encode()
+
+
+def _canonical_headers(headers: dict | None, include_headers: typing.Iterable[str] | None) -> bytes:
+    if not headers:
+        return b""
+
+    selected: typing.Iterable[tuple[str, typing.Any]]
+    if include_headers is None:
+        selected = headers.items()
+    else:
+        names = {name.lower() for name in include_headers}
+        selected = ((name, value) for name, value in headers.items() if name.lower() in names)
+    return "\n".join(sorted(f"{name.lower()}:{str(value).strip()}" for name, value in selected)).encode()
+
+
+def compute_fingerprint(request: "Request", include_headers: typing.Iterable[str] | None = None) -> bytes:
+    """
+    计算请求指纹，不使用缓存
+
+    :param request: 请求
+    :param include_headers: 参与计算的请求头名称（不区分大小写），为 None 时全部请求头参与计算
+    :return: 16 字节的 blake2b 摘要
+    """
+    parts = (
+        request.method.upper().encode(),
+        canonicalize_url(request.url, request.params).encode(),
+        _canonical_body(request.data, request.json),
+        _canonical_headers(request.headers, include_headers),
+    )
+    # 各字段前加长度前缀，避免不同字段拼接后产生歧义
+    data = b"".join(len(part).to_bytes(4, "little") + part for part in parts)
+    return hashlib.blake2b(data, digest_size=FINGERPRINT_SIZE).digest()
+
+
+def request_fingerprint(request: "Request", include_headers: typing.Iterable[str] | None = None) -> bytes:
+    """
+    请求指纹
+
+    结果缓存在请求上，修改 url、method、headers、params、data、json 属性后缓存失效；
+    原地修改这些属性中的 dict（如 request.headers["a"] = "b"）不会使缓存失效，需要重新赋值
+    :param request: 请求
+    :param include_headers: 参与计算的请求头名称（不区分大小写），为 None 时全部请求头参与计算
+    :return: 16 字节的二进制摘要
+    """
+    if include_headers is None:
+        fingerprint = request._fingerprint
+        if fingerprint is None:
+            fingerprint = request._fingerprint = compute_fingerprint(request)
+        return fingerprint
+
+    key = tuple(sorted(name.lower() for name in include_headers))
+    cache = request._fingerprint_cache
+    if cache is None:
+        cache = request._fingerprint_cache = {}
+    fingerprint = cache.get(key)
+    if fingerprint is None:
+        fingerprint = cache[key] = compute_fingerprint(request, key)
+    return fingerprint
@@ -1,10 +1,42 @@
-import hashlib
 import typing
 
 from maize.common.constant.request_constant import Method
+from maize.common.http.fingerprint import request_fingerprint
 
 
 class Request:
+    """
+    请求
+
+    使用 __slots__ 减少单个请求的内存占用，调度器中排队的请求数量很大时尤为明显：
+    meta 在第一次访问时才分配，未设置的 headers、cookies 等保持为 None，
+    method 直接引用 Method 枚举的字符串值，所有请求共享同一个字符串对象
+    """
+
+    __slots__ = (
+        "_current_retry_count",
+        "_data",
+        "_fingerprint",
+        "_fingerprint_cache",
+        "_headers",
+        "_json",
+        "_meta",
+        "_method",
+        "_params",
+        "_url",
+        "callback",
+        "cookies",
+        "encoding",
+        "error_callback",
+        "follow_redirects",
+        "headers_func",
+        "max_redirects",
+        "priority",
+        "proxy",
+        "proxy_password",
+        "proxy_username",
+    )
+
     def __init__(
         self,
         url: str,
@@ -48,16 +80,20 @@ class Request:
         :param follow_redirects: 是否允许重定向
         :param max_redirects: 最大重定向次数，默认为 20
         """
-        self.url = url
-        self.method: str = str(method.value)
+        self._url = url
+        self._method: str = method.value
         self.callback = callback
         self.error_callback = error_callback
         self.priority = priority
-        self.headers = headers
+        self._headers = headers
         self.headers_func = headers_func
-        self.params = params
-        self.data = data
-        self.json = json
+        self._params = params
+        self._data = data
+        self._json = json
+        # 请求指纹缓存，参与指纹计算的属性被重新赋值后清空：
+        # _fingerprint 为全部请求头参与计算的指纹，_fingerprint_cache 按参与计算的请求头缓存其它指纹
+        self._fingerprint: bytes | None = None
+        self._fingerprint_cache: dict[tuple[str, ...], bytes] | None = None
         self.cookies = cookies
         self.proxy = proxy
         self.proxy_username = proxy_username
@@ -70,7 +106,8 @@ class Request:
         self._current_retry_count: int = 0
 
         self.encoding = encoding
-        self._meta = meta if meta is not None else {}
+        # 第一次访问 meta 时才分配
+        self._meta: dict | None = meta
 
     def __str__(self):
         return f"{self.method} {self.url}"
@@ -80,7 +117,23 @@ class Request:
 
     @property
     def meta(self) -> dict:
-        return self._meta
+        meta = self._meta
+        if meta is None:
+            meta = self._meta = {}
+        return meta
+
+    def get_meta(self, key: str, default: typing.Any = None) -> typing.Any:
+        """
+        读取 meta 中的数据，meta 未分配时不会分配
+
+        :param key: key
+        :param default: 不存在时的默认值
+        :return: meta 中的数据
+        """
+        meta = self._meta
+        if meta is None:
+            return default
+        return meta.get(key, default)
 
     @property
     def current_retry_count(self):
@@ -89,18 +142,77 @@ class Request:
     def retry(self):
         self._current_retry_count += 1
 
+    @property
+    def url(self) -> str:
+        return self._url
+
+    @url.setter
+    def url(self, value: str):
+        self._url = value
+        self._clear_fingerprint()
+
+    @property
+    def method(self) -> str:
+        return self._method
+
+    @method.setter
+    def method(self, value: str):
+        self._method = value
+        self._clear_fingerprint()
+
+    @property
+    def headers(self) -> dict | None:
+        return self._headers
+
+    @headers.setter
+    def headers(self, value: dict | None):
+        self._headers = value
+        self._clear_fingerprint()
+
+    @property
+    def params(self) -> dict | None:
+        return self._params
+
+    @params.setter
+    def params(self, value: dict | None):
+        self._params = value
+        self._clear_fingerprint()
+
+    @property
+    def data(self) -> dict | str | None:
+        return self._data
+
+    @data.setter
+    def data(self, value: dict | str | None):
+        self._data = value
+        self._clear_fingerprint()
+
+    @property
+    def json(self) -> dict | None:
+        return self._json
+
+    @json.setter
+    def json(self, value: dict | None):
+        self._json = value
+        self._clear_fingerprint()
+
+    def _clear_fingerprint(self):
+        self._fingerprint = None
+        self._fingerprint_cache = None
+
+    @property
+    def fingerprint(self) -> bytes:
+        """
+        请求指纹，16 字节的二进制摘要，详见 maize.common.http.fingerprint.request_fingerprint
+
+        :return: 请求指纹
+        """
+        return request_fingerprint(self)
+
     @property
     def hash(self) -> str:
-        request_data_list = [
-            self.method,
-            self.url,
-            repr(self.headers) or "",
-            repr(self.params) or "",
-            repr(self.data) or "",
-            repr(self.json) or "",
-        ]
-        request_data_str = ":".join(request_data_list)
-        return hashlib.md5(request_data_str.encode("utf-8")).hexdigest()
+        """请求指纹的十六进制字符串"""
+        return request_fingerprint(self).hex()
 
     @property
     def model_dump(self):
@@ -118,5 +230,91 @@ class Request:
             "proxy_password": self.proxy_password,
         }
 
+    def to_dict(self, spider: typing.Any = None) -> dict[str, typing.Any]:
+        """
+        转换为可序列化的 dict，用于请求落盘、跨进程传递
+
+        回调函数只保存方法名，需通过 from_dict 传入 spider 按方法名还原
+
+        :param spider: 爬虫实例，传入时校验回调函数可以通过 spider 按方法名还原
+        :raises ValueError: 回调函数不是实例方法（如 lambda、普通函数），或不是 spider 的方法时无法序列化
+        :return: dict
+        """
+        return {
+            "url": self.url,
+            "method": self.method,
+            "callback": self._get_callback_name(self.callback, spider),
+            "error_callback": self._get_callback_name(self.error_callback, spider),
+            "headers_func": self._get_callback_name(self.headers_func, spider),
+            "priority": self.priority,
+            "headers": self.headers,
+            "params": self.params,
+            "data": self.data,
+            "json": self.json,
+            "cookies": self.cookies,
+            "proxy": self.proxy,
+            "proxy_username": self.proxy_username,
+            "proxy_password": self.proxy_password,
+            "encoding": self.encoding,
+            "meta": self._meta,
+            "follow_redirects": self.follow_redirects,
+            "max_redirects": self.max_redirects,
+            "retry_count": self._current_retry_count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, typing.Any], spider: typing.Any = None) -> "Request":
+        """
+        从 to_dict 的结果还原请求
+
+        :param data: to_dict 生成的 dict
+        :param spider: 爬虫实例，用于按方法名还原回调函数
+        :return: 请求
+        """
+
+        def _get_callback(name: str | None) -> typing.Callable | None:
+            if name is None:
+                return None
+            if spider is None:
+                raise ValueError(f"spider is required to resolve callback {name!r}")
+            callback: typing.Callable = getattr(spider, name)
+            return callback
+
+        request = cls(
+            data["url"],
+            method=Method(data["method"]),
+            callback=_get_callback(data.get("callback")),
+            error_callback=_get_callback(data.get("error_callback")),
+            headers_func=_get_callback(data.get("headers_func")),
+            priority=data.get("priority", 0),
+            headers=data.get("headers"),
+            params=data.get("params"),
+            data=data.get("data"),
+            json=data.get("json"),
+            cookies=data.get("cookies"),
+            proxy=data.get("proxy"),
+            proxy_username=data.get("proxy_username"),
+            proxy_password=data.get("proxy_password"),
+            encoding=data.get("encoding", "utf-8"),
+            meta=data.get("meta"),
+            follow_redirects=data.get("follow_redirects", True),
+            max_redirects=data.get("max_redirects", 20),
+        )
+        request._current_retry_count = data.get("retry_count", 0)
+        return request
+
+    @staticmethod
+    def _get_callback_name(callback: typing.Callable | None, spider: typing.Any = None) -> str | None:
+        if callback is None:
+            return None
+        if getattr(callback, "__self__", None) is None:
+            raise ValueError(f"callback {callback!r} must be a spider method to be serialized")
+
+        name = callback.__name__
+        # 绑定到其他对象的方法，或 spider 上同名属性不是该方法时，from_dict 无法还原
+        if spider is not None and getattr(spider, name, None) != callback:
+            raise ValueError(f"callback {callback!r} can not be resolved from spider by name {name!r}")
+        return name
+
     async def get_headers(self) -> dict:
         return await self.headers_func() if self.headers_func else self.headers
@@ -1,16 +1,28 @@
+import mmap
 import re
 from http.cookies import SimpleCookie
+from pathlib import Path
 from typing import TYPE_CHECKING, Any, Generic, TypeVar, Union
 from urllib.parse import urljoin as _urljoin
 
 import ujson
-from parsel import Selector, SelectorList
+from parsel import SelectorList
+from parsel.utils import extract_regex
 
+from maize.common.http.selector import Selector
 from maize.exceptions.spider_exception import DecodeException, EncodeException
 
 if TYPE_CHECKING:
     from maize.common.http.request import Request
 
+# 从响应体开头查找 <meta charset> 的字节数
+_META_SNIFF_BYTES = 4096
+_charset_re = re.compile(r"charset=([\w-]+)", flags=re.I)
+_meta_charset_re = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", flags=re.I)
+
+# 浏览器按 GB18030 解码声明为 GB2312 / GBK 的页面
+_ENCODING_ALIASES = {"gb2312": "gb18030", "gbk": "gb18030"}
+
 Driver = TypeVar("Driver")
 R = TypeVar("R")
 
@@ -28,6 +40,8 @@ class Response(Generic[Driver, R]):
         cookie_list: list[dict[str, Union[str, bool]]] | None = None,
         driver: Driver | None = None,
         source_response: R | None = None,
+        path: str | None = None,
+        body_hash: str | None = None,
     ):
         """
         响应
@@ -41,13 +55,15 @@ class Response(Generic[Driver, R]):
         :param cookie_list: cookie 列表
         :param driver:
         :param source_response: 原始响应，如下载器是 httpx，则为 httpx.Response 类型的实例。rpa 爬虫时，该字段为 None
+        :param path: 流式下载时响应体保存的文件路径，访问 body 时才读取文件
+        :param body_hash: 流式下载时响应体的摘要（十六进制）
         """
         self.url = url
         self.request = request
         self.headers = headers
         self._body_cache = body
         self.status = status
-        self.encoding = request.encoding
+        self.encoding: str = request.encoding or "utf-8"
 
         self._text_cache: str = text
         self._cookie_list_cache: list[dict[str, Any]] | None = cookie_list
@@ -56,6 +72,8 @@ class Response(Generic[Driver, R]):
 
         self.driver = driver
         self.source_response = source_response
+        self.path = path
+        self.body_hash = body_hash
 
     def __str__(self):
         return f"<{self.status}> {self.url}"
@@ -65,6 +83,10 @@ class Response(Generic[Driver, R]):
         if self._body_cache:
             return self._body_cache
 
+        if self.path and not self._text_cache:
+            self._body_cache = Path(self.path).read_bytes()
+            return self._body_cache
+
         try:
             self._body_cache = self._text_cache.encode(self.encoding)
         except UnicodeEncodeError:
@@ -96,6 +118,20 @@ class Response(Generic[Driver, R]):
                 raise DecodeException(e.encoding, e.object, e.start, e.end, f"{self.request}") from None
         return self._text_cache
 
+    def mmap_body(self) -> mmap.mmap | bytes:
+        """
+        以只读内存映射的方式打开流式下载的文件，按需读取，不把整个文件读入内存，使用完毕后需要调用 close()
+
+        :return: mmap 对象，文件为空时返回 b""，非流式下载的响应返回 body
+        """
+        if not self.path:
+            return self.body
+
+        with Path(self.path).open("rb") as f:
+            if f.seek(0, 2) == 0:
+                return b""
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
     def _get_encoding(self) -> str | None:
         _encoding_re = re.compile(r"charset=([\w-]+)", flags=re.I)
 
@@ -157,16 +193,88 @@ class Response(Generic[Driver, R]):
         return self._cookies_cache
 
     def json(self) -> dict[str, Any]:
-        return ujson.loads(self.text)
+        data: dict[str, Any] = ujson.loads(self.text)
+        return data
 
     def urljoin(self, url: str) -> str:
         return _urljoin(self.url, url)
 
-    def xpath(self, xpath: str) -> SelectorList[Selector]:
+    def _get_body_encoding(self) -> str:
+        """
+        直接解析响应体时使用的编码，不解码整个响应体
+
+        Request 指定了非 utf-8 编码时直接使用，否则依次使用响应头中的 charset、
+        响应体开头 <meta> 中的 charset、utf-8
+        """
+        encoding = self.encoding
+        if encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+            return encoding
+
+        content_type = self.headers.get("Content-Type", "") or self.headers.get("content-type", "")
+        charset = _charset_re.search(content_type)
+        if charset:
+            encoding = charset.group(1)
+        else:
+            meta_charset = _meta_charset_re.search(self._body_cache, 0, _META_SNIFF_BYTES)
+            if meta_charset:
+                encoding = meta_charset.group(1).decode("ascii")
+        return _ENCODING_ALIASES.get(encoding.lower(), encoding)
+
+    @property
+    def selector(self) -> Selector:
+        """
+        响应的解析结果，首次访问时解析并缓存，xpath、css、re、jmespath 共用同一份文档。
+        有响应体时直接从 bytes 构建 lxml 文档，不先解码为 str
+        """
         if self._selector is None:
-            self._selector = Selector(self.text)
+            if self._body_cache:
+                try:
+                    self._selector = Selector(body=self._body_cache, encoding=self._get_body_encoding())
+                except LookupError:
+                    # lxml 不支持的编码，回退为解码后的文本
+                    self._selector = Selector(self.text)
+            else:
+                self._selector = Selector(self.text)
+        return self._selector
+
+    def xpath(self, xpath: str, **kwargs: Any) -> SelectorList[Selector]:
+        """
+        XPath 选择器
+
+        :param xpath: XPath 表达式
+        :param kwargs: XPath 变量，如 response.xpath("//a[@href=$url]", url="...")
+        :return:
+        """
+        return self.selector.xpath(xpath, **kwargs)
+
+    def css(self, query: str) -> SelectorList[Selector]:
+        """
+        CSS 选择器，支持 ::text、::attr(name) 伪元素
+
+        :param query: CSS 选择器
+        :return:
+        """
+        return self.selector.css(query)
+
+    def re(self, regex: str | re.Pattern[str], replace_entities: bool = True) -> list[str]:
+        """
+        在响应文本上执行正则，返回匹配结果，规则与 parsel 的 Selector.re 相同
+
+        :param regex: 正则表达式
+        :param replace_entities: 是否替换字符实体（&amp; 和 &lt; 除外）
+        :return:
+        """
+        return extract_regex(regex, self.text, replace_entities=replace_entities)
+
+    def jmespath(self, query: str, **kwargs: Any) -> SelectorList[Selector]:
+        """
+        JMESPath 选择器，用于 JSON 响应
 
-        return self._selector.xpath(xpath)
+        :param query: JMESPath 表达式
+        :param kwargs: 传给 jmespath.search 的参数
+        :return:
+        """
+        return self.selector.jmespath(query, **kwargs)
 
     @property
     def meta(self) -> dict[str, Any]:
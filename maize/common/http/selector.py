@@ -0,0 +1,91 @@
+import typing
+from functools import lru_cache
+
+import parsel
+from lxml import etree
+from parsel.csstranslator import HTMLTranslator
+
+# 进程级编译缓存的容量
+XPATH_CACHE_SIZE = 2048
+CSS_CACHE_SIZE = 1024
+
+# EXSLT 扩展命名空间，表达式中使用到时不走缓存
+_EXSLT_NAMESPACES = frozenset(
+    {
+        "http://exslt.org/regular-expressions",
+        "http://exslt.org/sets",
+    }
+)
+
+_html_translator = HTMLTranslator()
+
+
+@lru_cache(maxsize=XPATH_CACHE_SIZE)
+def _compile_xpath(query: str, namespaces: tuple[tuple[str, str], ...]) -> etree.XPath:
+    return etree.XPath(query, namespaces=dict(namespaces), smart_strings=False)
+
+
+def compile_xpath(query: str, namespaces: typing.Mapping[str, str] | None = None) -> etree.XPath:
+    """
+    编译 XPath 表达式，结果按表达式和用到的命名空间缓存在进程内
+
+    :param query: XPath 表达式
+    :param namespaces: 命名空间前缀映射，只保留表达式中用到的前缀
+    :return: 编译后的 XPath
+    """
+    used_namespaces = {prefix: uri for prefix, uri in (namespaces or {}).items() if f"{prefix}:" in query}
+    if _EXSLT_NAMESPACES.intersection(used_namespaces.values()):
+        return etree.XPath(query, namespaces=used_namespaces, smart_strings=False)
+    return _compile_xpath(query, tuple(sorted(used_namespaces.items())))
+
+
+@lru_cache(maxsize=CSS_CACHE_SIZE)
+def css_to_xpath(query: str) -> str:
+    """
+    把 CSS 选择器转换为 XPath 表达式，结果缓存在进程内，支持 ::text、::attr(name) 伪元素
+
+    :param query: CSS 选择器
+    :return: XPath 表达式
+    """
+    return _html_translator.css_to_xpath(query)
+
+
+class Selector(parsel.Selector):
+    """
+    parsel.Selector 的子类，xpath、css 使用进程级的编译缓存，
+    回调中反复使用的表达式只在首次使用时编译
+    """
+
+    __slots__ = ()
+
+    def xpath(
+        self, query: str, namespaces: typing.Mapping[str, str] | None = None, **kwargs: typing.Any
+    ) -> parsel.SelectorList["Selector"]:
+        if self.type not in ("html", "xml") or not hasattr(self.root, "xpath"):
+            return super().xpath(query, namespaces, **kwargs)
+
+        nsp = dict(self.namespaces)
+        if namespaces is not None:
+            nsp.update(namespaces)
+        try:
+            result = compile_xpath(query, nsp)(self.root, **kwargs)
+        except etree.XPathError as e:
+            raise ValueError(f"XPath error: {e} in {query}") from None
+
+        if not isinstance(result, list):
+            result = [result]
+
+        selector_type = "xml" if self.type == "xml" else "html"
+        return typing.cast(
+            "parsel.SelectorList[Selector]",
+            self.selectorlist_cls(
+                [self.__class__(root=x, _expr=query, namespaces=self.namespaces, type=selector_type) for x in result]
+            ),
+        )
+
+    def css(self, query: str) -> parsel.SelectorList["Selector"]:
+        if self.type == "xml":
+            return super().css(query)
+        if self.type not in ("html", "text"):
+            raise ValueError(f"Cannot use css on a Selector of type {self.type!r}")
+        return self.xpath(css_to_xpath(query))
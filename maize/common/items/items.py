@@ -1,9 +1,14 @@
+from maize.common.constant.setting_constant import MysqlInsertModeEnum
 from maize.common.model.base_model import BaseModel
 
 
 class Item(BaseModel):
     __table_name__: str = ""
     __retry_count__: int = 0
+    # MysqlPipeline 写入模式
+    __insert_mode__: MysqlInsertModeEnum = MysqlInsertModeEnum.INSERT
+    # upsert 模式下冲突时更新的字段，为空时更新全部字段
+    __update_fields__: tuple[str, ...] = ()
 
     def retry(self):
         self.__retry_count__ += 1
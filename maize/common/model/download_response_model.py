@@ -17,4 +17,7 @@ class DownloadResponse(BaseModel, Generic[Driver, R]):
     # 失败原因
     reason: str | None = Field(default=None, description="下载失败原因")
 
+    # 下载耗时
+    latency: float | None = Field(default=None, description="网络请求耗时，单位：秒，不包含随机等待")
+
     model_config = ConfigDict(arbitrary_types_allowed=True)  # 允许任意类型（Response 是自定义类型）
@@ -29,3 +29,24 @@ class SpiderStatistics(BaseModel):
 
     # pipeline 失败量
     pipeline_fail_count: int = 0
+
+    # 去重丢弃的请求量
+    dupefilter_dropped_count: int = 0
+
+    # 自适应并发增加次数
+    autothrottle_increase_count: int = 0
+
+    # 自适应并发减小次数
+    autothrottle_decrease_count: int = 0
+
+    # 自适应并发调整后的全局并发数
+    autothrottle_concurrency: int = 0
+
+    # 各执行模式的回调执行次数
+    callback_count: dict[str, int] = Field(default={})
+
+    # 各执行模式的回调执行耗时（线程池、进程池模式，含排队时间），单位：秒
+    callback_seconds: dict[str, float] = Field(default={})
+
+    # 事件循环最大延迟，单位：秒
+    loop_lag_max: float = 0
@@ -1,17 +1,23 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import os
+import socket
 from collections.abc import AsyncGenerator, AsyncIterator, Callable
 from inspect import iscoroutine
+from pathlib import Path
 from typing import TYPE_CHECKING, Any, Union
 
-import ujson
-
 from maize.aio.classic.scheduler.scheduler import Scheduler
 from maize.common.http import Request, Response
 from maize.common.items import Item
+from maize.core.engine.job_checkpoint import JobCheckpoint
 from maize.core.processor import Processor
+from maize.core.task.auto_throttle import AutoThrottle
+from maize.core.task.callback_executor import CallbackExecutor
 from maize.core.task.task_manager import TaskManager
+from maize.dupefilters.base_dupefilter import BaseDupeFilter
 from maize.exceptions.spider_exception import (
     OutputException,
     StartRequestsNotImplementedException,
@@ -21,10 +27,19 @@ from maize.middlewares.middleware_manager import (
     SpiderMiddlewareManager,
 )
 
-try:
+if TYPE_CHECKING:
+    from maize.core.engine.redis_request_tracker import RedisRequestTracker
+    from maize.utils.redis_priority_queue import RedisPriorityQueue
     from maize.utils.redis_util import RedisUtil
-except ImportError:
-    RedisUtil = None
+else:
+    try:
+        from maize.core.engine.redis_request_tracker import RedisRequestTracker
+        from maize.utils.redis_priority_queue import RedisPriorityQueue
+        from maize.utils.redis_util import RedisUtil
+    except ImportError:
+        RedisUtil = None
+        RedisRequestTracker = None
+        RedisPriorityQueue = None
 from maize.utils.log_util import get_logger
 from maize.utils.project_util import load_class
 from maize.utils.spider_util import transform
@@ -51,6 +66,9 @@ class AioEngine:
         self.downloader: BaseDownloader | None = None
         self.scheduler: Scheduler | None = None
         self.processor: Processor | None = None
+        self.dupefilter: BaseDupeFilter | None = None
+        self.autothrottle: AutoThrottle | None = None
+        self.callback_executor: CallbackExecutor | None = None
 
         self.start_requests: AsyncGenerator | None = None
         self.task_requests: AsyncIterator[Request] | None = None
@@ -68,17 +86,45 @@ class AioEngine:
 
         # 分布式
         self.is_distributed = self.settings.is_distributed
-        self.__redis_util = None
-        self.__redis_key_distributed_lock = None
-        self.__redis_key_queue = None
-        self.__redis_key_running = None
+        self.__redis_tracker: RedisRequestTracker | None = None
+        self.__redis_frontier: RedisPriorityQueue | None = None
+        self._lease_task: asyncio.Task | None = None
+
+        # 任务目录
+        self.checkpoint: JobCheckpoint | None = None
 
     def __init_redis(self):
-        if self.is_distributed or self.settings.redis.use_redis:
-            self.__redis_util = RedisUtil(self.settings.redis_url)
-            self.__redis_key_distributed_lock = self.__get_redis_key(self.settings.redis.key_lock)
-            self.__redis_key_queue = self.__get_redis_key(self.settings.redis.key_queue)
-            self.__redis_key_running = self.__get_redis_key(self.settings.redis.key_running)
+        redis_settings = self.settings.redis
+        # 未配置时使用主机名和进程号，同一台机器上的多个实例互不冲突，但重启后无法恢复上次未完成的请求
+        node_id = redis_settings.node_id or f"{socket.gethostname()}-{os.getpid()}"
+        if self.settings.scheduler.use_redis_frontier:
+            self.__redis_frontier = RedisPriorityQueue(
+                RedisUtil(self.settings.redis_url),
+                self.spider,
+                key=self.__get_redis_key(redis_settings.key_frontier),
+                prefetch_size=self.settings.scheduler.prefetch_size,
+                node_id=node_id,
+                lease_ttl=redis_settings.lease_ttl,
+                batch_window=redis_settings.batch_window,
+                batch_max_size=redis_settings.batch_max_size,
+            )
+
+        if self.is_distributed or redis_settings.use_redis:
+            # 共享请求队列中的请求只会被一个实例取出，不需要再加请求锁
+            lock_ttl = redis_settings.lock_ttl if self.is_distributed and self.__redis_frontier is None else 0
+            self.__redis_tracker = RedisRequestTracker(
+                RedisUtil(self.settings.redis_url),
+                key_queue=self.__get_redis_key(redis_settings.key_queue),
+                key_running=self.__get_redis_key(redis_settings.key_running),
+                key_lock=self.__get_redis_key(redis_settings.key_lock),
+                lock_ttl=lock_ttl,
+                node_id=node_id,
+                # 共享请求队列自己管理取出到处理完成期间的租约
+                lease_ttl=redis_settings.lease_ttl if self.__redis_frontier is None else 0,
+                batch_window=redis_settings.batch_window,
+                batch_max_size=redis_settings.batch_max_size,
+                spider=self.spider,
+            )
 
     def __get_redis_key(self, key: str) -> str:
         redis_key_prefix = self.settings.redis.key_prefix
@@ -100,10 +146,38 @@ class AioEngine:
         self.logger.info(f"spider started. (project name: {self.settings.project_name})")
         self.spider = spider
         self.__init_redis()
-        self.scheduler = Scheduler()
+        if self.__redis_tracker:
+            await self.__redis_tracker.open()
+        if self.__redis_frontier:
+            await self.__redis_frontier.open()
+        self.scheduler = Scheduler(
+            self.settings.scheduler, spider, self.settings.politeness, frontier=self.__redis_frontier
+        )
         if self.scheduler.open:
             self.scheduler.open()
 
+        # 任务完成、统计上报完成时唤醒调度器，重新判断是否空闲
+        self.task_manager.add_done_callback(self.scheduler.notify)
+        if stats_collector := getattr(spider, "stats_collector", None):
+            stats_collector.add_done_callback(self.scheduler.notify)
+
+        if self.settings.autothrottle.enabled:
+            self.autothrottle = AutoThrottle(self.settings, self.task_manager, self.scheduler.throttle)
+
+        if self.settings.dupefilter.enabled:
+            self.dupefilter = load_class(self.settings.dupefilter.dupefilter)(self.settings)
+            await self.dupefilter.open()
+
+        if job_dir := self.settings.checkpoint.job_dir:
+            spider_name = StringUtil.camel_to_snake(spider.__class__.__name__)
+            self.checkpoint = JobCheckpoint(
+                Path(job_dir) / spider_name,
+                self.settings.checkpoint,
+                getattr(spider, "stats_collector", None),
+                spider=spider,
+            )
+            await self.checkpoint.open()
+
         # 初始化中间件管理器
         self.downloader_middleware_manager = DownloaderMiddlewareManager(
             self.crawler, self.settings.middleware.downloader_middlewares
@@ -123,6 +197,9 @@ class AioEngine:
         self.processor = Processor(self.crawler)
         await self.processor.open()
 
+        self.callback_executor = CallbackExecutor(self.settings, spider)
+        await self.callback_executor.open()
+
         # 校验 start_requests 是否已实现
         try:
             start_requests_result = spider.start_requests()
@@ -137,8 +214,129 @@ class AioEngine:
                 f"Spider {spider.__class__.__name__}.start_requests() must be implemented"
             ) from None
 
+        if self.checkpoint:
+            await self._restore_checkpoint()
+
+        if self.settings.redis.lease_ttl > 0 and (self.__redis_tracker or self.__redis_frontier):
+            await self._restore_requests()
+            self._lease_task = asyncio.create_task(self._maintain_leases(self.settings.redis.lease_ttl / 3))
+
         await self._open_spider()
 
+    async def _restore_requests(self):
+        """
+        恢复本节点上次运行时未完成的请求
+        :return:
+        """
+        if self.__redis_frontier and (count := await self.__redis_frontier.restore()):
+            self.logger.info(f"Restored {count} unfinished requests to the shared frontier")
+
+        if self.__redis_tracker:
+            # 非分布式模式下 queue 中只有本节点的请求，一并恢复
+            include_queue = not self.is_distributed and self.__redis_frontier is None
+            rows = await self.__redis_tracker.restore(include_queue=include_queue)
+            await self._enqueue_recovered(rows)
+            if rows:
+                self.logger.info(f"Restored {len(rows)} unfinished requests")
+
+    async def _restore_checkpoint(self):
+        """
+        从任务目录恢复上次运行的去重状态、统计、未完成的请求和待入库的 item
+        :return:
+        """
+        checkpoint, spider, processor = self.checkpoint, self.spider, self.processor
+        if checkpoint is None or spider is None or processor is None:
+            return
+
+        if (
+            checkpoint.start_requests_done
+            and spider.__spider_type__ != "task_spider"
+            and self.start_requests is not None
+        ):
+            # 起始请求已全部产出，后续请求从任务目录恢复
+            await self.start_requests.aclose()
+
+        if self.dupefilter:
+            try:
+                count = await asyncio.to_thread(self._restore_fingerprints, checkpoint, self.dupefilter)
+            except NotImplementedError as e:
+                self.logger.warning(f"Dupefilter state is not restored: {e}")
+            else:
+                if count:
+                    self.logger.info(f"Restored {count} dupefilter fingerprints from {checkpoint.path}")
+
+        if checkpoint.recovered_stats and (stats_collector := getattr(spider, "stats_collector", None)):
+            stats_collector.restore(checkpoint.recovered_stats)
+
+        requests, checkpoint.recovered_requests = checkpoint.recovered_requests, []
+        for record_id, row in requests:
+            try:
+                request = Request.from_dict(row, spider)
+            except (KeyError, ValueError, AttributeError) as e:
+                self.logger.warning(f"Drop unrecoverable request {row.get('url')}: {e}")
+                checkpoint.finish(record_id)
+                continue
+            checkpoint.adopt(record_id, request)
+            await self.enqueue_request(request, dont_filter=True)
+
+        items, checkpoint.recovered_items = checkpoint.recovered_items, []
+        for record_id, item_path, data in items:
+            try:
+                item = load_class(item_path).model_validate(data)
+            except Exception as e:
+                self.logger.warning(f"Drop unrecoverable item {item_path}: {e}")
+                checkpoint.finish(record_id)
+                continue
+            checkpoint.adopt(record_id, item)
+            await processor.enqueue(item)
+
+        if requests or items:
+            self.logger.info(f"Resumed job from {checkpoint.path}: {len(requests)} requests, {len(items)} items")
+
+    @staticmethod
+    def _restore_fingerprints(checkpoint: JobCheckpoint, dupefilter: BaseDupeFilter) -> int:
+        count = 0
+        for fingerprint in checkpoint.load_fingerprints():
+            dupefilter.add_fingerprint(fingerprint)
+            count += 1
+        return count
+
+    async def _maintain_leases(self, interval: float):
+        """
+        定时延长本节点处理中请求的租约，回收其他节点已过期的租约并重新入队
+
+        :param interval: 间隔，单位：秒
+        :return:
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if self.__redis_frontier:
+                    await self.__redis_frontier.heartbeat()
+                    if count := await self.__redis_frontier.reap():
+                        self.logger.info(f"Requeued {count} requests with expired leases")
+                        if self.scheduler is not None:
+                            self.scheduler.notify()
+                if self.__redis_tracker:
+                    await self.__redis_tracker.heartbeat()
+                    if rows := await self.__redis_tracker.reap():
+                        self.logger.info(f"Requeued {len(rows)} requests with expired leases")
+                        await self._enqueue_recovered(rows)
+            except Exception as e:
+                self.logger.error(f"Failed to maintain request leases: {e}")
+
+    async def _enqueue_recovered(self, rows: list[dict]):
+        for row in rows:
+            if row.get("restorable") is False:
+                self.logger.warning(f"Drop unrecoverable request {row.get('url')}: callback is not a spider method")
+                continue
+            try:
+                request = Request.from_dict(row, self.spider)
+            except (KeyError, ValueError, AttributeError) as e:
+                self.logger.warning(f"Drop unrecoverable request {row.get('url')}: {e}")
+                continue
+            await self.enqueue_request(request, dont_filter=True)
+
     async def _open_spider(self):
         crawling = asyncio.create_task(self.crawl())
         await crawling
@@ -190,9 +388,11 @@ class AioEngine:
                 start_request: Request = await anext(start_requests)
             except StopAsyncIteration:
                 self.start_requests = None
+                if self.checkpoint and self.spider.__spider_type__ != "task_spider":
+                    self.checkpoint.mark_start_requests_done()
                 # 生成器已耗尽，等待所有任务完成
                 if not self._idle():
-                    await asyncio.sleep(0.1)
+                    await self._wait_next_request()
                     continue
 
                 self.start_requests_running = False
@@ -202,7 +402,7 @@ class AioEngine:
                 # 2. 调度器是否空闲
                 # 3. 下载器是否空闲
                 if not self._idle():
-                    await asyncio.sleep(0.1)
+                    await self._wait_next_request()
                     continue
 
                 self.start_requests_running = False
@@ -224,8 +424,8 @@ class AioEngine:
                 continue
 
             try:
-                self.task_requests: AsyncIterator[Request]
-                task_request = await anext(self.task_requests)
+                # task_requests 为 None 时 anext 抛出 TypeError，按任务请求已全部产出处理
+                task_request = await anext(self.task_requests)  # type: ignore[arg-type]
             except StopAsyncIteration:
                 self.task_requests = None
             except RuntimeError:
@@ -236,7 +436,7 @@ class AioEngine:
                 # 3. 下载器是否空闲
                 self.task_requests = None
                 if not self._idle():
-                    await asyncio.sleep(0.1)
+                    await self._wait_next_request()
                     continue
 
                 self._single_task_requests_running = False
@@ -247,11 +447,35 @@ class AioEngine:
             else:
                 await self.enqueue_request(task_request)
 
+    async def _wait_next_request(self):
+        """
+        没有新的起始请求且爬虫未空闲时，等待调度器唤醒：
+        新请求入队时立即抓取，任务完成或 Processor 消费完毕时返回，由调用方重新判断是否空闲
+        :return:
+        """
+        if request := await self._get_next_request(wait=True):
+            await self._crawl(request)
+
     async def _crawl(self, request: Request):
+        record_id = self.checkpoint.claim(request) if self.checkpoint else None
+
         async def crawl_task():
-            outputs = await self._fetch(request)
-            if outputs:
-                await self._handle_spider_output(outputs)
+            try:
+                try:
+                    outputs = await self._fetch(request)
+                finally:
+                    if self.scheduler is not None:
+                        self.scheduler.release(request)
+                if outputs:
+                    await self._handle_spider_output(outputs)
+            finally:
+                # 产出处理完后再从 running 中删除
+                if self.__redis_tracker:
+                    self.__redis_tracker.finish(request)
+                if self.__redis_frontier:
+                    self.__redis_frontier.ack(request)
+                if self.checkpoint:
+                    self.checkpoint.finish(record_id)
 
         await self.task_manager.semaphore.acquire()
         self.task_manager.create_task(crawl_task())
@@ -266,10 +490,12 @@ class AioEngine:
         request = request_or_response
 
         # Download and process result
+        start_time = asyncio.get_running_loop().time()
         download_result = await self._do_download(request)
+        await self._record_autothrottle(request, start_time, download_result)
         if download_result is None or isinstance(download_result, Request):
             if isinstance(download_result, Request):
-                await self.enqueue_request(download_result)
+                await self.enqueue_request(download_result, dont_filter=True)
             return None
 
         if download_result.response is None:
@@ -306,12 +532,41 @@ class AioEngine:
             if result is None:
                 raise
             if result.__class__.__name__ == "Request":
-                await self.enqueue_request(result)
+                await self.enqueue_request(result, dont_filter=True)
                 return None
             if result.__class__.__name__ == "Response":
                 return type("DownloadResult", (), {"response": result, "reason": None})()
             return None
 
+    async def _record_autothrottle(self, request: Request, start_time: float, download_result: Any):
+        """
+        将下载延迟和状态码反馈给自适应并发
+
+        :param request: 请求
+        :param start_time: 下载开始时间
+        :param download_result: 下载结果，没有响应时视为下载失败
+        :return:
+        """
+        if self.autothrottle is None:
+            return
+
+        now = asyncio.get_running_loop().time()
+        response = getattr(download_result, "response", None)
+        if response is None:
+            latency, status = None, None
+        else:
+            # 下载器记录的耗时不包含随机等待，没有记录时（如浏览器下载器）使用整个下载的耗时
+            latency = getattr(download_result, "latency", None)
+            if latency is None:
+                latency = now - start_time
+            status = response.status
+
+        throttle = self.scheduler.throttle if self.scheduler is not None else None
+        host = throttle.get_host(request) if throttle else ""
+        delta, _ = self.autothrottle.record(host, latency, status, now)
+        if delta:
+            await self.spider.stats_collector.record_autothrottle(self.autothrottle.concurrency, delta)
+
     async def _process_response_middleware(self, request: Request, response: Response) -> Response | None:
         """处理响应中间件"""
         if not self.downloader_middleware_manager:
@@ -320,7 +575,7 @@ class AioEngine:
         if result is None:
             return None
         if result.__class__.__name__ == "Request":
-            await self.enqueue_request(result)
+            await self.enqueue_request(result, dont_filter=True)
             return None
         return result
 
@@ -340,7 +595,10 @@ class AioEngine:
 
         callback: Callable = request.callback or self.spider.parse
         try:
-            _output = callback(response)
+            if self.callback_executor:
+                _output = await self.callback_executor.execute(callback, response, request)
+            else:
+                _output = callback(response)
             if _output:
                 if iscoroutine(_output):
                     await _output
@@ -360,9 +618,6 @@ class AioEngine:
             self.logger.error(f"Error during callback: {e}")
             await self.spider.stats_collector.record_parse_fail()
 
-        if self.__redis_util:
-            self.logger.debug(f"redis delete {self.__redis_key_running}:{request.hash}")
-            await self.__redis_util.delete(f"{self.__redis_key_running}:{request.hash}")
         return None
 
     async def _handle_error_response(self, request: Request) -> AsyncGenerator[Union[Request, Item], Any] | None:
@@ -383,44 +638,74 @@ class AioEngine:
                     return transform_output
         except Exception as e:
             self.logger.error(f"Error during error_callback: {e}")
-        if self.__redis_util:
-            self.logger.debug(f"redis delete {self.__redis_key_running}:{request.hash}")
-            await self.__redis_util.delete(f"{self.__redis_key_running}:{request.hash}")
         return None
 
-    async def enqueue_request(self, request: Request):
-        if self.__redis_util:
-            await self.__redis_util.set(
-                f"{self.__redis_key_queue}:{request.hash}",
-                ujson.dumps(request.model_dump),
-            )
+    async def enqueue_request(self, request: Request, dont_filter: bool = False):
+        """
+        请求入队
+
+        :param request: 请求
+        :param dont_filter: 是否跳过去重，下载重试的请求不参与去重
+        :return:
+        """
+        if not dont_filter and await self._filter_request(request):
+            if self.checkpoint:
+                self.checkpoint.drop(request)
+            return
+
+        if self.checkpoint:
+            self.checkpoint.enqueue(request)
+
+        # 共享请求队列本身保存了排队中的请求，不需要再记录到 queue 哈希
+        if self.__redis_tracker and self.__redis_frontier is None:
+            self.__redis_tracker.enqueue(request)
         await self._schedule_request(request)
 
+    async def _filter_request(self, request: Request) -> bool:
+        """
+        请求去重，可通过 Request(meta={"dont_filter": True}) 跳过
+
+        :param request: 请求
+        :return: 重复请求返回 True，否则 False
+        """
+        if self.dupefilter is None or request.get_meta("dont_filter", False):
+            return False
+
+        if not await self.dupefilter.request_seen(request):
+            if self.checkpoint:
+                self.checkpoint.add_fingerprint(
+                    self.dupefilter.fingerprint(request, self.dupefilter.fingerprint_headers)
+                )
+            return False
+
+        self.logger.debug(f"Drop duplicate request: {request}")
+        await self.spider.stats_collector.record_dupefilter_dropped()
+        return True
+
     async def _schedule_request(self, request: Request):
         await self.scheduler.enqueue_request(request)
 
-    async def _get_next_request(self) -> Request | None:
-        request: Request | None = await self.scheduler.next_request(self.crawler.spider.gte_priority)
+    async def _get_next_request(self, wait: bool = False) -> Request | None:
+        request: Request | None = await self.scheduler.next_request(self.crawler.spider.gte_priority, wait=wait)
         if not request:
             return None
 
-        if self.is_distributed:
-            nx_set_result = await self.__redis_util.nx_set(self.__redis_key_distributed_lock, request.hash, 600)
-            if not nx_set_result:
-                return None
-
-        if self.__redis_util:
-            await self.__redis_util.set(
-                f"{self.__redis_key_running}:{request.hash}",
-                ujson.dumps(request.model_dump),
-            )
-            self.logger.debug(f"redis delete {self.__redis_key_queue}:{request.hash}")
-            await self.__redis_util.delete(f"{self.__redis_key_queue}:{request.hash}")
+        # 一次往返完成加锁（分布式模式）、写入 running、从 queue 删除
+        if self.__redis_tracker and not await self.__redis_tracker.claim(request):
+            # 请求锁被其他节点持有，由持有锁的节点处理
+            self.logger.info(f"Request {request} is being processed by another node, skipped")
+            if self.scheduler is not None:
+                self.scheduler.release(request)
+            if self.checkpoint:
+                self.checkpoint.finish(self.checkpoint.claim(request))
+            return None
         return request
 
     async def _handle_spider_output(self, outputs: AsyncGenerator[Union[Request, Item], Any]):
         async for spider_output in outputs:
             if isinstance(spider_output, Request | Item):
+                if self.checkpoint:
+                    self.checkpoint.record_output(spider_output)
                 await self.processor.enqueue(spider_output)
             else:
                 raise OutputException(f"{type(spider_output)} must return `Request` or `Item`")
@@ -436,9 +721,24 @@ class AioEngine:
 
     async def close_spider(self):
         self.logger.info("Closing spider")
+        if self._lease_task:
+            self._lease_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._lease_task
+            self._lease_task = None
         if self.downloader_middleware_manager:
             await self.downloader_middleware_manager.close()
         if self.spider_middleware_manager:
             await self.spider_middleware_manager.close()
         await self.downloader.close()
+        if self.callback_executor:
+            await self.callback_executor.close()
         await self.processor.close()
+        if self.dupefilter:
+            await self.dupefilter.close()
+        if self.scheduler:
+            await self.scheduler.close()
+        if self.checkpoint:
+            await self.checkpoint.close()
+        if self.__redis_tracker:
+            await self.__redis_tracker.close()
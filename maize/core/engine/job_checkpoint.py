@@ -0,0 +1,418 @@
+import asyncio
+import contextlib
+import os
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Union
+
+import ujson
+
+from maize.common.http.request import Request
+from maize.utils.log_util import get_logger
+
+if TYPE_CHECKING:
+    from maize.common.items import Item
+    from maize.settings.spider_settings import CheckpointSettings
+
+
+class JobCheckpoint:
+    """
+    任务目录：把排队中的请求、去重状态、待入库的 item 和统计增量写入本地目录，进程被杀后重启时从中恢复
+
+    目录结构：
+    - journal.{序号}.log：追加写入的日志分段，每行一条记录（JSON）：
+      {"op": "request", "id": 编号, "data": Request.to_dict()}、
+      {"op": "item", "id": 编号, "item": "模块.Item 类名", "data": {...}}、
+      {"op": "done", "ids": [编号...]}、{"op": "start_requests_done"}
+    - journal.snapshot：压缩后的快照，第一行记录已合并的最后一个分段序号，之后每行一条未完成的请求或 item
+    - seen.bin：追加写入的去重指纹，每个 16 字节
+    - stats.json：尚未上报的统计
+
+    记录先放入内存缓冲区，由后台任务每隔 flush_interval 秒在线程中追加写入当前分段；
+    日志记录数超过 compact_threshold 时切换到新的分段，在线程中把旧分段合并为快照（写入临时文件后原子替换），
+    合并期间爬虫照常运行，新的记录写入新的分段，不需要暂停抓取。
+    进程被杀时最多丢失最近 flush_interval 秒内的记录，恢复时请求可能被重复抓取（至少一次）。
+
+    请求在爬虫产出时（进入 Processor 队列前）或直接入队时记录，开始处理时取出编号，产出处理完后标记完成；
+    排队中的请求可能被溢写到磁盘或经过 Redis 后重新创建，因此入队后按请求 hash 记录编号
+    """
+
+    SNAPSHOT_NAME = "journal.snapshot"
+    SEEN_NAME = "seen.bin"
+    STATS_NAME = "stats.json"
+    FINGERPRINT_SIZE = 16
+
+    def __init__(
+        self, path: str | Path, settings: "CheckpointSettings", stats_collector: Any = None, spider: Any = None
+    ):
+        """
+        :param path: 任务目录
+        :param settings: 任务目录配置
+        :param stats_collector: 统计收集器，为 None 时不保存统计
+        :param spider: 爬虫实例，用于校验请求的回调函数可以按方法名还原，无法还原的请求不写入
+        """
+        self.path = Path(path)
+        self.flush_interval = settings.flush_interval
+        self.compact_threshold = max(1, settings.compact_threshold)
+        self.fsync = settings.fsync
+        self.stats_collector = stats_collector
+        self.spider = spider
+        self.logger = get_logger(name=self.__class__.__name__)
+
+        self._next_id: int = 1
+        self._segment: int = 0
+        # 自上次压缩以来写入的日志记录数
+        self._records: int = 0
+        self._buffer: list[str] = []
+        self._fingerprints: list[bytes] = []
+
+        # 爬虫产出后、入队前的请求和待入库的 item（按 id），同时保留对象引用，避免 id 被复用
+        self._outputs: dict[int, tuple[int, Request]] = {}
+        self._items: dict[int, tuple[int, Item]] = {}
+        # 已入队的请求 hash 对应的编号，相同 hash 的请求按入队顺序取出
+        self._queued: dict[str, list[int]] = {}
+
+        self._flush_task: asyncio.Task | None = None
+        self._compact_task: asyncio.Task | None = None
+        self._write_lock = asyncio.Lock()
+
+        # 上次运行未完成的记录，open 时加载
+        self.start_requests_done: bool = False
+        self.recovered_requests: list[tuple[int, dict]] = []
+        self.recovered_items: list[tuple[int, str, dict]] = []
+        self.recovered_stats: dict | None = None
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.path / f"journal.{segment:08d}.log"
+
+    def _segments(self) -> list[tuple[int, Path]]:
+        segments = []
+        for path in self.path.glob("journal.*.log"):
+            with contextlib.suppress(ValueError):
+                segments.append((int(path.name.split(".")[1]), path))
+        return sorted(segments)
+
+    @property
+    def has_state(self) -> bool:
+        """上次运行是否留下了未完成的请求、item 或去重状态"""
+        return bool(self.recovered_requests or self.recovered_items or self.start_requests_done)
+
+    @property
+    def pending_count(self) -> int:
+        """本次运行记录且未完成的请求和 item 数"""
+        return len(self._outputs) + len(self._items) + sum(len(ids) for ids in self._queued.values())
+
+    async def open(self):
+        """
+        创建任务目录，加载上次运行未完成的记录，启动后台写入
+        :return:
+        """
+        await asyncio.to_thread(self._load)
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """
+        写入缓冲区中剩余的记录并压缩日志
+        :return:
+        """
+        if self._flush_task:
+            self._flush_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flush_task
+            self._flush_task = None
+        if self._compact_task:
+            await self._compact_task
+            self._compact_task = None
+
+        # 正常关闭后统计由统计收集器上报，不再保留
+        self.stats_collector = None
+        await self.flush()
+        upto = self._rotate()
+        await asyncio.to_thread(self._compact, upto)
+        await asyncio.to_thread((self.path / self.STATS_NAME).unlink, missing_ok=True)
+
+    def _load(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        live, header = self._read_journal()
+        self._next_id = header["next_id"]
+        self.start_requests_done = header["start_requests_done"]
+        for record in live.values():
+            if record["op"] == "request":
+                self.recovered_requests.append((record["id"], record["data"]))
+            else:
+                self.recovered_items.append((record["id"], record["item"], record["data"]))
+
+        self._segment = header["segment"] + 1
+
+        stats_path = self.path / self.STATS_NAME
+        if stats_path.exists():
+            with contextlib.suppress(ValueError):
+                self.recovered_stats = ujson.loads(stats_path.read_text(encoding="utf-8"))
+
+    def _read_journal(self, upto: int | None = None) -> tuple[dict[int, dict], dict]:
+        """
+        读取快照和日志分段，返回未完成的记录
+
+        :param upto: 只读取序号不超过该值的分段，为 None 时读取全部
+        :return: 未完成的记录（按编号）、快照头（已合并的最后一个分段序号、下一个记录编号、起始请求是否已全部产出）
+        """
+        live: dict[int, dict] = {}
+        header = {"segment": 0, "next_id": 1, "start_requests_done": False}
+        for index, record in enumerate(self._read_lines(self.path / self.SNAPSHOT_NAME)):
+            if index == 0:
+                header.update(record)
+            else:
+                live[record["id"]] = record
+
+        compacted = header["segment"]
+        for segment, path in self._segments():
+            if segment <= compacted or (upto is not None and segment > upto):
+                continue
+            header["segment"] = segment
+            for record in self._read_lines(path):
+                op = record["op"]
+                if op == "done":
+                    for record_id in record["ids"]:
+                        live.pop(record_id, None)
+                elif op == "start_requests_done":
+                    header["start_requests_done"] = True
+                else:
+                    live[record["id"]] = record
+                    header["next_id"] = max(header["next_id"], record["id"] + 1)
+        return live, header
+
+    @staticmethod
+    def _read_lines(path: Path) -> Iterator[dict]:
+        if not path.exists():
+            return
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield ujson.loads(line)
+                except ValueError:
+                    # 进程被杀时最后一行可能只写入了一部分
+                    continue
+
+    def load_fingerprints(self) -> Iterator[bytes]:
+        """
+        读取上次运行记录的去重指纹，在线程中调用
+        :return: 指纹
+        """
+        path = self.path / self.SEEN_NAME
+        if not path.exists():
+            return
+        with path.open("rb") as f:
+            while len(chunk := f.read(self.FINGERPRINT_SIZE * 4096)) >= self.FINGERPRINT_SIZE:
+                for i in range(0, len(chunk) - self.FINGERPRINT_SIZE + 1, self.FINGERPRINT_SIZE):
+                    yield chunk[i : i + self.FINGERPRINT_SIZE]
+
+    def _append(self, record: str):
+        self._buffer.append(record)
+
+    def _new_id(self) -> int:
+        record_id = self._next_id
+        self._next_id += 1
+        return record_id
+
+    def _dump_request(self, record_id: int, request: Request) -> str | None:
+        try:
+            return ujson.dumps({"op": "request", "id": record_id, "data": request.to_dict(self.spider)})
+        except (ValueError, TypeError, OverflowError) as e:
+            self.logger.debug(f"Request {request} can not be checkpointed: {e}")
+            return None
+
+    def record_output(self, output: Union[Request, "Item"]):
+        """
+        记录爬虫产出的请求或 item，在放入 Processor 队列前调用
+        :param output: 请求或 item
+        :return:
+        """
+        record_id = self._new_id()
+        if isinstance(output, Request):
+            if (record := self._dump_request(record_id, output)) is None:
+                return
+            self._outputs[id(output)] = (record_id, output)
+        else:
+            cls = output.__class__
+            record = (
+                f'{{"op": "item", "id": {record_id}, "item": {ujson.dumps(f"{cls.__module__}.{cls.__name__}")}, '
+                f'"data": {output.model_dump_json()}}}'
+            )
+            self._items[id(output)] = (record_id, output)
+        self._append(record)
+
+    def adopt(self, record_id: int, output: Union[Request, "Item"]):
+        """
+        接管上次运行未完成的请求或 item，不重复写入日志
+        :param record_id: 记录编号
+        :param output: 还原的请求或 item
+        :return:
+        """
+        if isinstance(output, Request):
+            self._outputs[id(output)] = (record_id, output)
+        else:
+            self._items[id(output)] = (record_id, output)
+
+    def enqueue(self, request: Request):
+        """
+        记录进入调度器的请求，爬虫产出时已记录的请求只转为按 hash 记录
+        :param request: 请求
+        :return:
+        """
+        if (output := self._outputs.pop(id(request), None)) is not None:
+            record_id = output[0]
+        else:
+            record_id = self._new_id()
+            if (record := self._dump_request(record_id, request)) is None:
+                return
+            self._append(record)
+        self._queued.setdefault(request.hash, []).append(record_id)
+
+    def drop(self, request: Request):
+        """
+        爬虫产出的请求被去重丢弃
+        :param request: 请求
+        :return:
+        """
+        if (output := self._outputs.pop(id(request), None)) is not None:
+            self.finish(output[0])
+
+    def claim(self, request: Request) -> int | None:
+        """
+        请求开始处理
+        :param request: 请求
+        :return: 记录编号，处理完成后传给 finish；未记录的请求返回 None
+        """
+        request_hash = request.hash
+        record_ids = self._queued.get(request_hash)
+        if not record_ids:
+            return None
+        record_id = record_ids.pop(0)
+        if not record_ids:
+            del self._queued[request_hash]
+        return record_id
+
+    def finish(self, record_id: int | None):
+        """
+        请求处理完成（产出已放入 Processor 队列）
+        :param record_id: claim 返回的记录编号
+        :return:
+        """
+        if record_id is not None:
+            self._append(f'{{"op": "done", "ids": [{record_id}]}}')
+
+    def replace_item(self, old: "Item", new: "Item"):
+        """
+        管道中间件返回了新的 item，沿用原来的记录
+        :param old: 原 item
+        :param new: 新 item
+        :return:
+        """
+        if old is not new and (output := self._items.pop(id(old), None)) is not None:
+            self._items[id(new)] = (output[0], new)
+
+    def finish_items(self, items: list["Item"]):
+        """
+        item 已入库、写入死信或被丢弃
+        :param items: item 列表
+        :return:
+        """
+        record_ids = [output[0] for item in items if (output := self._items.pop(id(item), None)) is not None]
+        if record_ids:
+            self._append(ujson.dumps({"op": "done", "ids": record_ids}))
+
+    def add_fingerprint(self, fingerprint: bytes):
+        """
+        记录去重器新增的指纹
+        :param fingerprint: 16 字节的请求指纹
+        :return:
+        """
+        self._fingerprints.append(fingerprint)
+
+    def mark_start_requests_done(self):
+        """起始请求已全部产出，恢复时不再重新执行 start_requests"""
+        if not self.start_requests_done:
+            self.start_requests_done = True
+            self._append('{"op": "start_requests_done"}')
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+                if self._records >= self.compact_threshold and (
+                    self._compact_task is None or self._compact_task.done()
+                ):
+                    self._compact_task = asyncio.create_task(self._run_compact(self._rotate()))
+            except Exception as e:
+                self.logger.error(f"Failed to write job checkpoint: {e}")
+
+    async def flush(self):
+        """
+        把缓冲区中的记录、指纹和统计写入任务目录
+        :return:
+        """
+        async with self._write_lock:
+            records, self._buffer = self._buffer, []
+            fingerprints, self._fingerprints = self._fingerprints, []
+            stats = self.stats_collector.snapshot() if self.stats_collector else None
+            await asyncio.to_thread(self._write, self._segment, records, fingerprints, stats)
+            self._records += len(records)
+
+    def _write(self, segment: int, records: list[str], fingerprints: list[bytes], stats: dict | None):
+        if records:
+            with self._segment_path(segment).open("a", encoding="utf-8") as f:
+                f.write("\n".join(records) + "\n")
+                self._sync(f)
+        if fingerprints:
+            with (self.path / self.SEEN_NAME).open("ab") as f:
+                f.write(b"".join(fingerprints))
+                self._sync(f)
+        if stats is not None:
+            self._replace(self.path / self.STATS_NAME, ujson.dumps(stats))
+
+    def _sync(self, f):
+        if self.fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _replace(self, path: Path, content: str):
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            f.write(content)
+            self._sync(f)
+        tmp_path.replace(path)
+
+    def _rotate(self) -> int:
+        """
+        切换到新的日志分段
+        :return: 切换前的分段序号，之前的分段不再写入，可以压缩
+        """
+        segment = self._segment
+        self._segment += 1
+        self._records = 0
+        return segment
+
+    async def _run_compact(self, upto: int):
+        # 等待写入旧分段的 flush 完成
+        async with self._write_lock:
+            pass
+        try:
+            await asyncio.to_thread(self._compact, upto)
+        except Exception as e:
+            self.logger.error(f"Failed to compact job checkpoint: {e}")
+
+    def _compact(self, upto: int):
+        """
+        把快照和序号不超过 upto 的分段合并为新的快照，删除已合并的分段，在线程中调用
+        :param upto: 分段序号
+        :return:
+        """
+        live, header = self._read_journal(upto)
+        header["segment"] = upto
+        lines = [ujson.dumps(header), *(ujson.dumps(record) for record in live.values())]
+        self._replace(self.path / self.SNAPSHOT_NAME, "\n".join(lines) + "\n")
+
+        for segment, path in self._segments():
+            if segment <= upto:
+                path.unlink(missing_ok=True)
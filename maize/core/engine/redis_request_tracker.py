@@ -0,0 +1,259 @@
+import typing
+
+import ujson
+
+from maize.common.http import Request
+from maize.utils.redis_util import LEASE_HEARTBEAT_SCRIPT, RedisPipelineBatcher, RedisUtil, extend_leases
+
+# 把请求从 queue 移到 running，分布式模式下先加请求锁（值为节点 ID），锁被其他节点持有时返回 0，
+# 本节点已持有的锁（如重试的请求在原请求完成前被取出）延长过期时间后继续；启用租约时记录租约到期时间和所属节点
+# KEYS: queue 哈希, running 哈希, 请求锁, 租约 ZSET, 所属节点哈希
+# ARGV: 请求 hash, 请求 json, 锁过期时间（秒，0 表示不加锁）, 租约时长（秒，0 表示不使用租约）, 节点 ID
+CLAIM_SCRIPT = """
+if tonumber(ARGV[3]) > 0 and not redis.call('SET', KEYS[3], ARGV[5], 'NX', 'EX', ARGV[3]) then
+    if redis.call('GET', KEYS[3]) ~= ARGV[5] then
+        return 0
+    end
+    redis.call('EXPIRE', KEYS[3], ARGV[3])
+end
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+redis.call('HDEL', KEYS[1], ARGV[1])
+if tonumber(ARGV[4]) > 0 then
+    redis.call('ZADD', KEYS[4], redis.call('TIME')[1] + ARGV[4], ARGV[1])
+    redis.call('HSET', KEYS[5], ARGV[1], ARGV[5])
+end
+return 1
+"""
+
+# 从 running 中取走请求：删除租约、所属节点和请求锁，由调用方重新入队
+# 返回: {取走的请求数, 请求 json...}
+_TAKE_SCRIPT = """
+local result = {#members}
+for _, member in ipairs(members) do
+    local data = redis.call('HGET', KEYS[3], member)
+    redis.call('HDEL', KEYS[3], member)
+    redis.call('HDEL', KEYS[2], member)
+    redis.call('ZREM', KEYS[1], member)
+    if ARGV[2] ~= '' then
+        redis.call('DEL', ARGV[2] .. ':' .. member)
+    end
+    if data then
+        result[#result + 1] = data
+    end
+end
+return result
+"""
+
+# 回收已过期的租约
+# KEYS: 租约 ZSET, 所属节点哈希, running 哈希
+# ARGV: 最多回收的数量, 请求锁前缀（为空时不删除请求锁）
+REAP_SCRIPT = (
+    """
+local members = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', redis.call('TIME')[1], 'LIMIT', 0, ARGV[1])
+"""
+    + _TAKE_SCRIPT
+)
+
+# 取回指定节点持有的租约（节点重启时恢复自己未完成的请求）
+# KEYS: 租约 ZSET, 所属节点哈希, running 哈希
+# ARGV: 最多取回的数量, 请求锁前缀（为空时不删除请求锁）, 节点 ID
+RESTORE_SCRIPT = (
+    """
+local members = {}
+local owners = redis.call('HGETALL', KEYS[2])
+for i = 1, #owners, 2 do
+    if owners[i + 1] == ARGV[3] then
+        members[#members + 1] = owners[i]
+        if #members >= tonumber(ARGV[1]) then
+            break
+        end
+    end
+end
+"""
+    + _TAKE_SCRIPT
+)
+
+
+class RedisRequestTracker:
+    """
+    在 Redis 中记录请求状态
+
+    - queue、running 各是一个哈希，字段为请求 hash，值为请求 json
+    - 请求入队（HSET queue）和处理完成（HDEL running）不等待结果，合并到 pipeline 批量发送
+    - 取出请求时用一次 Lua 脚本完成加锁、写入 running、从 queue 删除，与之前提交的命令在同一个 pipeline 中按顺序执行
+    - 分布式模式下每个请求一把锁（字符串 key，值为节点 ID，带过期时间），避免多个实例处理同一个请求；
+      本节点处理中的同一请求（如重试）全部完成后删除 running 中的记录和请求锁
+    - 启用租约（lease_ttl > 0）时，running 中的每个请求记录所属节点和租约到期时间（租约 ZSET，分数为到期的 Unix 时间）：
+      heartbeat 延长本节点处理中请求的租约，reap 取回已过期的租约（节点宕机），restore 取回本节点上次未完成的请求，
+      取回的请求由调用方重新入队
+    """
+
+    def __init__(
+        self,
+        redis_util: RedisUtil,
+        *,
+        key_queue: str,
+        key_running: str,
+        key_lock: str,
+        lock_ttl: int = 0,
+        node_id: str = "",
+        lease_ttl: int = 0,
+        batch_window: float = 0.002,
+        batch_max_size: int = 500,
+        spider: typing.Any = None,
+    ):
+        """
+        :param redis_util: RedisUtil
+        :param key_queue: 排队请求的哈希 key
+        :param key_running: 处理中请求的哈希 key，租约 ZSET、所属节点哈希的 key 为 {key_running}:leases、{key_running}:owners
+        :param key_lock: 请求锁 key 前缀，完整的 key 为 {key_lock}:{请求 hash}
+        :param lock_ttl: 请求锁过期时间，单位：秒，0 表示不加锁（非分布式模式）
+        :param node_id: 节点 ID，作为请求锁的值，启用租约时记录请求所属的节点，每个实例需唯一
+        :param lease_ttl: 租约时长，单位：秒，0 表示不使用租约
+        :param batch_window: 不等待结果的命令最多等待合并的时间，单位：秒
+        :param batch_max_size: 每个 pipeline 最多发送的命令数
+        :param spider: 爬虫实例，用于校验请求的回调函数可以按方法名还原
+        """
+        self.redis_util = redis_util
+        self.key_queue = key_queue
+        self.key_running = key_running
+        self.key_lock = key_lock
+        self.key_leases = f"{key_running}:leases"
+        self.key_owners = f"{key_running}:owners"
+        self.lock_ttl = lock_ttl
+        self.node_id = node_id
+        self.lease_ttl = lease_ttl
+        self.spider = spider
+
+        self.batcher = RedisPipelineBatcher(redis_util, window=batch_window, max_size=batch_max_size)
+        self._claim_script = redis_util.register_script(CLAIM_SCRIPT)
+        self._heartbeat_script = redis_util.register_script(LEASE_HEARTBEAT_SCRIPT)
+        self._reap_script = redis_util.register_script(REAP_SCRIPT)
+        self._restore_script = redis_util.register_script(RESTORE_SCRIPT)
+
+        # 本节点持有租约的请求 hash
+        self._leased: set[str] = set()
+        # 本节点处理中的请求 hash 及其数量，同一请求的重试可能在原请求完成前被取出
+        self._claimed: dict[str, int] = {}
+
+    async def open(self):
+        await self.redis_util.open()
+        await self.batcher.open()
+
+    async def close(self):
+        await self.batcher.close()
+        await self.redis_util.close()
+
+    def _dumps(self, request: Request) -> str:
+        """请求 json，优先使用可通过 Request.from_dict 还原的 to_dict()，无法还原的请求标记 restorable 为 False"""
+        try:
+            return ujson.dumps(request.to_dict(self.spider))
+        except (ValueError, TypeError, OverflowError):
+            return ujson.dumps({**request.model_dump, "restorable": False})
+
+    def enqueue(self, request: Request):
+        """
+        记录排队中的请求，不等待结果
+        :param request: 请求
+        :return:
+        """
+        self.batcher.send("hset", self.key_queue, request.hash, self._dumps(request))
+
+    async def claim(self, request: Request) -> bool:
+        """
+        记录开始处理的请求
+
+        :param request: 请求
+        :return: 分布式模式下加锁失败（其他实例正在处理）返回 False
+        """
+        request_hash = request.hash
+        result = await self.batcher.call_script(
+            self._claim_script,
+            keys=[
+                self.key_queue,
+                self.key_running,
+                f"{self.key_lock}:{request_hash}",
+                self.key_leases,
+                self.key_owners,
+            ],
+            args=[request_hash, self._dumps(request), self.lock_ttl, self.lease_ttl, self.node_id],
+        )
+        if not result:
+            return False
+        self._claimed[request_hash] = self._claimed.get(request_hash, 0) + 1
+        if self.lease_ttl > 0:
+            self._leased.add(request_hash)
+        return True
+
+    def finish(self, request: Request):
+        """
+        删除处理完成的请求和请求锁，不等待结果；本节点还有处理中的同一请求时保留
+        :param request: 请求
+        :return:
+        """
+        request_hash = request.hash
+        count = self._claimed.pop(request_hash, 0) - 1
+        if count > 0:
+            self._claimed[request_hash] = count
+            return
+
+        self.batcher.send("hdel", self.key_running, request_hash)
+        if self.lock_ttl > 0:
+            self.batcher.send("delete", f"{self.key_lock}:{request_hash}")
+        if self.lease_ttl > 0:
+            self.batcher.send("zrem", self.key_leases, request_hash)
+            self.batcher.send("hdel", self.key_owners, request_hash)
+            self._leased.discard(request_hash)
+
+    async def heartbeat(self) -> int:
+        """
+        延长本节点处理中请求的租约
+        :return: 延长的租约数
+        """
+        return await extend_leases(
+            self.batcher,
+            self._heartbeat_script,
+            keys=[self.key_leases, self.key_owners],
+            lease_ttl=self.lease_ttl,
+            node_id=self.node_id,
+            members=list(self._leased),
+        )
+
+    async def reap(self, limit: int = 500) -> list[dict]:
+        """
+        取回已过期的租约（所属节点宕机或失联），同时删除请求锁
+
+        :param limit: 最多取回的数量
+        :return: 请求的 dict，由调用方重新入队
+        """
+        rows = await self.batcher.call_script(
+            self._reap_script,
+            keys=[self.key_leases, self.key_owners, self.key_running],
+            args=[limit, self.key_lock if self.lock_ttl > 0 else ""],
+        )
+        return [ujson.loads(row) for row in rows[1:]]
+
+    async def restore(self, limit: int = 500, include_queue: bool = False) -> list[dict]:
+        """
+        取回本节点上次运行时未完成的请求
+
+        :param limit: 每批取回的数量
+        :param include_queue: 是否同时取回 queue 中的请求，只有一个节点使用 queue 时（非分布式模式）才能取回
+        :return: 请求的 dict，由调用方重新入队
+        """
+        requests: list[dict] = []
+        if self.lease_ttl > 0:
+            while True:
+                rows = await self.batcher.call_script(
+                    self._restore_script,
+                    keys=[self.key_leases, self.key_owners, self.key_running],
+                    args=[limit, self.key_lock if self.lock_ttl > 0 else "", self.node_id],
+                )
+                requests.extend(ujson.loads(row) for row in rows[1:])
+                if int(rows[0]) < limit:
+                    break
+
+        if include_queue:
+            queued = await self.batcher.call("hgetall", self.key_queue)
+            requests.extend(ujson.loads(row) for row in queued.values())
+        return requests
@@ -1,8 +1,10 @@
-from asyncio import Queue
+import asyncio
+from asyncio import Queue, Task
 from typing import TYPE_CHECKING, Union
 
 from maize.common.http.request import Request
 from maize.common.items import Item
+from maize.common.model.pipeline_model import PipelineProcessResult
 from maize.middlewares.middleware_manager import PipelineMiddlewareManager
 from maize.pipelines.pipeline_scheduler import PipelineScheduler
 from maize.utils.log_util import get_logger
@@ -10,6 +12,7 @@ from maize.utils.log_util import get_logger
 if TYPE_CHECKING:
     from maize import BasePipeline
     from maize.aio.classic.crawler.crawler import Crawler
+    from maize.core.engine.job_checkpoint import JobCheckpoint
 
 
 class Processor:
@@ -17,10 +20,24 @@ class Processor:
         self.crawler: Crawler = crawler
         self.logger = get_logger(crawler.settings, self.__class__.__name__)
 
-        self.queue = Queue()
+        # 有界队列：队列满时爬虫回调在 enqueue 处等待，数据管道的耗时不会占用下载并发
+        pipeline_settings = crawler.settings.pipeline
+        self.queue: Queue[Union[Request, Item]] = Queue(maxsize=pipeline_settings.processor_queue_size)
+        self.concurrency: int = max(1, pipeline_settings.processor_concurrency)
         self.item_pipelines: list[BasePipeline] = []
 
-        self.pipeline_scheduler: PipelineScheduler = PipelineScheduler(self.crawler.settings)
+        self._consumers: list[Task] = []
+        # 消费者正在处理的数量
+        self._processing: int = 0
+
+        # 任务目录：item 处理完毕后标记完成
+        self.checkpoint: JobCheckpoint | None = getattr(crawler.engine, "checkpoint", None)
+
+        self.pipeline_scheduler: PipelineScheduler = PipelineScheduler(
+            self.crawler.settings,
+            self._record_process_result,
+            self.checkpoint.finish_items if self.checkpoint else None,
+        )
 
         # 管道中间件管理器
         self.pipeline_middleware_manager: PipelineMiddlewareManager = PipelineMiddlewareManager(
@@ -33,41 +50,91 @@ class Processor:
     async def open(self):
         await self.pipeline_middleware_manager.open()
         await self.pipeline_scheduler.open()
-
-    async def process(self):
-        while not self.idle():
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.concurrency)]
+
+    async def _consume(self):
+        """
+        常驻消费者：从队列中取出爬虫产出并处理
+        :return:
+        """
+        while True:
             result = await self.queue.get()
-            if isinstance(result, Request):
-                await self.crawler.engine.enqueue_request(result)
-            else:
-                assert isinstance(result, Item)
-
-                # Apply pipeline middleware process_item_before
-                item = await self.pipeline_middleware_manager.process_item_before(result, self.crawler.spider)
-
-                # If middleware dropped the item, skip processing
-                if item is None:
-                    self.logger.debug("Item was dropped by pipeline middleware")
-                    continue
-
-                process_result = await self.pipeline_scheduler.process(item)
-
-                # Apply pipeline middleware process_item_after
-                await self.pipeline_middleware_manager.process_item_after(item, self.crawler.spider)
-
-                await self.crawler.spider.stats_collector.record_pipeline_success(process_result.success_count)
-                await self.crawler.spider.stats_collector.record_pipeline_fail(process_result.fail_count)
+            self._processing += 1
+            try:
+                await self.process(result)
+            except Exception as e:
+                self.logger.error(f"Error during processing {type(result).__name__}: {e}")
+            finally:
+                self._processing -= 1
+                self.queue.task_done()
+
+            # 队列已消费完毕，唤醒调度器重新判断是否空闲
+            if self.idle():
+                self._notify_scheduler()
+
+    async def process(self, result: Union[Request, Item]):
+        """
+        处理一个爬虫产出：请求入队，Item 经过管道中间件后交给数据管道
+
+        :param result: 请求或 Item
+        :return:
+        """
+        if isinstance(result, Request):
+            await self.crawler.engine.enqueue_request(result)
+            return
+
+        assert isinstance(result, Item)
+
+        # Apply pipeline middleware process_item_before
+        item = await self.pipeline_middleware_manager.process_item_before(result, self.crawler.spider)
+
+        # If middleware dropped the item, skip processing
+        if item is None:
+            self.logger.debug("Item was dropped by pipeline middleware")
+            if self.checkpoint:
+                self.checkpoint.finish_items([result])
+            return
+        if self.checkpoint:
+            self.checkpoint.replace_item(result, item)
+
+        process_result = await self.pipeline_scheduler.process(item)
+
+        # Apply pipeline middleware process_item_after
+        await self.pipeline_middleware_manager.process_item_after(item, self.crawler.spider)
+
+        await self._record_process_result(process_result)
+
+    async def _record_process_result(self, process_result: PipelineProcessResult):
+        await self.crawler.spider.stats_collector.record_pipeline_success(process_result.success_count)
+        await self.crawler.spider.stats_collector.record_pipeline_fail(process_result.fail_count)
+
+    def _notify_scheduler(self):
+        engine = self.crawler.engine
+        if engine and engine.scheduler:
+            engine.scheduler.notify()
 
     async def close(self):
+        # 处理完队列中剩余的产出后停止消费者
+        if self._consumers:
+            await self.queue.join()
+            for consumer in self._consumers:
+                consumer.cancel()
+            await asyncio.gather(*self._consumers, return_exceptions=True)
+            self._consumers = []
+
         close_process_result = await self.pipeline_scheduler.close()
-        await self.crawler.spider.stats_collector.record_pipeline_success(close_process_result.success_count)
-        await self.crawler.spider.stats_collector.record_pipeline_fail(close_process_result.fail_count)
+        await self._record_process_result(close_process_result)
         await self.pipeline_middleware_manager.close()
         self.logger.debug("processor closed")
 
     async def enqueue(self, output: Union[Request, Item]):
+        """
+        爬虫产出入队，由消费者异步处理，队列满时等待
+
+        :param output: 请求或 Item
+        :return:
+        """
         await self.queue.put(output)
-        await self.process()
 
     def idle(self) -> bool:
-        return len(self) == 0
+        return len(self) == 0 and self._processing == 0
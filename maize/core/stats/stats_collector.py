@@ -30,6 +30,15 @@ class StatsCollector:
         self._last_upload_key: str = ""
         self._container_id: str = ""
 
+    def add_done_callback(self, callback):
+        """
+        注册统计上报任务完成回调
+
+        :param callback: 无参数的同步回调
+        :return:
+        """
+        self._task_manager.add_done_callback(callback)
+
     async def open(self):
         if container_id := get_container_id():
             self._container_id = container_id
@@ -98,6 +107,61 @@ class StatsCollector:
         async with self._increment() as stats:
             stats.parse_fail_count += 1
 
+    async def record_dupefilter_dropped(self, count: int = 1):
+        async with self._increment() as stats:
+            stats.dupefilter_dropped_count += count
+
+    async def record_autothrottle(self, concurrency: int, delta: int):
+        """
+        记录自适应并发的调整
+
+        :param concurrency: 调整后的全局并发数
+        :param delta: 全局并发变化量
+        :return:
+        """
+        async with self._increment() as stats:
+            if delta > 0:
+                stats.autothrottle_increase_count += 1
+            elif delta < 0:
+                stats.autothrottle_decrease_count += 1
+            stats.autothrottle_concurrency = concurrency
+
+    async def record_callback(self, mode: str, elapsed: float | None = None):
+        """
+        记录一次回调执行
+
+        :param mode: 执行模式
+        :param elapsed: 执行耗时，单位：秒；事件循环中执行时为 None
+        :return:
+        """
+        async with self._increment() as stats:
+            stats.callback_count[mode] = stats.callback_count.get(mode, 0) + 1
+            if elapsed is not None:
+                stats.callback_seconds[mode] = stats.callback_seconds.get(mode, 0) + elapsed
+
+    def count_callback(self, mode: str):
+        """
+        记录一次回调执行次数，不获取锁、不触发上报，用于事件循环中执行的 inline 回调
+
+        :param mode: 执行模式
+        :return:
+        """
+        minute_key, _ = self._get_minute_key()
+        stats = self._stats.get(minute_key)
+        if stats is None:
+            stats = self._stats[minute_key] = SpiderStatistics()
+        stats.callback_count[mode] = stats.callback_count.get(mode, 0) + 1
+
+    async def record_loop_lag(self, lag: float):
+        """
+        记录事件循环延迟，每分钟保留最大值
+
+        :param lag: 延迟，单位：秒
+        :return:
+        """
+        async with self._increment() as stats:
+            stats.loop_lag_max = max(stats.loop_lag_max, lag)
+
     async def record_pipeline_success(self, count: int = 1):
         if not count:
             return
@@ -112,6 +176,29 @@ class StatsCollector:
         async with self._increment() as stats:
             stats.pipeline_fail_count += count
 
+    def snapshot(self) -> dict:
+        """
+        尚未上报的统计和开始时间，用于写入任务目录
+
+        :return: 可 JSON 序列化的 dict
+        """
+        return {
+            "start_time": self._start_time.isoformat() if self._start_time else None,
+            "stats": {minute_key: stats.model_dump() for minute_key, stats in self._stats.items()},
+        }
+
+    def restore(self, data: dict):
+        """
+        恢复上次运行尚未上报的统计，开始时间沿用上次运行的开始时间
+
+        :param data: snapshot 的返回值
+        :return:
+        """
+        if start_time := data.get("start_time"):
+            self._start_time = datetime.datetime.fromisoformat(start_time)
+        for minute_key, stats in data.get("stats", {}).items():
+            self._stats.setdefault(minute_key, SpiderStatistics.model_validate(stats))
+
     async def get_and_clear_stats(self, minute_key: str):
         async with self._lock:
             stats = self._stats.get(minute_key, None)
@@ -0,0 +1,173 @@
+import typing
+from collections import OrderedDict
+
+from maize.utils.log_util import get_logger
+
+if typing.TYPE_CHECKING:
+    from maize.aio.classic.scheduler.host_throttle import HostThrottle
+    from maize.core.task.task_manager import TaskManager
+    from maize.settings import SpiderSettings
+
+
+class AIMDController:
+    """
+    加性增、乘性减（AIMD）并发控制器
+
+    - 平滑延迟（EWMA）不超过目标延迟、且没有收到退避状态码时，每完成一轮（当前并发数个）请求，并发数加 increase_step
+    - 平滑延迟超过目标延迟、收到退避状态码（如 429、503）或下载失败时，并发数乘以 decrease_factor，
+      两次减小之间至少间隔一个目标延迟，避免同一批在途请求连续触发减小
+    """
+
+    __slots__ = (
+        "concurrency",
+        "decrease_factor",
+        "increase_step",
+        "last_decrease",
+        "latency",
+        "max_concurrency",
+        "min_concurrency",
+        "successes",
+        "target_latency",
+    )
+
+    # 延迟平滑系数
+    _alpha = 0.3
+
+    def __init__(
+        self,
+        concurrency: int,
+        *,
+        min_concurrency: int,
+        max_concurrency: int,
+        target_latency: float,
+        increase_step: int,
+        decrease_factor: float,
+    ):
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.concurrency = min(max(concurrency, self.min_concurrency), self.max_concurrency)
+        self.target_latency = target_latency
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+
+        self.latency: float | None = None
+        self.successes: int = 0
+        self.last_decrease: float | None = None
+
+    def record(self, latency: float | None, backoff: bool, now: float) -> int:
+        """
+        记录一次下载结果
+
+        :param latency: 下载耗时，单位：秒；下载失败时为 None
+        :param backoff: 是否需要退避（退避状态码或下载失败）
+        :param now: 当前时间
+        :return: 并发数的变化量，0 表示未调整
+        """
+        if latency is not None:
+            self.latency = latency if self.latency is None else self._alpha * latency + (1 - self._alpha) * self.latency
+
+        if backoff or (self.latency is not None and self.latency > self.target_latency):
+            self.successes = 0
+            if self.last_decrease is not None and now - self.last_decrease < self.target_latency:
+                return 0
+            self.last_decrease = now
+            concurrency = max(self.min_concurrency, int(self.concurrency * self.decrease_factor))
+        else:
+            self.successes += 1
+            if self.successes < self.concurrency:
+                return 0
+            self.successes = 0
+            concurrency = min(self.max_concurrency, self.concurrency + self.increase_step)
+
+        delta = concurrency - self.concurrency
+        self.concurrency = concurrency
+        return delta
+
+
+class AutoThrottle:
+    """
+    自适应并发（Classic 引擎）
+
+    根据下载延迟和状态码，在运行时调整 TaskManager 的全局并发上限；
+    启用按 host 限流（politeness）时，同时调整每个 host 的并发上限，
+    最多保留 max_hosts 个 host 的状态，超出后回收最久未请求的 host
+    """
+
+    def __init__(
+        self,
+        settings: "SpiderSettings",
+        task_manager: "TaskManager",
+        host_throttle: "HostThrottle | None" = None,
+    ):
+        self.settings = settings.autothrottle
+        self.logger = get_logger(settings, self.__class__.__name__)
+        self.task_manager = task_manager
+        self.host_throttle = host_throttle
+
+        self._max_concurrency = self.settings.max_concurrency or settings.concurrency
+        self._max_host_concurrency = settings.politeness.host_concurrency or self._max_concurrency
+        self._backoff_status = set(self.settings.backoff_status)
+
+        self.controller = self._create_controller(self.settings.start_concurrency or 1, self._max_concurrency)
+        # 按最近请求时间排序，最久未请求的在前
+        self._host_controllers: OrderedDict[str, AIMDController] = OrderedDict()
+        self.task_manager.set_concurrency(self.controller.concurrency)
+
+    def _create_controller(self, concurrency: int, max_concurrency: int) -> AIMDController:
+        return AIMDController(
+            concurrency,
+            min_concurrency=self.settings.min_concurrency,
+            max_concurrency=max_concurrency,
+            target_latency=self.settings.target_latency,
+            increase_step=self.settings.increase_step,
+            decrease_factor=self.settings.decrease_factor,
+        )
+
+    @property
+    def concurrency(self) -> int:
+        return self.controller.concurrency
+
+    def host_concurrency(self, host: str) -> int | None:
+        controller = self._host_controllers.get(host)
+        return controller.concurrency if controller else None
+
+    def record(self, host: str, latency: float | None, status: int | None, now: float) -> tuple[int, int]:
+        """
+        记录一次下载结果并调整并发
+
+        :param host: 请求的 host
+        :param latency: 下载耗时，单位：秒；下载失败时为 None
+        :param status: 响应状态码；下载失败时为 None
+        :param now: 当前时间
+        :return: (全局并发变化量, host 并发变化量)
+        """
+        backoff = status is None or status in self._backoff_status
+
+        delta = self.controller.record(latency, backoff, now)
+        if delta:
+            self.task_manager.set_concurrency(self.controller.concurrency)
+            self.logger.debug(f"autothrottle concurrency: {self.controller.concurrency} ({delta:+d})")
+
+        host_delta = 0
+        if self.host_throttle is not None:
+            controller = self._host_controllers.get(host)
+            if controller is None:
+                controller = self._host_controllers[host] = self._create_controller(
+                    self.settings.start_concurrency or 1, self._max_host_concurrency
+                )
+                self.host_throttle.set_concurrency(host, controller.concurrency)
+                self._evict_hosts()
+            else:
+                self._host_controllers.move_to_end(host)
+            host_delta = controller.record(latency, backoff, now)
+            if host_delta:
+                self.host_throttle.set_concurrency(host, controller.concurrency)
+                self.logger.debug(f"autothrottle {host} concurrency: {controller.concurrency} ({host_delta:+d})")
+
+        return delta, host_delta
+
+    def _evict_hosts(self):
+        """回收最久未请求的 host，恢复其并发上限为 host_concurrency 配置"""
+        while len(self._host_controllers) > max(1, self.settings.max_hosts):
+            host, _ = self._host_controllers.popitem(last=False)
+            self.host_throttle.reset_concurrency(host)
@@ -0,0 +1,243 @@
+import asyncio
+import contextlib
+import multiprocessing
+import time
+import typing
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from inspect import isasyncgen, iscoroutine, isgenerator
+
+from maize.common.constant import CallbackExecutionModeEnum
+from maize.common.http import Request, Response
+from maize.exceptions.spider_exception import TransformTypeException
+from maize.utils.log_util import get_logger
+from maize.utils.project_util import load_class
+
+if typing.TYPE_CHECKING:
+    from maize.base.interface.standard_spider_interface import StandardSpiderInterface
+    from maize.settings import SpiderSettings
+
+# 回调函数上记录执行模式的属性名
+EXECUTION_MODE_ATTR = "__maize_execution_mode__"
+
+# Request.meta 中指定执行模式的 key
+EXECUTION_MODE_META_KEY = "execution_mode"
+
+# 子进程中按爬虫类路径缓存的爬虫实例
+_process_spiders: dict[str, "StandardSpiderInterface"] = {}
+
+
+def execution_mode(mode: CallbackExecutionModeEnum | str) -> Callable[[Callable], Callable]:
+    """
+    指定回调的执行模式，优先级低于 Request(meta={"execution_mode": ...})，高于 settings.callback.execution_mode
+
+    :param mode: 执行模式
+    :return:
+    """
+    mode = CallbackExecutionModeEnum(mode)
+
+    def wrapper(func: Callable) -> Callable:
+        setattr(func, EXECUTION_MODE_ATTR, mode)
+        return func
+
+    return wrapper
+
+
+def collect_output(output: typing.Any) -> list[typing.Any]:
+    """
+    在当前线程中执行完回调的返回值，收集产出的 Request / Item
+
+    异步回调在当前线程新建的事件循环中执行，不能使用主线程事件循环中的对象（如引擎、队列）
+    :param output: 回调的返回值
+    :raises TransformTypeException: 返回值不是生成器、协程或 None，与 inline 模式一致
+    :return: 产出列表
+    """
+    if isgenerator(output):
+        return list(output)
+    if isasyncgen(output):
+
+        async def _collect():
+            return [r async for r in output]
+
+        return asyncio.run(_collect())
+    if iscoroutine(output):
+        asyncio.run(output)
+    elif output:
+        raise TransformTypeException("callback return value must be `generator` or `async generator`")
+    return []
+
+
+def _get_process_spider(spider_path: str) -> "StandardSpiderInterface":
+    spider = _process_spiders.get(spider_path)
+    if spider is None:
+        spider = _process_spiders[spider_path] = load_class(spider_path)()
+        if hasattr(spider, "logger"):
+            spider.logger = get_logger()
+    return spider
+
+
+def run_callback_in_process(
+    spider_path: str, callback_name: str, response_data: dict[str, typing.Any]
+) -> list[tuple[bool, typing.Any]]:
+    """
+    在子进程中执行回调
+
+    :param spider_path: 爬虫类路径，子进程中按类路径创建一个爬虫实例（不调用 open）
+    :param callback_name: 回调的方法名
+    :param response_data: 响应的 url、status、headers、body（流式下载时为 path、body_hash）和请求的 to_dict()
+    :return: 产出列表，(是否为请求, 请求的 to_dict() 或 Item)
+    """
+    spider = _get_process_spider(spider_path)
+    request = Request.from_dict(response_data["request"], spider)
+    response: Response[None, None] = Response(
+        response_data["url"],
+        headers=response_data["headers"],
+        request=request,
+        body=response_data["body"],
+        status=response_data["status"],
+        path=response_data.get("path"),
+        body_hash=response_data.get("body_hash"),
+    )
+    outputs = collect_output(getattr(spider, callback_name)(response))
+    return [(True, r.to_dict(spider)) if isinstance(r, Request) else (False, r) for r in outputs]
+
+
+class CallbackExecutor:
+    """
+    爬虫回调执行器
+
+    - inline：在事件循环中执行，产出按需迭代（默认）
+    - thread：在线程池中执行完整个回调，lxml 解析会释放 GIL，不阻塞事件循环
+    - process：响应的 url、status、headers、body 发送到子进程，子进程执行回调后把产出的 Request / Item 发送回主进程；
+      回调必须是爬虫的方法，子进程中的爬虫实例不会调用 open，不能依赖运行时状态
+
+    thread、process 模式下的异步回调在工作线程 / 子进程新建的事件循环中执行
+    """
+
+    def __init__(self, settings: "SpiderSettings", spider: "StandardSpiderInterface"):
+        self.logger = get_logger(settings, self.__class__.__name__)
+        self.settings = settings.callback
+        self.spider = spider
+        self.default_mode = CallbackExecutionModeEnum(self.settings.execution_mode)
+
+        self._spider_path = f"{spider.__class__.__module__}.{spider.__class__.__qualname__}"
+        self._thread_executor: ThreadPoolExecutor | None = None
+        self._process_executor: ProcessPoolExecutor | None = None
+        self._lag_task: asyncio.Task | None = None
+
+    async def open(self):
+        if self.settings.loop_lag_interval > 0 and getattr(self.spider, "stats_collector", None):
+            self._lag_task = asyncio.create_task(self._monitor_loop_lag(self.settings.loop_lag_interval))
+
+    async def close(self):
+        if self._lag_task:
+            self._lag_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._lag_task
+            self._lag_task = None
+
+        for executor in (self._thread_executor, self._process_executor):
+            if executor is not None:
+                await asyncio.to_thread(executor.shutdown)
+        self._thread_executor = None
+        self._process_executor = None
+
+    async def _monitor_loop_lag(self, interval: float):
+        """
+        事件循环延迟采样：sleep(interval) 实际经过的时间超出 interval 的部分即为事件循环被阻塞的时间
+
+        :param interval: 采样间隔，单位：秒
+        :return:
+        """
+        stats_collector = self.spider.stats_collector
+        if stats_collector is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        while True:
+            start_time = loop.time()
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - start_time - interval)
+            await stats_collector.record_loop_lag(lag)
+
+    def get_mode(self, callback: Callable, request: Request) -> CallbackExecutionModeEnum:
+        """
+        回调的执行模式，优先级：Request.meta > @execution_mode 装饰器 > settings
+
+        :param callback: 回调
+        :param request: 请求
+        :return: 执行模式
+        """
+        mode = request.get_meta(EXECUTION_MODE_META_KEY)
+        if mode is None:
+            mode = getattr(callback, EXECUTION_MODE_ATTR, None)
+        return self.default_mode if mode is None else CallbackExecutionModeEnum(mode)
+
+    def _get_executor(self, mode: CallbackExecutionModeEnum) -> Executor:
+        if mode == CallbackExecutionModeEnum.THREAD:
+            if self._thread_executor is None:
+                self._thread_executor = ThreadPoolExecutor(
+                    max_workers=self.settings.thread_workers or None, thread_name_prefix="maize-callback"
+                )
+            return self._thread_executor
+
+        if self._process_executor is None:
+            self._process_executor = ProcessPoolExecutor(
+                max_workers=self.settings.process_workers or None,
+                mp_context=multiprocessing.get_context(self.settings.process_start_method),
+            )
+        return self._process_executor
+
+    async def execute(self, callback: Callable, response: Response, request: Request) -> typing.Any:
+        """
+        执行回调
+
+        inline 模式直接调用回调，只记录执行次数，不获取统计锁；产出由调用方按需迭代，不记录耗时
+
+        :param callback: 回调
+        :param response: 响应
+        :param request: 请求
+        :return: inline 模式返回回调的原始返回值，其他模式返回已收集产出的生成器
+        """
+        mode = self.get_mode(callback, request)
+        if mode == CallbackExecutionModeEnum.INLINE:
+            if self.spider.stats_collector:
+                self.spider.stats_collector.count_callback(mode.value)
+            return callback(response)
+
+        loop = asyncio.get_running_loop()
+        start_time = time.perf_counter()
+        if mode == CallbackExecutionModeEnum.THREAD:
+            outputs = await loop.run_in_executor(self._get_executor(mode), self._run_in_thread, callback, response)
+        else:
+            outputs = await self._run_in_process(callback, response)
+        if self.spider.stats_collector:
+            await self.spider.stats_collector.record_callback(mode.value, time.perf_counter() - start_time)
+        return (output for output in outputs)
+
+    @staticmethod
+    def _run_in_thread(callback: Callable, response: Response) -> list[typing.Any]:
+        return collect_output(callback(response))
+
+    async def _run_in_process(self, callback: Callable, response: Response) -> list[typing.Any]:
+        if getattr(callback, "__self__", None) is not self.spider:
+            raise TypeError(f"process execution mode requires a spider method as callback, got {callback!r}")
+
+        response_data = {
+            "url": response.url,
+            "status": response.status,
+            "headers": dict(response.headers),
+            # 流式下载的响应只传递文件路径，由子进程按需读取
+            "body": b"" if response.path else response.body,
+            "path": response.path,
+            "body_hash": response.body_hash,
+            "request": response.request.to_dict(self.spider),
+        }
+        outputs = await asyncio.get_running_loop().run_in_executor(
+            self._get_executor(CallbackExecutionModeEnum.PROCESS),
+            run_callback_in_process,
+            self._spider_path,
+            callback.__name__,
+            response_data,
+        )
+        return [Request.from_dict(output, self.spider) if is_request else output for is_request, output in outputs]
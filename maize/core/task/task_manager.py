@@ -1,13 +1,105 @@
 import asyncio
-from asyncio import Semaphore, Task
-from collections.abc import Coroutine, Generator
+from asyncio import Future, Task
+from collections import deque
+from collections.abc import Callable, Coroutine, Generator
 from typing import Any, Final
 
 
+class ResizableSemaphore:
+    """
+    可在运行时调整上限的信号量
+
+    调小上限时不会打断已获取的许可，只是在在途数量降到新上限以下前不再发放新许可
+    """
+
+    def __init__(self, value: int = 1):
+        if value < 1:
+            raise ValueError("Semaphore value must be >= 1")
+        self._limit: int = value
+        self._active: int = 0
+        self._waiters: deque[Future] = deque()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def resize(self, value: int):
+        """
+        调整上限
+
+        :param value: 新的上限，最小为 1
+        :return:
+        """
+        self._limit = max(1, value)
+        self._wake_up_next()
+
+    def locked(self) -> bool:
+        return self._active >= self._limit or any(not waiter.cancelled() for waiter in self._waiters)
+
+    async def acquire(self) -> bool:
+        if not self.locked():
+            self._active += 1
+            return True
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # 已获得许可后被取消，归还许可
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        return True
+
+    def release(self):
+        if self._active > 0:
+            self._active -= 1
+        self._wake_up_next()
+
+    def _wake_up_next(self):
+        while self._waiters and self._active < self._limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._active += 1
+                waiter.set_result(True)
+
+
 class TaskManager:
     def __init__(self, total_concurrency: int = 1):
         self.current_task: Final[set] = set()
-        self.semaphore: Semaphore = Semaphore(total_concurrency)
+        self.semaphore: ResizableSemaphore = ResizableSemaphore(total_concurrency)
+        self._done_callbacks: Final[list[Callable[[], None]]] = []
+
+    @property
+    def concurrency(self) -> int:
+        """当前生效的并发上限"""
+        return self.semaphore.limit
+
+    def set_concurrency(self, concurrency: int):
+        """
+        运行时调整并发上限
+
+        :param concurrency: 新的并发上限，最小为 1
+        :return:
+        """
+        self.semaphore.resize(concurrency)
+
+    def add_done_callback(self, callback: Callable[[], None]):
+        """
+        注册任务完成回调，每个任务完成（并释放信号量）后调用
+
+        :param callback: 无参数的同步回调
+        :return:
+        """
+        self._done_callbacks.append(callback)
 
     def create_task(self, coroutine: Generator[Any, None, None] | Coroutine[Any, Any, None]) -> Task:
         task = asyncio.create_task(coroutine)
@@ -16,6 +108,8 @@ class TaskManager:
         def done_callback(_fut: Task[None]) -> None:
             self.current_task.remove(task)
             self.semaphore.release()
+            for callback in self._done_callbacks:
+                callback()
 
         task.add_done_callback(done_callback)
         return task
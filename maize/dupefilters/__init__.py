@@ -0,0 +1,5 @@
+from maize.dupefilters.base_dupefilter import BaseDupeFilter
+from maize.dupefilters.bloom_dupefilter import BloomDupeFilter
+from maize.dupefilters.memory_dupefilter import MemoryDupeFilter
+
+__all__ = ["BaseDupeFilter", "BloomDupeFilter", "MemoryDupeFilter"]
@@ -0,0 +1,62 @@
+from abc import ABCMeta, abstractmethod
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+from maize.common.http.fingerprint import request_fingerprint
+
+if TYPE_CHECKING:
+    from maize.common.http.request import Request
+    from maize.settings import SpiderSettings
+
+
+class BaseDupeFilter(metaclass=ABCMeta):
+    def __init__(self, settings: "SpiderSettings"):
+        self.settings = settings
+        # 参与指纹计算的请求头，为 None 时全部请求头参与计算
+        self.fingerprint_headers = settings.dupefilter.fingerprint_headers
+
+    @abstractmethod
+    async def open(self):
+        """
+        去重器初始化时调用，需要初始化的异步方法请在此实现
+        @return:
+        """
+
+    @abstractmethod
+    async def close(self):
+        """
+        去重器关闭时调用，需要关闭的异步方法请在此实现
+        @return:
+        """
+
+    @staticmethod
+    def fingerprint(request: "Request", include_headers: Iterable[str] | None = None) -> bytes:
+        """
+        请求指纹，16 字节的二进制摘要
+
+        :param request: 请求
+        :param include_headers: 参与计算的请求头名称，为 None 时全部请求头参与计算
+        :return: 请求指纹
+        """
+        return request_fingerprint(request, include_headers)
+
+    @abstractmethod
+    async def request_seen(self, request: "Request") -> bool:
+        """
+        判断请求是否已出现过，未出现过时记录该请求
+
+        :param request: 请求
+        @return: 已出现过 True，否则 False
+        """
+
+    def add_fingerprint(self, fingerprint: bytes):
+        """
+        直接记录一个请求指纹，用于从任务目录恢复去重状态
+
+        :param fingerprint: 16 字节的请求指纹
+        @return:
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support restoring fingerprints")
+
+    def __len__(self):
+        return 0
@@ -0,0 +1,37 @@
+from typing import TYPE_CHECKING
+
+from maize.dupefilters.base_dupefilter import BaseDupeFilter
+from maize.utils.bloom_filter import BloomFilter
+
+if TYPE_CHECKING:
+    from maize.common.http.request import Request
+    from maize.settings import SpiderSettings
+
+
+class BloomDupeFilter(BaseDupeFilter):
+    """
+    布隆过滤器去重，内存占用由 dupefilter.bloom_capacity 和 dupefilter.bloom_error_rate 决定，
+    存在一定误判率：未抓取过的请求可能被误判为重复请求而丢弃
+    """
+
+    def __init__(self, settings: "SpiderSettings"):
+        super().__init__(settings)
+        self._bloom_filter = BloomFilter(
+            capacity=settings.dupefilter.bloom_capacity,
+            error_rate=settings.dupefilter.bloom_error_rate,
+        )
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def request_seen(self, request: "Request") -> bool:
+        return self._bloom_filter.add(self.fingerprint(request, self.fingerprint_headers))
+
+    def add_fingerprint(self, fingerprint: bytes):
+        self._bloom_filter.add(fingerprint)
+
+    def __len__(self):
+        return len(self._bloom_filter)
@@ -0,0 +1,37 @@
+from typing import TYPE_CHECKING, Final
+
+from maize.dupefilters.base_dupefilter import BaseDupeFilter
+
+if TYPE_CHECKING:
+    from maize.common.http.request import Request
+    from maize.settings import SpiderSettings
+
+
+class MemoryDupeFilter(BaseDupeFilter):
+    """
+    内存精确去重，保存 16 字节的二进制请求指纹
+    """
+
+    def __init__(self, settings: "SpiderSettings"):
+        super().__init__(settings)
+        self._seen: Final[set[bytes]] = set()
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def request_seen(self, request: "Request") -> bool:
+        fingerprint = self.fingerprint(request, self.fingerprint_headers)
+        if fingerprint in self._seen:
+            return True
+
+        self._seen.add(fingerprint)
+        return False
+
+    def add_fingerprint(self, fingerprint: bytes):
+        self._seen.add(fingerprint)
+
+    def __len__(self):
+        return len(self._seen)
@@ -30,3 +30,7 @@ class StartRequestsNotImplementedException(NotImplementedError):
     """start_requests method not implemented"""
 
     pass
+
+
+class MaxBodySizeExceededException(Exception):
+    """流式下载的响应体超过最大大小"""
@@ -30,6 +30,7 @@ from maize.middlewares.base_middleware import (
 # Import built-in middleware
 from maize.middlewares.downloader import (
     DefaultHeadersMiddleware,
+    HttpCacheMiddleware,
     RetryMiddleware,
     UserAgentMiddleware,
 )
@@ -55,6 +56,7 @@ __all__ = [
     "DepthMiddleware",
     "DownloaderMiddleware",
     "DownloaderMiddlewareManager",
+    "HttpCacheMiddleware",
     "HttpErrorMiddleware",
     "ItemCleanerMiddleware",
     "ItemValidationMiddleware",
@@ -3,11 +3,14 @@ Built-in downloader middleware for Maize framework.
 """
 
 from maize.middlewares.downloader.default_headers_middleware import DefaultHeadersMiddleware
+from maize.middlewares.downloader.http_cache_middleware import HttpCacheMiddleware, HttpCacheStorage
 from maize.middlewares.downloader.retry_middleware import RetryMiddleware
 from maize.middlewares.downloader.user_agent_middleware import UserAgentMiddleware
 
 __all__ = [
     "DefaultHeadersMiddleware",
+    "HttpCacheMiddleware",
+    "HttpCacheStorage",
     "RetryMiddleware",
     "UserAgentMiddleware",
 ]
@@ -0,0 +1,300 @@
+"""
+HTTP 缓存中间件
+
+把响应缓存到本地磁盘，命中时不再经过下载器
+"""
+
+import asyncio
+import gzip
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import ujson
+
+from maize.common.http.fingerprint import request_fingerprint
+from maize.common.http.response import Response
+from maize.middlewares.base_middleware import DownloaderMiddleware
+from maize.settings.spider_settings import HttpCacheSettings
+
+if TYPE_CHECKING:
+    from maize.base.interface.standard_spider_interface import StandardSpiderInterface
+    from maize.common.http.request import Request
+
+
+def _get_header(headers: dict[str, Any], name: str) -> str | None:
+    """按名称获取响应头，不区分大小写"""
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return str(value)
+    return None
+
+
+class HttpCacheStorage:
+    """
+    响应缓存存储
+
+    - 索引：SQLite 表，每个请求指纹一行，记录状态码、响应头、响应体哈希、写入时间和校验信息（ETag / Last-Modified）
+    - 响应体：按 sha256 内容寻址，gzip 压缩后保存在 bodies/{哈希前两位}/{哈希}.gz，内容相同的响应体只保存一份
+
+    所有文件和 SQLite 调用都放到线程中执行，不阻塞事件循环。
+    """
+
+    INDEX_NAME = "index.sqlite3"
+    BODIES_DIR = "bodies"
+
+    def __init__(self, path: str | Path, compression_level: int = 6):
+        """
+        :param path: 缓存目录
+        :param compression_level: 响应体 gzip 压缩级别
+        """
+        self.path = Path(path)
+        self.compression_level = compression_level
+        self._conn: sqlite3.Connection | None = None
+        self._lock = asyncio.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path / self.INDEX_NAME, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "fingerprint TEXT PRIMARY KEY, url TEXT, status INTEGER, headers TEXT, body_hash TEXT, "
+                "stored_at REAL, etag TEXT, last_modified TEXT)"
+            )
+        return self._conn
+
+    def _body_path(self, body_hash: str) -> Path:
+        return self.path / self.BODIES_DIR / body_hash[:2] / f"{body_hash}.gz"
+
+    def _get(self, fingerprint: str) -> dict | None:
+        row = self._connect().execute("SELECT * FROM responses WHERE fingerprint = ?", (fingerprint,)).fetchone()
+        if row is None:
+            return None
+
+        try:
+            body = gzip.decompress(self._body_path(row["body_hash"]).read_bytes())
+        except (OSError, EOFError):
+            # 响应体文件被删除或损坏，按未缓存处理
+            return None
+        entry = dict(row)
+        entry["headers"] = ujson.loads(entry["headers"])
+        entry["body"] = body
+        return entry
+
+    def _store(self, fingerprint: str, url: str, status: int, headers: dict[str, Any], body: bytes):
+        body_hash = hashlib.sha256(body).hexdigest()
+        body_path = self._body_path(body_hash)
+        if not body_path.exists():
+            body_path.parent.mkdir(parents=True, exist_ok=True)
+            # 先写临时文件再重命名，进程中途退出也不会留下不完整的响应体
+            tmp_path = body_path.with_suffix(".tmp")
+            tmp_path.write_bytes(gzip.compress(body, compresslevel=self.compression_level))
+            tmp_path.replace(body_path)
+
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses "
+            "(fingerprint, url, status, headers, body_hash, stored_at, etag, last_modified) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                fingerprint,
+                url,
+                status,
+                ujson.dumps({key: str(value) for key, value in headers.items()}),
+                body_hash,
+                time.time(),
+                _get_header(headers, "ETag"),
+                _get_header(headers, "Last-Modified"),
+            ),
+        )
+        conn.commit()
+
+    def _touch(self, fingerprint: str, etag: str | None, last_modified: str | None):
+        conn = self._connect()
+        conn.execute(
+            "UPDATE responses SET stored_at = ?, etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) "
+            "WHERE fingerprint = ?",
+            (time.time(), etag, last_modified, fingerprint),
+        )
+        conn.commit()
+
+    async def get(self, fingerprint: str) -> dict | None:
+        """
+        获取缓存的响应
+
+        :param fingerprint: 请求指纹
+        :return: 包含 url、status、headers、body、stored_at、etag、last_modified 的字典，未缓存时返回 None
+        """
+        async with self._lock:
+            return await asyncio.to_thread(self._get, fingerprint)
+
+    async def store(self, fingerprint: str, url: str, status: int, headers: dict[str, Any], body: bytes):
+        """
+        写入响应，同一指纹的旧记录被覆盖
+
+        :param fingerprint: 请求指纹
+        :param url: url
+        :param status: 响应状态码
+        :param headers: 响应头
+        :param body: 响应体
+        :return:
+        """
+        async with self._lock:
+            await asyncio.to_thread(self._store, fingerprint, url, status, headers, body)
+
+    async def touch(self, fingerprint: str, etag: str | None = None, last_modified: str | None = None):
+        """
+        重新验证通过（304）后刷新写入时间，服务端返回了新的校验信息时一并更新
+
+        :param fingerprint: 请求指纹
+        :param etag: 新的 ETag
+        :param last_modified: 新的 Last-Modified
+        :return:
+        """
+        async with self._lock:
+            await asyncio.to_thread(self._touch, fingerprint, etag, last_modified)
+
+    async def close(self):
+        async with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class HttpCacheMiddleware(DownloaderMiddleware):
+    """
+    HTTP 缓存中间件
+
+    按请求指纹把响应缓存到本地目录：
+    - 缓存未过期时直接返回缓存的响应，不经过下载器
+    - 缓存已过期且有 ETag / Last-Modified 时，带上 If-None-Match / If-Modified-Since 重新请求，
+      服务端返回 304 时只传输响应头，继续使用缓存的响应体
+    - 离线模式（always_use_cache）下只要有缓存就直接使用，不判断是否过期
+
+    process_request 返回缓存的响应时，引擎不再调用下载器和后续中间件的 process_response，
+    建议设置较大的优先级数值（如 900），让其他中间件先处理请求。
+    请求的 meta 中设置 dont_cache=True 时不读写缓存，流式下载（meta 中 stream=True）的请求也不读写缓存。
+    默认不缓存 429 和 5xx 响应（cache_server_errors），重试的请求不会命中缓存的错误响应。
+
+    配置项见 SpiderSettings.http_cache
+    """
+
+    def __init__(self, settings=None):
+        """
+        初始化 HTTP 缓存中间件
+
+        :param settings: 爬虫配置
+        """
+        super().__init__(settings)
+        self.cache_settings: HttpCacheSettings = settings.http_cache if settings else HttpCacheSettings()
+        self.storage = HttpCacheStorage(self.cache_settings.path, self.cache_settings.compression_level)
+        self.hit_count = 0
+        self.miss_count = 0
+        self.revalidated_count = 0
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        self.logger.info(
+            f"http cache hit: {self.hit_count}, miss: {self.miss_count}, revalidated: {self.revalidated_count}"
+        )
+        await self.storage.close()
+
+    def _fingerprint(self, request: "Request") -> str:
+        return request_fingerprint(request, self.cache_settings.fingerprint_headers).hex()
+
+    @staticmethod
+    def _skip_cache(request: "Request") -> bool:
+        # 流式下载的响应体在文件中，读取 body 会把整个文件读入内存
+        return bool(request.get_meta("dont_cache", False) or request.get_meta("stream", False))
+
+    def _is_cacheable(self, status: int) -> bool:
+        if status in self.cache_settings.ignore_http_codes:
+            return False
+        return self.cache_settings.cache_server_errors or (status < 500 and status != 429)
+
+    def _is_fresh(self, entry: dict) -> bool:
+        expiration_secs = self.cache_settings.expiration_secs
+        return expiration_secs <= 0 or time.time() - entry["stored_at"] < expiration_secs
+
+    @staticmethod
+    def _cached_response(request: "Request", entry: dict) -> Response:
+        return Response(
+            url=request.url,
+            headers=entry["headers"],
+            request=request,
+            body=entry["body"],
+            status=entry["status"],
+        )
+
+    async def process_request(
+        self, request: "Request", spider: "StandardSpiderInterface"
+    ) -> "Request | Response | None":
+        """
+        命中未过期的缓存时返回缓存的响应；缓存已过期时添加条件请求头
+
+        :param request: 请求
+        :param spider: 爬虫实例
+        :return: 缓存的响应、请求，离线模式下未命中且 ignore_missing 为 True 时返回 None 丢弃请求
+        """
+        if self._skip_cache(request):
+            return request
+
+        entry = await self.storage.get(self._fingerprint(request))
+        if entry is None:
+            self.miss_count += 1
+            if self.cache_settings.always_use_cache and self.cache_settings.ignore_missing:
+                self.logger.debug(f"http cache missing, drop request: {request}")
+                return None
+            return request
+
+        if self.cache_settings.always_use_cache or self._is_fresh(entry):
+            self.hit_count += 1
+            return self._cached_response(request, entry)
+
+        # 请求头由 headers_func 动态生成时无法添加条件请求头，直接重新下载
+        if self.cache_settings.revalidate and request.headers_func is None:
+            headers = dict(request.headers or {})
+            if entry["etag"] and _get_header(headers, "If-None-Match") is None:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"] and _get_header(headers, "If-Modified-Since") is None:
+                headers["If-Modified-Since"] = entry["last_modified"]
+            request.headers = headers
+        return request
+
+    async def process_response(
+        self, request: "Request", response: "Response", spider: "StandardSpiderInterface"
+    ) -> "Request | Response | None":
+        """
+        服务端返回 304 时使用缓存的响应，其他响应写入缓存
+
+        :param request: 请求
+        :param response: 响应
+        :param spider: 爬虫实例
+        :return: 响应
+        """
+        if self._skip_cache(request) or response.path:
+            return response
+
+        fingerprint = self._fingerprint(request)
+        if response.status == 304:
+            entry = await self.storage.get(fingerprint)
+            if entry is None:
+                return response
+            self.revalidated_count += 1
+            await self.storage.touch(
+                fingerprint, _get_header(response.headers, "ETag"), _get_header(response.headers, "Last-Modified")
+            )
+            return self._cached_response(request, entry)
+
+        if self._is_cacheable(response.status):
+            await self.storage.store(fingerprint, request.url, response.status, response.headers, response.body)
+        return response
@@ -100,9 +100,7 @@ class RetryMiddleware(DownloaderMiddleware):
         :param request: 请求实例
         :return: 重试次数
         """
-        if not request.meta:
-            return 0
-        return request.meta.get("retry_count", 0)
+        return request.get_meta("retry_count", 0)
 
     def _set_retry_count(self, request: "Request", count: int):
         """
@@ -111,9 +109,7 @@ class RetryMiddleware(DownloaderMiddleware):
         :param request: 请求实例
         :param count: 重试次数
         """
-        if not request.meta:
-            request._meta = {}
-        request._meta["retry_count"] = count
+        request.meta["retry_count"] = count
 
     async def _calculate_delay(self, retry_count: int) -> float:
         """
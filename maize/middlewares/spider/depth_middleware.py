@@ -67,9 +67,7 @@ class DepthMiddleware(SpiderMiddleware):
         :param request: 请求实例
         :return: 深度值
         """
-        if not request.meta:
-            return 0
-        return request.meta.get("depth", 0)
+        return request.get_meta("depth", 0)
 
     def _set_depth(self, request: "Request", depth: int):
         """
@@ -78,9 +76,7 @@ class DepthMiddleware(SpiderMiddleware):
         :param request: 请求实例
         :param depth: 深度值
         """
-        if not request.meta:
-            request._meta = {}
-        request._meta["depth"] = depth
+        request.meta["depth"] = depth
 
     async def process_start_requests(self, start_requests: AsyncGenerator, spider: "Spider") -> AsyncGenerator:
         """
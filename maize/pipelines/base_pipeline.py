@@ -1,11 +1,24 @@
 from abc import ABCMeta, abstractmethod
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Union
 
 if TYPE_CHECKING:
     from maize import Item
     from maize.settings import SpiderSettings
 
 
+def get_failed_items(result: Union[bool, list["Item"]], items: list["Item"]) -> list["Item"]:
+    """
+    根据 process_item 的返回值获取处理失败的 item
+
+    :param result: process_item 的返回值
+    :param items: 传入 process_item 的 item 列表
+    :return: 处理失败的 item 列表
+    """
+    if isinstance(result, list):
+        return result
+    return [] if result else items
+
+
 class BasePipeline(metaclass=ABCMeta):
     def __init__(self, settings: "SpiderSettings"):
         self.settings = settings
@@ -25,12 +38,12 @@ class BasePipeline(metaclass=ABCMeta):
         """
 
     @abstractmethod
-    async def process_item(self, items: list["Item"]) -> bool:
+    async def process_item(self, items: list["Item"]) -> Union[bool, list["Item"]]:
         """
         处理数据，需要处理数据的方法请在此实现。
         为了提高效率，请使用异步方法。
         :param items:
-        @return:
+        @return: True 表示全部成功，False 表示全部失败；部分失败时返回失败的 item 列表，只重试这些 item
         """
 
     @abstractmethod
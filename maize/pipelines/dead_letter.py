@@ -0,0 +1,262 @@
+import asyncio
+import gzip
+import json
+import os
+import time
+import zlib
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, ClassVar
+
+from maize.common.model.pipeline_model import PipelineProcessResult
+from maize.pipelines.base_pipeline import get_failed_items
+from maize.utils.log_util import get_logger
+from maize.utils.project_util import load_class
+
+if TYPE_CHECKING:
+    from maize import BasePipeline, Item
+    from maize.settings import SpiderSettings
+
+
+class DeadLetterSpool:
+    """
+    死信存储
+
+    入库失败且无法继续在内存中重试的 item 追加写入本地目录下 gzip 压缩的 JSONL 分段文件，每行一个 item：
+    {"item": "模块.Item 类名", "pipeline": "模块.管道类名" 或 null, "data": {...}}。
+    pipeline 为 null 时表示重放到所有管道，否则只重放到指定管道（fan-out 模式下按管道记录）。
+
+    正在写入的分段以 .part 结尾，超过 segment_max_bytes 或关闭时重命名为正式分段，重放只读取正式分段。
+    进程崩溃遗留的 .part 分段在打开新分段或重放时恢复为正式分段，末尾不完整的 gzip 数据和半行被丢弃。
+    同一目录不要同时被多个进程写入，否则其它进程正在写入的分段会被当作遗留分段恢复。
+    所有文件操作都放到线程中执行，不阻塞事件循环。
+    """
+
+    SEGMENT_SUFFIX = ".jsonl.gz"
+    PART_SUFFIX = ".part"
+    # 本进程中正在写入的分段，恢复遗留分段时跳过
+    _open_parts: ClassVar[set[Path]] = set()
+
+    def __init__(self, path: str, segment_max_bytes: int = 64 * 1024 * 1024):
+        """
+        :param path: 死信目录
+        :param segment_max_bytes: 单个分段压缩前的最大字节数
+        """
+        self.path = Path(path)
+        self.segment_max_bytes = segment_max_bytes
+
+        self._file: gzip.GzipFile | None = None
+        self._file_path: Path | None = None
+        self._segment_bytes: int = 0
+        self._lock = asyncio.Lock()
+        # 本次运行写入的 item 数
+        self.write_count: int = 0
+
+    @staticmethod
+    def _get_class_path(obj: object) -> str:
+        cls = obj if isinstance(obj, type) else obj.__class__
+        return f"{cls.__module__}.{cls.__name__}"
+
+    def segments(self) -> list[Path]:
+        """
+        已完成写入的分段，按写入时间排序
+
+        :return: 分段文件路径列表
+        """
+        if not self.path.exists():
+            return []
+        return sorted(self.path.glob(f"*{self.SEGMENT_SUFFIX}"))
+
+    def recover(self) -> list[Path]:
+        """
+        把遗留的 .part 分段恢复为正式分段
+
+        逐块解压遗留分段，只保留完整的行写入新的分段，崩溃时未写完的 gzip 数据和半行被丢弃
+
+        :return: 恢复的分段文件路径列表
+        """
+        if not self.path.exists():
+            return []
+
+        segments = []
+        for part in sorted(self.path.glob(f"*{self.SEGMENT_SUFFIX}{self.PART_SUFFIX}")):
+            if part in self._open_parts:
+                continue
+            segment = part.with_name(part.name.removesuffix(self.PART_SUFFIX))
+            tmp = part.with_name(f"{part.name}.tmp")
+            with gzip.open(tmp, "wb") as f:
+                line_count = self._copy_lines(part, f)
+            if line_count:
+                tmp.replace(segment)
+                segments.append(segment)
+            else:
+                tmp.unlink()
+            part.unlink()
+        return segments
+
+    @staticmethod
+    def _copy_lines(part: Path, f: gzip.GzipFile) -> int:
+        line_count = 0
+        tail = b""
+        # 16 + MAX_WBITS 解压 gzip 格式，多个 gzip 成员依次解压
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        corrupted = False
+        with open(part, "rb") as src:
+            while not corrupted and (chunk := src.read(1024 * 1024)):
+                data = tail
+                try:
+                    while chunk:
+                        data += decompressor.decompress(chunk)
+                        chunk = b""
+                        if decompressor.eof:
+                            chunk = decompressor.unused_data
+                            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                except zlib.error:
+                    # 损坏的数据之后无法继续解压，保留已经解压出的完整行
+                    corrupted = True
+
+                end = data.rfind(b"\n") + 1
+                f.write(data[:end])
+                line_count += data.count(b"\n", 0, end)
+                tail = data[end:]
+        return line_count
+
+    async def write(self, items: list["Item"], pipeline: "BasePipeline | str | None" = None):
+        """
+        追加写入一批 item
+
+        :param items: item 列表
+        :param pipeline: 入库失败的管道或管道类路径，为 None 时表示重放到所有管道
+        :return:
+        """
+        if not items:
+            return
+
+        if pipeline is not None and not isinstance(pipeline, str):
+            pipeline = self._get_class_path(pipeline)
+        pipeline_path = json.dumps(pipeline)
+        lines = "".join(
+            f'{{"item": {json.dumps(self._get_class_path(item))}, "pipeline": {pipeline_path}, '
+            f'"data": {item.model_dump_json()}}}\n'
+            for item in items
+        ).encode()
+        async with self._lock:
+            await asyncio.to_thread(self._write, lines)
+        self.write_count += len(items)
+
+    def _write(self, data: bytes):
+        if self._file is None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self.recover()
+            self._file_path = self.path / f"{time.time_ns()}-{os.getpid()}{self.SEGMENT_SUFFIX}{self.PART_SUFFIX}"
+            self._open_parts.add(self._file_path)
+            # 分段跨多次写入保持打开，在 _finish_segment 中关闭
+            self._file = gzip.open(self._file_path, "ab")  # noqa: SIM115
+            self._segment_bytes = 0
+
+        self._file.write(data)
+        self._file.flush()
+        self._segment_bytes += len(data)
+        if self._segment_bytes >= self.segment_max_bytes:
+            self._finish_segment()
+
+    def _finish_segment(self):
+        if self._file is None or self._file_path is None:
+            return
+        self._file.close()
+        self._file_path.rename(self._file_path.with_name(self._file_path.name.removesuffix(self.PART_SUFFIX)))
+        self._open_parts.discard(self._file_path)
+        self._file = None
+        self._file_path = None
+
+    async def close(self):
+        async with self._lock:
+            await asyncio.to_thread(self._finish_segment)
+
+    def _read_batches(self, segment: Path, batch_size: int) -> Iterator[list[tuple[str | None, "Item"]]]:
+        item_classes: dict[str, type[Item]] = {}
+        batch = []
+        with gzip.open(segment, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                item_path = record["item"]
+                item_cls = item_classes.get(item_path)
+                if item_cls is None:
+                    item_cls = item_classes[item_path] = load_class(item_path)
+                batch.append((record["pipeline"], item_cls.model_validate(record["data"])))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    async def replay(self, pipelines: list["BasePipeline"], batch_size: int = 5000) -> PipelineProcessResult:
+        """
+        把死信重新写入数据管道
+
+        逐个分段读取，按 batch_size 分批调用管道的 process_item；分段处理完后删除，
+        写入失败的批次重新追加到新的分段，可在下次重放时继续处理
+        :param pipelines: 已 open 的数据管道
+        :param batch_size: 每批写入的最大 item 数
+        :return: 处理结果
+        """
+        process_result = PipelineProcessResult()
+        pipeline_map = {self._get_class_path(pipeline): pipeline for pipeline in pipelines}
+        async with self._lock:
+            await asyncio.to_thread(self.recover)
+
+        for segment in self.segments():
+            batches = self._read_batches(segment, batch_size)
+            while batch := await asyncio.to_thread(next, batches, None):
+                groups: dict[str | None, list[Item]] = {}
+                for pipeline_path, item in batch:
+                    groups.setdefault(pipeline_path, []).append(item)
+
+                for pipeline_path, items in groups.items():
+                    if pipeline_path is None:
+                        targets = pipelines
+                    elif pipeline_path in pipeline_map:
+                        targets = [pipeline_map[pipeline_path]]
+                    else:
+                        # 管道不在本次重放的管道中，原样保留
+                        await self.write(items, pipeline_path)
+                        continue
+
+                    for pipeline in targets:
+                        failed_items = get_failed_items(await pipeline.process_item(items), items)
+                        process_result.success_count += len(items) - len(failed_items)
+                        if failed_items:
+                            process_result.fail_count += len(failed_items)
+                            await self.write(failed_items, pipeline)
+            await asyncio.to_thread(segment.unlink)
+
+        await self.close()
+        return process_result
+
+
+async def replay_dead_letters(path: str, settings: "SpiderSettings", batch_size: int = 5000) -> PipelineProcessResult:
+    """
+    把死信目录中的 item 重新写入配置的数据管道
+
+    :param path: 死信目录
+    :param settings: 爬虫配置，使用其中的 pipeline.pipelines
+    :param batch_size: 每批写入的最大 item 数
+    :return: 处理结果
+    """
+    logger = get_logger(settings, "DeadLetterSpool")
+    pipelines = []
+    for pipeline_path in settings.pipeline.pipelines:
+        pipeline = load_class(pipeline_path)(settings)
+        await pipeline.open()
+        pipelines.append(pipeline)
+
+    spool = DeadLetterSpool(path, settings.pipeline.dead_letter_segment_max_bytes)
+    try:
+        process_result = await spool.replay(pipelines, batch_size)
+    finally:
+        for pipeline in pipelines:
+            await pipeline.close()
+    logger.info(f"死信重放完成，成功: {process_result.success_count}，失败: {process_result.fail_count}")
+    return process_result
@@ -1,5 +1,8 @@
-from typing import TYPE_CHECKING
+import asyncio
+import time
+from typing import TYPE_CHECKING, Union
 
+from maize.common.constant.setting_constant import MysqlInsertModeEnum
 from maize.pipelines.base_pipeline import BasePipeline
 from maize.utils.log_util import get_logger
 from maize.utils.mysql_util import MysqlSingletonUtil
@@ -14,6 +17,10 @@ class MysqlPipeline(BasePipeline):
         super().__init__(settings=settings)
         self.mysql: MysqlSingletonUtil | None = None
         self.logger = get_logger(settings, self.__class__.__name__)
+        # 按 Item 类缓存的字段列表和 insert 语句：(字段列表, executemany 语句, 多行 VALUES 语句前缀, 语句后缀)
+        self._insert_sql_cache: dict[type[Item], tuple[tuple[str, ...], str, str, str]] = {}
+        # 按表统计的写入行数和耗时：{表名: [行数, 耗时]}
+        self._write_stats: dict[str, list] = {}
 
     async def open(self):
         host = self.settings.mysql.host
@@ -29,36 +36,98 @@ class MysqlPipeline(BasePipeline):
         await self.mysql.open()
 
     async def close(self):
+        for table_name, (rows, elapsed) in self._write_stats.items():
+            self.logger.info(f"{table_name} total rows: {rows}, {self._rows_per_second(rows, elapsed):.0f} rows/s")
         await self.mysql.close()
 
-    async def process_item(self, items: list["Item"]) -> bool:
+    async def process_item(self, items: list["Item"]) -> Union[bool, list["Item"]]:
         """
         批量处理 item
         :param items:
-        @return: 成功 True，否则 False
+        @return: 成功 True，全部失败 False；部分 Item 类写入失败时返回这些类的 item，已写入的不会被重试
         """
         if not items:
             return True
 
         try:
-            await self._process_items(items)
-            return True
+            failed_items = await self._process_items(items)
         except Exception as e:
             self.logger.error(f"Error processing item: {e}. items: {items}")
             return False
+        return failed_items or True
+
+    async def _process_items(self, items: list["Item"]) -> list["Item"]:
+        """
+        按 Item 类分组，各组并发写入（每组占用连接池中的一个连接）
 
-    async def _process_items(self, items: list["Item"]):
-        first_item = items[0]
-        item_key = first_item.model_dump().keys()
-        item_data_list = []
+        :param items: item 列表，可以包含多个 Item 类
+        :return: 写入失败的 item 列表
+        """
+        groups: dict[type[Item], list[Item]] = {}
         for item in items:
-            item_data_list.append([getattr(item, key) for key in item_key])
+            groups.setdefault(type(item), []).append(item)
+
+        results = await asyncio.gather(
+            *(self._insert_items(item_cls, group) for item_cls, group in groups.items()), return_exceptions=True
+        )
+        failed_items: list[Item] = []
+        for (item_cls, group), result in zip(groups.items(), results, strict=True):
+            if isinstance(result, BaseException):
+                self.logger.error(f"Error processing {item_cls.__name__} items: {result}. items: {group}")
+                failed_items.extend(group)
+        return failed_items
+
+    def _get_insert_sql(self, item_cls: type["Item"]) -> tuple[tuple[str, ...], str, str, str]:
+        """
+        获取 Item 类对应的字段列表和 insert 语句
+
+        写入模式由 Item 类的 __insert_mode__ 指定，upsert 模式更新 __update_fields__ 中的字段（为空时更新全部字段）
+        :param item_cls: Item 类
+        :return: (字段列表, executemany 语句, 多行 VALUES 语句前缀, 语句后缀)
+        """
+        cached = self._insert_sql_cache.get(item_cls)
+        if cached is None:
+            item_keys = tuple(item_cls.model_fields)
+            item_key_str = ",".join(item_keys)
+            placeholder = ",".join(["%s"] * len(item_keys))
+
+            insert_mode = MysqlInsertModeEnum(item_cls.__insert_mode__)
+            insert = "insert ignore into" if insert_mode == MysqlInsertModeEnum.IGNORE else "insert into"
+            prefix = f"{insert} {item_cls.__table_name__} ({item_key_str}) values "
+            postfix = ""
+            if insert_mode == MysqlInsertModeEnum.UPSERT:
+                update_fields = item_cls.__update_fields__ or item_keys
+                postfix = " on duplicate key update " + ",".join(f"{key}=values({key})" for key in update_fields)
+
+            sql = f"{prefix}({placeholder}){postfix}"
+            cached = self._insert_sql_cache[item_cls] = (item_keys, sql, prefix, postfix)
+        return cached
+
+    async def _insert_items(self, item_cls: type["Item"], items: list["Item"]):
+        item_keys, sql, prefix, postfix = self._get_insert_sql(item_cls)
+        item_data_list = [[getattr(item, key) for key in item_keys] for item in items]
+
+        start_time = time.perf_counter()
+        if self.settings.mysql.bulk_insert:
+            row = await self.mysql.bulk_insert(
+                prefix, item_data_list, postfix, self.settings.mysql.bulk_max_statement_bytes
+            )
+        else:
+            row = await self.mysql.executemany(sql, item_data_list)
+        elapsed = time.perf_counter() - start_time
+
+        table_name = item_cls.__table_name__
+        stats = self._write_stats.setdefault(table_name, [0, 0.0])
+        stats[0] += len(items)
+        stats[1] += elapsed
+        self.logger.info(
+            f"process item row: {table_name} {row}, "
+            f"{len(items)} items in {elapsed:.3f}s, {self._rows_per_second(len(items), elapsed):.0f} rows/s"
+        )
 
-        item_key_str = ",".join(item_key)
-        placeholder = ",".join(["%s"] * len(item_key))
-        sql = f"insert into {first_item.__table_name__} ({item_key_str}) values ({placeholder})"
-        row = await self.mysql.executemany(sql, item_data_list)
-        self.logger.info(f"process item row: {row}")
+    @staticmethod
+    def _rows_per_second(rows: int, elapsed: float) -> float:
+        return rows / elapsed if elapsed > 0 else 0.0
 
     async def process_error_item(self, items: list["Item"]):
         pass
@@ -1,8 +1,14 @@
+import asyncio
 import time
-from asyncio import Queue
+from asyncio import Queue, Task
+from collections import deque
+from collections.abc import Awaitable, Callable
 from typing import TYPE_CHECKING
 
 from maize.common.model.pipeline_model import PipelineProcessResult
+from maize.pipelines.base_pipeline import get_failed_items
+from maize.pipelines.dead_letter import DeadLetterSpool
+from maize.pipelines.pipeline_worker import PipelineWorker
 from maize.utils.log_util import get_logger
 from maize.utils.project_util import load_class
 
@@ -16,10 +22,23 @@ class PipelineScheduler:
     管道数据调度
     """
 
-    def __init__(self, settings: "SpiderSettings"):
+    def __init__(
+        self,
+        settings: "SpiderSettings",
+        result_callback: Callable[[PipelineProcessResult], Awaitable[None]] | None = None,
+        items_done_callback: Callable[[list["Item"]], None] | None = None,
+    ):
+        """
+        :param settings: 爬虫配置
+        :param result_callback: 后台定时入库的结果回调，用于记录统计
+        :param items_done_callback: item 处理完毕（全部管道入库成功、写入死信或交给 process_error_item）时的回调，
+            fan-out 模式下所有管道的消费者都处理完毕（包括重试）后才回调
+        """
         self.settings = settings
         self.logger = get_logger(settings, self.__class__.__name__)
         self.item_pipelines: list[BasePipeline] = []
+        self.result_callback = result_callback
+        self.items_done_callback = items_done_callback
 
         # item
         pipeline_settings = settings.pipeline
@@ -30,6 +49,13 @@ class PipelineScheduler:
         self.item_queue = Queue(maxsize=item_max_cache_count)
         self._last_handle_item_time = 0
 
+        # 按字节数限制缓存和每批大小，item 大小按 JSON 序列化后的长度估算
+        self.item_max_cache_bytes = pipeline_settings.max_cache_bytes
+        self.item_handle_batch_max_bytes = pipeline_settings.handle_batch_max_bytes
+        self._track_item_bytes = bool(self.item_max_cache_bytes or self.item_handle_batch_max_bytes)
+        self._item_sizes: deque[int] = deque()
+        self._item_queue_bytes: int = 0
+
         # error item
         self.error_item_max_retry_count = pipeline_settings.error_max_retry_count
         error_item_max_cache_count = pipeline_settings.error_max_cache_count
@@ -42,9 +68,33 @@ class PipelineScheduler:
         # retry item
         self.retry_item_queue = Queue(maxsize=error_item_max_cache_count)
 
+        # 死信存储：启用后异常队列已满时不再等待，item 直接写入磁盘
+        self.dead_letter: DeadLetterSpool | None = None
+        if pipeline_settings.dead_letter_path:
+            self.dead_letter = DeadLetterSpool(
+                pipeline_settings.dead_letter_path, pipeline_settings.dead_letter_segment_max_bytes
+            )
+
+        # fan-out 模式：每个管道一个独立的消费者
+        self.fanout = pipeline_settings.fanout
+        self.pipeline_workers: list[PipelineWorker] = []
+        # fan-out 模式下已分发、尚有管道未处理完毕的 item：id(item) -> (item, 剩余的管道数)
+        self._fanout_pending: dict[int, tuple[Item, int]] = {}
+
+        # 后台定时入库
+        self._handle_lock = asyncio.Lock()
+        self._flush_task: Task | None = None
+        self._flush_stop: asyncio.Event = asyncio.Event()
+        self._flush_tick: float = max(min(self.item_handle_interval, self.error_item_handle_interval), 1)
+
     def __len__(self):
         return self.item_queue.qsize()
 
+    @property
+    def item_queue_bytes(self) -> int:
+        """内存队列中 item 的估算字节数，未配置字节数限制时为 0"""
+        return self._item_queue_bytes
+
     async def open(self):
         pipeline_path_list = self.settings.pipeline.pipelines
         for pipeline_path in pipeline_path_list:
@@ -53,8 +103,83 @@ class PipelineScheduler:
             await pipeline_instance.open()
             self.item_pipelines.append(pipeline_instance)
 
+        if self.fanout:
+            for pipeline in self.item_pipelines:
+                worker = PipelineWorker(
+                    pipeline, self.settings.pipeline, self.logger, self.dead_letter, self._fanout_items_done
+                )
+                worker.start()
+                self.pipeline_workers.append(worker)
+
+        self._flush_stop.clear()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        """
+        后台定时入库：即使没有新的 item 到达，缓存的 item、待重试 item 和超过重试次数的 item 也会按间隔处理
+        :return:
+        """
+        while not self._flush_stop.is_set():
+            try:
+                await asyncio.wait_for(self._flush_stop.wait(), self._flush_tick)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                break
+
+            try:
+                process_result = await self.flush()
+                if self.result_callback and (process_result.success_count or process_result.fail_count):
+                    await self.result_callback(process_result)
+            except Exception as e:
+                self.logger.error(f"Error during pipeline flush: {e}")
+
+    async def flush(self, force: bool = False) -> PipelineProcessResult:
+        """
+        处理到期的缓存 item、待重试 item 和超过重试次数的 item
+
+        :param force: 是否忽略处理间隔，立即处理
+        :return: 处理结果
+        """
+        process_result = PipelineProcessResult()
+        async with self._handle_lock:
+            current_time = int(time.time())
+            if not self.item_queue.empty() and (
+                force or (current_time - self.item_handle_interval) >= self._last_handle_item_time
+            ):
+                self._last_handle_item_time = current_time
+                while not self.item_queue.empty():
+                    process_result.add(await self._handle_items())
+
+            if self.pipeline_workers:
+                for worker in self.pipeline_workers:
+                    worker.tick()
+                process_result.add(self._collect_fanout_result())
+                return process_result
+
+            if force or (current_time - self.error_item_handle_interval) >= self._error_last_handle_item_time:
+                self._error_last_handle_item_time = current_time
+                # 本轮只重试已在队列中的 item，再次失败的 item 留到下一轮
+                retry_batch_count = -(-self.retry_item_queue.qsize() // self.error_item_retry_batch_max_size)
+                for _ in range(retry_batch_count):
+                    _, retry_result = await self._retry_error_items()
+                    process_result.add(retry_result)
+                await self.process_error_items()
+        return process_result
+
+    async def _stop_flush_task(self):
+        if self._flush_task is None:
+            return
+        self._flush_stop.set()
+        await self._flush_task
+        self._flush_task = None
+
     async def close(self) -> PipelineProcessResult:
         self.logger.debug("pipeline scheduler closing")
+        await self._stop_flush_task()
+        if self.pipeline_workers:
+            return await self._close_fanout()
+
         close_process_result = PipelineProcessResult()
         while not self.item_queue.empty():
             process_item = await self._process_item()
@@ -78,50 +203,170 @@ class PipelineScheduler:
 
         self.logger.debug("process retry all items finished")
 
+        await self._close_pipelines()
+        return close_process_result
+
+    async def _close_fanout(self) -> PipelineProcessResult:
+        close_process_result = PipelineProcessResult()
+        while not self.item_queue.empty():
+            await self._dispatch_items()
+
+        for worker in self.pipeline_workers:
+            close_process_result.add(await worker.close())
+        self.pipeline_workers = []
+        self.logger.debug("process all items finished")
+
+        await self._close_pipelines()
+        return close_process_result
+
+    async def _close_pipelines(self):
+        if self.dead_letter is not None:
+            await self.dead_letter.close()
+            if self.dead_letter.write_count:
+                self.logger.warning(
+                    f"{self.dead_letter.write_count} 个入库失败的 item 已写入死信目录: {self.dead_letter.path}"
+                )
+
         for pipeline in self.item_pipelines:
             await pipeline.close()
         self.logger.debug("pipeline scheduler closed")
-        return close_process_result
 
     async def process(self, item: "Item") -> PipelineProcessResult:
         pipeline_process_result = PipelineProcessResult()
-        await self.item_queue.put(item)
+        await self._put_item(item)
         current_time = int(time.time())
-        if ((current_time - self.item_handle_interval) > self._last_handle_item_time) or self.item_queue.full():
-            self._last_handle_item_time = current_time
-            process_result = await self._process_item()
-            retry_process_result = await self.process_retry_items()
-            pipeline_process_result.add(process_result)
-            pipeline_process_result.add(retry_process_result)
+        if (
+            ((current_time - self.item_handle_interval) > self._last_handle_item_time)
+            or self.item_queue.full()
+            or (self.item_max_cache_bytes and self._item_queue_bytes >= self.item_max_cache_bytes)
+        ):
+            async with self._handle_lock:
+                self._last_handle_item_time = current_time
+                if self.pipeline_workers:
+                    await self._dispatch_items()
+                    return self._collect_fanout_result()
+
+                process_result = await self._process_item()
+                retry_process_result = await self.process_retry_items()
+                pipeline_process_result.add(process_result)
+                pipeline_process_result.add(retry_process_result)
         return pipeline_process_result
 
-    async def _process_item(self) -> PipelineProcessResult:
+    async def _put_item(self, item: "Item"):
+        await self.item_queue.put(item)
+        if self._track_item_bytes:
+            item_size = len(item.model_dump_json())
+            self._item_sizes.append(item_size)
+            self._item_queue_bytes += item_size
+
+    async def _handle_items(self) -> PipelineProcessResult:
+        """处理一批缓存的 item，fan-out 模式下分发给各管道的消费者"""
+        if self.pipeline_workers:
+            await self._dispatch_items()
+            return PipelineProcessResult()
+        return await self._process_item()
+
+    def _take_batch_items(self) -> list["Item"]:
         """
-        处理 item
+        取出一批 item，数量不超过 handle_batch_max_size，字节数不超过 handle_batch_max_bytes（至少取一个）
 
-        :return: 处理结果
+        :return: item 列表
         """
-        process_result = PipelineProcessResult()
-        batch_items = []
+        batch_items: list[Item] = []
+        batch_bytes = 0
         for _ in range(self.item_handle_batch_max_size):
             if self.item_queue.empty():
                 break
 
-            batch_items.append(await self.item_queue.get())
+            if self._track_item_bytes:
+                item_size = self._item_sizes[0] if self._item_sizes else 0
+                if (
+                    batch_items
+                    and self.item_handle_batch_max_bytes
+                    and batch_bytes + item_size > self.item_handle_batch_max_bytes
+                ):
+                    break
+                if self._item_sizes:
+                    self._item_sizes.popleft()
+                batch_bytes += item_size
+                self._item_queue_bytes -= item_size
+
+            batch_items.append(self.item_queue.get_nowait())
+        return batch_items
+
+    async def _dispatch_items(self):
+        """
+        fan-out 模式：取出一批 item，分发给所有管道的消费者并发处理
+
+        :return:
+        """
+        batch_items = self._take_batch_items()
+        if not batch_items:
+            return
+
+        for item in batch_items:
+            _, remaining = self._fanout_pending.get(id(item), (item, 0))
+            self._fanout_pending[id(item)] = (item, remaining + len(self.pipeline_workers))
+        for worker in self.pipeline_workers:
+            await worker.put(list(batch_items))
+
+    def _fanout_items_done(self, items: list["Item"]):
+        """fan-out 模式：某个管道处理完毕的 item，所有管道都处理完毕后才视为完成"""
+        done_items = []
+        for item in items:
+            entry = self._fanout_pending.get(id(item))
+            if entry is None:
+                continue
+            if entry[1] > 1:
+                self._fanout_pending[id(item)] = (item, entry[1] - 1)
+            else:
+                del self._fanout_pending[id(item)]
+                done_items.append(item)
+        self._items_done(done_items)
+
+    def _items_done(self, items: list["Item"]):
+        if self.items_done_callback and items:
+            self.items_done_callback(items)
+
+    def _collect_fanout_result(self) -> PipelineProcessResult:
+        process_result = PipelineProcessResult()
+        for worker in self.pipeline_workers:
+            process_result.add(worker.pop_result())
+        return process_result
+
+    async def _process_item(self) -> PipelineProcessResult:
+        """
+        处理 item
 
+        :return: 处理结果
+        """
+        process_result = PipelineProcessResult()
+        batch_items = self._take_batch_items()
         if not batch_items:
             self.logger.debug("no more items to process")
             return process_result
 
-        batch_items_len = len(batch_items)
+        await self._process_batch(batch_items, process_result)
+        return process_result
+
+    async def _process_batch(self, batch_items: list["Item"], process_result: PipelineProcessResult):
+        """
+        依次交给每个管道处理，只重试处理失败的 item，所有管道都处理成功的 item 视为完成
+
+        :param batch_items: item 列表
+        :param process_result: 处理结果
+        :return:
+        """
+        failed_ids: set[int] = set()
         for pipeline in self.item_pipelines:
             process_item_result = await pipeline.process_item(batch_items)
-            if not process_item_result:
-                process_result.fail_count += batch_items_len
-                await self._enqueue_retry_items(batch_items)
-            else:
-                process_result.success_count += batch_items_len
-        return process_result
+            failed_items = get_failed_items(process_item_result, batch_items)
+            process_result.fail_count += len(failed_items)
+            process_result.success_count += len(batch_items) - len(failed_items)
+            if failed_items:
+                failed_ids.update(id(item) for item in failed_items)
+                await self._enqueue_retry_items(failed_items)
+        self._items_done([item for item in batch_items if id(item) not in failed_ids])
 
     async def process_error_items(self):
         self.logger.info(f"需要处理的错误任务个数: {self.error_item_queue.qsize()}")
@@ -151,6 +396,9 @@ class PipelineScheduler:
 
         for pipeline in self.item_pipelines:
             await pipeline.process_error_item(batch_items)
+        if self.dead_letter is not None:
+            await self.dead_letter.write(batch_items)
+        self._items_done(batch_items)
 
     async def process_retry_items(self) -> PipelineProcessResult:
         """
@@ -193,34 +441,41 @@ class PipelineScheduler:
             self.logger.debug("no more error items to retry")
             return False, process_result
 
-        for pipeline in self.item_pipelines:
-            # 调用正常处理方法重试
-            process_item_result = await pipeline.process_item(batch_items)
-            if not process_item_result:
-                process_result.fail_count += len(batch_items)
-                await self._enqueue_retry_items(batch_items)
-            else:
-                process_result.success_count += len(batch_items)
+        # 调用正常处理方法重试
+        await self._process_batch(batch_items, process_result)
         return True, process_result
 
     async def _enqueue_retry_items(self, items: list["Item"]):
         """
         入队需要重试的 item
 
+        启用死信存储时，队列已满的 item 直接写入死信，不等待队列空出
         :param items:
         :return:
         """
+        dead_letter = self.dead_letter
+        dead_letter_items: list[Item] = []
         for item in items:
             if item.__retry_count__ >= self.error_item_max_retry_count:
                 self.logger.warning(
                     f"超过重试次数({item.__retry_count__}/{self.error_item_max_retry_count}) item: {item}"
                 )
-                await self.error_item_queue.put(item)
+                queue = self.error_item_queue
             else:
-                await self.retry_item_queue.put(item)
+                queue = self.retry_item_queue
+
+            if dead_letter is not None and queue.full():
+                dead_letter_items.append(item)
+            else:
+                await queue.put(item)
+
+        if dead_letter is not None and dead_letter_items:
+            self.logger.warning(f"异常队列已满，{len(dead_letter_items)} 个 item 写入死信")
+            await dead_letter.write(dead_letter_items)
+            self._items_done(dead_letter_items)
 
     def idle(self):
-        return len(self) == 0
+        return len(self) == 0 and all(worker.idle() for worker in self.pipeline_workers)
 
     def error_task_idle(self):
         return self.error_item_queue.qsize() == 0
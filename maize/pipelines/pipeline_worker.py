@@ -0,0 +1,189 @@
+import asyncio
+import time
+from asyncio import Queue, Task
+from collections import deque
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from maize.common.model.pipeline_model import PipelineProcessResult
+from maize.pipelines.base_pipeline import get_failed_items
+
+if TYPE_CHECKING:
+    from logging import Logger
+
+    from maize import BasePipeline, Item
+    from maize.pipelines.dead_letter import DeadLetterSpool
+    from maize.settings.spider_settings import PipelineSettings
+
+
+class PipelineWorker:
+    """
+    单个数据管道的独立消费者（fan-out 模式）
+
+    每个管道拥有自己的有界批次队列、重试队列和异常 item 列表：
+    某个管道入库失败时只在该管道内重试，不会把 item 重复发送给已经成功的管道。
+    重试次数按管道分别统计，不修改 item 自身的 __retry_count__。
+    """
+
+    def __init__(
+        self,
+        pipeline: "BasePipeline",
+        settings: "PipelineSettings",
+        logger: "Logger",
+        dead_letter: "DeadLetterSpool | None" = None,
+        items_done_callback: Callable[[list["Item"]], None] | None = None,
+    ):
+        """
+        :param pipeline: 数据管道
+        :param settings: 数据管道配置
+        :param logger: 日志
+        :param dead_letter: 死信存储，超过重试次数的 item 按管道写入
+        :param items_done_callback: item 在当前管道处理完毕（入库成功、重试后写入死信或交给 process_error_item）时的回调
+        """
+        self.pipeline = pipeline
+        self.logger = logger
+        self.dead_letter = dead_letter
+        self.items_done_callback = items_done_callback
+        self.name = pipeline.__class__.__name__
+
+        self.queue: Queue[list[Item]] = Queue(maxsize=settings.fanout_queue_size)
+        self.max_retry_count = settings.error_max_retry_count
+        self.retry_batch_max_size = settings.error_retry_batch_max_size
+        self.retry_interval = settings.error_handle_interval
+        self.error_batch_max_size = settings.error_handle_batch_max_size
+
+        # 待重试的 item 及其在当前管道的已重试次数
+        self._retry_items: deque[tuple[Item, int]] = deque()
+        self._error_items: list[Item] = []
+        self._last_retry_time = 0
+
+        self._result = PipelineProcessResult()
+        self._task: Task | None = None
+        # 已提交但未处理完的批次数
+        self._pending: int = 0
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def put(self, batch_items: list["Item"]):
+        """
+        提交一批 item，队列满时等待
+
+        :param batch_items: item 列表
+        :return:
+        """
+        self._pending += 1
+        await self.queue.put(batch_items)
+
+    def tick(self):
+        """
+        提交一个空批次，没有新批次到达时也按间隔重试和处理超过重试次数的 item；队列已满时跳过
+
+        :return:
+        """
+        if (not self._retry_items and not self._error_items) or self.queue.full():
+            return
+        self._pending += 1
+        self.queue.put_nowait([])
+
+    def pop_result(self) -> PipelineProcessResult:
+        """
+        取出并清空当前累计的处理结果
+
+        :return: 处理结果
+        """
+        result, self._result = self._result, PipelineProcessResult()
+        return result
+
+    def idle(self) -> bool:
+        return self._pending == 0
+
+    async def _run(self):
+        while True:
+            batch_items = await self.queue.get()
+            try:
+                if batch_items:
+                    await self._process([(item, 0) for item in batch_items])
+
+                current_time = int(time.time())
+                if (self._retry_items or self._error_items) and (
+                    current_time - self.retry_interval
+                ) > self._last_retry_time:
+                    self._last_retry_time = current_time
+                    await self._retry()
+                    await self._process_error_items()
+            except Exception as e:
+                self.logger.error(f"Error during pipeline {self.name} processing: {e}")
+            finally:
+                self._pending -= 1
+                self.queue.task_done()
+
+    async def _process(self, entries: list[tuple["Item", int]]):
+        items = [item for item, _ in entries]
+        try:
+            process_item_result = await self.pipeline.process_item(items)
+        except Exception as e:
+            self.logger.error(f"Error during pipeline {self.name} process_item: {e}")
+            process_item_result = False
+
+        # 部分失败时只重试失败的 item
+        failed_items = get_failed_items(process_item_result, items)
+        self._result.success_count += len(items) - len(failed_items)
+        failed_ids = {id(item) for item in failed_items}
+        self._items_done([item for item in items if id(item) not in failed_ids])
+        if not failed_items:
+            return
+
+        self._result.fail_count += len(failed_items)
+        for item, retry_count in entries:
+            if id(item) not in failed_ids:
+                continue
+            if retry_count >= self.max_retry_count:
+                self.logger.warning(f"{self.name} 超过重试次数({retry_count}/{self.max_retry_count}) item: {item}")
+                self._error_items.append(item)
+            else:
+                self._retry_items.append((item, retry_count))
+
+        if len(self._error_items) >= self.error_batch_max_size:
+            await self._process_error_items()
+
+    async def _retry(self):
+        """重试一批入库失败的 item"""
+        entries: list[tuple[Item, int]] = []
+        while self._retry_items and len(entries) < self.retry_batch_max_size:
+            item, retry_count = self._retry_items.popleft()
+            entries.append((item, retry_count + 1))
+        if entries:
+            self.logger.info(f"{self.name} retry error items")
+            await self._process(entries)
+
+    async def _process_error_items(self):
+        """处理超过重试次数的 item"""
+        while self._error_items:
+            batch_items = self._error_items[: self.error_batch_max_size]
+            del self._error_items[: self.error_batch_max_size]
+            await self.pipeline.process_error_item(batch_items)
+            if self.dead_letter is not None:
+                await self.dead_letter.write(batch_items, self.pipeline)
+            self._items_done(batch_items)
+
+    def _items_done(self, items: list["Item"]):
+        if self.items_done_callback and items:
+            self.items_done_callback(items)
+
+    async def close(self) -> PipelineProcessResult:
+        """
+        处理完队列中的批次和所有重试后停止
+
+        :return: 剩余的处理结果
+        """
+        await self.queue.join()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        while self._retry_items:
+            await self._retry()
+        await self._process_error_items()
+        return self.pop_result()
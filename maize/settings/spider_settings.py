@@ -11,6 +11,9 @@ from pydantic_settings import (
 )
 
 from maize.common.constant.setting_constant import (
+    CallbackExecutionModeEnum,
+    DnsResolverEnum,
+    DupeFilterEnum,
     LogLevelEnum,
     PipelineEnum,
     RPADriverTypeEnum,
@@ -27,8 +30,32 @@ class RequestSettings(BaseModel):
     verify_ssl: bool = Field(default=True, description="是否验证 SSL 证书")
     request_timeout: int = Field(default=60, description="请求超时时间，单位：秒")
     random_wait_time: tuple[int, int] = Field(default=(0, 0), description="随机等待时间，单位：秒")
-    use_session: bool = Field(default=True, description="是否使用 session（HTTPXDownloader 不支持）")
+    use_session: bool = Field(
+        default=True, description="是否复用 session 及其中的连接，请求的代理配置不同时使用不同的 session"
+    )
     max_retry_count: int = Field(default=0, description="请求最大重试次数")
+    max_connections: int = Field(default=100, description="每个 session 的最大连接数")
+    max_keepalive_connections: int = Field(
+        default=20, description="每个 session 保持的最大空闲连接数（HTTPXDownloader）"
+    )
+    keepalive_expiry: float = Field(default=5.0, description="空闲连接的保持时间，单位：秒")
+    limit_per_host: int = Field(
+        default=0, description="每个 session 中每个 host 的最大连接数，0 表示不限制（AioHttpDownloader）"
+    )
+    dns_cache_ttl: int | None = Field(
+        default=10, description="DNS 缓存时间，单位：秒，None 表示永久缓存，0 表示不缓存（AioHttpDownloader）"
+    )
+    happy_eyeballs_delay: float | None = Field(
+        default=0.25, description="Happy Eyeballs 连接各个地址的间隔，单位：秒，None 表示依次连接（AioHttpDownloader）"
+    )
+    dns_resolver: str = Field(
+        default=DnsResolverEnum.THREADED.value,
+        description="DNS 解析器：threaded（线程池）、async（aiodns，需要安装 aiodns）（AioHttpDownloader）",
+    )
+    max_sessions: int = Field(
+        default=32, description="按代理配置保留的最大 session 数，超出时关闭最久未使用的空闲 session"
+    )
+    http2: bool = Field(default=False, description="是否启用 HTTP/2（HTTPXDownloader，需要安装 httpx[http2]）")
 
 
 class PipelineSettings(BaseModel):
@@ -37,10 +64,22 @@ class PipelineSettings(BaseModel):
     # 数据管道，支持多个数据管道
     pipelines: list[str] = Field(default=[PipelineEnum.EMPTY.value], description="数据管道列表")
 
+    # 爬虫产出处理配置
+    processor_queue_size: int = Field(
+        default=1000, description="爬虫产出（请求、item）缓冲队列大小，队列满时爬虫回调等待，0 表示不限制"
+    )
+    processor_concurrency: int = Field(default=1, description="处理爬虫产出的消费者数量")
+
     # Item 正常处理配置
     max_cache_count: int = Field(default=5000, description="item在内存队列中最大缓存数量")
     handle_batch_max_size: int = Field(default=1000, description="item每批入库的最大数量")
     handle_interval: int = Field(default=2, description="item入库时间间隔，单位：秒")
+    max_cache_bytes: int = Field(
+        default=0, description="item在内存队列中最大缓存字节数（按 JSON 序列化长度估算），超过后立即入库，0 表示不限制"
+    )
+    handle_batch_max_bytes: int = Field(default=0, description="item每批入库的最大字节数，0 表示不限制")
+    fanout: bool = Field(default=False, description="是否并发写入多个数据管道，每个管道独立消费、重试")
+    fanout_queue_size: int = Field(default=10, description="fan-out 模式下每个管道等待处理的最大批次数")
 
     # 异常 Item 处理配置
     error_max_retry_count: int = Field(default=5, description="入库异常的 item 最大重试次数")
@@ -50,6 +89,120 @@ class PipelineSettings(BaseModel):
         default=1000, description="入库异常的 item 超过重试次数后，每批处理的最大数量"
     )
     error_handle_interval: int = Field(default=60, description="处理入库异常的 item 时间间隔，单位：秒")
+    dead_letter_path: str = Field(
+        default="",
+        description="死信目录，为空时不启用。超过重试次数的 item 和异常队列已满时的 item 写入该目录，可通过 maize replay 重放",
+    )
+    dead_letter_segment_max_bytes: int = Field(
+        default=64 * 1024 * 1024, description="死信单个分段文件压缩前的最大字节数"
+    )
+
+
+class SchedulerSettings(BaseModel):
+    """调度器配置（Classic 引擎）"""
+
+    max_memory_requests_per_priority: int = Field(
+        default=0, description="每个优先级在内存中保留的最大请求数，超出部分溢写到磁盘，0 表示不限制、不溢写"
+    )
+    spill_batch_size: int = Field(default=1000, description="每批溢写、回填的最大请求数")
+    spill_path: str = Field(default="", description="溢写文件路径，为空时在系统临时目录创建，爬虫关闭后删除")
+    use_redis_frontier: bool = Field(
+        default=False, description="是否使用 Redis 共享请求队列，多个实例运行同一个爬虫时共同消费同一个队列"
+    )
+    prefetch_size: int = Field(default=100, description="使用 Redis 共享请求队列时，每次预取到本地的最大请求数")
+
+
+class CheckpointSettings(BaseModel):
+    """任务目录配置（Classic 引擎）"""
+
+    job_dir: str = Field(
+        default="",
+        description="任务目录，为空时不启用。排队中的请求、去重状态、待入库的 item 和统计增量写入该目录，重启后从中恢复",
+    )
+    flush_interval: float = Field(default=1.0, description="记录写入任务目录的间隔，单位：秒")
+    compact_threshold: int = Field(default=100_000, description="日志记录数超过该值时切换分段并压缩为快照")
+    fsync: bool = Field(default=False, description="每次写入后是否调用 fsync，开启后机器掉电也不会丢失已写入的记录")
+
+
+class StreamSettings(BaseModel):
+    """流式下载配置，请求的 meta 中设置 stream=True 时生效"""
+
+    directory: str = Field(default="", description="流式下载文件的保存目录，为空时使用系统临时目录")
+    chunk_size: int = Field(default=64 * 1024, description="每次读取的响应体大小，单位：字节")
+    max_body_size: int = Field(default=0, description="响应体最大大小，单位：字节，超出时中止下载，0 表示不限制")
+    hash_algorithm: str = Field(default="sha256", description="响应体摘要算法，hashlib 支持的算法名称")
+    resume: bool = Field(default=True, description="保存文件已存在时是否通过 Range 请求续传")
+
+
+class HttpCacheSettings(BaseModel):
+    """HTTP 缓存配置，启用 HttpCacheMiddleware 时生效"""
+
+    path: str = Field(default=".maize/http_cache", description="缓存目录，保存索引和压缩后的响应体")
+    expiration_secs: int = Field(default=0, description="缓存有效期，单位：秒，0 表示永不过期")
+    always_use_cache: bool = Field(default=False, description="离线模式，只要有缓存就直接使用，不判断是否过期")
+    ignore_missing: bool = Field(default=False, description="离线模式下未命中缓存的请求是否直接丢弃")
+    revalidate: bool = Field(
+        default=True, description="缓存过期后是否带上 If-None-Match / If-Modified-Since 重新验证，304 时继续使用缓存"
+    )
+    ignore_http_codes: list[int] = Field(default=[], description="不缓存的响应状态码")
+    cache_server_errors: bool = Field(
+        default=False, description="是否缓存 429 和 5xx 响应，默认不缓存，避免重试时命中缓存的错误响应"
+    )
+    fingerprint_headers: list[str] = Field(
+        default=[], description="参与计算缓存 key 的请求头名称，默认请求头不参与计算"
+    )
+    compression_level: int = Field(default=6, description="响应体 gzip 压缩级别，1-9")
+
+
+class PolitenessSettings(BaseModel):
+    """按 host 限流配置（Classic 引擎）"""
+
+    enabled: bool = Field(default=False, description="是否启用按 host 限流")
+    host_concurrency: int = Field(default=0, description="每个 host 的最大并发数，0 表示不限制")
+    host_rate: float = Field(default=0, description="每个 host 每秒最多发起的请求数，0 表示不限制")
+    host_burst: int = Field(default=1, description="每个 host 允许的突发请求数（令牌桶容量）")
+    host_delay: float = Field(default=0, description="同一 host 相邻两次请求的最小间隔，单位：秒")
+    max_deferred_requests: int = Field(default=10000, description="每个 host 因限流暂存在调度器中的最大请求数")
+
+
+class AutoThrottleSettings(BaseModel):
+    """自适应并发配置（Classic 引擎）"""
+
+    enabled: bool = Field(default=False, description="是否启用自适应并发")
+    target_latency: float = Field(default=1.0, description="目标下载延迟，单位：秒，超过后减小并发")
+    start_concurrency: int = Field(default=1, description="初始并发数")
+    min_concurrency: int = Field(default=1, description="最小并发数")
+    max_concurrency: int = Field(default=0, description="最大并发数，0 表示使用 concurrency")
+    increase_step: int = Field(default=1, description="每轮请求全部正常时增加的并发数")
+    decrease_factor: float = Field(default=0.5, description="延迟超标或需要退避时，并发数乘以该系数")
+    backoff_status: list[int] = Field(default=[429, 503], description="需要退避的响应状态码")
+    max_hosts: int = Field(default=10000, description="保留并发状态的最大 host 数，超出后回收最久未请求的 host")
+
+
+class DupeFilterSettings(BaseModel):
+    """请求去重配置（Classic 引擎）"""
+
+    enabled: bool = Field(default=False, description="是否启用请求去重")
+    dupefilter: str = Field(default=DupeFilterEnum.MEMORY.value, description="去重器")
+    bloom_capacity: int = Field(default=10_000_000, description="布隆过滤器预期容量")
+    bloom_error_rate: float = Field(default=0.001, description="布隆过滤器误判率")
+    fingerprint_headers: list[str] | None = Field(
+        default=None, description="参与请求指纹计算的请求头名称（不区分大小写），为 None 时全部请求头参与计算"
+    )
+
+
+class CallbackSettings(BaseModel):
+    """爬虫回调执行配置（Classic 引擎）"""
+
+    execution_mode: str = Field(
+        default=CallbackExecutionModeEnum.INLINE.value,
+        description="回调执行模式：inline（事件循环中）、thread（线程池）、process（进程池），"
+        "可被回调上的 @execution_mode 装饰器和 Request(meta={'execution_mode': ...}) 覆盖",
+    )
+    thread_workers: int = Field(default=0, description="线程池大小，0 表示使用 min(32, CPU 核数 + 4)")
+    process_workers: int = Field(default=0, description="进程池大小，0 表示使用 CPU 核数")
+    process_start_method: str = Field(default="spawn", description="进程池的启动方式：spawn、forkserver、fork")
+    loop_lag_interval: float = Field(default=1.0, description="事件循环延迟的采样间隔，单位：秒，0 表示不采样")
 
 
 class RPASettings(BaseModel):
@@ -110,6 +263,20 @@ class RedisSettings(BaseModel):
     key_lock: str = Field(default="lock", description="Redis lock key")
     key_running: str = Field(default="running", description="Redis running key")
     key_queue: str = Field(default="queue", description="Redis queue key")
+    key_frontier: str = Field(default="frontier", description="Redis 共享请求队列 key")
+    lock_ttl: int = Field(default=600, description="分布式模式下请求锁的过期时间，单位：秒")
+    node_id: str = Field(
+        default="",
+        description="节点 ID，启用租约时记录请求所属的节点，为空时使用主机名和进程号；重启后恢复未完成的请求需要配置固定的节点 ID",
+    )
+    lease_ttl: int = Field(
+        default=0,
+        description="处理中请求的租约时长，单位：秒，0 表示不使用租约；启用后定时续约、回收过期租约，启动时恢复本节点未完成的请求",
+    )
+    batch_window: float = Field(
+        default=0.002, description="请求入队、完成等记录命令合并到 pipeline 发送的最长等待时间，单位：秒"
+    )
+    batch_max_size: int = Field(default=500, description="每个 pipeline 最多发送的命令数")
 
     @property
     def url(self) -> str:
@@ -153,6 +320,14 @@ class MySQLSettings(BaseModel):
     db: str = Field(default="", description="MySQL 数据库名")
     user: str = Field(default="", description="MySQL 用户名")
     password: str = Field(default="", description="MySQL 密码")
+    bulk_insert: bool = Field(
+        default=False,
+        description="MysqlPipeline 是否使用多行 VALUES 批量写入，按 bulk_max_statement_bytes 拆分为多条语句",
+    )
+    bulk_max_statement_bytes: int = Field(
+        default=1024 * 1024,
+        description="批量写入时单条 SQL 的最大字节数，需小于服务端的 max_allowed_packet",
+    )
 
 
 class MiddlewareSettings(BaseModel):
@@ -204,6 +379,14 @@ class SpiderSettings(BaseSettings):
     # 子配置
     request: RequestSettings = Field(default_factory=RequestSettings, description="请求配置")
     pipeline: PipelineSettings = Field(default_factory=PipelineSettings, description="数据管道配置")
+    scheduler: SchedulerSettings = Field(default_factory=SchedulerSettings, description="调度器配置")
+    checkpoint: CheckpointSettings = Field(default_factory=CheckpointSettings, description="任务目录配置")
+    stream: StreamSettings = Field(default_factory=StreamSettings, description="流式下载配置")
+    http_cache: HttpCacheSettings = Field(default_factory=HttpCacheSettings, description="HTTP 缓存配置")
+    politeness: PolitenessSettings = Field(default_factory=PolitenessSettings, description="按 host 限流配置")
+    autothrottle: AutoThrottleSettings = Field(default_factory=AutoThrottleSettings, description="自适应并发配置")
+    dupefilter: DupeFilterSettings = Field(default_factory=DupeFilterSettings, description="请求去重配置")
+    callback: CallbackSettings = Field(default_factory=CallbackSettings, description="爬虫回调执行配置")
     rpa: RPASettings = Field(default_factory=RPASettings, description="RPA 配置")
     redis: RedisSettings = Field(default_factory=RedisSettings, description="Redis 配置")
     proxy: ProxySettings = Field(default_factory=ProxySettings, description="代理配置")
@@ -0,0 +1,194 @@
+import math
+import struct
+from pathlib import Path
+
+
+class BloomFilter:
+    """
+    布隆过滤器
+
+    位数组使用 bytearray 存储，容量和误判率确定后内存固定，不随插入数量增长。
+    元素为定长的二进制摘要（如 16 字节的请求指纹），使用双重哈希生成 k 个位置。
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        :param capacity: 预期容量，超过后误判率会升高
+        :param error_rate: 达到预期容量时的误判率
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be greater than 0")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+        self.bit_size: int = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.hash_count: int = max(1, round(self.bit_size / capacity * math.log(2)))
+        self._bits = bytearray((self.bit_size + 7) // 8)
+        self._count: int = 0
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, digest: bytes) -> bool:
+        bits = self._bits
+        return all(bits[index >> 3] & (1 << (index & 7)) for index in self._indexes(digest))
+
+    @property
+    def nbytes(self) -> int:
+        """位数组占用的字节数"""
+        return len(self._bits)
+
+    def _indexes(self, digest: bytes):
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        bit_size = self.bit_size
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % bit_size
+
+    def add(self, digest: bytes) -> bool:
+        """
+        添加摘要
+
+        :param digest: 至少 16 字节的二进制摘要
+        :return: 添加前已存在（可能误判）返回 True，否则 False
+        """
+        bits = self._bits
+        exists = True
+        for index in self._indexes(digest):
+            byte_index, mask = index >> 3, 1 << (index & 7)
+            if not bits[byte_index] & mask:
+                exists = False
+                bits[byte_index] |= mask
+
+        if not exists:
+            self._count += 1
+        return exists
+
+
+class ScalableBloomFilter:
+    """
+    可扩容的布隆过滤器
+
+    由多级 BloomFilter 组成，当前一级达到容量后新建下一级，容量按 growth 倍增长、
+    误判率按 ratio 收紧，使整体误判率不超过 error_rate。
+    支持 dump 到文件、从文件 load，重启后保留已见集合。
+    """
+
+    _MAGIC = b"MZBF"
+    _VERSION = 1
+    _HEADER = struct.Struct("<4sBQdBdI")
+    _STAGE_HEADER = struct.Struct("<QdQQ")
+
+    def __init__(
+        self,
+        initial_capacity: int = 1_000_000,
+        error_rate: float = 0.001,
+        growth: int = 2,
+        ratio: float = 0.5,
+    ):
+        """
+        :param initial_capacity: 第一级容量
+        :param error_rate: 整体误判率上限
+        :param growth: 每级容量增长倍数
+        :param ratio: 每级误判率收紧比例
+        """
+        if growth < 1:
+            raise ValueError("growth must be greater than or equal to 1")
+        if not 0 < ratio < 1:
+            raise ValueError("ratio must be between 0 and 1")
+
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.ratio = ratio
+        self._stages: list[BloomFilter] = [BloomFilter(initial_capacity, error_rate * (1 - ratio))]
+
+    def __len__(self):
+        return sum(len(stage) for stage in self._stages)
+
+    def __contains__(self, digest: bytes) -> bool:
+        return any(digest in stage for stage in reversed(self._stages))
+
+    @property
+    def nbytes(self) -> int:
+        """所有位数组占用的字节数"""
+        return sum(stage.nbytes for stage in self._stages)
+
+    @property
+    def stage_count(self) -> int:
+        return len(self._stages)
+
+    def add(self, digest: bytes) -> bool:
+        """
+        添加摘要
+
+        :param digest: 至少 16 字节的二进制摘要
+        :return: 添加前已存在（可能误判）返回 True，否则 False
+        """
+        if digest in self:
+            return True
+
+        stage = self._stages[-1]
+        if len(stage) >= stage.capacity:
+            stage = BloomFilter(stage.capacity * self.growth, stage.error_rate * self.ratio)
+            self._stages.append(stage)
+        stage.add(digest)
+        return False
+
+    def dump(self, path: str | Path):
+        """
+        保存到文件，先写临时文件再替换，避免中途退出导致文件损坏
+
+        :param path: 文件路径
+        :return:
+        """
+        path = Path(path)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with tmp_path.open("wb") as f:
+            f.write(
+                self._HEADER.pack(
+                    self._MAGIC,
+                    self._VERSION,
+                    self.initial_capacity,
+                    self.error_rate,
+                    self.growth,
+                    self.ratio,
+                    len(self._stages),
+                )
+            )
+            for stage in self._stages:
+                f.write(self._STAGE_HEADER.pack(stage.capacity, stage.error_rate, len(stage), stage.nbytes))
+                f.write(stage._bits)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ScalableBloomFilter":
+        """
+        从文件加载
+
+        :param path: dump 生成的文件路径
+        :return: ScalableBloomFilter 实例
+        """
+        with Path(path).open("rb") as f:
+            magic, version, initial_capacity, error_rate, growth, ratio, stage_count = cls._HEADER.unpack(
+                f.read(cls._HEADER.size)
+            )
+            if magic != cls._MAGIC or version != cls._VERSION:
+                raise ValueError(f"{path} is not a bloom filter snapshot")
+
+            instance = cls(initial_capacity=1, error_rate=error_rate, growth=growth, ratio=ratio)
+            instance.initial_capacity = initial_capacity
+            instance._stages = []
+            for _ in range(stage_count):
+                capacity, stage_error_rate, count, nbytes = cls._STAGE_HEADER.unpack(f.read(cls._STAGE_HEADER.size))
+                stage = BloomFilter(capacity, stage_error_rate)
+                bits = f.read(nbytes)
+                if len(bits) != nbytes or nbytes != stage.nbytes:
+                    raise ValueError(f"{path} is truncated or corrupted")
+                stage._bits = bytearray(bits)
+                stage._count = count
+                instance._stages.append(stage)
+        return instance
@@ -1,3 +1,4 @@
+from collections.abc import Iterable, Iterator
 from typing import Any, Union
 
 import aiomysql
@@ -101,6 +102,68 @@ class MysqlUtil:
                 await conn.rollback()
                 raise e
 
+    async def bulk_insert(
+        self,
+        prefix: str,
+        rows: Iterable[Union[list, tuple]],
+        postfix: str = "",
+        max_statement_bytes: int = 1024 * 1024,
+    ) -> int:
+        """
+        多行 VALUES 批量写入
+
+        按字节数把所有行拆分为多条 insert 语句，在同一个事务中执行
+        :param prefix: 语句前缀，如 insert into demo (name,age) values
+        :param rows: 待写入的行，每行为 list 或 tuple 类型的参数
+        :param postfix: 语句后缀，如 on duplicate key update name=values(name)
+        :param max_statement_bytes: 单条语句的最大字节数，单行超过时该行单独成为一条语句
+        :return: 受影响的行数
+        """
+        async with self.pool.acquire() as conn, conn.cursor() as cur:
+            encoding = conn.encoding
+            values = (
+                ("(" + ",".join(conn.escape(arg) for arg in row) + ")").encode(encoding, "surrogateescape")
+                for row in rows
+            )
+            try:
+                row_count = 0
+                for sql in self.split_statements(
+                    prefix.encode(encoding), values, postfix.encode(encoding), max_statement_bytes
+                ):
+                    row_count += await cur.execute(sql)
+                await conn.commit()
+                return row_count
+            except Exception as e:
+                await conn.rollback()
+                raise e
+
+    @staticmethod
+    def split_statements(
+        prefix: bytes, values: Iterable[bytes], postfix: bytes, max_statement_bytes: int
+    ) -> Iterator[bytes]:
+        """
+        把多行 VALUES 拼接为不超过 max_statement_bytes 的多条语句
+
+        :param prefix: 语句前缀
+        :param values: 已转义的行，如 b"('a',1)"
+        :param postfix: 语句后缀
+        :param max_statement_bytes: 单条语句的最大字节数
+        :return: 语句
+        """
+        sql = bytearray(prefix)
+        empty = True
+        for value in values:
+            if not empty and len(sql) + 1 + len(value) + len(postfix) > max_statement_bytes:
+                yield bytes(sql + postfix)
+                sql = bytearray(prefix)
+                empty = True
+            if not empty:
+                sql += b","
+            sql += value
+            empty = False
+        if not empty:
+            yield bytes(sql + postfix)
+
     async def close(self):
         if self.pool:
             self.pool.close()
@@ -1,29 +1,126 @@
-from asyncio import PriorityQueue, TimeoutError, wait_for
+from asyncio import Queue
+from bisect import bisect_left, insort
+from collections import deque
+from collections.abc import Iterator
+from typing import Any
 
 
-class SpiderPriorityQueue(PriorityQueue):
+class PriorityBuckets:
+    """
+    分级优先级容器
+
+    每个优先级一个 FIFO deque，另维护一个非空优先级的有序索引。
+    优先级数值越小越先出队，同一优先级内按入队顺序出队。
+    """
+
+    def __init__(self):
+        self._buckets: dict[Any, deque] = {}
+        self._levels: list = []
+        self._size: int = 0
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self) -> Iterator:
+        for level in self._levels:
+            yield from self._buckets[level]
+
+    def push(self, item):
+        """
+        按 item.priority 放入对应优先级的队尾
+
+        :param item: 带有 priority 属性的元素
+        :return:
+        """
+        level = item.priority
+        bucket = self._buckets.get(level)
+        if bucket is None:
+            bucket = self._buckets[level] = deque()
+            insort(self._levels, level)
+        bucket.append(item)
+        self._size += 1
+
+    def has(self, gte_priority=None) -> bool:
+        """
+        是否有满足条件的元素
+
+        :param gte_priority: 只判断优先级大于等于该值的元素，为 None 时不限制
+        :return:
+        """
+        if not self._levels:
+            return False
+        return gte_priority is None or self._levels[-1] >= gte_priority
+
+    def pop(self, gte_priority=None):
+        """
+        取出优先级最高的元素
+
+        :param gte_priority: 只取优先级大于等于该值的元素，为 None 时不限制
+        :return: 元素，没有满足条件的元素时返回 None
+        """
+        if not self._levels:
+            return None
+
+        index = 0 if gte_priority is None else bisect_left(self._levels, gte_priority)
+        if index >= len(self._levels):
+            return None
+
+        level = self._levels[index]
+        bucket = self._buckets[level]
+        item = bucket.popleft()
+        if not bucket:
+            del self._buckets[level]
+            del self._levels[index]
+        self._size -= 1
+        return item
+
+
+class SpiderPriorityQueue(Queue):
+    """
+    基于 PriorityBuckets 的请求队列
+
+    get/get_by_priority 均为非阻塞获取，等待新元素的逻辑由 Scheduler 的唤醒信号负责
+    """
+
+    _queue: PriorityBuckets
+
     def __init__(self, maxsize: int = 0):
         super().__init__(maxsize=maxsize)
+        # get_by_priority 期间 _get 使用的优先级下限
+        self._gte_priority: int | None = None
+
+    def _init(self, maxsize):
+        self._queue = PriorityBuckets()
+
+    def _put(self, item):
+        self._queue.push(item)
+
+    def _get(self):
+        return self._queue.pop(self._gte_priority)
 
     async def get(self):
-        fut = super().get()
-        try:
-            return await wait_for(fut, timeout=0.1)
-        except TimeoutError:
+        """
+        获取优先级最高的元素，队列为空时立即返回 None
+        """
+        if self.empty():
             return None
+        return self.get_nowait()
 
     async def get_by_priority(self, gte_priority: int):
         """
         获取指定优先级的元素
 
+        直接定位到第一个大于等于 gte_priority 的非空优先级，不会出队再回填
+
         :param gte_priority: 获取大于等于指定优先级的元素
         :return: 大于等于指定优先级的元素
         """
-        item = await self.get()
-        if item is None:
+        if not self._queue.has(gte_priority):
             return None
 
-        if item.priority >= gte_priority:
-            return item
-        await self.put(item)
-        return None
+        # 通过 get_nowait 出队，由 Queue 负责唤醒等待中的 put
+        self._gte_priority = gte_priority
+        try:
+            return self.get_nowait()
+        finally:
+            self._gte_priority = None
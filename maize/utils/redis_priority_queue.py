@@ -0,0 +1,302 @@
+import typing
+
+import ujson
+
+from maize.common.http.request import Request
+from maize.utils.priority_queue import PriorityBuckets
+from maize.utils.redis_util import LEASE_HEARTBEAT_SCRIPT, RedisPipelineBatcher, RedisUtil, extend_leases
+
+# 请求入队：用自增序号作为 ZSET 成员，优先级相同时按序号（字典序）出队，保持 FIFO
+# KEYS: 优先级 ZSET, 请求哈希, 序号
+# ARGV: 优先级, 请求 json
+PUSH_SCRIPT = """
+local member = string.format('%016d', redis.call('INCR', KEYS[3]))
+redis.call('ZADD', KEYS[1], ARGV[1], member)
+redis.call('HSET', KEYS[2], member, ARGV[2])
+return 1
+"""
+
+# 批量取出请求：不限制优先级时使用 ZPOPMIN，否则取出第一批大于等于最小优先级的请求；
+# 启用租约时请求 json 保留在哈希中，记录租约到期时间和所属节点，处理完成（ack）后再删除
+# KEYS: 优先级 ZSET, 请求哈希, 租约 ZSET, 所属节点哈希
+# ARGV: 数量, 最小优先级（为空时不限制）, 租约时长（秒，0 表示不使用租约）, 节点 ID
+# 返回: {取出后 ZSET 中剩余的请求数, 成员, 请求 json, 成员, 请求 json...}
+POP_SCRIPT = """
+local members = {}
+if ARGV[2] == '' then
+    local popped = redis.call('ZPOPMIN', KEYS[1], ARGV[1])
+    for i = 1, #popped, 2 do
+        members[#members + 1] = popped[i]
+    end
+else
+    members = redis.call('ZRANGEBYSCORE', KEYS[1], ARGV[2], '+inf', 'LIMIT', 0, ARGV[1])
+    if #members > 0 then
+        redis.call('ZREM', KEYS[1], unpack(members))
+    end
+end
+
+local result = {redis.call('ZCARD', KEYS[1])}
+if #members > 0 then
+    local rows = redis.call('HMGET', KEYS[2], unpack(members))
+    if tonumber(ARGV[3]) > 0 then
+        local expires = redis.call('TIME')[1] + ARGV[3]
+        for i = 1, #members do
+            redis.call('ZADD', KEYS[3], expires, members[i])
+            redis.call('HSET', KEYS[4], members[i], ARGV[4])
+        end
+    else
+        redis.call('HDEL', KEYS[2], unpack(members))
+    end
+    for i = 1, #rows do
+        if rows[i] then
+            result[#result + 1] = members[i]
+            result[#result + 1] = rows[i]
+        end
+    end
+end
+return result
+"""
+
+# 把租约中的请求放回优先级 ZSET，保持原来的序号：节点 ID 为空时取已过期的租约（节点宕机或失联），否则取该节点持有的租约
+# KEYS: 优先级 ZSET, 请求哈希, 租约 ZSET, 所属节点哈希
+# ARGV: 最多放回的数量, 节点 ID
+# 返回 {取出的租约数, 放回的请求数}
+REQUEUE_SCRIPT = """
+local members = {}
+if ARGV[2] == '' then
+    members = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', redis.call('TIME')[1], 'LIMIT', 0, ARGV[1])
+else
+    local owners = redis.call('HGETALL', KEYS[4])
+    for i = 1, #owners, 2 do
+        if owners[i + 1] == ARGV[2] then
+            members[#members + 1] = owners[i]
+            if #members >= tonumber(ARGV[1]) then
+                break
+            end
+        end
+    end
+end
+
+local count = 0
+for _, member in ipairs(members) do
+    redis.call('ZREM', KEYS[3], member)
+    redis.call('HDEL', KEYS[4], member)
+    local data = redis.call('HGET', KEYS[2], member)
+    if data then
+        redis.call('ZADD', KEYS[1], cjson.decode(data)['priority'], member)
+        count = count + 1
+    end
+end
+return {#members, count}
+"""
+
+
+class RedisPriorityQueue:
+    """
+    基于 Redis 的共享请求队列，多个实例运行同一个爬虫时共同消费
+
+    - 优先级 ZSET：成员为自增序号，分数为请求优先级，数值越小越先出队，同一优先级内 FIFO
+    - 请求哈希：字段为序号，值为 Request.to_dict() 的 json
+    - 入队不等待结果，与其他命令合并到 pipeline 批量发送
+    - 每个实例在内存中维护一个预取缓冲区，取空时用一次 Lua 脚本批量取出 prefetch_size 个请求，
+      ZPOPMIN 是原子操作，同一个请求只会被一个实例取到
+
+    启用租约（lease_ttl > 0）时，取出的请求在处理完成（ack）前保留在请求哈希中，并记录所属节点和租约到期时间：
+    heartbeat 延长本实例预取和处理中请求的租约，reap 把已过期的租约（节点宕机）放回队列，
+    restore 把本节点上次未完成的请求放回队列
+
+    无法序列化的请求（如回调为 lambda、data 为 bytes）直接放入本实例的预取缓冲区，不参与共享。
+
+    接口与 SpiderPriorityQueue 保持一致：get/get_by_priority 均为非阻塞获取，队列为空时返回 None
+    """
+
+    def __init__(
+        self,
+        redis_util: RedisUtil,
+        spider: typing.Any = None,
+        *,
+        key: str,
+        prefetch_size: int = 100,
+        node_id: str = "",
+        lease_ttl: int = 0,
+        batch_window: float = 0.002,
+        batch_max_size: int = 500,
+    ):
+        """
+        :param redis_util: RedisUtil
+        :param spider: 爬虫实例，用于按方法名还原回调函数
+        :param key: 优先级 ZSET 的 key，请求哈希、序号、租约 ZSET、所属节点哈希的 key 为
+            {key}:requests、{key}:sequence、{key}:leases、{key}:owners
+        :param prefetch_size: 每次从 Redis 预取的最大请求数
+        :param node_id: 节点 ID，启用租约时记录请求所属的节点
+        :param lease_ttl: 租约时长，单位：秒，0 表示不使用租约
+        :param batch_window: 入队命令最多等待合并的时间，单位：秒
+        :param batch_max_size: 每个 pipeline 最多发送的命令数
+        """
+        if prefetch_size <= 0:
+            raise ValueError("prefetch_size must be greater than 0")
+
+        self.redis_util = redis_util
+        self.spider = spider
+        self.key = key
+        self.key_requests = f"{key}:requests"
+        self.key_sequence = f"{key}:sequence"
+        self.key_leases = f"{key}:leases"
+        self.key_owners = f"{key}:owners"
+        self.prefetch_size = prefetch_size
+        self.node_id = node_id
+        self.lease_ttl = lease_ttl
+
+        self.batcher = RedisPipelineBatcher(redis_util, window=batch_window, max_size=batch_max_size)
+        self._push_script = redis_util.register_script(PUSH_SCRIPT)
+        self._pop_script = redis_util.register_script(POP_SCRIPT)
+        self._requeue_script = redis_util.register_script(REQUEUE_SCRIPT)
+        self._heartbeat_script = redis_util.register_script(LEASE_HEARTBEAT_SCRIPT)
+
+        self._buffer = PriorityBuckets()
+        # 最近一次预取时 Redis 中剩余的请求数，加上之后本实例入队的请求数
+        self._remote_size: int = 0
+        # 启用租约时，本实例取出且未 ack 的请求（按 id）对应的 ZSET 成员
+        self._members: dict[int, str] = {}
+
+    def qsize(self) -> int:
+        return len(self._buffer) + self._remote_size
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    @property
+    def prefetched_count(self) -> int:
+        """本实例预取缓冲区中的请求数"""
+        return len(self._buffer)
+
+    async def open(self):
+        await self.redis_util.open()
+        await self.batcher.open()
+
+    async def put(self, request: Request):
+        try:
+            data = ujson.dumps(request.to_dict(self.spider))
+        except (ValueError, TypeError, OverflowError):
+            self._buffer.push(request)
+            return
+
+        self.batcher.send_script(
+            self._push_script, keys=[self.key, self.key_requests, self.key_sequence], args=[request.priority, data]
+        )
+        self._remote_size += 1
+
+    async def get(self) -> Request | None:
+        """
+        获取优先级最高的请求，队列为空时立即返回 None
+        """
+        return await self._pop()
+
+    async def get_by_priority(self, gte_priority: int) -> Request | None:
+        """
+        获取第一个大于等于 gte_priority 的非空优先级中的请求
+
+        :param gte_priority: 获取大于等于指定优先级的请求
+        :return: 请求，没有满足条件的请求时返回 None
+        """
+        return await self._pop(gte_priority)
+
+    async def _pop(self, gte_priority: int | None = None) -> Request | None:
+        request = self._buffer.pop(gte_priority)
+        if request is None and await self._prefetch(gte_priority):
+            request = self._buffer.pop(gte_priority)
+        return request
+
+    async def _prefetch(self, gte_priority: int | None = None) -> int:
+        """
+        从 Redis 批量取出请求放入预取缓冲区，同时刷新 Redis 中剩余的请求数
+
+        :param gte_priority: 只取优先级大于等于该值的请求，为 None 时不限制
+        :return: 取出的请求数
+        """
+        result = await self.batcher.call_script(
+            self._pop_script,
+            keys=[self.key, self.key_requests, self.key_leases, self.key_owners],
+            args=[self.prefetch_size, "" if gte_priority is None else gte_priority, self.lease_ttl, self.node_id],
+        )
+        self._remote_size = int(result[0])
+        for member, row in zip(result[1::2], result[2::2], strict=True):
+            request = Request.from_dict(ujson.loads(row), self.spider)
+            if self.lease_ttl > 0:
+                self._members[id(request)] = member
+            self._buffer.push(request)
+        return (len(result) - 1) // 2
+
+    def ack(self, request: Request):
+        """
+        请求处理完成，删除租约和请求 json，不等待结果；未启用租约或不是从 Redis 取出的请求忽略
+
+        :param request: get/get_by_priority 返回的请求
+        :return:
+        """
+        member = self._members.pop(id(request), None)
+        if member is None:
+            return
+        self.batcher.send("zrem", self.key_leases, member)
+        self.batcher.send("hdel", self.key_owners, member)
+        self.batcher.send("hdel", self.key_requests, member)
+
+    async def heartbeat(self) -> int:
+        """
+        延长本实例预取和处理中请求的租约
+        :return: 延长的租约数
+        """
+        return await extend_leases(
+            self.batcher,
+            self._heartbeat_script,
+            keys=[self.key_leases, self.key_owners],
+            lease_ttl=self.lease_ttl,
+            node_id=self.node_id,
+            members=list(self._members.values()),
+        )
+
+    async def _requeue(self, limit: int, node_id: str) -> tuple[int, int]:
+        taken, count = await self.batcher.call_script(
+            self._requeue_script,
+            keys=[self.key, self.key_requests, self.key_leases, self.key_owners],
+            args=[limit, node_id],
+        )
+        self._remote_size += int(count)
+        return int(taken), int(count)
+
+    async def reap(self, limit: int = 500) -> int:
+        """
+        把已过期的租约（所属节点宕机或失联）放回队列
+
+        :param limit: 最多放回的数量
+        :return: 放回的请求数
+        """
+        _, count = await self._requeue(limit, "")
+        return count
+
+    async def restore(self, limit: int = 500) -> int:
+        """
+        把本节点上次运行时预取或处理中、未完成的请求放回队列
+
+        :param limit: 每批放回的数量
+        :return: 放回的请求数
+        """
+        total = 0
+        while True:
+            taken, count = await self._requeue(limit, self.node_id)
+            total += count
+            if taken < limit:
+                return total
+
+    async def close(self):
+        """
+        把预取后未处理的请求放回 Redis，由其他实例或下次启动继续处理
+        :return:
+        """
+        requests = list(self._buffer)
+        self._buffer = PriorityBuckets()
+        for request in requests:
+            await self.put(request)
+            self.ack(request)
+        await self.batcher.close()
+        await self.redis_util.close()
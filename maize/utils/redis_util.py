@@ -1,8 +1,33 @@
+import asyncio
+import contextlib
+from collections.abc import Callable
+from typing import Any
+
 from redis import asyncio as aioredis
-from redis.typing import EncodableT, ExpiryT, KeyT
+from redis.commands.core import AsyncScript
+from redis.typing import EncodableT, ExpiryT, FieldT, KeyT
 
+from .log_util import get_logger
 from .tools import SingletonType
 
+# 延长本节点持有的租约，已被回收（或被其他节点重新领取）的成员不再延长
+# KEYS: 租约 ZSET（分数为到期的 Unix 时间）, 所属节点哈希
+# ARGV: 租约时长（秒）, 节点 ID, 成员...
+LEASE_HEARTBEAT_SCRIPT = """
+local expires = redis.call('TIME')[1] + ARGV[1]
+local count = 0
+for i = 3, #ARGV do
+    if redis.call('HGET', KEYS[2], ARGV[i]) == ARGV[2] then
+        redis.call('ZADD', KEYS[1], 'XX', expires, ARGV[i])
+        count = count + 1
+    end
+end
+return count
+"""
+
+# 每次心跳脚本最多携带的成员数
+LEASE_HEARTBEAT_BATCH_SIZE = 1000
+
 
 class RedisUtil:
     def __init__(
@@ -104,6 +129,238 @@ class RedisUtil:
         """
         return await self._redis.delete(*names)
 
+    async def hset(
+        self,
+        name: KeyT,
+        key: FieldT | None = None,
+        value: EncodableT | None = None,
+        mapping: dict | None = None,
+    ):
+        """
+        设置哈希 `name` 中字段 `key` 的值为 `value`，或批量设置 `mapping` 中的字段
+        :param name:
+        :param key:
+        :param value:
+        :param mapping:
+        :return: 新增的字段数
+        """
+        return await self._redis.hset(name, key=key, value=value, mapping=mapping)
+
+    async def hget(self, name: KeyT, key: FieldT):
+        """
+        返回哈希 `name` 中字段 `key` 的值，不存在时返回 None
+        :param name:
+        :param key:
+        :return:
+        """
+        return await self._redis.hget(name, key)
+
+    async def hgetall(self, name: KeyT) -> dict:
+        """
+        返回哈希 `name` 的所有字段和值
+        :param name:
+        :return:
+        """
+        return await self._redis.hgetall(name)
+
+    async def hdel(self, name: KeyT, *keys: FieldT):
+        """
+        删除哈希 `name` 中的一个或多个字段
+        :param name:
+        :param keys:
+        :return: 删除的字段数
+        """
+        return await self._redis.hdel(name, *keys)
+
+    async def hlen(self, name: KeyT) -> int:
+        """
+        返回哈希 `name` 的字段数
+        :param name:
+        :return:
+        """
+        return await self._redis.hlen(name)
+
+    def pipeline(self, transaction: bool = False):
+        """
+        创建 pipeline，多条命令在一次往返中发送
+        :param transaction: 是否使用 MULTI / EXEC 包裹
+        :return:
+        """
+        return self._redis.pipeline(transaction=transaction)
+
+    def register_script(self, script: str) -> AsyncScript:
+        """
+        注册 Lua 脚本，调用时使用 EVALSHA，服务端没有缓存脚本时自动 SCRIPT LOAD
+        :param script: Lua 脚本
+        :return:
+        """
+        return self._redis.register_script(script)
+
+
+class RedisPipelineBatcher:
+    """
+    Redis 命令合并发送
+
+    命令按提交顺序放入缓冲区，由后台任务通过 pipeline 批量发送：
+    - send 提交后不等待结果，缓冲区中的命令在 window 秒后或达到 max_size 条时发送
+    - call 提交后立即触发发送并等待结果，同一批中先提交的命令先执行
+
+    pipeline 不使用事务，一条命令失败不影响同一批的其他命令
+    """
+
+    def __init__(self, redis_util: RedisUtil, window: float = 0.002, max_size: int = 500):
+        """
+        :param redis_util: RedisUtil
+        :param window: send 提交的命令最多等待的时间，单位：秒
+        :param max_size: 每批最多发送的命令数
+        """
+        self.redis_util = redis_util
+        self.window = window
+        self.max_size = max(1, max_size)
+        self.logger = get_logger(name=self.__class__.__name__)
+
+        self._commands: list[tuple[Callable[[Any], Any], asyncio.Future | None]] = []
+        self._pending = asyncio.Event()
+        self._urgent = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+    async def open(self):
+        self._closed = False
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """
+        发送缓冲区中剩余的命令后停止
+        :return:
+        """
+        self._closed = True
+        self._pending.set()
+        self._urgent.set()
+        if self._task:
+            await self._task
+            self._task = None
+        await self._flush()
+
+    def send(self, command: str, *args: Any, **kwargs: Any):
+        """
+        提交一条命令，不等待结果，发送失败时只记录日志
+        :param command: 命令名，如 hset、hdel
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        self._append(lambda pipe: getattr(pipe, command)(*args, **kwargs), None)
+
+    async def call(self, command: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        提交一条命令并等待结果
+        :param command: 命令名
+        :param args:
+        :param kwargs:
+        :return: 命令结果
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._append(lambda pipe: getattr(pipe, command)(*args, **kwargs), future)
+        return await future
+
+    def send_script(self, script: AsyncScript, keys: list[KeyT], args: list[EncodableT]):
+        """
+        提交一次 Lua 脚本调用，不等待结果，发送失败时只记录日志
+        :param script: register_script 返回的脚本
+        :param keys:
+        :param args:
+        :return:
+        """
+        self._append(lambda pipe: script(keys=keys, args=args, client=pipe), None)
+
+    async def call_script(self, script: AsyncScript, keys: list[KeyT], args: list[EncodableT]) -> Any:
+        """
+        提交一次 Lua 脚本调用并等待结果
+        :param script: register_script 返回的脚本
+        :param keys:
+        :param args:
+        :return: 脚本返回值
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._append(lambda pipe: script(keys=keys, args=args, client=pipe), future)
+        return await future
+
+    def _append(self, command: Callable[[Any], Any], future: asyncio.Future | None):
+        self._commands.append((command, future))
+        self._pending.set()
+        if future is not None or len(self._commands) >= self.max_size:
+            self._urgent.set()
+
+    async def _run(self):
+        while True:
+            await self._pending.wait()
+            if not self._urgent.is_set() and self.window > 0:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._urgent.wait(), self.window)
+            while self._commands:
+                await self._flush()
+            if self._closed:
+                return
+
+    async def _flush(self):
+        self._pending.clear()
+        self._urgent.clear()
+        if not self._commands:
+            return
+
+        commands = self._commands[: self.max_size]
+        del self._commands[: self.max_size]
+        try:
+            pipe = self.redis_util.pipeline(transaction=False)
+            for command, _ in commands:
+                # 脚本调用在 pipeline 中返回可等待对象，需要 await 才会加入 pipeline
+                result = command(pipe)
+                if asyncio.iscoroutine(result):
+                    await result
+            results = await pipe.execute(raise_on_error=False)
+        except Exception as e:
+            self.logger.error(f"redis pipeline error: {e}")
+            results = [e] * len(commands)
+
+        for (_, future), result in zip(commands, results, strict=False):
+            if future is None:
+                if isinstance(result, Exception):
+                    self.logger.error(f"redis command error: {result}")
+            elif not future.done():
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+async def extend_leases(
+    batcher: RedisPipelineBatcher,
+    script: AsyncScript,
+    *,
+    keys: list[KeyT],
+    lease_ttl: int,
+    node_id: str,
+    members: list[str],
+) -> int:
+    """
+    分批调用 LEASE_HEARTBEAT_SCRIPT 延长租约
+
+    :param batcher: RedisPipelineBatcher
+    :param script: register_script(LEASE_HEARTBEAT_SCRIPT) 返回的脚本
+    :param keys: 租约 ZSET、所属节点哈希的 key
+    :param lease_ttl: 租约时长，单位：秒
+    :param node_id: 节点 ID
+    :param members: 要延长的成员
+    :return: 延长的租约数
+    """
+    count = 0
+    for i in range(0, len(members), LEASE_HEARTBEAT_BATCH_SIZE):
+        count += await batcher.call_script(
+            script, keys=keys, args=[lease_ttl, node_id, *members[i : i + LEASE_HEARTBEAT_BATCH_SIZE]]
+        )
+    return count
+
 
 class RedisSingletonUtil(RedisUtil, metaclass=SingletonType):
     """
@@ -0,0 +1,87 @@
+import contextlib
+import typing
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable
+
+K = typing.TypeVar("K", bound=Hashable)
+S = typing.TypeVar("S")
+
+
+class SessionPool(typing.Generic[K, S]):
+    """
+    按 key 复用的长连接会话池，下载器用于按代理配置复用 httpx.AsyncClient / aiohttp.ClientSession
+
+    - 第一次使用某个 key 时调用 create 创建会话，之后复用，保留其中的连接（TCP、TLS、代理 CONNECT）
+    - 会话数超过 max_size 时按最近使用顺序关闭空闲的会话，正在使用的会话不会被关闭，
+      全部在使用时暂时超出上限，使用完毕后再回收
+    """
+
+    def __init__(
+        self,
+        create: Callable[[K], S],
+        close: Callable[[S], Awaitable[typing.Any]],
+        max_size: int = 32,
+    ):
+        """
+        :param create: 根据 key 创建会话
+        :param close: 关闭会话
+        :param max_size: 最多保留的会话数
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be greater than 0")
+
+        self._create = create
+        self._close = close
+        self.max_size = max_size
+        # 按最近使用顺序排列，最久未使用的在前
+        self._sessions: OrderedDict[K, S] = OrderedDict()
+        self._in_use: dict[K, int] = {}
+
+    def __len__(self):
+        return len(self._sessions)
+
+    @contextlib.asynccontextmanager
+    async def acquire(self, key: K) -> AsyncIterator[S]:
+        """
+        获取 key 对应的会话，不存在时创建
+
+        :param key: 会话的 key，如代理地址
+        :return:
+        """
+        session = self._sessions.get(key)
+        if session is None:
+            session = self._sessions[key] = self._create(key)
+        else:
+            self._sessions.move_to_end(key)
+
+        self._in_use[key] = self._in_use.get(key, 0) + 1
+        try:
+            yield session
+        finally:
+            count = self._in_use.pop(key, 1) - 1
+            if count:
+                self._in_use[key] = count
+            await self._evict()
+
+    async def _evict(self):
+        excess = len(self._sessions) - self.max_size
+        for key in list(self._sessions):
+            if excess <= 0:
+                return
+            if key in self._in_use:
+                continue
+            # 先移出再关闭，关闭期间同一个 key 会创建新的会话
+            session = self._sessions.pop(key)
+            excess -= 1
+            await self._close(session)
+
+    async def close(self):
+        """
+        关闭所有会话
+        :return:
+        """
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        self._in_use.clear()
+        for session in sessions:
+            await self._close(session)
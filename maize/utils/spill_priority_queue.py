@@ -0,0 +1,241 @@
+import asyncio
+import pickle
+import sqlite3
+import tempfile
+import typing
+from bisect import bisect_left, insort
+from collections import deque
+from pathlib import Path
+
+from maize.common.http.request import Request
+
+
+class SqliteFrontierStore:
+    """
+    请求溢写存储
+
+    每个请求序列化后作为一行写入 SQLite，同一优先级按自增 id 保持 FIFO。
+    所有 SQLite 调用都放到线程中执行，不阻塞事件循环。
+    """
+
+    def __init__(self, path: str | None = None):
+        """
+        :param path: 数据库文件路径，为空时在系统临时目录创建，关闭后自动删除
+        """
+        self._path = path
+        self._remove_on_close = not path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def path(self) -> str | None:
+        return self._path
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if not self._path:
+                with tempfile.NamedTemporaryFile(prefix="maize-frontier-", suffix=".sqlite3", delete=False) as f:
+                    self._path = f.name
+            self._conn = sqlite3.connect(self._path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=OFF")
+            self._conn.execute("PRAGMA synchronous=OFF")
+            self._conn.execute("DROP TABLE IF EXISTS frontier")
+            self._conn.execute(
+                "CREATE TABLE frontier (id INTEGER PRIMARY KEY AUTOINCREMENT, priority INTEGER NOT NULL, data BLOB)"
+            )
+            self._conn.execute("CREATE INDEX frontier_priority_id ON frontier (priority, id)")
+        return self._conn
+
+    def _push_many(self, priority: int, rows: list[bytes]):
+        conn = self._connect()
+        conn.executemany("INSERT INTO frontier (priority, data) VALUES (?, ?)", ((priority, row) for row in rows))
+        conn.commit()
+
+    def _pop_many(self, priority: int, count: int) -> list[bytes]:
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT id, data FROM frontier WHERE priority = ? ORDER BY id LIMIT ?", (priority, count)
+        ).fetchall()
+        if rows:
+            conn.execute("DELETE FROM frontier WHERE priority = ? AND id <= ?", (priority, rows[-1][0]))
+            conn.commit()
+        return [row[1] for row in rows]
+
+    async def push_many(self, priority: int, rows: list[bytes]):
+        async with self._lock:
+            await asyncio.to_thread(self._push_many, priority, rows)
+
+    async def pop_many(self, priority: int, count: int) -> list[bytes]:
+        async with self._lock:
+            return await asyncio.to_thread(self._pop_many, priority, count)
+
+    async def close(self):
+        async with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            if self._remove_on_close and self._path:
+                Path(self._path).unlink(missing_ok=True)
+
+
+class SpillPriorityQueue:
+    """
+    内存有界的请求队列
+
+    每个优先级在内存中保留一个有上限的热队列，超出的请求序列化后先进入写缓冲，
+    缓冲满 batch_size 后批量溢写到 SQLite。热队列低于上限的一半时后台异步回填，
+    热队列取空且回填未完成时才等待磁盘读取。
+
+    同一优先级内的顺序为：热队列 -> 磁盘 -> 写缓冲，整体仍保持 FIFO。
+    回调函数以爬虫方法名保存，回填时通过 spider 还原；无法序列化的请求（如回调为 lambda）
+    直接留在内存热队列中。
+
+    接口与 SpiderPriorityQueue 保持一致：get/get_by_priority 均为非阻塞获取，队列为空时返回 None
+    """
+
+    def __init__(
+        self,
+        spider: typing.Any = None,
+        max_memory_requests_per_priority: int = 10000,
+        batch_size: int = 1000,
+        path: str | None = None,
+    ):
+        """
+        :param spider: 爬虫实例，用于按方法名还原回调函数
+        :param max_memory_requests_per_priority: 每个优先级在内存中保留的最大请求数
+        :param batch_size: 每批溢写、回填的最大请求数
+        :param path: 溢写文件路径，为空时在系统临时目录创建
+        """
+        if max_memory_requests_per_priority <= 0:
+            raise ValueError("max_memory_requests_per_priority must be greater than 0")
+        if batch_size <= 0:
+            raise ValueError("batch_size must be greater than 0")
+
+        self.spider = spider
+        self.max_memory_requests_per_priority = max_memory_requests_per_priority
+        self.batch_size = batch_size
+        self._store = SqliteFrontierStore(path)
+
+        self._hot: dict[int, deque[Request]] = {}
+        self._buffer: dict[int, list[bytes]] = {}
+        self._disk_count: dict[int, int] = {}
+        self._refills: dict[int, asyncio.Task] = {}
+        self._levels: list[int] = []
+        self._size: int = 0
+
+    def qsize(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    @property
+    def memory_count(self) -> int:
+        """内存热队列中的请求数"""
+        return sum(len(hot) for hot in self._hot.values())
+
+    @property
+    def spilled_count(self) -> int:
+        """已溢写到磁盘及写缓冲中的请求数"""
+        return self._size - self.memory_count
+
+    def _cold_count(self, level: int) -> int:
+        return self._disk_count.get(level, 0) + len(self._buffer.get(level, ()))
+
+    async def put(self, request: Request):
+        level = request.priority
+        hot = self._hot.get(level)
+        if hot is None:
+            hot = self._hot[level] = deque()
+            self._disk_count[level] = 0
+            self._buffer[level] = []
+            insort(self._levels, level)
+        self._size += 1
+
+        if not self._cold_count(level) and len(hot) < self.max_memory_requests_per_priority:
+            hot.append(request)
+            return
+
+        try:
+            row = pickle.dumps(request.to_dict(self.spider), protocol=pickle.HIGHEST_PROTOCOL)
+        except (ValueError, TypeError, AttributeError, pickle.PicklingError):
+            hot.append(request)
+            return
+
+        buffer = self._buffer[level]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self._buffer[level] = []
+            self._disk_count[level] += len(buffer)
+            await self._store.push_many(level, buffer)
+
+    async def get(self) -> Request | None:
+        """
+        获取优先级最高的请求，队列为空时立即返回 None
+        """
+        return await self._pop()
+
+    async def get_by_priority(self, gte_priority: int) -> Request | None:
+        """
+        获取第一个大于等于 gte_priority 的非空优先级中的请求
+
+        :param gte_priority: 获取大于等于指定优先级的请求
+        :return: 请求，没有满足条件的请求时返回 None
+        """
+        return await self._pop(gte_priority)
+
+    async def _pop(self, gte_priority: int | None = None) -> Request | None:
+        if not self._levels:
+            return None
+
+        index = 0 if gte_priority is None else bisect_left(self._levels, gte_priority)
+        if index >= len(self._levels):
+            return None
+
+        level = self._levels[index]
+        hot = self._hot[level]
+        while not hot and self._cold_count(level):
+            await self._start_refill(level)
+
+        request = hot.popleft()
+        self._size -= 1
+
+        cold_count = self._cold_count(level)
+        if not hot and not cold_count:
+            del self._hot[level], self._buffer[level], self._disk_count[level]
+            self._levels.remove(level)
+        elif cold_count and len(hot) < self.max_memory_requests_per_priority // 2:
+            self._start_refill(level)
+        return request
+
+    def _start_refill(self, level: int) -> asyncio.Task:
+        task = self._refills.get(level)
+        if task is None or task.done():
+            task = self._refills[level] = asyncio.create_task(self._refill(level))
+        return task
+
+    async def _refill(self, level: int):
+        hot = self._hot.get(level)
+        if hot is None:
+            return
+
+        count = min(self.batch_size, self.max_memory_requests_per_priority - len(hot))
+        if count <= 0:
+            return
+
+        if self._disk_count[level]:
+            rows = await self._store.pop_many(level, count)
+            self._disk_count[level] -= len(rows)
+        else:
+            buffer = self._buffer[level]
+            rows = buffer[:count]
+            del buffer[:count]
+
+        hot.extend(Request.from_dict(pickle.loads(row), self.spider) for row in rows)
+
+    async def close(self):
+        for task in self._refills.values():
+            task.cancel()
+        await asyncio.gather(*self._refills.values(), return_exceptions=True)
+        self._refills.clear()
+        await self._store.close()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+回调执行模式基准
+
+在 inline / thread / process 三种执行模式下解析同一批大页面（每页约 2MB），
+统计每秒解析的页面数和解析期间事件循环的最大延迟（延迟越大，在途下载被阻塞得越久）。
+
+用法::
+
+    python scripts/benchmarks/callback_execution.py --pages 200 --rows 10000 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from maize import Item, Request, Response, Spider  # noqa: E402
+from maize.common.constant import CallbackExecutionModeEnum  # noqa: E402
+from maize.core.task.callback_executor import CallbackExecutor  # noqa: E402
+from maize.settings import SpiderSettings  # noqa: E402
+
+
+class BenchmarkItem(Item):
+    url: str = ""
+    price_total: float = 0
+
+
+class BenchmarkSpider(Spider):
+    async def start_requests(self):
+        yield Request("https://example.com")
+
+    def parse(self, response: Response):
+        prices = response.xpath("//div[@class='item']/span[@class='price']/text()").getall()
+        yield BenchmarkItem(url=response.url, price_total=sum(float(price) for price in prices))
+
+
+def _make_body(rows: int) -> bytes:
+    items = "".join(
+        f'<div class="item"><a href="/item/{i}">商品 {i} 的标题文字</a><span class="price">{i}.00</span>'
+        f'<p class="desc">商品描述 {"x" * 100}</p></div>'
+        for i in range(rows)
+    )
+    return f"<html><head><title>列表页</title></head><body>{items}</body></html>".encode()
+
+
+async def run(mode: CallbackExecutionModeEnum, body: bytes, pages: int, concurrency: int) -> tuple[float, float]:
+    settings = SpiderSettings()
+    settings.callback.execution_mode = mode.value
+    settings.callback.loop_lag_interval = 0
+    spider = BenchmarkSpider()
+    spider.stats_collector = MagicMock()
+    spider.stats_collector.record_callback = AsyncMock()
+    executor = CallbackExecutor(settings, spider)
+
+    max_lag = 0.0
+    done = asyncio.Event()
+
+    async def probe():
+        nonlocal max_lag
+        loop = asyncio.get_running_loop()
+        while not done.is_set():
+            start_time = loop.time()
+            await asyncio.sleep(0.005)
+            max_lag = max(max_lag, loop.time() - start_time - 0.005)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def parse_page(i: int):
+        async with semaphore:
+            request = Request(f"https://example.com/list/{i}", callback=spider.parse)
+            response = Response(request.url, headers={}, request=request, body=body)
+            output = await executor.execute(spider.parse, response, request)
+            for _ in output:
+                pass
+
+    # 预热进程池、线程池
+    await parse_page(-1)
+    probe_task = asyncio.create_task(probe())
+    start_time = time.perf_counter()
+    await asyncio.gather(*(parse_page(i) for i in range(pages)))
+    elapsed = time.perf_counter() - start_time
+    done.set()
+    await probe_task
+    await executor.close()
+    return pages / elapsed, max_lag
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200, help="页面数量")
+    parser.add_argument("--rows", type=int, default=10000, help="每个页面的列表行数")
+    parser.add_argument("--concurrency", type=int, default=8, help="同时解析的页面数")
+    args = parser.parse_args()
+
+    body = _make_body(args.rows)
+    print(f"页面数量: {args.pages}, 页面大小: {len(body) / 1024 / 1024:.1f} MiB, 并发: {args.concurrency}")
+    for mode in CallbackExecutionModeEnum:
+        pages_per_second, max_lag = asyncio.run(run(mode, body, args.pages, args.concurrency))
+        print(f"{mode.value:<8}: {pages_per_second:8.1f} 页/s, 事件循环最大延迟 {max_lag * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+HTTPXDownloader 客户端复用基准
+
+启动本地 aiohttp 服务，分别在每个请求新建 httpx.AsyncClient（use_session=False）
+和按代理配置复用客户端（use_session=True）两种模式下下载同一批页面，统计每秒完成的请求数。
+本地服务为明文 HTTP，不包含 TLS 握手和代理 CONNECT 的开销，实际抓取时复用客户端的收益更大。
+
+用法::
+
+    python scripts/benchmarks/httpx_client_pool.py --requests 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import socket
+import sys
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from aiohttp import web
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from maize import Request  # noqa: E402
+from maize.aio.classic.downloader.httpx_downloader import HTTPXDownloader  # noqa: E402
+from maize.settings import SpiderSettings  # noqa: E402
+
+PAGE = "<html><body>" + "x" * 4096 + "</body></html>"
+
+
+async def start_server() -> tuple[web.AppRunner, str]:
+    app = web.Application()
+    app.router.add_get("/{page}", lambda _: web.Response(text=PAGE, content_type="text/html"))
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner, f"http://127.0.0.1:{port}"
+
+
+async def run(base_url: str, use_session: bool, requests: int, concurrency: int) -> float:
+    settings = SpiderSettings(log_level="WARNING")
+    settings.request.use_session = use_session
+    settings.request.max_connections = concurrency
+    settings.request.max_keepalive_connections = concurrency
+    crawler = MagicMock()
+    crawler.settings = settings
+    downloader = HTTPXDownloader(crawler)
+    await downloader.open()
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def download(i: int):
+        async with semaphore:
+            result = await downloader.download(Request(f"{base_url}/{i}"))
+            assert result.response is not None and result.response.status == 200, result.reason
+
+    # 预热
+    await download(-1)
+    start_time = time.perf_counter()
+    await asyncio.gather(*(download(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start_time
+    await downloader.close()
+    return requests / elapsed
+
+
+async def main_async(args: argparse.Namespace):
+    runner, base_url = await start_server()
+    try:
+        print(f"请求数: {args.requests}, 并发: {args.concurrency}")
+        for use_session, name in ((False, "每个请求新建客户端"), (True, "复用客户端")):
+            requests_per_second = await run(base_url, use_session, args.requests, args.concurrency)
+            print(f"{name}: {requests_per_second:.1f} 请求/s")
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="请求数量")
+    parser.add_argument("--concurrency", type=int, default=50, help="并发数")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
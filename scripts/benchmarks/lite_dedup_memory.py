@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+LiteCrawler 去重内存占用基准
+
+对比 set 去重（md5 hexdigest 字符串）与可扩容布隆过滤器每个 URL 的内存占用。
+
+用法::
+
+    python scripts/benchmarks/lite_dedup_memory.py --count 1000000 --error-rate 0.001
+"""
+
+import argparse
+import hashlib
+import sys
+import tracemalloc
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def _hexdigests(count: int):
+    for i in range(count):
+        yield hashlib.md5(f"GET:https://example.com/item/{i}".encode()).hexdigest()
+
+
+def measure_set(count: int) -> int:
+    tracemalloc.start()
+    seen: set[str] = set()
+    for hexdigest in _hexdigests(count):
+        seen.add(hexdigest)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current
+
+
+def measure_bloom(count: int, error_rate: float, initial_capacity: int) -> tuple[int, int]:
+    from maize.utils.bloom_filter import ScalableBloomFilter
+
+    tracemalloc.start()
+    seen = ScalableBloomFilter(initial_capacity=initial_capacity, error_rate=error_rate)
+    for hexdigest in _hexdigests(count):
+        seen.add(bytes.fromhex(hexdigest))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, seen.stage_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000, help="URL 数量")
+    parser.add_argument("--error-rate", type=float, default=0.001, help="布隆过滤器误判率")
+    parser.add_argument("--initial-capacity", type=int, default=1_000_000, help="布隆过滤器第一级容量")
+    args = parser.parse_args()
+
+    set_bytes = measure_set(args.count)
+    bloom_bytes, stage_count = measure_bloom(args.count, args.error_rate, args.initial_capacity)
+
+    print(f"URL 数量: {args.count}")
+    print(f"set   : {set_bytes / 1024 / 1024:8.1f} MiB, {set_bytes / args.count:6.1f} bytes/url")
+    print(
+        f"bloom : {bloom_bytes / 1024 / 1024:8.1f} MiB, {bloom_bytes / args.count:6.1f} bytes/url "
+        f"(error_rate={args.error_rate}, stages={stage_count})"
+    )
+
+
+if __name__ == "__main__":
+    main()
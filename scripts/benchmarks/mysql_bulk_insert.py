@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+MysqlPipeline 写入吞吐基准
+
+对比 executemany 与多行 VALUES 批量写入（bulk_insert）在 insert / ignore / upsert 模式下的每秒写入行数。
+需要一个可写的 MySQL 或 MariaDB，例如::
+
+    docker run -d --rm -p 3306:3306 -e MYSQL_ROOT_PASSWORD=root -e MYSQL_DATABASE=maize mysql:8
+
+用法::
+
+    python scripts/benchmarks/mysql_bulk_insert.py --password root --db maize --count 100000 --batch-size 1000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+TABLE_NAME = "maize_bulk_benchmark"
+
+
+async def run(args: argparse.Namespace):
+    from maize import Item, SpiderSettings
+    from maize.common.constant import MysqlInsertModeEnum
+    from maize.pipelines.mysql_pipeline import MysqlPipeline
+    from maize.utils.mysql_util import MysqlUtil
+
+    mysql = MysqlUtil(host=args.host, port=args.port, db=args.db, user=args.user, password=args.password)
+    await mysql.open()
+    await mysql.execute(f"drop table if exists {TABLE_NAME}")
+    await mysql.execute(
+        f"create table {TABLE_NAME} (id int primary key, name varchar(64), url varchar(255), price int)"
+    )
+    await mysql.close()
+
+    print(f"行数: {args.count}, 每批: {args.batch_size}")
+    for insert_mode in MysqlInsertModeEnum:
+        for bulk_insert in (False, True):
+
+            class BenchmarkItem(Item):
+                __table_name__: str = TABLE_NAME
+                __insert_mode__ = insert_mode
+                id: int = 0
+                name: str = ""
+                url: str = ""
+                price: int = 0
+
+            settings = SpiderSettings()
+            settings.mysql.host = args.host
+            settings.mysql.port = args.port
+            settings.mysql.db = args.db
+            settings.mysql.user = args.user
+            settings.mysql.password = args.password
+            settings.mysql.bulk_insert = bulk_insert
+            settings.mysql.bulk_max_statement_bytes = args.max_statement_bytes
+
+            pipeline = MysqlPipeline(settings)
+            await pipeline.open()
+            if insert_mode == MysqlInsertModeEnum.INSERT:
+                await pipeline.mysql.execute(f"truncate table {TABLE_NAME}")
+
+            start_time = time.perf_counter()
+            for offset in range(0, args.count, args.batch_size):
+                items = [
+                    BenchmarkItem(id=i, name=f"item-{i}", url=f"https://example.com/item/{i}", price=i % 1000)
+                    for i in range(offset, min(offset + args.batch_size, args.count))
+                ]
+                if not await pipeline.process_item(items):
+                    raise RuntimeError(f"写入失败: {insert_mode.value}, bulk_insert={bulk_insert}")
+            elapsed = time.perf_counter() - start_time
+            await pipeline.close()
+
+            mode = "bulk_insert" if bulk_insert else "executemany"
+            print(f"{insert_mode.value:<6} {mode:<11}: {elapsed:8.2f}s, {args.count / elapsed:10.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="MySQL 主机")
+    parser.add_argument("--port", type=int, default=3306, help="MySQL 端口")
+    parser.add_argument("--db", default="maize", help="MySQL 数据库名")
+    parser.add_argument("--user", default="root", help="MySQL 用户名")
+    parser.add_argument("--password", default="root", help="MySQL 密码")
+    parser.add_argument("--count", type=int, default=100_000, help="写入行数")
+    parser.add_argument("--batch-size", type=int, default=1000, help="每批 item 数")
+    parser.add_argument("--max-statement-bytes", type=int, default=1024 * 1024, help="批量写入时单条 SQL 的最大字节数")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
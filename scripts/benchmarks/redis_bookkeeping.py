@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Redis 请求记录基准
+
+对比旧的逐条命令（每个请求 SET queue、SET NX lock、SET running、DEL queue、DEL running 共 5 次往返）
+与 RedisRequestTracker（哈希 + pipeline 合并 + Lua 脚本）的每秒处理请求数。
+需要一个可写的 Redis，例如::
+
+    docker run -d --rm -p 6379:6379 redis:7
+
+用法::
+
+    python scripts/benchmarks/redis_bookkeeping.py --url redis://127.0.0.1:6379/0 --count 20000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+KEY_PREFIX = "maize:redis_benchmark"
+
+
+async def run_legacy(redis_util, requests, concurrency: int):
+    import ujson
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def process(request):
+        async with semaphore:
+            payload = ujson.dumps(request.model_dump)
+            await redis_util.set(f"{KEY_PREFIX}:queue:{request.hash}", payload)
+            await redis_util.nx_set(f"{KEY_PREFIX}:lock:{request.hash}", request.hash, 600)
+            await redis_util.set(f"{KEY_PREFIX}:running:{request.hash}", payload)
+            await redis_util.delete(f"{KEY_PREFIX}:queue:{request.hash}")
+            await redis_util.delete(f"{KEY_PREFIX}:running:{request.hash}")
+
+    await asyncio.gather(*(process(request) for request in requests))
+
+
+async def run_tracker(tracker, requests, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def process(request):
+        async with semaphore:
+            tracker.enqueue(request)
+            await tracker.claim(request)
+            tracker.finish(request)
+
+    await asyncio.gather(*(process(request) for request in requests))
+
+
+async def run(args: argparse.Namespace):
+    from maize import Request
+    from maize.core.engine.redis_request_tracker import RedisRequestTracker
+    from maize.utils.redis_util import RedisUtil
+
+    def make_requests(tag: str):
+        return [Request(f"https://example.com/{tag}/{i}") for i in range(args.count)]
+
+    redis_util = RedisUtil(args.url)
+    start_time = time.perf_counter()
+    await run_legacy(redis_util, make_requests("legacy"), args.concurrency)
+    legacy_elapsed = time.perf_counter() - start_time
+    await redis_util.close()
+
+    tracker = RedisRequestTracker(
+        RedisUtil(args.url),
+        key_queue=f"{KEY_PREFIX}:queue",
+        key_running=f"{KEY_PREFIX}:running",
+        key_lock=f"{KEY_PREFIX}:lock",
+        lock_ttl=600,
+        batch_window=args.batch_window,
+    )
+    await tracker.open()
+    start_time = time.perf_counter()
+    await run_tracker(tracker, make_requests("tracker"), args.concurrency)
+    await tracker.batcher.close()
+    tracker_elapsed = time.perf_counter() - start_time
+    await tracker.redis_util.close()
+
+    print(f"请求数量: {args.count}, 并发: {args.concurrency}")
+    print(f"逐条命令           : {args.count / legacy_elapsed:10.0f} 请求/s")
+    print(f"哈希 + pipeline + Lua: {args.count / tracker_elapsed:10.0f} 请求/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="redis://127.0.0.1:6379/0", help="Redis URL")
+    parser.add_argument("--count", type=int, default=20_000, help="请求数量")
+    parser.add_argument("--concurrency", type=int, default=32, help="并发处理的请求数")
+    parser.add_argument("--batch-window", type=float, default=0.002, help="命令合并窗口，单位：秒")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Redis 共享请求队列扩展性基准
+
+先把 --count 个请求写入 RedisPriorityQueue，再分别用 1、2、4... 个进程（模拟多个节点）同时消费，
+每个节点 --concurrency 个协程，每处理一个请求等待 --latency 秒模拟下载，统计取空队列的耗时和每秒处理请求数。
+需要一个可写的 Redis，例如::
+
+    docker run -d --rm -p 6379:6379 redis:7
+
+用法::
+
+    python scripts/benchmarks/redis_frontier.py --url redis://127.0.0.1:6379/0 --count 20000 --nodes 1 2 4
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+KEY = "maize:redis_benchmark:frontier"
+
+
+class DemoSpider:
+    async def parse(self, response):
+        pass
+
+
+def _make_queue(args: argparse.Namespace, spider=None):
+    from maize.utils.redis_priority_queue import RedisPriorityQueue
+    from maize.utils.redis_util import RedisUtil
+
+    return RedisPriorityQueue(RedisUtil(args.url), spider, key=KEY, prefetch_size=args.prefetch_size)
+
+
+async def fill(args: argparse.Namespace):
+    from maize import Request
+
+    spider = DemoSpider()
+    queue = _make_queue(args, spider)
+    await queue.open()
+    await queue.redis_util.delete(queue.key, queue.key_requests, queue.key_sequence)
+    for i in range(args.count):
+        await queue.put(Request(f"https://example.com/{i}", priority=i % 3, callback=spider.parse))
+    await queue.close()
+
+
+async def consume(args: argparse.Namespace) -> int:
+    queue = _make_queue(args, DemoSpider())
+    await queue.open()
+    count = 0
+
+    async def worker():
+        nonlocal count
+        while await queue.get() is not None:
+            count += 1
+            await asyncio.sleep(args.latency)
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    await queue.close()
+    return count
+
+
+def run_node(args: argparse.Namespace) -> int:
+    return asyncio.run(consume(args))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="redis://127.0.0.1:6379/0", help="Redis URL")
+    parser.add_argument("--count", type=int, default=20_000, help="请求数量")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1, 2, 4], help="节点数")
+    parser.add_argument("--concurrency", type=int, default=32, help="每个节点并发处理的请求数")
+    parser.add_argument("--latency", type=float, default=0.01, help="每个请求的模拟下载耗时，单位：秒")
+    parser.add_argument("--prefetch-size", type=int, default=100, help="每次预取的请求数")
+    args = parser.parse_args()
+
+    print(f"请求数量: {args.count}, 每个节点并发: {args.concurrency}, 模拟下载耗时: {args.latency}s")
+    baseline = None
+    for nodes in args.nodes:
+        asyncio.run(fill(args))
+        with multiprocessing.get_context("spawn").Pool(nodes) as pool:
+            start_time = time.perf_counter()
+            counts = pool.map(run_node, [args] * nodes)
+            elapsed = time.perf_counter() - start_time
+
+        rate = sum(counts) / elapsed
+        baseline = baseline or rate / nodes
+        print(
+            f"{nodes} 个节点: {elapsed:6.2f}s, {rate:8.0f} 请求/s, 加速比 {rate / baseline:4.2f}, 各节点处理 {counts}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+请求指纹微基准
+
+对比旧的 Request.hash（每次访问都拼接 repr 字符串并计算 md5）与新的规范化 blake2b 指纹：
+首次计算的耗时，以及 Classic 引擎每个请求访问 4 次（入队、分布式锁、运行集合、删除）的总耗时。
+
+用法::
+
+    python scripts/benchmarks/request_fingerprint.py --count 100000
+"""
+
+import argparse
+import hashlib
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+# Classic 引擎处理一个请求时访问指纹的次数
+ACCESS_PER_REQUEST = 4
+
+
+def legacy_hash(request) -> str:
+    """旧版 Request.hash 的实现"""
+    request_data_list = [
+        request.method,
+        request.url,
+        repr(request.headers) or "",
+        repr(request.params) or "",
+        repr(request.data) or "",
+        repr(request.json) or "",
+    ]
+    request_data_str = ":".join(request_data_list)
+    return hashlib.md5(request_data_str.encode("utf-8")).hexdigest()
+
+
+def _make_requests(count: int):
+    from maize import Request
+
+    return [
+        Request(
+            f"https://example.com/list?page={i}&size=20",
+            headers={"User-Agent": "maize", "Accept": "text/html"},
+            params={"category": "books", "sort": "price"},
+        )
+        for i in range(count)
+    ]
+
+
+def _timeit(func, count: int, repeat: int) -> float:
+    """每轮使用新创建的请求（指纹未缓存），取多轮中的最小耗时"""
+    elapsed_list = []
+    for _ in range(repeat):
+        requests = _make_requests(count)
+        start_time = time.perf_counter()
+        for request in requests:
+            func(request)
+        elapsed_list.append(time.perf_counter() - start_time)
+    return min(elapsed_list)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100_000, help="请求数量")
+    parser.add_argument("--repeat", type=int, default=5, help="重复轮数，取最小耗时")
+    args = parser.parse_args()
+
+    def legacy_engine(request):
+        for _ in range(ACCESS_PER_REQUEST):
+            legacy_hash(request)
+
+    def fingerprint_engine(request):
+        for _ in range(ACCESS_PER_REQUEST):
+            request.hash  # noqa: B018
+
+    legacy_once = _timeit(legacy_hash, args.count, args.repeat)
+    fingerprint_once = _timeit(lambda request: request.fingerprint, args.count, args.repeat)
+    legacy_total = _timeit(legacy_engine, args.count, args.repeat)
+    fingerprint_total = _timeit(fingerprint_engine, args.count, args.repeat)
+
+    print(f"请求数量: {args.count}")
+    print(f"单次计算   旧 md5 hash: {legacy_once / args.count * 1e6:6.2f} us/请求")
+    print(f"单次计算   blake2b 指纹: {fingerprint_once / args.count * 1e6:6.2f} us/请求")
+    print(f"访问 {ACCESS_PER_REQUEST} 次 旧 md5 hash: {legacy_total / args.count * 1e6:6.2f} us/请求")
+    print(f"访问 {ACCESS_PER_REQUEST} 次 blake2b 指纹: {fingerprint_total / args.count * 1e6:6.2f} us/请求")
+
+
+if __name__ == "__main__":
+    main()
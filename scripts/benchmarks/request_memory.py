@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Request 内存占用基准
+
+对比旧的 Request（普通类，每个实例一个 __dict__，总是分配 meta dict）与 __slots__ 实现，
+统计调度器队列中每个请求占用的字节数（含 URL 字符串和回调的绑定方法对象）。
+
+用法::
+
+    python scripts/benchmarks/request_memory.py --count 1000000
+"""
+
+import argparse
+import sys
+import tracemalloc
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+
+class LegacyRequest:
+    """旧版 Request 的实例属性布局"""
+
+    def __init__(self, url: str, *, method=None, callback=None, priority: int = 0, meta: dict | None = None):
+        self.url = url
+        self.method: str = str(method.value)
+        self.callback = callback
+        self.error_callback = None
+        self.priority = priority
+        self.headers = None
+        self.headers_func = None
+        self.params = None
+        self.data = None
+        self.json = None
+        self.cookies = None
+        self.proxy = None
+        self.proxy_username = None
+        self.proxy_password = None
+        self.follow_redirects = True
+        self.max_redirects = 20
+        self._current_retry_count: int = 0
+        self.encoding = "utf-8"
+        self._meta = meta if meta is not None else {}
+
+
+class DemoSpider:
+    async def parse(self, response):
+        pass
+
+
+def measure(request_cls, count: int) -> int:
+    from maize.common.constant import Method
+
+    spider = DemoSpider()
+    tracemalloc.start()
+    queue = [
+        request_cls(f"https://example.com/list?page={i}", method=Method.GET, callback=spider.parse, priority=i % 10)
+        for i in range(count)
+    ]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del queue
+    return current
+
+
+def main():
+    from maize import Request
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000, help="请求数量")
+    args = parser.parse_args()
+
+    legacy_bytes = measure(LegacyRequest, args.count)
+    slots_bytes = measure(Request, args.count)
+
+    print(f"请求数量: {args.count}")
+    print(f"旧 Request    : {legacy_bytes / 1024 / 1024:8.1f} MiB, {legacy_bytes / args.count:6.1f} bytes/请求")
+    print(f"__slots__ 实现: {slots_bytes / 1024 / 1024:8.1f} MiB, {slots_bytes / args.count:6.1f} bytes/请求")
+    print(f"节省: {(1 - slots_bytes / legacy_bytes) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Response 解析基准
+
+对比旧的 Response.xpath（先把 body 解码为 str 再交给 parsel，每次调用重新编译 XPath）
+与直接从 bytes 构建文档、使用进程级编译缓存的实现，每个页面执行一组回调中常见的表达式。
+
+用法::
+
+    python scripts/benchmarks/response_selector.py --count 2000 --rows 200 --encoding gbk
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from lxml import etree
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+QUERIES = (
+    "//title/text()",
+    "//div[@class='item']",
+    "//div[@class='item']/a/@href",
+    "//div[@class='item']/span[@class='price']/text()",
+    "//a[@class='next']/@href",
+)
+
+
+def _make_body(rows: int, encoding: str) -> bytes:
+    items = "".join(
+        f'<div class="item"><a href="/item/{i}">商品 {i}</a><span class="price">{i}.00</span></div>'
+        for i in range(rows)
+    )
+    html = (
+        f'<html><head><meta charset="{encoding}"><title>列表页</title></head>'
+        f'<body>{items}<a class="next" href="/page/2">下一页</a></body></html>'
+    )
+    return html.encode(encoding)
+
+
+def _make_response(body: bytes, encoding: str):
+    from maize import Request, Response
+
+    request = Request("https://example.com", encoding=encoding)
+    return Response("https://example.com", headers={}, request=request, body=body)
+
+
+def legacy_parse(body: bytes, encoding: str):
+    """旧版 Response.xpath：先解码为 str，每次调用都重新编译 XPath"""
+    from maize.common.http import selector as selector_module
+
+    response = _make_response(body, encoding)
+    selector = selector_module.Selector(response.text)
+    compile_xpath = selector_module.compile_xpath
+    selector_module.compile_xpath = lambda query, namespaces=None: etree.XPath(
+        query, namespaces=namespaces, smart_strings=False
+    )
+    try:
+        for query in QUERIES:
+            selector.xpath(query)
+    finally:
+        selector_module.compile_xpath = compile_xpath
+
+
+def bytes_parse(body: bytes, encoding: str):
+    response = _make_response(body, encoding)
+    for query in QUERIES:
+        response.xpath(query)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=2000, help="页面数量")
+    parser.add_argument("--rows", type=int, default=200, help="每个页面的列表行数")
+    parser.add_argument("--encoding", default="utf-8", help="页面编码，如 utf-8、gbk")
+    args = parser.parse_args()
+
+    body = _make_body(args.rows, args.encoding)
+    for name, func in (("旧 xpath      ", legacy_parse), ("bytes + 缓存  ", bytes_parse)):
+        start_time = time.perf_counter()
+        for _ in range(args.count):
+            func(body, args.encoding)
+        elapsed = time.perf_counter() - start_time
+        print(f"{name}: {elapsed / args.count * 1e3:7.3f} ms/页面")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Classic 调度器队列峰值内存基准
+
+分别使用纯内存队列（SpiderPriorityQueue）与溢写队列（SpillPriorityQueue）灌入并取空
+合成请求，每种模式在独立子进程中运行，统计进程峰值 RSS。
+
+用法::
+
+    python scripts/benchmarks/scheduler_frontier_rss.py --count 10000000 --max-memory 10000
+"""
+
+import argparse
+import asyncio
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+
+class _Spider:
+    async def parse(self, response):
+        pass
+
+
+async def _run(mode: str, count: int, max_memory: int, batch_size: int, priorities: int):
+    from maize.aio.classic.scheduler.scheduler import Scheduler
+    from maize.common.http.request import Request
+    from maize.settings.spider_settings import SchedulerSettings
+
+    spider = _Spider()
+    settings = SchedulerSettings(
+        max_memory_requests_per_priority=max_memory if mode == "spill" else 0,
+        spill_batch_size=batch_size,
+    )
+    scheduler = Scheduler(settings, spider)
+    scheduler.open()
+
+    start = time.perf_counter()
+    for i in range(count):
+        request = Request(
+            f"https://example.com/item/{i}",
+            callback=spider.parse,
+            priority=i % priorities,
+            headers={"User-Agent": "maize-benchmark"},
+            meta={"index": i},
+        )
+        await scheduler.enqueue_request(request)
+
+    drained = 0
+    while await scheduler.next_request() is not None:
+        drained += 1
+    elapsed = time.perf_counter() - start
+    await scheduler.close()
+
+    assert drained == count
+    # Linux 上 ru_maxrss 单位为 KiB
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{mode:6}: peak rss {max_rss / 1024:8.1f} MiB, {elapsed:7.1f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=10_000_000, help="请求数量")
+    parser.add_argument("--max-memory", type=int, default=10_000, help="溢写队列每个优先级在内存中保留的最大请求数")
+    parser.add_argument("--batch-size", type=int, default=1000, help="溢写队列每批溢写、回填的请求数")
+    parser.add_argument("--priorities", type=int, default=4, help="优先级数量")
+    parser.add_argument("--mode", choices=["memory", "spill"], help="只运行指定模式（供子进程使用）")
+    args = parser.parse_args()
+
+    if args.mode:
+        asyncio.run(_run(args.mode, args.count, args.max_memory, args.batch_size, args.priorities))
+        return
+
+    print(f"请求数量: {args.count}, 优先级数量: {args.priorities}")
+    for mode in ("memory", "spill"):
+        subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--mode",
+                mode,
+                "--count",
+                str(args.count),
+                "--max-memory",
+                str(args.max_memory),
+                "--batch-size",
+                str(args.batch_size),
+                "--priorities",
+                str(args.priorities),
+            ],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
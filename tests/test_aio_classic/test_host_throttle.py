@@ -0,0 +1,72 @@
+"""
+Tests for classic HostThrottle.
+"""
+
+import math
+
+from maize.aio.classic.scheduler.host_throttle import HostSlot, HostThrottle
+from maize.common.http.request import Request
+from maize.settings.spider_settings import PolitenessSettings
+
+
+class TestHostSlot:
+    """Test HostSlot limits."""
+
+    def test_unlimited_slot_is_always_ready(self):
+        slot = HostSlot(concurrency=0, rate=0, burst=1, delay=0, now=0)
+        for _ in range(100):
+            assert slot.ready_in(0) == 0
+            slot.acquire(0)
+
+    def test_concurrency_full_waits_for_release(self):
+        slot = HostSlot(concurrency=2, rate=0, burst=1, delay=0, now=0)
+        slot.acquire(0)
+        slot.acquire(0)
+        assert math.isinf(slot.ready_in(0))
+
+        slot.release()
+        assert slot.ready_in(0) == 0
+
+    def test_token_bucket_rate_and_burst(self):
+        slot = HostSlot(concurrency=0, rate=2, burst=2, delay=0, now=0)
+        slot.acquire(0)
+        slot.acquire(0)
+        assert slot.ready_in(0) == 0.5
+        assert slot.ready_in(0.5) == 0
+
+    def test_delay_between_requests(self):
+        slot = HostSlot(concurrency=0, rate=0, burst=1, delay=1.5, now=0)
+        slot.acquire(10)
+        assert slot.ready_in(10) == 1.5
+        assert slot.ready_in(11.5) == 0
+
+
+class TestHostThrottle:
+    """Test HostThrottle bookkeeping."""
+
+    def test_slots_are_per_host_and_recycled(self):
+        throttle = HostThrottle(PolitenessSettings(enabled=True, host_concurrency=1))
+        host_a = throttle.get_host(Request("https://a.example.com/1"))
+        host_b = throttle.get_host(Request("https://b.example.com/1"))
+        assert host_a == "a.example.com"
+
+        throttle.acquire(host_a, 0)
+        assert math.isinf(throttle.ready_in(host_a, 0))
+        assert throttle.ready_in(host_b, 0) == 0
+
+        throttle.release(host_a, 0)
+        assert len(throttle) == 0
+
+    def test_delayed_slots_reaped_on_acquire(self):
+        throttle = HostThrottle(PolitenessSettings(enabled=True, host_delay=1))
+        for i in range(3):
+            throttle.acquire(f"{i}.example.com", 0)
+            throttle.release(f"{i}.example.com", 0)
+        # 释放时仍在 host_delay 间隔内，不能立即回收
+        assert len(throttle) == 3
+
+        throttle.acquire("new.example.com", 5)
+        assert len(throttle) == 4
+
+        throttle.acquire("new.example.com", 20)
+        assert list(throttle._slots) == ["new.example.com"]
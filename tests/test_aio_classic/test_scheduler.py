@@ -2,10 +2,15 @@
 Tests for classic Scheduler.
 """
 
+import asyncio
+
 import pytest
 
 from maize.aio.classic.scheduler.scheduler import Scheduler
 from maize.common.http.request import Request
+from maize.core.task.task_manager import TaskManager
+from maize.settings.spider_settings import PolitenessSettings, SchedulerSettings
+from maize.utils.spill_priority_queue import SpillPriorityQueue
 
 
 class TestScheduler:
@@ -80,8 +85,7 @@ class TestScheduler:
     async def test_next_request_with_gte_priority(self):
         """next_request(gte_priority) only returns items >= priority.
 
-        get_by_priority peeks at the min-heap head (lowest priority first).
-        If the head doesn't meet gte_priority, it's requeued and None returned.
+        Items below the threshold do not block higher-priority items behind them.
         """
         scheduler = Scheduler()
         scheduler.open()
@@ -92,16 +96,29 @@ class TestScheduler:
         await scheduler.enqueue_request(req_low)
         await scheduler.enqueue_request(req_high)
 
-        # gte_priority=5: head is low (1 < 5), requeued, returns None
+        # gte_priority=5: low (1 < 5) is skipped, high is returned
         result = await scheduler.next_request(gte_priority=5)
-        assert result is None
-        # Both items still in queue
-        assert not scheduler.idle()
+        assert result is req_high
+        # Low item still in queue
+        assert len(scheduler) == 1
 
-        # Without gte_priority, low (priority=1) comes out first
+        # Without gte_priority, low (priority=1) comes out
         result = await scheduler.next_request()
         assert result is req_low
 
+    @pytest.mark.asyncio
+    async def test_same_priority_is_fifo(self):
+        """Requests with the same priority are returned in insertion order."""
+        scheduler = Scheduler()
+        scheduler.open()
+
+        requests = [Request(f"https://example.com/{i}") for i in range(5)]
+        for req in requests:
+            await scheduler.enqueue_request(req)
+
+        results = [await scheduler.next_request() for _ in requests]
+        assert results == requests
+
     @pytest.mark.asyncio
     async def test_next_request_with_gte_priority_none_matching(self):
         """next_request(gte_priority) returns None when no item matches."""
@@ -115,3 +132,145 @@ class TestScheduler:
         assert result is None
         # Item requeued since it didn't match
         assert not scheduler.idle()
+
+
+class TestSchedulerSpill:
+    """Test Scheduler with a bounded in-memory frontier."""
+
+    @pytest.mark.asyncio
+    async def test_open_creates_spill_queue(self):
+        scheduler = Scheduler(SchedulerSettings(max_memory_requests_per_priority=2, spill_batch_size=2))
+        scheduler.open()
+        assert isinstance(scheduler.request_queue, SpillPriorityQueue)
+
+        for i in range(5):
+            await scheduler.enqueue_request(Request(f"https://example.com/{i}"))
+        assert len(scheduler) == 5
+
+        urls = [(await scheduler.next_request()).url for _ in range(5)]
+        assert urls == [f"https://example.com/{i}" for i in range(5)]
+        assert scheduler.idle()
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_default_settings_use_memory_queue(self):
+        scheduler = Scheduler(SchedulerSettings())
+        scheduler.open()
+        assert not isinstance(scheduler.request_queue, SpillPriorityQueue)
+        await scheduler.close()
+
+
+class TestSchedulerPoliteness:
+    """Test Scheduler per-host throttling."""
+
+    @pytest.mark.asyncio
+    async def test_busy_host_does_not_block_other_hosts(self):
+        scheduler = Scheduler(politeness=PolitenessSettings(enabled=True, host_concurrency=1))
+        scheduler.open()
+        slow_1 = Request("https://slow.example.com/1")
+        slow_2 = Request("https://slow.example.com/2")
+        fast = Request("https://fast.example.com/1")
+        for request in (slow_1, slow_2, fast):
+            await scheduler.enqueue_request(request)
+
+        assert await scheduler.next_request() is slow_1
+        # slow.example.com 并发已满，slow_2 暂存在调度器中
+        assert await scheduler.next_request() is fast
+        assert await scheduler.next_request() is None
+        assert len(scheduler) == 1
+        assert not scheduler.idle()
+
+        scheduler.release(slow_1)
+        assert await scheduler.next_request() is slow_2
+        assert scheduler.idle()
+
+    @pytest.mark.asyncio
+    async def test_full_host_at_head_does_not_starve_other_hosts(self):
+        politeness = PolitenessSettings(enabled=True, host_concurrency=1, max_deferred_requests=2)
+        scheduler = Scheduler(politeness=politeness)
+        scheduler.open()
+        for i in range(10):
+            await scheduler.enqueue_request(Request(f"https://slow.example.com/{i}"))
+        fast = Request("https://fast.example.com/1")
+        await scheduler.enqueue_request(fast)
+
+        assert (await scheduler.next_request()).url == "https://slow.example.com/0"
+        # slow.example.com 暂存已满后，其余请求放回队列，fast.example.com 的请求仍能取出
+        assert await scheduler.next_request() is fast
+        assert len(scheduler._deferred["slow.example.com"]) == 2
+        assert len(scheduler) == 9
+
+    @pytest.mark.asyncio
+    async def test_wait_until_host_delay_elapses(self):
+        scheduler = Scheduler(politeness=PolitenessSettings(enabled=True, host_delay=0.05))
+        scheduler.open()
+        first = Request("https://example.com/1")
+        second = Request("https://example.com/2")
+        await scheduler.enqueue_request(first)
+        await scheduler.enqueue_request(second)
+
+        loop = asyncio.get_running_loop()
+        assert await scheduler.next_request() is first
+        start = loop.time()
+        scheduler._wakeup.clear()
+        assert await scheduler.next_request(wait=True) is second
+        assert loop.time() - start >= 0.04
+
+    @pytest.mark.asyncio
+    async def test_deferred_requests_respect_gte_priority(self):
+        scheduler = Scheduler(politeness=PolitenessSettings(enabled=True, host_concurrency=1))
+        scheduler.open()
+        await scheduler.enqueue_request(Request("https://example.com/1", priority=5))
+        await scheduler.enqueue_request(Request("https://example.com/2", priority=1))
+
+        first = await scheduler.next_request()
+        assert first.priority == 1
+        assert await scheduler.next_request() is None
+
+        scheduler.release(first)
+        assert await scheduler.next_request(gte_priority=6) is None
+        assert (await scheduler.next_request(gte_priority=5)).priority == 5
+
+
+class TestSchedulerWakeup:
+    """Test Scheduler notification-based wakeups."""
+
+    @pytest.mark.asyncio
+    async def test_wait_returns_enqueued_request(self):
+        """next_request(wait=True) wakes up as soon as a request is enqueued."""
+        scheduler = Scheduler()
+        scheduler.open()
+        req = Request("https://example.com")
+
+        waiter = asyncio.create_task(scheduler.next_request(wait=True))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        await scheduler.enqueue_request(req)
+        assert await asyncio.wait_for(waiter, timeout=1) is req
+
+    @pytest.mark.asyncio
+    async def test_wait_returns_none_on_notify(self):
+        """A bare notify() wakes the waiter, which returns None to let the engine re-check idle."""
+        scheduler = Scheduler()
+        scheduler.open()
+
+        waiter = asyncio.create_task(scheduler.next_request(wait=True))
+        await asyncio.sleep(0)
+        scheduler.notify()
+        assert await asyncio.wait_for(waiter, timeout=1) is None
+
+    @pytest.mark.asyncio
+    async def test_task_manager_done_callback_notifies(self):
+        """TaskManager done callbacks wake the scheduler after the task finishes."""
+        scheduler = Scheduler()
+        scheduler.open()
+        task_manager = TaskManager()
+        task_manager.add_done_callback(scheduler.notify)
+
+        waiter = asyncio.create_task(scheduler.next_request(wait=True))
+        await task_manager.semaphore.acquire()
+        task_manager.create_task(asyncio.sleep(0))
+
+        assert await asyncio.wait_for(waiter, timeout=1) is None
+        assert task_manager.all_done()
@@ -2,11 +2,14 @@
 Tests for lite_spider fetch exception path, run, and _run.
 """
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from maize.aio.lite.crawler import LiteCrawler
 from maize.aio.lite.spider.lite_spider import LiteSpider
+from maize.common.constant import DedupBackendEnum
 from maize.common.http import Request, Response
 
 
@@ -147,3 +150,82 @@ class TestLiteSpiderOnStartOnClose:
     async def test_on_close_default_noop(self):
         spider = FetchErrorSpider()
         await spider.on_close()
+
+
+class BloomDedupSpider(LiteSpider):
+    """Spider using the bloom dedup backend with a snapshot file."""
+
+    def __init__(self, snapshot_path: str):
+        super().__init__()
+        self._snapshot_path = snapshot_path
+        self.fetched: list[str] = []
+
+    @property
+    def dedup_backend(self) -> str:
+        return DedupBackendEnum.BLOOM.value
+
+    @property
+    def dedup_snapshot_path(self) -> str | None:
+        return self._snapshot_path
+
+    async def start_requests(self):
+        yield Request("https://example.com/dup")
+        yield Request("https://example.com/dup")
+
+    async def parse(self, response: Response):
+        self.fetched.append(response.url)
+
+
+class TestLiteCrawlerBloomDedup:
+    """Test LiteCrawler bloom dedup backend and snapshot restore."""
+
+    @pytest.mark.asyncio
+    async def test_bloom_dedup_and_snapshot_restore(self, tmp_path):
+        snapshot_path = str(tmp_path / "seen.bloom")
+        spider = BloomDedupSpider(snapshot_path)
+        req = Request("https://example.com/dup")
+        resp = Response(url="https://example.com/dup", headers={}, body=b"", status=200, request=req)
+
+        with patch.object(spider, "fetch", AsyncMock(return_value=resp)):
+            crawler = LiteCrawler(spider)
+            assert crawler._seen_filter is not None
+            await crawler.crawl()
+
+        assert spider.fetched == ["https://example.com/dup"]
+        assert crawler.stats["dropped"] == 1
+
+        # 重启后从快照恢复，已抓取过的请求全部被丢弃
+        restarted_spider = BloomDedupSpider(snapshot_path)
+        with patch.object(restarted_spider, "fetch", AsyncMock(return_value=resp)):
+            restarted_crawler = LiteCrawler(restarted_spider)
+            await restarted_crawler.crawl()
+
+        assert restarted_spider.fetched == []
+        assert restarted_crawler.stats["dropped"] == 2
+
+    @pytest.mark.asyncio
+    async def test_snapshot_saves_pending_requests(self, tmp_path):
+        snapshot_path = tmp_path / "seen.bloom"
+        pending_path = tmp_path / "seen.bloom.pending"
+        spider = BloomDedupSpider(str(snapshot_path))
+        crawler = LiteCrawler(spider)
+        queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+
+        # 停止时已入队未处理的请求和快照一起保存
+        pending = Request("https://example.com/next", callback=spider.parse, meta={"page": 2})
+        assert await crawler._enqueue(pending, queue)
+        crawler._dump_seen_filter()
+        assert snapshot_path.exists()
+        assert pending_path.exists()
+
+        # 重启后未处理的请求直接入队，不会因指纹已在快照中被丢弃
+        restarted_spider = BloomDedupSpider(str(snapshot_path))
+        resp = Response(url="https://example.com/next", headers={}, body=b"", status=200, request=pending)
+        with patch.object(restarted_spider, "fetch", AsyncMock(return_value=resp)) as fetch:
+            restarted_crawler = LiteCrawler(restarted_spider)
+            await restarted_crawler.crawl()
+
+        fetched = [call.args[0] for call in fetch.await_args_list]
+        assert [request.url for request in fetched] == ["https://example.com/next", "https://example.com/dup"]
+        assert fetched[0].meta["page"] == 2
+        assert not pending_path.exists()
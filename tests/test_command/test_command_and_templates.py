@@ -3,7 +3,7 @@ Tests for CodeGenerate, maize_command CLI, and code templates.
 """
 
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 import click
 import pytest
@@ -14,6 +14,7 @@ from maize.command.code_generate import CodeGenerate
 from maize.command.code_template.item_template import ItemTemplate
 from maize.command.code_template.spider_template import SpiderTemplate
 from maize.command.maize_command import cli
+from maize.common.model.pipeline_model import PipelineProcessResult
 
 
 class TestCodeGenerateClassName:
@@ -116,6 +117,19 @@ class TestMaizeCommandCli:
             assert result.exit_code == 0
             assert "成功" in result.output
 
+    def test_replay_command(self, tmp_path: Path):
+        runner = CliRunner()
+        process_result = PipelineProcessResult(success_count=3, fail_count=1)
+        with patch(
+            "maize.command.maize_command.replay_dead_letters", AsyncMock(return_value=process_result)
+        ) as mock_replay:
+            result = runner.invoke(cli, ["replay", str(tmp_path), "--batch-size", "100"])
+
+        assert result.exit_code == 0
+        assert "成功: 3" in result.output
+        assert mock_replay.call_args.args[0] == str(tmp_path)
+        assert mock_replay.call_args.args[2] == 100
+
 
 class TestCodeTemplates:
     """Test that code template files are valid and loadable."""
@@ -8,6 +8,7 @@ import pytest
 from aiohttp import ClientResponse, ClientSession
 
 from maize.aio.classic.downloader.aiohttp_downloader import AioHttpDownloader
+from maize.common.constant import DnsResolverEnum
 from maize.common.constant.request_constant import Method
 from maize.common.http.request import Request
 from maize.common.model.download_response_model import DownloadResponse
@@ -113,5 +114,74 @@ class TestAioHttpDownloaderDownloadNoSession:
         await dl.close()
 
 
+class TestAioHttpDownloaderProxySessions:
+    """Test AioHttpDownloader per-proxy sessions and connector settings."""
+
+    @pytest.mark.asyncio
+    async def test_proxy_sessions_reused_and_evicted(self):
+        crawler = _make_crawler(use_session=True)
+        crawler.settings.request.max_sessions = 1
+        dl = AioHttpDownloader(crawler)
+        await dl.open()
+        dl.send_request = AsyncMock(return_value=_make_mock_response())
+
+        for request in (
+            Request("https://example.com/1", proxy="http://proxy-a:8080"),
+            Request("https://example.com/2", proxy="http://proxy-a:8080"),
+            Request("https://example.com/3", proxy="http://proxy-b:8080", proxy_username="u", proxy_password="p"),
+            Request("https://example.com/4"),
+        ):
+            assert isinstance(await dl.download(request), DownloadResponse)
+
+        sessions = [call.args[0] for call in dl.send_request.call_args_list]
+        assert sessions[0] is sessions[1]
+        assert sessions[2] is not sessions[0]
+        assert sessions[3] is dl.session
+        # 超出 max_sessions 时关闭最久未使用的空闲 session
+        assert sessions[0].closed
+        assert len(dl.proxy_sessions) == 1
+
+        await dl.close()
+        assert sessions[2].closed
+
+    @pytest.mark.asyncio
+    async def test_proxy_sessions_share_cookie_jar(self):
+        dl = AioHttpDownloader(_make_crawler(use_session=True))
+        await dl.open()
+        dl.send_request = AsyncMock(return_value=_make_mock_response())
+
+        await dl.download(Request("https://example.com/1", proxy="http://proxy-a:8080"))
+        await dl.download(Request("https://example.com/2", proxy="http://proxy-b:8080"))
+
+        # 轮换代理时 cookie 在默认 session 和各代理 session 之间共享
+        sessions = [call.args[0] for call in dl.send_request.call_args_list]
+        assert sessions[0] is not sessions[1]
+        assert sessions[0].cookie_jar is dl.session.cookie_jar
+        assert sessions[1].cookie_jar is dl.session.cookie_jar
+        await dl.close()
+
+    @pytest.mark.asyncio
+    async def test_connector_settings(self):
+        crawler = _make_crawler(use_session=True)
+        crawler.settings.request.max_connections = 20
+        crawler.settings.request.limit_per_host = 5
+        dl = AioHttpDownloader(crawler)
+        await dl.open()
+        assert dl.connector.limit == 20
+        assert dl.connector.limit_per_host == 5
+        await dl.close()
+
+    @pytest.mark.asyncio
+    async def test_async_resolver_requires_aiodns(self):
+        crawler = _make_crawler()
+        crawler.settings.request.dns_resolver = DnsResolverEnum.ASYNC.value
+        dl = AioHttpDownloader(crawler)
+        with (
+            patch("maize.aio.classic.downloader.aiohttp_downloader.importlib.util.find_spec", return_value=None),
+            pytest.raises(ImportError),
+        ):
+            await dl.open()
+
+
 # Import patch at top
 from unittest.mock import patch  # noqa: E402
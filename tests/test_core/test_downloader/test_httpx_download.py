@@ -27,6 +27,7 @@ def _make_mock_httpx_response(status=200, body=b"<html>ok</html>"):
     resp.headers = {"Content-Type": "text/html"}
     resp.status_code = status
     resp.aread = AsyncMock(return_value=body)
+    resp.next_request = None
     return resp
 
 
@@ -45,6 +46,7 @@ class TestHTTPXDownloaderDownload:
         mock_client.request = AsyncMock(return_value=mock_resp)
         mock_client.__aenter__ = AsyncMock(return_value=mock_client)
         mock_client.__aexit__ = AsyncMock(return_value=None)
+        mock_client.aclose = AsyncMock()
 
         with patch("maize.aio.classic.downloader.httpx_downloader.httpx.AsyncClient", return_value=mock_client):
             req = Request("https://example.com", method=Method.GET)
@@ -65,6 +67,7 @@ class TestHTTPXDownloaderDownload:
         mock_client.request = AsyncMock(side_effect=httpx.ConnectError("refused"))
         mock_client.__aenter__ = AsyncMock(return_value=mock_client)
         mock_client.__aexit__ = AsyncMock(return_value=None)
+        mock_client.aclose = AsyncMock()
 
         with patch("maize.aio.classic.downloader.httpx_downloader.httpx.AsyncClient", return_value=mock_client):
             req = Request("https://example.com", method=Method.GET)
@@ -85,6 +88,7 @@ class TestHTTPXDownloaderDownload:
         mock_client.request = AsyncMock(side_effect=httpx.ConnectError("refused"))
         mock_client.__aenter__ = AsyncMock(return_value=mock_client)
         mock_client.__aexit__ = AsyncMock(return_value=None)
+        mock_client.aclose = AsyncMock()
 
         with patch("maize.aio.classic.downloader.httpx_downloader.httpx.AsyncClient", return_value=mock_client):
             req = Request("https://example.com", method=Method.GET)
@@ -94,3 +98,97 @@ class TestHTTPXDownloaderDownload:
         assert isinstance(result, Request)
         assert result.current_retry_count == 1
         await dl.close()
+
+
+def _make_mock_client():
+    client = MagicMock()
+    client.request = AsyncMock(return_value=_make_mock_httpx_response())
+    client.__aenter__ = AsyncMock(return_value=client)
+    client.__aexit__ = AsyncMock(return_value=None)
+    client.aclose = AsyncMock()
+    return client
+
+
+class TestHTTPXDownloaderClientPool:
+    """Test HTTPXDownloader client reuse."""
+
+    @pytest.mark.asyncio
+    async def test_clients_reused_per_proxy(self):
+        crawler = _make_crawler()
+        crawler.settings.request.max_connections = 10
+        dl = HTTPXDownloader(crawler)
+        await dl.open()
+
+        with patch(
+            "maize.aio.classic.downloader.httpx_downloader.httpx.AsyncClient",
+            side_effect=lambda **_: _make_mock_client(),
+        ) as client_cls:
+            for request in (
+                Request("https://example.com/1"),
+                Request("https://example.com/2"),
+                Request("https://example.com/3", proxy="proxy:8080", proxy_username="u", proxy_password="p"),
+                Request("https://example.com/4", proxy="proxy:8080", proxy_username="u", proxy_password="p"),
+            ):
+                assert isinstance(await dl.download(request), DownloadResponse)
+
+        assert client_cls.call_count == 2
+        assert client_cls.call_args_list[0].kwargs["limits"].max_connections == 10
+        assert client_cls.call_args_list[1].kwargs["proxy"].auth == ("u", "p")
+        clients = list(dl.clients._sessions.values())
+        await dl.close()
+        for client in clients:
+            client.aclose.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_pooled_client_keeps_redirect_cookies_per_request(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/login":
+                return httpx.Response(302, headers={"Location": "/home", "Set-Cookie": "sid=1; Path=/"})
+            return httpx.Response(200, text=request.headers.get("Cookie", ""))
+
+        async_client = httpx.AsyncClient
+        dl = HTTPXDownloader(_make_crawler())
+        await dl.open()
+        with patch(
+            "maize.aio.classic.downloader.httpx_downloader.httpx.AsyncClient",
+            side_effect=lambda **kwargs: async_client(transport=httpx.MockTransport(handler), **kwargs),
+        ):
+            login = await dl.download(Request("https://example.com/login", cookies={"a": "1"}))
+            home = await dl.download(Request("https://example.com/home"))
+            too_many = await dl.download(Request("https://example.com/login", max_redirects=0))
+
+        # 重定向中设置的 cookie 带到重定向后的请求，但不会泄漏到同一客户端的其他请求
+        assert sorted(login.response.body.decode().split("; ")) == ["a=1", "sid=1"]
+        assert len(login.response.source_response.history) == 1
+        assert home.response.body == b""
+        assert too_many.response is None
+        await dl.close()
+
+    @pytest.mark.asyncio
+    async def test_client_per_request_without_session(self):
+        crawler = _make_crawler()
+        crawler.settings.request.use_session = False
+        dl = HTTPXDownloader(crawler)
+        await dl.open()
+        assert dl.clients is None
+
+        with patch(
+            "maize.aio.classic.downloader.httpx_downloader.httpx.AsyncClient",
+            side_effect=lambda **_: _make_mock_client(),
+        ) as client_cls:
+            await dl.download(Request("https://example.com/1"))
+            await dl.download(Request("https://example.com/2"))
+
+        assert client_cls.call_count == 2
+        await dl.close()
+
+    @pytest.mark.asyncio
+    async def test_http2_requires_h2(self):
+        crawler = _make_crawler()
+        crawler.settings.request.http2 = True
+        dl = HTTPXDownloader(crawler)
+        with (
+            patch("maize.aio.classic.downloader.httpx_downloader.importlib.util.find_spec", return_value=None),
+            pytest.raises(ImportError),
+        ):
+            await dl.open()
@@ -0,0 +1,195 @@
+"""
+Tests for streaming downloads against a local aiohttp server.
+"""
+
+import hashlib
+import socket
+from unittest.mock import MagicMock
+
+import pytest
+from aiohttp import web
+
+from maize.aio.classic.downloader.aiohttp_downloader import AioHttpDownloader
+from maize.aio.classic.downloader.httpx_downloader import HTTPXDownloader
+from maize.base.downloader.stream_writer import StreamWriter
+from maize.common.http.request import Request
+from maize.common.http.response import Response
+from maize.settings import SpiderSettings
+
+CONTENT = bytes(range(256)) * 1024
+
+
+@pytest.fixture
+async def file_server(tmp_path):
+    file_path = tmp_path / "content.bin"
+    file_path.write_bytes(CONTENT)
+
+    async def chunked_handler(request: web.Request) -> web.StreamResponse:
+        # 不带 Content-Length，只能在读取过程中判断大小
+        response = web.StreamResponse()
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        for i in range(0, len(CONTENT), 4096):
+            await response.write(CONTENT[i : i + 4096])
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/file", lambda _: web.FileResponse(file_path))
+    app.router.add_get("/chunked", chunked_handler)
+    app.router.add_get("/error", lambda _: web.Response(status=503, body=b"service unavailable"))
+    runner = web.AppRunner(app)
+    await runner.setup()
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    yield f"http://127.0.0.1:{port}"
+    await runner.cleanup()
+
+
+async def _open_downloader(downloader_cls, tmp_path, **stream_settings):
+    crawler = MagicMock()
+    crawler.settings = SpiderSettings()
+    crawler.settings.stream.directory = str(tmp_path / "downloads")
+    for key, value in stream_settings.items():
+        setattr(crawler.settings.stream, key, value)
+    crawler.spider = "TestSpider"
+    downloader = downloader_cls(crawler)
+    await downloader.open()
+    return downloader
+
+
+@pytest.mark.parametrize("downloader_cls", [AioHttpDownloader, HTTPXDownloader])
+class TestStreamDownload:
+    @pytest.mark.asyncio
+    async def test_stream_to_file(self, downloader_cls, file_server, tmp_path):
+        downloader = await _open_downloader(downloader_cls, tmp_path, chunk_size=10_000)
+        request = Request(f"{file_server}/file", meta={"stream": True})
+        result = await downloader.download(request)
+        await downloader.close()
+
+        response = result.response
+        assert response.status == 200
+        assert response.path == request.meta["stream_path"]
+        assert response.path.startswith(str(tmp_path / "downloads"))
+        assert response.body_hash == hashlib.sha256(CONTENT).hexdigest()
+        assert response.body == CONTENT
+        body = response.mmap_body()
+        assert body[:256] == bytes(range(256))
+        body.close()
+
+    @pytest.mark.asyncio
+    async def test_resume_with_range(self, downloader_cls, file_server, tmp_path):
+        path = tmp_path / "partial.bin"
+        path.write_bytes(CONTENT[:1000])
+        downloader = await _open_downloader(downloader_cls, tmp_path)
+        request = Request(f"{file_server}/file", meta={"stream": True, "stream_path": str(path)})
+        result = await downloader.download(request)
+        await downloader.close()
+
+        assert result.response.status == 200
+        assert result.response.body_hash == hashlib.sha256(CONTENT).hexdigest()
+        assert path.read_bytes() == CONTENT
+
+    @pytest.mark.asyncio
+    async def test_error_status_is_not_written(self, downloader_cls, file_server, tmp_path):
+        path = tmp_path / "partial.bin"
+        path.write_bytes(CONTENT[:1000])
+        downloader = await _open_downloader(downloader_cls, tmp_path)
+        request = Request(f"{file_server}/error", meta={"stream": True, "stream_path": str(path)})
+        result = await downloader.download(request)
+        await downloader.close()
+
+        # 错误响应不写入文件，已有的部分被删除，重试时重新下载
+        assert result.response.status == 503
+        assert result.response.path is None
+        assert not path.exists()
+
+    @pytest.mark.asyncio
+    async def test_completed_file_is_not_downloaded_again(self, downloader_cls, file_server, tmp_path):
+        path = tmp_path / "complete.bin"
+        path.write_bytes(CONTENT)
+        downloader = await _open_downloader(downloader_cls, tmp_path)
+        result = await downloader.download(
+            Request(f"{file_server}/file", meta={"stream": True, "stream_path": str(path)})
+        )
+        await downloader.close()
+
+        # 续传范围超出文件大小时服务端返回 416，已有文件即为完整内容
+        assert result.response.status == 200
+        assert result.response.body_hash == hashlib.sha256(CONTENT).hexdigest()
+
+    @pytest.mark.asyncio
+    async def test_changed_file_is_downloaded_again(self, downloader_cls, file_server, tmp_path):
+        path = tmp_path / "partial.bin"
+        path.write_bytes(b"stale content")
+        downloader = await _open_downloader(downloader_cls, tmp_path)
+        # 上次下载时的 Last-Modified 早于服务端文件的修改时间，If-Range 不匹配时返回完整内容
+        meta = {"stream": True, "stream_path": str(path), "stream_validator": "Wed, 01 Jan 2020 00:00:00 GMT"}
+        request = Request(f"{file_server}/file", meta=meta)
+        result = await downloader.download(request)
+        await downloader.close()
+
+        assert result.response.status == 200
+        assert path.read_bytes() == CONTENT
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("url_path", ["/file", "/chunked"])
+    async def test_max_body_size(self, downloader_cls, file_server, tmp_path, url_path):
+        downloader = await _open_downloader(downloader_cls, tmp_path, max_body_size=len(CONTENT) // 2)
+        request = Request(f"{file_server}{url_path}", meta={"stream": True})
+        result = await downloader.download(request)
+        await downloader.close()
+
+        assert result.response is None
+        assert "max_body_size" in result.reason
+        # 超出大小时删除已写入的部分，不重试
+        assert request.current_retry_count == 0
+        assert not (tmp_path / "downloads").exists() or not any((tmp_path / "downloads").iterdir())
+
+    @pytest.mark.asyncio
+    async def test_stream_to_sink(self, downloader_cls, file_server, tmp_path):
+        chunks = []
+
+        class Sink:
+            async def write(self, chunk: bytes):
+                chunks.append(chunk)
+
+        downloader = await _open_downloader(downloader_cls, tmp_path)
+        request = Request(f"{file_server}/file", meta={"stream": True, "stream_sink": Sink()})
+        result = await downloader.download(request)
+        await downloader.close()
+
+        assert result.response.path is None
+        assert result.response.body_hash == hashlib.sha256(CONTENT).hexdigest()
+        assert b"".join(chunks) == CONTENT
+
+
+class TestStreamResponse:
+    def test_mmap_body_of_empty_file(self, tmp_path):
+        path = tmp_path / "empty.bin"
+        path.write_bytes(b"")
+        response = Response("https://example.com", headers={}, request=Request("https://example.com"), path=str(path))
+        assert response.mmap_body() == b""
+        assert response.body == b""
+
+    def test_mmap_body_without_path(self):
+        request = Request("https://example.com")
+        response = Response("https://example.com", headers={}, request=request, body=b"body")
+        assert response.mmap_body() == b"body"
+
+
+class TestStreamWriter:
+    @pytest.mark.parametrize(("partial", "accept_encoding"), [(False, "gzip, deflate"), (True, "identity")])
+    def test_prepare_headers_accept_encoding(self, tmp_path, partial, accept_encoding):
+        path = tmp_path / "partial.bin"
+        if partial:
+            path.write_bytes(CONTENT[:1000])
+        request = Request("https://example.com", meta={"stream": True, "stream_path": str(path)})
+        writer = StreamWriter(request, SpiderSettings().stream)
+
+        # DefaultHeadersMiddleware 等设置了压缩时，续传仍然要求服务端返回原始内容
+        headers = writer.prepare_headers({"accept-encoding": "gzip, deflate"})
+        assert [value for key, value in headers.items() if key.lower() == "accept-encoding"] == [accept_encoding]
+        assert ("Range" in headers) == partial
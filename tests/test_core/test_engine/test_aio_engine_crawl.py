@@ -11,6 +11,7 @@ from maize.common.http.request import Request
 from maize.common.http.response import Response
 from maize.common.items import Item
 from maize.core.engine.aio_engine import AioEngine
+from maize.dupefilters import MemoryDupeFilter
 from maize.settings import SpiderSettings
 
 
@@ -271,3 +272,31 @@ class TestProcessRequestMiddleware:
         req = Request("https://example.com")
         result = await engine._process_request_middleware(req)
         assert result is None
+
+
+class TestEnqueueRequestDupeFilter:
+    """Cover enqueue_request dupefilter stage."""
+
+    @pytest.mark.asyncio
+    async def test_duplicate_request_dropped(self):
+        engine = _make_engine()
+        engine.dupefilter = MemoryDupeFilter(engine.settings)
+        engine.spider.stats_collector.record_dupefilter_dropped = AsyncMock()
+
+        await engine.enqueue_request(Request("https://example.com"))
+        await engine.enqueue_request(Request("https://example.com"))
+
+        engine.scheduler.enqueue_request.assert_called_once()
+        engine.spider.stats_collector.record_dupefilter_dropped.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_dont_filter_meta_and_retry_bypass(self):
+        engine = _make_engine()
+        engine.dupefilter = MemoryDupeFilter(engine.settings)
+        req = Request("https://example.com")
+
+        await engine.enqueue_request(req)
+        await engine.enqueue_request(Request("https://example.com", meta={"dont_filter": True}))
+        await engine.enqueue_request(req, dont_filter=True)
+
+        assert engine.scheduler.enqueue_request.call_count == 3
@@ -2,13 +2,17 @@
 Tests for AioEngine fetch/download/middleware/handle paths.
 """
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
 from maize.common.http.request import Request
 from maize.common.http.response import Response
+from maize.common.model.download_response_model import DownloadResponse
 from maize.core.engine.aio_engine import AioEngine
+from maize.core.task.auto_throttle import AutoThrottle
+from maize.core.task.task_manager import TaskManager
 from maize.settings import SpiderSettings
 
 
@@ -24,6 +28,7 @@ def _make_engine():
     engine.spider.stats_collector.record_parse_fail = AsyncMock()
     engine.scheduler = MagicMock()
     engine.scheduler.enqueue_request = AsyncMock()
+    engine.scheduler.close = AsyncMock()
     engine.downloader = MagicMock()
     engine.processor = MagicMock()
     engine.processor.enqueue = AsyncMock()
@@ -223,6 +228,50 @@ class TestAioEngineHandleErrorResponse:
         engine.spider.stats_collector.record_parse_fail.assert_called_once()
 
 
+class TestAioEngineAutoThrottle:
+    """Test AioEngine._record_autothrottle."""
+
+    @pytest.mark.asyncio
+    async def test_backoff_status_shrinks_concurrency_and_records_stats(self):
+        engine = _make_engine()
+        engine.spider.stats_collector.record_autothrottle = AsyncMock()
+        engine.task_manager = TaskManager(8)
+        engine.settings.concurrency = 8
+        engine.settings.autothrottle.start_concurrency = 8
+        engine.autothrottle = AutoThrottle(engine.settings, engine.task_manager)
+        engine.scheduler.throttle = None
+
+        req = Request("https://example.com")
+        resp = Response(url="https://example.com", headers={}, request=req, status=503, text="")
+        download_result = DownloadResponse(response=resp)
+        await engine._record_autothrottle(req, 0.0, download_result)
+
+        assert engine.task_manager.concurrency == 4
+        engine.spider.stats_collector.record_autothrottle.assert_called_once_with(4, -4)
+
+    @pytest.mark.asyncio
+    async def test_uses_downloader_latency(self):
+        engine = _make_engine()
+        engine.task_manager = TaskManager(8)
+        engine.autothrottle = AutoThrottle(engine.settings, engine.task_manager)
+        engine.scheduler.throttle = None
+
+        req = Request("https://example.com")
+        resp = Response(url="https://example.com", headers={}, request=req, status=200, text="")
+        # 开始时间包含了随机等待，使用下载器记录的网络请求耗时
+        start_time = asyncio.get_running_loop().time() - 100
+        await engine._record_autothrottle(req, start_time, DownloadResponse(response=resp, latency=0.1))
+
+        assert engine.autothrottle.controller.latency == 0.1
+
+    @pytest.mark.asyncio
+    async def test_disabled_is_noop(self):
+        engine = _make_engine()
+        req = Request("https://example.com")
+        await engine._record_autothrottle(req, 0.0, None)
+        assert engine.autothrottle is None
+
+
 class TestAioEngineCloseSpider:
     """Test AioEngine.close_spider."""
 
@@ -241,3 +290,4 @@ class TestAioEngineCloseSpider:
         engine.spider_middleware_manager.close.assert_called_once()
         engine.downloader.close.assert_called_once()
         engine.processor.close.assert_called_once()
+        engine.scheduler.close.assert_called_once()
@@ -3,12 +3,12 @@ Tests for AioEngine redis paths, crawl loop with task_spider,
 _crawl_start_requests exception/idle paths, _get_next_request distributed path.
 """
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from maize.common.http.request import Request
-from maize.common.http.response import Response
 from maize.core.engine.aio_engine import AioEngine
 from maize.settings import SpiderSettings
 
@@ -46,82 +46,92 @@ class TestEngineRedisPaths:
 
     @pytest.mark.asyncio
     async def test_enqueue_request_with_redis(self):
-        """enqueue_request stores to redis when __redis_util is set."""
+        """enqueue_request records the request in redis without waiting."""
         engine = _make_engine()
         # Access private attr via name mangling
-        engine._AioEngine__redis_util = MagicMock()
-        engine._AioEngine__redis_util.set = AsyncMock()
-        engine._AioEngine__redis_key_queue = "queue"
+        engine._AioEngine__redis_tracker = MagicMock()
         req = Request("https://example.com")
         await engine.enqueue_request(req)
-        engine._AioEngine__redis_util.set.assert_called_once()
+        engine._AioEngine__redis_tracker.enqueue.assert_called_once_with(req)
         engine.scheduler.enqueue_request.assert_called_once_with(req)
 
     @pytest.mark.asyncio
     async def test_get_next_request_with_redis(self):
-        """_get_next_request sets running key and deletes queue key when redis is active."""
+        """_get_next_request claims the request in one redis call."""
         engine = _make_engine()
         engine.crawler.spider.gte_priority = None
         req = Request("https://example.com")
         engine.scheduler.next_request = AsyncMock(return_value=req)
-        engine._AioEngine__redis_util = MagicMock()
-        engine._AioEngine__redis_util.set = AsyncMock()
-        engine._AioEngine__redis_util.delete = AsyncMock()
-        engine._AioEngine__redis_key_running = "running"
-        engine._AioEngine__redis_key_queue = "queue"
+        engine._AioEngine__redis_tracker = MagicMock()
+        engine._AioEngine__redis_tracker.claim = AsyncMock(return_value=True)
 
         result = await engine._get_next_request()
         assert result is req
-        engine._AioEngine__redis_util.set.assert_called_once()
-        engine._AioEngine__redis_util.delete.assert_called_once()
+        engine._AioEngine__redis_tracker.claim.assert_awaited_once_with(req)
 
     @pytest.mark.asyncio
     async def test_get_next_request_distributed_lock_fails(self):
-        """When distributed lock fails, _get_next_request returns None."""
+        """When the request lock is held elsewhere, _get_next_request returns None."""
         engine = _make_engine()
         engine.crawler.spider.gte_priority = None
         req = Request("https://example.com")
         engine.scheduler.next_request = AsyncMock(return_value=req)
         engine.is_distributed = True
-        engine._AioEngine__redis_util = MagicMock()
-        engine._AioEngine__redis_util.nx_set = AsyncMock(return_value=False)
-        engine._AioEngine__redis_key_distributed_lock = "lock"
+        engine._AioEngine__redis_tracker = MagicMock()
+        engine._AioEngine__redis_tracker.claim = AsyncMock(return_value=False)
 
         result = await engine._get_next_request()
         assert result is None
+        engine.scheduler.release.assert_called_once_with(req)
 
-    @pytest.mark.asyncio
-    async def test_get_next_request_distributed_lock_succeeds(self):
-        """When distributed lock succeeds, request is returned."""
-        engine = _make_engine()
-        engine.crawler.spider.gte_priority = None
-        req = Request("https://example.com")
-        engine.scheduler.next_request = AsyncMock(return_value=req)
-        engine.is_distributed = True
-        engine._AioEngine__redis_util = MagicMock()
-        engine._AioEngine__redis_util.nx_set = AsyncMock(return_value=True)
-        engine._AioEngine__redis_util.set = AsyncMock()
-        engine._AioEngine__redis_util.delete = AsyncMock()
-        engine._AioEngine__redis_key_distributed_lock = "lock"
-        engine._AioEngine__redis_key_running = "running"
-        engine._AioEngine__redis_key_queue = "queue"
-
-        result = await engine._get_next_request()
-        assert result is req
-
-    def test_init_redis(self):
+    @pytest.mark.parametrize(("is_distributed", "lock_ttl"), [(False, 0), (True, 600)])
+    def test_init_redis(self, is_distributed, lock_ttl):
         """Cover __init_redis when redis is enabled."""
         engine = _make_engine()
         engine.settings.redis.use_redis = True
+        engine.is_distributed = is_distributed
         engine.spider = MagicMock()
         engine.spider.__class__.__name__ = "TestSpider"
 
         with patch("maize.core.engine.aio_engine.RedisUtil") as mock_redis_cls:
-            mock_redis = MagicMock()
-            mock_redis_cls.return_value = mock_redis
             engine._AioEngine__init_redis()
             mock_redis_cls.assert_called_once()
 
+        tracker = engine._AioEngine__redis_tracker
+        assert tracker.key_queue == "maize:test_spider:queue"
+        assert tracker.key_running == "maize:test_spider:running"
+        assert tracker.key_lock == "maize:test_spider:lock"
+        assert tracker.lock_ttl == lock_ttl
+
+    def test_init_redis_frontier(self):
+        """The shared frontier replaces the per-request lock in distributed mode."""
+        engine = _make_engine()
+        engine.settings.scheduler.use_redis_frontier = True
+        engine.settings.scheduler.prefetch_size = 20
+        engine.is_distributed = True
+        engine.spider = MagicMock()
+        engine.spider.__class__.__name__ = "TestSpider"
+
+        with patch("maize.core.engine.aio_engine.RedisUtil"):
+            engine._AioEngine__init_redis()
+
+        frontier = engine._AioEngine__redis_frontier
+        assert frontier.key == "maize:test_spider:frontier"
+        assert frontier.prefetch_size == 20
+        assert frontier.spider is engine.spider
+        assert engine._AioEngine__redis_tracker.lock_ttl == 0
+
+    @pytest.mark.asyncio
+    async def test_enqueue_request_with_redis_frontier(self):
+        """Requests in the shared frontier are not mirrored to the queue hash."""
+        engine = _make_engine()
+        engine._AioEngine__redis_tracker = MagicMock()
+        engine._AioEngine__redis_frontier = MagicMock()
+        req = Request("https://example.com")
+        await engine.enqueue_request(req)
+        engine._AioEngine__redis_tracker.enqueue.assert_not_called()
+        engine.scheduler.enqueue_request.assert_called_once_with(req)
+
     def test_get_redis_key(self):
         """Cover __get_redis_key."""
         engine = _make_engine()
@@ -243,39 +253,159 @@ class TestCrawlStartRequestsEdgeCases:
         assert engine.start_requests_running is False
 
 
-class TestHandleSuccessRedisDelete:
-    """Cover _handle_success_response redis delete path."""
+class TestCrawlTaskRedisFinish:
+    """Cover the redis finish path after a request is processed."""
+
+    @staticmethod
+    async def _run_crawl_task(engine, req):
+        await engine._crawl(req)
+        await engine.task_manager.create_task.call_args.args[0]
 
     @pytest.mark.asyncio
-    async def test_redis_delete_after_callback(self):
-        """When __redis_util is set, redis delete is called after callback."""
+    async def test_finish_after_outputs_handled(self):
+        """The request is removed from running after its outputs are handled."""
         engine = _make_engine()
-        engine.spider_middleware_manager = None
-        engine.spider.parse = MagicMock(return_value=None)
-        engine._AioEngine__redis_util = MagicMock()
-        engine._AioEngine__redis_util.delete = AsyncMock()
-        engine._AioEngine__redis_key_running = "running"
+        engine._AioEngine__redis_tracker = MagicMock()
+        calls = []
+        engine._fetch = AsyncMock(return_value=["output"])
+        engine._handle_spider_output = AsyncMock(side_effect=lambda _: calls.append("outputs"))
+        engine._AioEngine__redis_tracker.finish.side_effect = lambda _: calls.append("finish")
+
+        req = Request("https://example.com")
+        await self._run_crawl_task(engine, req)
+        assert calls == ["outputs", "finish"]
+        engine._AioEngine__redis_tracker.finish.assert_called_once_with(req)
+
+    @pytest.mark.asyncio
+    async def test_finish_when_fetch_fails(self):
+        """The request is removed from running even if fetching raises."""
+        engine = _make_engine()
+        engine._AioEngine__redis_tracker = MagicMock()
+        engine._fetch = AsyncMock(side_effect=RuntimeError("boom"))
+
+        req = Request("https://example.com")
+        with pytest.raises(RuntimeError):
+            await self._run_crawl_task(engine, req)
+        engine._AioEngine__redis_tracker.finish.assert_called_once_with(req)
+        engine.scheduler.release.assert_called_once_with(req)
+
+    @pytest.mark.asyncio
+    async def test_ack_frontier(self):
+        """The shared frontier lease is released after the request is processed."""
+        engine = _make_engine()
+        engine._AioEngine__redis_frontier = MagicMock()
+        engine._fetch = AsyncMock(return_value=None)
 
         req = Request("https://example.com")
-        resp = Response(url="https://example.com", headers={}, request=req, status=200, text="ok")
-        await engine._handle_success_response(resp, req)
-        engine._AioEngine__redis_util.delete.assert_called_once()
+        await self._run_crawl_task(engine, req)
+        engine._AioEngine__redis_frontier.ack.assert_called_once_with(req)
+
+
+class _Spider:
+    async def parse(self, response):
+        pass
 
 
-class TestHandleErrorRedisDelete:
-    """Cover _handle_error_response redis delete path."""
+class TestEngineLeases:
+    """Cover lease restore and maintenance."""
+
+    def test_init_redis_lease(self):
+        engine = _make_engine()
+        engine.settings.redis.use_redis = True
+        engine.settings.redis.node_id = "node-a"
+        engine.settings.redis.lease_ttl = 60
+        engine.spider = MagicMock()
+        engine.spider.__class__.__name__ = "TestSpider"
+
+        with patch("maize.core.engine.aio_engine.RedisUtil"):
+            engine._AioEngine__init_redis()
+
+        tracker = engine._AioEngine__redis_tracker
+        assert tracker.node_id == "node-a"
+        assert tracker.lease_ttl == 60
+        assert tracker.key_leases == "maize:test_spider:running:leases"
+
+    def test_init_redis_lease_with_frontier(self):
+        """The frontier owns the lease; node id defaults to the hostname and pid."""
+        engine = _make_engine()
+        engine.settings.redis.use_redis = True
+        engine.settings.redis.lease_ttl = 60
+        engine.settings.scheduler.use_redis_frontier = True
+        engine.spider = MagicMock()
+        engine.spider.__class__.__name__ = "TestSpider"
+
+        with (
+            patch("maize.core.engine.aio_engine.RedisUtil"),
+            patch("maize.core.engine.aio_engine.socket.gethostname", return_value="host-1"),
+            patch("maize.core.engine.aio_engine.os.getpid", return_value=123),
+        ):
+            engine._AioEngine__init_redis()
+
+        assert engine._AioEngine__redis_frontier.lease_ttl == 60
+        assert engine._AioEngine__redis_frontier.node_id == "host-1-123"
+        assert engine._AioEngine__redis_tracker.lease_ttl == 0
 
     @pytest.mark.asyncio
-    async def test_redis_delete_after_error_callback(self):
-        """When __redis_util is set, redis delete is called after error callback."""
+    @pytest.mark.parametrize(("is_distributed", "include_queue"), [(False, True), (True, False)])
+    async def test_restore_requests(self, is_distributed, include_queue):
         engine = _make_engine()
-        engine._AioEngine__redis_util = MagicMock()
-        engine._AioEngine__redis_util.delete = AsyncMock()
-        engine._AioEngine__redis_key_running = "running"
+        engine.is_distributed = is_distributed
+        engine.spider = _Spider()
+        engine._AioEngine__redis_tracker = MagicMock()
+        rows = [
+            Request("https://example.com/1", callback=engine.spider.parse).to_dict(),
+            {"url": "https://example.com/2", "method": "GET", "callback": "<lambda>"},
+        ]
+        engine._AioEngine__redis_tracker.restore = AsyncMock(return_value=rows)
+        engine.enqueue_request = AsyncMock()
+
+        await engine._restore_requests()
+        engine._AioEngine__redis_tracker.restore.assert_awaited_once_with(include_queue=include_queue)
+        engine.enqueue_request.assert_awaited_once()
+        request = engine.enqueue_request.await_args.args[0]
+        assert request.url == "https://example.com/1"
+        assert request.callback == engine.spider.parse
+        assert engine.enqueue_request.await_args.kwargs == {"dont_filter": True}
 
-        def err_cb(request):
-            return None
+    @pytest.mark.asyncio
+    async def test_restore_requests_frontier(self):
+        engine = _make_engine()
+        engine._AioEngine__redis_frontier = MagicMock()
+        engine._AioEngine__redis_frontier.restore = AsyncMock(return_value=2)
+        await engine._restore_requests()
+        engine._AioEngine__redis_frontier.restore.assert_awaited_once()
 
-        req = Request("https://example.com", error_callback=err_cb)
-        await engine._handle_error_response(req)
-        engine._AioEngine__redis_util.delete.assert_called_once()
+    @pytest.mark.asyncio
+    async def test_maintain_leases(self):
+        engine = _make_engine()
+        engine.spider = _Spider()
+        tracker = engine._AioEngine__redis_tracker = MagicMock()
+        tracker.heartbeat = AsyncMock(return_value=1)
+        tracker.reap = AsyncMock(return_value=[Request("https://example.com").to_dict()])
+        frontier = engine._AioEngine__redis_frontier = MagicMock()
+        frontier.heartbeat = AsyncMock(return_value=1)
+        frontier.reap = AsyncMock(return_value=3)
+        engine.enqueue_request = AsyncMock()
+
+        task = asyncio.create_task(engine._maintain_leases(0))
+        while not engine.enqueue_request.await_count:
+            await asyncio.sleep(0)
+        task.cancel()
+
+        tracker.heartbeat.assert_awaited()
+        frontier.heartbeat.assert_awaited()
+        engine.scheduler.notify.assert_called()
+        assert engine.enqueue_request.await_args.args[0].url == "https://example.com"
+
+    @pytest.mark.asyncio
+    async def test_maintain_leases_survives_errors(self):
+        engine = _make_engine()
+        tracker = engine._AioEngine__redis_tracker = MagicMock()
+        tracker.heartbeat = AsyncMock(side_effect=[ConnectionError("down"), 0])
+        tracker.reap = AsyncMock(return_value=[])
+
+        task = asyncio.create_task(engine._maintain_leases(0))
+        while tracker.heartbeat.await_count < 2:
+            await asyncio.sleep(0)
+        task.cancel()
+        tracker.reap.assert_awaited_once()
@@ -0,0 +1,297 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from maize import Field, Item
+from maize.common.http.request import Request
+from maize.core.engine.aio_engine import AioEngine
+from maize.core.engine.job_checkpoint import JobCheckpoint
+from maize.core.stats.stats_collector import StatsCollector
+from maize.dupefilters import MemoryDupeFilter
+from maize.settings import SpiderSettings
+from maize.settings.spider_settings import CheckpointSettings
+
+
+class _Spider:
+    __spider_type__ = "spider"
+
+    async def parse(self, response):
+        pass
+
+
+class _Item(Item):
+    title: str = Field(default="")
+
+
+async def _open(path, **kwargs) -> JobCheckpoint:
+    settings = CheckpointSettings(job_dir=str(path), flush_interval=3600, **kwargs)
+    checkpoint = JobCheckpoint(path, settings)
+    await checkpoint.open()
+    return checkpoint
+
+
+async def _kill(checkpoint: JobCheckpoint):
+    """写入缓冲区后直接丢弃，模拟进程被杀"""
+    await checkpoint.flush()
+    checkpoint._flush_task.cancel()
+
+
+class TestJobCheckpoint:
+    @pytest.mark.asyncio
+    async def test_resume_unfinished_requests(self, tmp_path):
+        spider = _Spider()
+        checkpoint = await _open(tmp_path)
+        done = Request("https://example.com/done", callback=spider.parse)
+        queued = Request("https://example.com/queued", callback=spider.parse, priority=2)
+        output = Request("https://example.com/output", callback=spider.parse)
+        for request in (done, queued):
+            checkpoint.enqueue(request)
+        checkpoint.finish(checkpoint.claim(done))
+        # 爬虫产出后还在 Processor 队列中的请求
+        checkpoint.record_output(output)
+        await _kill(checkpoint)
+
+        resumed = await _open(tmp_path)
+        urls = {row["url"]: row for _, row in resumed.recovered_requests}
+        assert set(urls) == {"https://example.com/queued", "https://example.com/output"}
+        request = Request.from_dict(urls["https://example.com/queued"], spider)
+        assert request.priority == 2
+        assert request.callback == spider.parse
+        await resumed.close()
+
+    @pytest.mark.asyncio
+    async def test_output_enqueued_once(self, tmp_path):
+        checkpoint = await _open(tmp_path)
+        request = Request("https://example.com")
+        checkpoint.record_output(request)
+        checkpoint.enqueue(request)
+        assert checkpoint.pending_count == 1
+
+        record_id = checkpoint.claim(request)
+        assert record_id is not None
+        assert checkpoint.claim(request) is None
+        checkpoint.finish(record_id)
+        await _kill(checkpoint)
+
+        resumed = await _open(tmp_path)
+        assert resumed.recovered_requests == []
+        await resumed.close()
+
+    @pytest.mark.asyncio
+    async def test_duplicate_requests_claimed_by_hash(self, tmp_path):
+        """排队中的请求被溢写后重新创建，按 hash 取出编号"""
+        checkpoint = await _open(tmp_path)
+        checkpoint.enqueue(Request("https://example.com"))
+        checkpoint.enqueue(Request("https://example.com"))
+        first = checkpoint.claim(Request("https://example.com"))
+        second = checkpoint.claim(Request("https://example.com"))
+        assert first != second
+        assert checkpoint.pending_count == 0
+        await checkpoint.close()
+
+    @pytest.mark.asyncio
+    async def test_dropped_output_is_done(self, tmp_path):
+        checkpoint = await _open(tmp_path)
+        request = Request("https://example.com")
+        checkpoint.record_output(request)
+        checkpoint.drop(request)
+        await _kill(checkpoint)
+
+        resumed = await _open(tmp_path)
+        assert resumed.recovered_requests == []
+        await resumed.close()
+
+    @pytest.mark.asyncio
+    async def test_unserializable_request_is_skipped(self, tmp_path):
+        checkpoint = await _open(tmp_path)
+        request = Request("https://example.com", callback=lambda _: None)
+        checkpoint.record_output(request)
+        checkpoint.enqueue(request)
+        assert checkpoint.pending_count == 0
+        assert checkpoint.claim(request) is None
+        await checkpoint.close()
+
+    @pytest.mark.asyncio
+    async def test_resume_pending_items(self, tmp_path):
+        checkpoint = await _open(tmp_path)
+        saved, pending, replaced = _Item(title="saved"), _Item(title="pending"), _Item(title="old")
+        for item in (saved, pending, replaced):
+            checkpoint.record_output(item)
+        new = _Item(title="new")
+        checkpoint.replace_item(replaced, new)
+        checkpoint.finish_items([saved, new])
+        await _kill(checkpoint)
+
+        resumed = await _open(tmp_path)
+        assert len(resumed.recovered_items) == 1
+        _, item_path, data = resumed.recovered_items[0]
+        assert item_path == f"{__name__}._Item"
+        assert _Item.model_validate(data).title == "pending"
+        await resumed.close()
+
+    @pytest.mark.asyncio
+    async def test_compaction(self, tmp_path):
+        checkpoint = await _open(tmp_path, compact_threshold=2)
+        requests = [Request(f"https://example.com/{i}") for i in range(4)]
+        for request in requests:
+            checkpoint.enqueue(request)
+        checkpoint.finish(checkpoint.claim(requests[0]))
+        checkpoint.mark_start_requests_done()
+        await checkpoint.flush()
+        upto = checkpoint._rotate()
+        await checkpoint._run_compact(upto)
+
+        assert (tmp_path / JobCheckpoint.SNAPSHOT_NAME).exists()
+        assert checkpoint._segments() == []
+
+        # 压缩后继续写入新的分段
+        checkpoint.finish(checkpoint.claim(requests[1]))
+        checkpoint.enqueue(Request("https://example.com/new"))
+        await _kill(checkpoint)
+
+        resumed = await _open(tmp_path)
+        assert resumed.start_requests_done
+        assert sorted(row["url"] for _, row in resumed.recovered_requests) == [
+            "https://example.com/2",
+            "https://example.com/3",
+            "https://example.com/new",
+        ]
+        record_ids = [record_id for record_id, _ in resumed.recovered_requests]
+        assert len(set(record_ids)) == 3
+        # 新的记录编号不与恢复的记录重复
+        assert resumed._new_id() > max(record_ids)
+        await resumed.close()
+
+    @pytest.mark.asyncio
+    async def test_close_compacts(self, tmp_path):
+        checkpoint = await _open(tmp_path)
+        checkpoint.enqueue(Request("https://example.com"))
+        await checkpoint.close()
+        assert checkpoint._segments() == []
+
+        resumed = await _open(tmp_path)
+        assert [row["url"] for _, row in resumed.recovered_requests] == ["https://example.com"]
+        await resumed.close()
+
+    @pytest.mark.asyncio
+    async def test_truncated_line_is_ignored(self, tmp_path):
+        checkpoint = await _open(tmp_path)
+        checkpoint.enqueue(Request("https://example.com"))
+        await _kill(checkpoint)
+        with checkpoint._segment_path(checkpoint._segment).open("a", encoding="utf-8") as f:
+            f.write('{"op": "done", "ids": [')
+
+        resumed = await _open(tmp_path)
+        assert len(resumed.recovered_requests) == 1
+        await resumed.close()
+
+    @pytest.mark.asyncio
+    async def test_fingerprints(self, tmp_path):
+        checkpoint = await _open(tmp_path)
+        fingerprints = [Request(f"https://example.com/{i}").fingerprint for i in range(3)]
+        for fingerprint in fingerprints:
+            checkpoint.add_fingerprint(fingerprint)
+        await _kill(checkpoint)
+
+        resumed = await _open(tmp_path)
+        assert list(resumed.load_fingerprints()) == fingerprints
+        await resumed.close()
+
+    @pytest.mark.asyncio
+    async def test_stats(self, tmp_path):
+        stats_collector = StatsCollector("spider")
+        await stats_collector.open()
+        await stats_collector.record_parse_success()
+        checkpoint = JobCheckpoint(tmp_path, CheckpointSettings(flush_interval=3600), stats_collector)
+        await checkpoint.open()
+        await _kill(checkpoint)
+
+        resumed = await _open(tmp_path)
+        restored = StatsCollector("spider")
+        await restored.open()
+        restored.restore(resumed.recovered_stats)
+        assert restored._start_time == stats_collector._start_time
+        assert sum(stats.parse_success_count for stats in restored._stats.values()) == 1
+
+        # 正常关闭后统计由统计收集器上报，不再保留
+        await resumed.close()
+        assert not (tmp_path / JobCheckpoint.STATS_NAME).exists()
+
+
+class TestEngineCheckpoint:
+    def _make_engine(self, checkpoint: JobCheckpoint) -> AioEngine:
+        crawler = MagicMock()
+        crawler.settings = SpiderSettings()
+        engine = AioEngine(crawler)
+        engine.spider = _Spider()
+        engine.checkpoint = checkpoint
+        engine.scheduler = MagicMock()
+        engine.scheduler.enqueue_request = AsyncMock()
+        engine.processor = MagicMock()
+        engine.processor.enqueue = AsyncMock()
+        return engine
+
+    @pytest.mark.asyncio
+    async def test_restore_checkpoint(self, tmp_path):
+        spider = _Spider()
+        checkpoint = await _open(tmp_path)
+        checkpoint.enqueue(Request("https://example.com", callback=spider.parse))
+        checkpoint.record_output(Request("https://example.com/output", callback=spider.parse))
+        checkpoint.record_output(_Item(title="pending"))
+        checkpoint.mark_start_requests_done()
+        await _kill(checkpoint)
+
+        # 上次运行的请求回调已不存在
+        rows = (tmp_path / "journal.00000001.log").read_text(encoding="utf-8")
+        (tmp_path / "journal.00000001.log").write_text(rows.replace('"parse"', '"missing"', 1), encoding="utf-8")
+
+        resumed = await _open(tmp_path)
+        engine = self._make_engine(resumed)
+        engine.start_requests = AsyncMock()
+        await engine._restore_checkpoint()
+
+        engine.start_requests.aclose.assert_awaited_once()
+        engine.scheduler.enqueue_request.assert_awaited_once()
+        request = engine.scheduler.enqueue_request.await_args.args[0]
+        assert request.url == "https://example.com/output"
+        assert engine.processor.enqueue.await_args.args[0].title == "pending"
+        # 恢复的请求沿用原来的记录，不会重复写入
+        assert resumed._buffer == ['{"op": "done", "ids": [1]}']
+        assert resumed.claim(request) == 2
+        await resumed.close()
+
+    @pytest.mark.asyncio
+    async def test_request_lifecycle(self, tmp_path):
+        checkpoint = await _open(tmp_path)
+        engine = self._make_engine(checkpoint)
+        engine.task_manager = MagicMock()
+        engine.task_manager.semaphore.acquire = AsyncMock()
+        request = Request("https://example.com")
+
+        await engine.enqueue_request(request)
+        assert checkpoint.pending_count == 1
+        await engine._crawl(request)
+        assert checkpoint.pending_count == 0
+
+        engine._fetch = AsyncMock(return_value=None)
+        await engine.task_manager.create_task.call_args.args[0]
+        assert checkpoint._buffer[-1] == '{"op": "done", "ids": [1]}'
+        await checkpoint.close()
+
+    @pytest.mark.asyncio
+    async def test_dupefilter_state(self, tmp_path):
+        checkpoint = await _open(tmp_path)
+        engine = self._make_engine(checkpoint)
+        engine.dupefilter = MemoryDupeFilter(engine.settings)
+        engine.spider.stats_collector = MagicMock()
+        engine.spider.stats_collector.record_dupefilter_dropped = AsyncMock()
+
+        first = Request("https://example.com")
+        await engine.enqueue_request(first)
+        duplicate = Request("https://example.com")
+        checkpoint.record_output(duplicate)
+        await engine.enqueue_request(duplicate)
+
+        assert checkpoint._fingerprints == [first.fingerprint]
+        assert checkpoint.pending_count == 1
+        await checkpoint.close()
@@ -0,0 +1,160 @@
+"""
+Tests for RedisRequestTracker
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import ujson
+
+from maize.common.http.request import Request
+from maize.core.engine.redis_request_tracker import CLAIM_SCRIPT, RedisRequestTracker
+
+
+def _tracker(lock_ttl=0, lease_ttl=0):
+    redis_util = MagicMock()
+    redis_util.open = AsyncMock()
+    redis_util.close = AsyncMock()
+    tracker = RedisRequestTracker(
+        redis_util,
+        key_queue="queue",
+        key_running="running",
+        key_lock="lock",
+        lock_ttl=lock_ttl,
+        node_id="node-a",
+        lease_ttl=lease_ttl,
+    )
+    tracker.batcher = MagicMock()
+    tracker.batcher.open = AsyncMock()
+    tracker.batcher.close = AsyncMock()
+    tracker.batcher.call_script = AsyncMock(return_value=1)
+    return tracker
+
+
+class TestRedisRequestTracker:
+    def test_register_claim_script(self):
+        tracker = _tracker()
+        tracker.redis_util.register_script.assert_any_call(CLAIM_SCRIPT)
+
+    def test_enqueue(self):
+        tracker = _tracker()
+        request = Request("https://example.com")
+        tracker.enqueue(request)
+        tracker.batcher.send.assert_called_once_with("hset", "queue", request.hash, ujson.dumps(request.to_dict()))
+
+    def test_enqueue_unserializable_request(self):
+        tracker = _tracker()
+        request = Request("https://example.com", callback=lambda _: None)
+        tracker.enqueue(request)
+        assert tracker.batcher.send.call_args.args[3] == ujson.dumps({**request.model_dump, "restorable": False})
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(("lock_ttl", "lease_ttl"), [(0, 0), (600, 0), (0, 60)])
+    async def test_claim(self, lock_ttl, lease_ttl):
+        tracker = _tracker(lock_ttl, lease_ttl)
+        request = Request("https://example.com")
+        assert await tracker.claim(request) is True
+        tracker.batcher.call_script.assert_awaited_once_with(
+            tracker._claim_script,
+            keys=["queue", "running", f"lock:{request.hash}", "running:leases", "running:owners"],
+            args=[request.hash, ujson.dumps(request.to_dict()), lock_ttl, lease_ttl, "node-a"],
+        )
+        assert tracker._leased == ({request.hash} if lease_ttl else set())
+
+    @pytest.mark.asyncio
+    async def test_claim_lock_held(self):
+        tracker = _tracker(600)
+        tracker.batcher.call_script.return_value = 0
+        assert await tracker.claim(Request("https://example.com")) is False
+
+    def test_finish(self):
+        tracker = _tracker()
+        request = Request("https://example.com")
+        tracker.finish(request)
+        tracker.batcher.send.assert_called_once_with("hdel", "running", request.hash)
+
+    @pytest.mark.asyncio
+    async def test_finish_with_lease(self):
+        tracker = _tracker(lease_ttl=60)
+        request = Request("https://example.com")
+        await tracker.claim(request)
+        tracker.finish(request)
+        assert [c.args for c in tracker.batcher.send.call_args_list] == [
+            ("hdel", "running", request.hash),
+            ("zrem", "running:leases", request.hash),
+            ("hdel", "running:owners", request.hash),
+        ]
+        assert tracker._leased == set()
+
+    @pytest.mark.asyncio
+    async def test_finish_deletes_lock(self):
+        tracker = _tracker(lock_ttl=600)
+        request = Request("https://example.com")
+        await tracker.claim(request)
+        tracker.finish(request)
+        assert [c.args for c in tracker.batcher.send.call_args_list] == [
+            ("hdel", "running", request.hash),
+            ("delete", f"lock:{request.hash}"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_finish_keeps_lock_for_claimed_retry(self):
+        tracker = _tracker(lock_ttl=600)
+        request = Request("https://example.com")
+        retry_request = Request("https://example.com")
+        await tracker.claim(request)
+        # 重试的请求在原请求完成前被本节点取出
+        await tracker.claim(retry_request)
+
+        tracker.finish(request)
+        tracker.batcher.send.assert_not_called()
+        tracker.finish(retry_request)
+        assert ("delete", f"lock:{request.hash}") in [c.args for c in tracker.batcher.send.call_args_list]
+
+    @pytest.mark.asyncio
+    async def test_heartbeat(self):
+        tracker = _tracker(lease_ttl=60)
+        tracker.batcher.call_script.return_value = 1
+        request = Request("https://example.com")
+        await tracker.claim(request)
+        assert await tracker.heartbeat() == 1
+        tracker.batcher.call_script.assert_awaited_with(
+            tracker._heartbeat_script, keys=["running:leases", "running:owners"], args=[60, "node-a", request.hash]
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(("lock_ttl", "lock_prefix"), [(0, ""), (600, "lock")])
+    async def test_reap(self, lock_ttl, lock_prefix):
+        tracker = _tracker(lock_ttl, 60)
+        row = Request("https://example.com").to_dict()
+        tracker.batcher.call_script.return_value = [1, ujson.dumps(row)]
+        assert await tracker.reap(limit=10) == [row]
+        tracker.batcher.call_script.assert_awaited_once_with(
+            tracker._reap_script,
+            keys=["running:leases", "running:owners", "running"],
+            args=[10, lock_prefix],
+        )
+
+    @pytest.mark.asyncio
+    async def test_restore(self):
+        tracker = _tracker(lease_ttl=60)
+        rows = [Request(f"https://example.com/{i}").to_dict() for i in range(3)]
+        tracker.batcher.call_script.side_effect = [
+            [2, ujson.dumps(rows[0]), ujson.dumps(rows[1])],
+            [0],
+        ]
+        tracker.batcher.call = AsyncMock(return_value={"hash": ujson.dumps(rows[2])})
+
+        assert await tracker.restore(limit=2, include_queue=True) == rows
+        assert tracker.batcher.call_script.await_count == 2
+        assert tracker.batcher.call_script.await_args.kwargs["args"] == [2, "", "node-a"]
+        tracker.batcher.call.assert_awaited_once_with("hgetall", "queue")
+
+    @pytest.mark.asyncio
+    async def test_open_close(self):
+        tracker = _tracker()
+        await tracker.open()
+        await tracker.close()
+        tracker.batcher.open.assert_awaited_once()
+        tracker.batcher.close.assert_awaited_once()
+        tracker.redis_util.close.assert_awaited_once()
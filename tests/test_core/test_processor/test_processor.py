@@ -2,7 +2,7 @@
 Tests for Processor
 """
 
-from asyncio import QueueEmpty
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -10,6 +10,7 @@ import pytest
 from maize.common.http.request import Request
 from maize.common.items import Item
 from maize.core.processor.processor import Processor
+from maize.settings.spider_settings import PipelineSettings
 
 
 class TestProcessor:
@@ -21,6 +22,7 @@ class TestProcessor:
         crawler.settings = MagicMock()
         crawler.settings.middleware = MagicMock()
         crawler.settings.middleware.pipeline_middlewares = {}
+        crawler.settings.pipeline = PipelineSettings(processor_queue_size=2)
         crawler.spider = MagicMock()
         crawler.spider.stats_collector = MagicMock()
         crawler.spider.stats_collector.record_pipeline_success = AsyncMock()
@@ -47,6 +49,11 @@ class TestProcessor:
 
         processor.pipeline_middleware_manager.open.assert_called_once()
         processor.pipeline_scheduler.open.assert_called_once()
+        assert len(processor._consumers) == processor.concurrency
+
+        for consumer in processor._consumers:
+            consumer.cancel()
+        await asyncio.gather(*processor._consumers, return_exceptions=True)
 
     @pytest.mark.asyncio
     async def test_close(self, processor, mock_crawler):
@@ -72,15 +79,14 @@ class TestProcessor:
         processor.queue = MagicMock()
         processor.queue.put = AsyncMock()
         processor.process = AsyncMock()
-        processor.crawler.engine = MagicMock()
-        processor.crawler.engine.enqueue_request = AsyncMock()
 
         request = Request(url="https://example.com")
 
         await processor.enqueue(request)
 
         processor.queue.put.assert_called_once_with(request)
-        processor.process.assert_called_once()
+        # 由消费者异步处理，enqueue 不再同步处理
+        processor.process.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_enqueue_item(self, processor, mock_crawler):
@@ -94,7 +100,7 @@ class TestProcessor:
         await processor.enqueue(item)
 
         processor.queue.put.assert_called_once_with(item)
-        processor.process.assert_called_once()
+        processor.process.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_idle_when_empty(self, processor):
@@ -131,15 +137,10 @@ class TestProcessor:
         process_result.fail_count = 0
         processor.pipeline_scheduler.process = AsyncMock(return_value=process_result)
 
-        # Set queue with an item
         item = Item()
-        processor.queue = MagicMock()
-        processor.queue.get = AsyncMock(side_effect=[item, QueueEmpty()])
-        processor.queue.qsize = MagicMock(side_effect=[1, 0])
-
         processor.logger = MagicMock()
 
-        await processor.process()
+        await processor.process(item)
 
         processor.pipeline_middleware_manager.process_item_before.assert_called_once()
         processor.pipeline_scheduler.process.assert_called_once()
@@ -153,16 +154,12 @@ class TestProcessor:
         processor.pipeline_middleware_manager = MagicMock()
 
         request = Request(url="https://example.com")
-        processor.queue = MagicMock()
-        processor.queue.get = AsyncMock(side_effect=[request, QueueEmpty()])
-        processor.queue.qsize = MagicMock(side_effect=[1, 0])
-
         processor.crawler.engine = MagicMock()
         processor.crawler.engine.enqueue_request = AsyncMock()
 
         processor.logger = MagicMock()
 
-        await processor.process()
+        await processor.process(request)
 
         processor.crawler.engine.enqueue_request.assert_called_once_with(request)
         processor.pipeline_middleware_manager.process_item_before.assert_not_called()
@@ -175,14 +172,75 @@ class TestProcessor:
         processor.pipeline_middleware_manager.process_item_before = AsyncMock(return_value=None)
 
         item = Item()
-        processor.queue = MagicMock()
-        processor.queue.get = AsyncMock(side_effect=[item, QueueEmpty()])
-        processor.queue.qsize = MagicMock(side_effect=[1, 0])
-
         processor.logger = MagicMock()
 
-        await processor.process()
+        await processor.process(item)
 
         processor.pipeline_middleware_manager.process_item_before.assert_called_once()
         processor.pipeline_scheduler.process.assert_not_called()
         processor.logger.debug.assert_called()
+
+    @pytest.mark.asyncio
+    async def test_consumer_processes_in_background(self, processor, mock_crawler):
+        """Consumers drain the queue, keep idle() false while busy and notify the scheduler"""
+        processor.pipeline_middleware_manager = MagicMock()
+        processor.pipeline_middleware_manager.open = AsyncMock()
+        processor.pipeline_middleware_manager.close = AsyncMock()
+        processor.pipeline_scheduler.open = AsyncMock()
+        processor.pipeline_scheduler.close = AsyncMock(return_value=MagicMock(success_count=0, fail_count=0))
+        mock_crawler.engine = MagicMock()
+
+        release = asyncio.Event()
+
+        async def slow_process(result):
+            await release.wait()
+
+        processor.process = slow_process
+        await processor.open()
+
+        await processor.enqueue(Request(url="https://example.com/1"))
+        await asyncio.sleep(0)
+        assert len(processor) == 0
+        assert processor.idle() is False
+
+        release.set()
+        await asyncio.sleep(0)
+        assert processor.idle() is True
+        mock_crawler.engine.scheduler.notify.assert_called()
+        await processor.close()
+        assert processor._consumers == []
+
+    @pytest.mark.asyncio
+    async def test_enqueue_blocks_when_queue_full(self, processor):
+        """enqueue waits when the bounded queue is full"""
+        await processor.enqueue(Item())
+        await processor.enqueue(Item())
+
+        blocked = asyncio.create_task(processor.enqueue(Item()))
+        await asyncio.sleep(0)
+        assert not blocked.done()
+
+        processor.queue.get_nowait()
+        await asyncio.sleep(0)
+        assert blocked.done()
+
+    @pytest.mark.asyncio
+    async def test_consumer_survives_errors(self, processor, mock_crawler):
+        """An exception while processing is logged and the consumer keeps running"""
+        processor.pipeline_middleware_manager = MagicMock()
+        processor.pipeline_middleware_manager.open = AsyncMock()
+        processor.pipeline_scheduler.open = AsyncMock()
+        processor.logger = MagicMock()
+        mock_crawler.engine = MagicMock()
+        processor.process = AsyncMock(side_effect=[RuntimeError("boom"), None])
+        await processor.open()
+
+        await processor.enqueue(Item())
+        await processor.enqueue(Item())
+        await processor.queue.join()
+
+        processor.logger.error.assert_called_once()
+        assert processor.process.await_count == 2
+        for consumer in processor._consumers:
+            consumer.cancel()
+        await asyncio.gather(*processor._consumers, return_exceptions=True)
@@ -0,0 +1,103 @@
+"""
+Tests for request fingerprints and URL canonicalization.
+"""
+
+from maize import Request
+from maize.common.constant import Method
+from maize.common.http.fingerprint import canonicalize_url, compute_fingerprint, request_fingerprint
+
+
+class TestCanonicalizeUrl:
+    """Test canonicalize_url."""
+
+    def test_sorts_query(self):
+        assert canonicalize_url("https://example.com/a?b=2&a=1") == "https://example.com/a?a=1&b=2"
+
+    def test_normalizes_scheme_host_and_default_port(self):
+        assert canonicalize_url("HTTPS://Example.COM:443/Path") == "https://example.com/Path"
+        assert canonicalize_url("http://example.com:80") == "http://example.com/"
+
+    def test_keeps_non_default_port(self):
+        assert canonicalize_url("http://example.com:8080/a") == "http://example.com:8080/a"
+
+    def test_removes_fragment(self):
+        assert canonicalize_url("https://example.com/a#top") == "https://example.com/a"
+
+    def test_keeps_raw_query_pairs(self):
+        assert canonicalize_url("https://example.com/?b&a=&&c=%20") == "https://example.com/?a=&b&c=%20"
+
+    def test_quotes_params(self):
+        assert canonicalize_url("https://example.com", {"q": "a b/c"}) == "https://example.com/?q=a+b%2Fc"
+
+    def test_merges_params(self):
+        assert canonicalize_url("https://example.com/?b=2", {"a": 1, "c": [3, 2]}) == (
+            "https://example.com/?a=1&b=2&c=2&c=3"
+        )
+
+    def test_ipv6_host(self):
+        assert canonicalize_url("http://[::1]:80/a") == "http://[::1]/a"
+
+
+class TestRequestFingerprint:
+    """Test Request.fingerprint."""
+
+    def test_fingerprint_is_16_bytes(self):
+        fingerprint = Request("https://example.com").fingerprint
+        assert isinstance(fingerprint, bytes)
+        assert len(fingerprint) == 16
+
+    def test_hash_is_fingerprint_hex(self):
+        request = Request("https://example.com")
+        assert request.hash == request.fingerprint.hex()
+
+    def test_equivalent_urls_share_fingerprint(self):
+        a = Request("https://Example.com:443/list?page=1&size=20#top")
+        b = Request("https://example.com/list?size=20&page=1")
+        assert a.fingerprint == b.fingerprint
+
+    def test_params_and_query_equivalent(self):
+        a = Request("https://example.com/list?page=1")
+        b = Request("https://example.com/list", params={"page": 1})
+        assert a.fingerprint == b.fingerprint
+
+    def test_header_order_ignored(self):
+        a = Request("https://example.com", headers={"A": "1", "B": "2"})
+        b = Request("https://example.com", headers={"b": "2", "a": "1"})
+        assert a.fingerprint == b.fingerprint
+
+    def test_json_key_order_ignored(self):
+        a = Request("https://example.com", method=Method.POST, json={"a": 1, "b": 2})
+        b = Request("https://example.com", method=Method.POST, json={"b": 2, "a": 1})
+        assert a.fingerprint == b.fingerprint
+
+    def test_include_headers(self):
+        a = Request("https://example.com", headers={"X-Token": "a", "Accept": "json"})
+        b = Request("https://example.com", headers={"X-Token": "b", "Accept": "json"})
+        assert request_fingerprint(a, ["accept"]) == request_fingerprint(b, ["Accept"])
+        assert request_fingerprint(a, ["x-token"]) != request_fingerprint(b, ["x-token"])
+        assert request_fingerprint(a, []) == request_fingerprint(Request("https://example.com"), [])
+
+    def test_memoized(self):
+        request = Request("https://example.com")
+        fingerprint = request.fingerprint
+        assert request.fingerprint is fingerprint
+        assert request._fingerprint == fingerprint
+
+    def test_include_headers_memoized_separately(self):
+        request = Request("https://example.com", headers={"A": "1"})
+        fingerprint = request_fingerprint(request, ["A"])
+        assert request._fingerprint is None
+        assert request._fingerprint_cache == {("a",): fingerprint}
+        assert request_fingerprint(request, ["a"]) is fingerprint
+
+    def test_invalidated_on_assignment(self):
+        request = Request("https://example.com/a")
+        fingerprint = request.fingerprint
+
+        request.url = "https://example.com/b"
+        assert request.fingerprint != fingerprint
+        assert request.fingerprint == compute_fingerprint(request)
+
+        fingerprint = request.fingerprint
+        request.headers = {"X-Token": "a"}
+        assert request.fingerprint != fingerprint
@@ -74,6 +74,36 @@ class TestRequestBasics:
         assert "x" not in b.meta
 
 
+class TestRequestSlots:
+    """Test the slotted Request layout."""
+
+    def test_no_instance_dict(self):
+        request = Request("https://example.com")
+        assert not hasattr(request, "__dict__")
+        with pytest.raises(AttributeError):
+            request.unknown_attribute = 1
+
+    def test_meta_allocated_lazily(self):
+        request = Request("https://example.com")
+        assert request._meta is None
+        assert request.get_meta("depth", 0) == 0
+        assert request._meta is None
+
+        request.meta["depth"] = 1
+        assert request.get_meta("depth") == 1
+        assert request.meta is request.meta
+
+    def test_meta_passed_in_is_kept(self):
+        meta = {"a": 1}
+        request = Request("https://example.com", meta=meta)
+        assert request.meta is meta
+
+    def test_method_string_shared(self):
+        a = Request("https://example.com/a", method=Method.POST)
+        b = Request("https://example.com/b", method=Method.POST)
+        assert a.method is b.method is Method.POST.value
+
+
 class TestRequestRetry:
     """Test retry counting."""
 
@@ -149,7 +179,7 @@ class TestRequestHash:
         req = Request("https://example.com")
         h = req.hash
         assert isinstance(h, str)
-        assert len(h) == 32  # md5 hex digest
+        assert len(h) == 32  # 16-byte fingerprint as hex
 
 
 class TestRequestModelDump:
@@ -188,6 +218,74 @@ class TestRequestModelDump:
         assert req.model_dump["callback"] is None
 
 
+class _CallbackSpider:
+    async def parse_detail(self, response):
+        pass
+
+    async def on_error(self, request):
+        pass
+
+
+class TestRequestToDict:
+    """Test Request.to_dict / Request.from_dict."""
+
+    def test_round_trip_resolves_callbacks_by_name(self):
+        spider = _CallbackSpider()
+        req = Request(
+            "https://example.com",
+            method=Method.POST,
+            callback=spider.parse_detail,
+            error_callback=spider.on_error,
+            priority=3,
+            headers={"X-Test": "1"},
+            json={"k": "v"},
+            meta={"depth": 2},
+        )
+        req.retry()
+
+        data = req.to_dict()
+        assert data["callback"] == "parse_detail"
+        assert data["error_callback"] == "on_error"
+
+        restored = Request.from_dict(data, spider)
+        assert restored.url == req.url
+        assert restored.method == "POST"
+        assert restored.callback == spider.parse_detail
+        assert restored.error_callback == spider.on_error
+        assert restored.priority == 3
+        assert restored.meta == {"depth": 2}
+        assert restored.current_retry_count == 1
+        assert restored.hash == req.hash
+
+    def test_to_dict_rejects_plain_function_callback(self):
+        req = Request("https://example.com", callback=lambda _response: None)
+        with pytest.raises(ValueError):
+            req.to_dict()
+
+    def test_to_dict_rejects_callback_not_resolvable_from_spider(self):
+        spider = _CallbackSpider()
+        req = Request("https://example.com", callback=_CallbackSpider().parse_detail)
+        with pytest.raises(ValueError):
+            req.to_dict(spider)
+
+        class _Other:
+            async def parse_other(self, response):
+                pass
+
+        req = Request("https://example.com", callback=_Other().parse_other)
+        with pytest.raises(ValueError):
+            req.to_dict(spider)
+        assert req.to_dict()["callback"] == "parse_other"
+
+        req = Request("https://example.com", callback=spider.parse_detail)
+        assert req.to_dict(spider)["callback"] == "parse_detail"
+
+    def test_from_dict_requires_spider_for_callback(self):
+        data = Request("https://example.com", callback=_CallbackSpider().parse_detail).to_dict()
+        with pytest.raises(ValueError):
+            Request.from_dict(data)
+
+
 class TestRequestGetHeaders:
     """Test Request.get_headers."""
 
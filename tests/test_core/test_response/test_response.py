@@ -460,3 +460,93 @@ class TestResponse:
             status=200,
         )
         assert response.text == "héllo"
+
+
+class TestResponseSelector:
+    """Response 直接从 bytes 解析，以及 css / re / jmespath"""
+
+    @pytest.fixture
+    def mock_request(self):
+        request = MagicMock(spec=Request)
+        request.url = "https://example.com"
+        request.encoding = "utf-8"
+        return request
+
+    def test_selector_parses_body_without_decoding_text(self, mock_request):
+        response = Response(
+            url="https://example.com",
+            headers={},
+            request=mock_request,
+            body="<html><body><p>中文</p></body></html>".encode(),
+        )
+        assert response.xpath("//p/text()").get() == "中文"
+        assert response._text_cache == ""
+
+    def test_selector_uses_header_charset(self, mock_request):
+        response = Response(
+            url="https://example.com",
+            headers={"Content-Type": "text/html; charset=gbk"},
+            request=mock_request,
+            body="<html><body><p>中文</p></body></html>".encode("gbk"),
+        )
+        assert response.xpath("//p/text()").get() == "中文"
+
+    def test_selector_uses_meta_charset(self, mock_request):
+        response = Response(
+            url="https://example.com",
+            headers={},
+            request=mock_request,
+            body='<html><head><meta charset="gb2312"></head><body><p>中文</p></body></html>'.encode("gbk"),
+        )
+        assert response._get_body_encoding() == "gb18030"
+        assert response.css("p::text").get() == "中文"
+
+    def test_selector_prefers_explicit_request_encoding(self, mock_request):
+        mock_request.encoding = "gbk"
+        response = Response(
+            url="https://example.com",
+            headers={"Content-Type": "text/html; charset=utf-8"},
+            request=mock_request,
+            body="<p>中文</p>".encode("gbk"),
+        )
+        assert response._get_body_encoding() == "gbk"
+        assert response.xpath("//p/text()").get() == "中文"
+
+    def test_selector_unknown_encoding_falls_back_to_text(self, mock_request):
+        response = Response(
+            url="https://example.com",
+            headers={"Content-Type": "text/html; charset=unknown-charset"},
+            request=mock_request,
+            body=b"<p>test</p>",
+        )
+        assert response.xpath("//p/text()").get() == "test"
+
+    def test_selector_shared_by_accessors(self, mock_request):
+        response = Response(
+            url="https://example.com",
+            headers={},
+            request=mock_request,
+            body=b'<html><body><a class="next" href="/page/2">next</a></body></html>',
+        )
+        assert response.css("a.next::attr(href)").get() == "/page/2"
+        selector = response.selector
+        assert response.xpath("//a[@href=$href]/text()", href="/page/2").get() == "next"
+        assert response.selector is selector
+
+    def test_re(self, mock_request):
+        response = Response(
+            url="https://example.com",
+            headers={},
+            request=mock_request,
+            body=b'<a href="/item/1">1</a><a href="/item/2">2</a>',
+        )
+        assert response.re(r"/item/(\d+)") == ["1", "2"]
+
+    def test_jmespath(self, mock_request):
+        response = Response(
+            url="https://example.com",
+            headers={},
+            request=mock_request,
+            body=b'{"data": {"items": [{"id": 1}, {"id": 2}]}}',
+        )
+        assert response.jmespath("data.items[*].id").getall() == [1, 2]
@@ -0,0 +1,48 @@
+"""
+Tests for the cached Selector
+"""
+
+import pytest
+
+from maize.common.http.selector import Selector, compile_xpath, css_to_xpath
+
+
+class TestSelector:
+    def test_compile_xpath_cached(self):
+        assert compile_xpath("//div/span/text()") is compile_xpath("//div/span/text()")
+
+    def test_compile_xpath_ignores_unused_namespaces(self):
+        assert compile_xpath("//p", {"ns": "http://example.com/ns"}) is compile_xpath("//p")
+
+    def test_compile_xpath_exslt_not_cached(self):
+        namespaces = {"re": "http://exslt.org/regular-expressions"}
+        query = '//p[re:test(text(), "\\d+")]'
+        assert compile_xpath(query, namespaces) is not compile_xpath(query, namespaces)
+
+    def test_css_to_xpath_cached(self):
+        css_to_xpath.cache_clear()
+        css_to_xpath("div.item > a::attr(href)")
+        css_to_xpath("div.item > a::attr(href)")
+        assert css_to_xpath.cache_info().hits == 1
+
+    def test_xpath_and_css(self):
+        selector = Selector('<div class="item"><a href="/1">one</a></div><div class="item"><a href="/2">two</a></div>')
+        items = selector.css("div.item")
+        assert [type(item) for item in items] == [Selector, Selector]
+        assert [item.xpath("./a/text()").get() for item in items] == ["one", "two"]
+        assert selector.css("a::attr(href)").getall() == ["/1", "/2"]
+        assert selector.xpath("count(//a)").get() == "2.0"
+
+    def test_xpath_variables_and_exslt(self):
+        selector = Selector("<p>a1</p><p>b</p>")
+        assert selector.xpath("//p[text()=$value]/text()", value="b").getall() == ["b"]
+        assert selector.xpath('//p[re:test(text(), "\\d")]/text()').getall() == ["a1"]
+
+    def test_xpath_error(self):
+        with pytest.raises(ValueError, match="XPath error"):
+            Selector("<p></p>").xpath("//p[")
+
+    def test_xml(self):
+        selector = Selector(body=b"<root><item>1</item></root>", type="xml")
+        assert selector.css("item::text").get() == "1"
+        assert selector.xpath("//item/text()").get() == "1"
@@ -115,6 +115,30 @@ class TestStatsCollector:
             assert stats.download_total == 1
             assert "200" in stats.download_status
 
+    @pytest.mark.asyncio
+    async def test_record_autothrottle(self, stats_collector):
+        """Test record_autothrottle counts adjustments and keeps the latest concurrency"""
+        await stats_collector.record_autothrottle(5, 1)
+        await stats_collector.record_autothrottle(2, -3)
+
+        minute_key, _ = StatsCollector._get_minute_key()
+        stats = stats_collector._stats[minute_key]
+        assert stats.autothrottle_increase_count == 1
+        assert stats.autothrottle_decrease_count == 1
+        assert stats.autothrottle_concurrency == 2
+
+    @pytest.mark.asyncio
+    async def test_count_callback(self, stats_collector):
+        """Test count_callback shares callback_count with record_callback"""
+        stats_collector.count_callback("inline")
+        stats_collector.count_callback("inline")
+        await stats_collector.record_callback("thread", 0.5)
+
+        minute_key, _ = StatsCollector._get_minute_key()
+        stats = stats_collector._stats[minute_key]
+        assert stats.callback_count == {"inline": 2, "thread": 1}
+        assert stats.callback_seconds == {"thread": 0.5}
+
     @pytest.mark.asyncio
     async def test_record_download_success_multiple_status_codes(self):
         """Test record_download_success with multiple status codes"""
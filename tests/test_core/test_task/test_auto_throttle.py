@@ -0,0 +1,109 @@
+"""
+Tests for AutoThrottle
+"""
+
+from maize.aio.classic.scheduler.host_throttle import HostThrottle
+from maize.core.task.auto_throttle import AIMDController, AutoThrottle
+from maize.core.task.task_manager import TaskManager
+from maize.settings import SpiderSettings
+
+
+def _controller(concurrency=4):
+    return AIMDController(
+        concurrency,
+        min_concurrency=1,
+        max_concurrency=8,
+        target_latency=1.0,
+        increase_step=1,
+        decrease_factor=0.5,
+    )
+
+
+class TestAIMDController:
+    """Test AIMDController"""
+
+    def test_additive_increase_after_one_round(self):
+        controller = _controller(4)
+        deltas = [controller.record(0.1, backoff=False, now=i) for i in range(4)]
+        assert deltas == [0, 0, 0, 1]
+        assert controller.concurrency == 5
+
+    def test_increase_is_capped(self):
+        controller = _controller(8)
+        for i in range(20):
+            controller.record(0.1, backoff=False, now=i)
+        assert controller.concurrency == 8
+
+    def test_multiplicative_decrease_on_backoff_with_cooldown(self):
+        controller = _controller(8)
+        assert controller.record(0.1, backoff=True, now=10) == -4
+        # 冷却期内的退避信号不再减小
+        assert controller.record(0.1, backoff=True, now=10.5) == 0
+        assert controller.record(0.1, backoff=True, now=11) == -2
+        assert controller.concurrency == 2
+
+    def test_decrease_on_high_latency(self):
+        controller = _controller(4)
+        assert controller.record(5.0, backoff=False, now=0) == -2
+
+    def test_floor(self):
+        controller = _controller(1)
+        assert controller.record(None, backoff=True, now=0) == 0
+        assert controller.concurrency == 1
+
+
+class TestAutoThrottle:
+    """Test AutoThrottle"""
+
+    def _settings(self):
+        settings = SpiderSettings(concurrency=16)
+        settings.autothrottle.enabled = True
+        settings.autothrottle.start_concurrency = 2
+        settings.politeness.enabled = True
+        settings.politeness.host_concurrency = 4
+        return settings
+
+    def test_resizes_task_manager(self):
+        task_manager = TaskManager(16)
+        throttle = AutoThrottle(self._settings(), task_manager)
+        assert task_manager.concurrency == 2
+
+        throttle.record("a.com", 0.1, 200, now=0)
+        delta, host_delta = throttle.record("a.com", 0.1, 200, now=1)
+        assert (delta, host_delta) == (1, 0)
+        assert task_manager.concurrency == 3
+
+        delta, _ = throttle.record("a.com", 0.1, 429, now=2)
+        assert delta == -2
+        assert task_manager.concurrency == 1
+
+    def test_resizes_host_concurrency(self):
+        settings = self._settings()
+        host_throttle = HostThrottle(settings.politeness)
+        throttle = AutoThrottle(settings, TaskManager(16), host_throttle)
+
+        for i in range(20):
+            throttle.record("a.com", 0.1, 200, now=i)
+        # host 并发上限不超过 politeness.host_concurrency
+        assert throttle.host_concurrency("a.com") == 4
+        assert throttle.host_concurrency("b.com") is None
+
+        throttle.record("a.com", None, None, now=100)
+        assert throttle.host_concurrency("a.com") == 2
+        host_throttle.acquire("a.com", 0)
+        host_throttle.acquire("a.com", 0)
+        assert host_throttle.ready_in("a.com", 0) == float("inf")
+
+    def test_evicts_least_recently_used_hosts(self):
+        settings = self._settings()
+        settings.autothrottle.max_hosts = 2
+        host_throttle = HostThrottle(settings.politeness)
+        throttle = AutoThrottle(settings, TaskManager(16), host_throttle)
+
+        for host in ("a.com", "b.com", "a.com", "c.com"):
+            throttle.record(host, 0.1, 200, now=0)
+
+        assert list(throttle._host_controllers) == ["a.com", "c.com"]
+        assert throttle.host_concurrency("b.com") is None
+        # 回收的 host 恢复为 host_concurrency 配置
+        assert "b.com" not in host_throttle._concurrency
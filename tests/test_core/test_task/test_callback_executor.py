@@ -0,0 +1,175 @@
+"""
+Tests for CallbackExecutor
+"""
+
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from maize import Item, Request, Response, Spider
+from maize.common.constant import CallbackExecutionModeEnum
+from maize.core.task.callback_executor import CallbackExecutor, collect_output, execution_mode
+from maize.exceptions.spider_exception import TransformTypeException
+from maize.settings import SpiderSettings
+
+
+class DemoItem(Item):
+    url: str = ""
+    title: str = ""
+    thread_name: str = ""
+
+
+class DemoSpider(Spider):
+    async def start_requests(self):
+        yield Request("https://example.com")
+
+    async def parse(self, response: Response):
+        yield DemoItem(
+            url=response.url,
+            title=response.xpath("//title/text()").get(),
+            thread_name=threading.current_thread().name,
+        )
+        yield Request(response.urljoin("/next"), callback=self.parse_detail, meta={"page": 2})
+
+    @execution_mode(CallbackExecutionModeEnum.THREAD)
+    def parse_detail(self, response: Response):
+        yield DemoItem(url=response.url, thread_name=threading.current_thread().name)
+
+
+def _spider():
+    spider = DemoSpider()
+    spider.stats_collector = MagicMock()
+    spider.stats_collector.record_callback = AsyncMock()
+    spider.stats_collector.record_loop_lag = AsyncMock()
+    return spider
+
+
+def _response(request: Request):
+    return Response(
+        request.url,
+        headers={"Content-Type": "text/html; charset=utf-8"},
+        request=request,
+        body=b"<html><head><title>demo</title></head></html>",
+    )
+
+
+def _executor(spider, mode=CallbackExecutionModeEnum.INLINE):
+    settings = SpiderSettings()
+    settings.callback.execution_mode = mode.value
+    settings.callback.loop_lag_interval = 0
+    settings.callback.process_workers = 1
+    return CallbackExecutor(settings, spider)
+
+
+class TestCollectOutput:
+    def test_generator(self):
+        assert collect_output(x for x in (1, 2)) == [1, 2]
+
+    def test_async_generator(self):
+        async def agen():
+            yield 1
+            yield 2
+
+        assert collect_output(agen()) == [1, 2]
+
+    def test_coroutine_and_none(self):
+        async def coroutine():
+            return 1
+
+        assert collect_output(coroutine()) == []
+        assert collect_output(None) == []
+
+    def test_invalid_output(self):
+        with pytest.raises(TransformTypeException):
+            collect_output([1, 2])
+
+
+class TestCallbackExecutor:
+    def test_get_mode_priority(self):
+        spider = _spider()
+        executor = _executor(spider)
+        request = Request("https://example.com")
+        assert executor.get_mode(spider.parse, request) == CallbackExecutionModeEnum.INLINE
+        assert executor.get_mode(spider.parse_detail, request) == CallbackExecutionModeEnum.THREAD
+
+        request.meta["execution_mode"] = "process"
+        assert executor.get_mode(spider.parse_detail, request) == CallbackExecutionModeEnum.PROCESS
+
+    @pytest.mark.asyncio
+    async def test_inline_returns_raw_output(self):
+        spider = _spider()
+        executor = _executor(spider)
+        request = Request("https://example.com", callback=spider.parse)
+        output = await executor.execute(spider.parse, _response(request), request)
+        items = [r async for r in output]
+        assert items[0].thread_name == threading.current_thread().name
+        # inline 模式只计数，不获取统计锁
+        spider.stats_collector.count_callback.assert_called_once_with("inline")
+        spider.stats_collector.record_callback.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_thread(self):
+        spider = _spider()
+        executor = _executor(spider, CallbackExecutionModeEnum.THREAD)
+        request = Request("https://example.com", callback=spider.parse)
+        try:
+            outputs = list(await executor.execute(spider.parse, _response(request), request))
+        finally:
+            await executor.close()
+
+        item, next_request = outputs
+        assert item.title == "demo"
+        assert item.thread_name.startswith("maize-callback")
+        assert next_request.callback == spider.parse_detail
+        assert spider.stats_collector.record_callback.await_args.args[0] == "thread"
+
+    @pytest.mark.asyncio
+    async def test_thread_invalid_output(self):
+        spider = _spider()
+        executor = _executor(spider, CallbackExecutionModeEnum.THREAD)
+        request = Request("https://example.com")
+        try:
+            with pytest.raises(TransformTypeException):
+                await executor.execute(lambda _: [DemoItem()], _response(request), request)
+        finally:
+            await executor.close()
+
+    @pytest.mark.asyncio
+    async def test_process(self):
+        spider = _spider()
+        executor = _executor(spider, CallbackExecutionModeEnum.PROCESS)
+        request = Request("https://example.com/list", callback=spider.parse, meta={"page": 1})
+        try:
+            outputs = list(await executor.execute(spider.parse, _response(request), request))
+        finally:
+            await executor.close()
+
+        item, next_request = outputs
+        assert isinstance(item, DemoItem)
+        assert item.url == "https://example.com/list"
+        assert item.title == "demo"
+        assert next_request.url == "https://example.com/next"
+        assert next_request.callback == spider.parse_detail
+        assert next_request.meta == {"page": 2}
+
+    @pytest.mark.asyncio
+    async def test_process_requires_spider_method(self):
+        spider = _spider()
+        executor = _executor(spider, CallbackExecutionModeEnum.PROCESS)
+        request = Request("https://example.com")
+        with pytest.raises(TypeError):
+            await executor.execute(lambda _: None, _response(request), request)
+
+    @pytest.mark.asyncio
+    async def test_loop_lag_monitor(self):
+        spider = _spider()
+        executor = _executor(spider)
+        executor.settings.loop_lag_interval = 0.01
+        await executor.open()
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            await executor.close()
+        assert spider.stats_collector.record_loop_lag.await_count > 0
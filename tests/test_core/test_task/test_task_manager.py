@@ -0,0 +1,76 @@
+"""
+Tests for TaskManager and ResizableSemaphore
+"""
+
+import asyncio
+
+import pytest
+
+from maize.core.task.task_manager import ResizableSemaphore, TaskManager
+
+
+class TestResizableSemaphore:
+    """Test ResizableSemaphore"""
+
+    def test_invalid_value(self):
+        with pytest.raises(ValueError):
+            ResizableSemaphore(0)
+
+    @pytest.mark.asyncio
+    async def test_grow_wakes_waiters(self):
+        semaphore = ResizableSemaphore(1)
+        await semaphore.acquire()
+        waiter = asyncio.create_task(semaphore.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        semaphore.resize(2)
+        await asyncio.sleep(0)
+        assert waiter.done()
+        assert semaphore.active == 2
+
+    @pytest.mark.asyncio
+    async def test_shrink_waits_for_in_flight(self):
+        semaphore = ResizableSemaphore(3)
+        for _ in range(3):
+            await semaphore.acquire()
+
+        semaphore.resize(1)
+        waiter = asyncio.create_task(semaphore.acquire())
+        semaphore.release()
+        semaphore.release()
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        semaphore.release()
+        await asyncio.sleep(0)
+        assert waiter.done()
+        assert semaphore.active == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_is_skipped(self):
+        semaphore = ResizableSemaphore(1)
+        await semaphore.acquire()
+        waiter = asyncio.create_task(semaphore.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+
+        semaphore.release()
+        assert semaphore.active == 0
+        assert not semaphore.locked()
+
+
+class TestTaskManagerConcurrency:
+    """Test TaskManager.set_concurrency"""
+
+    @pytest.mark.asyncio
+    async def test_set_concurrency(self):
+        task_manager = TaskManager(2)
+        assert task_manager.concurrency == 2
+
+        task_manager.set_concurrency(5)
+        assert task_manager.concurrency == 5
+
+        task_manager.set_concurrency(0)
+        assert task_manager.concurrency == 1
@@ -0,0 +1,62 @@
+"""
+Tests for request dupefilters.
+"""
+
+import pytest
+
+from maize.common.http.request import Request
+from maize.dupefilters import BloomDupeFilter, MemoryDupeFilter
+from maize.settings import SpiderSettings
+
+
+class TestMemoryDupeFilter:
+    """Test MemoryDupeFilter exact dedup."""
+
+    def test_fingerprint_is_16_bytes(self):
+        fingerprint = MemoryDupeFilter.fingerprint(Request("https://example.com"))
+        assert isinstance(fingerprint, bytes)
+        assert len(fingerprint) == 16
+
+    @pytest.mark.asyncio
+    async def test_request_seen(self):
+        dupefilter = MemoryDupeFilter(SpiderSettings())
+        assert await dupefilter.request_seen(Request("https://example.com")) is False
+        assert await dupefilter.request_seen(Request("https://example.com")) is True
+        assert await dupefilter.request_seen(Request("https://example.com/other")) is False
+        assert len(dupefilter) == 2
+
+    @pytest.mark.asyncio
+    async def test_add_fingerprint(self):
+        dupefilter = MemoryDupeFilter(SpiderSettings())
+        dupefilter.add_fingerprint(Request("https://example.com").fingerprint)
+        assert await dupefilter.request_seen(Request("https://example.com")) is True
+
+
+class TestBloomDupeFilter:
+    """Test BloomDupeFilter probabilistic dedup."""
+
+    @pytest.mark.asyncio
+    async def test_request_seen(self):
+        settings = SpiderSettings()
+        settings.dupefilter.bloom_capacity = 1000
+        dupefilter = BloomDupeFilter(settings)
+
+        assert await dupefilter.request_seen(Request("https://example.com")) is False
+        assert await dupefilter.request_seen(Request("https://example.com")) is True
+        assert len(dupefilter) == 1
+
+        dupefilter.add_fingerprint(Request("https://example.com/other").fingerprint)
+        assert await dupefilter.request_seen(Request("https://example.com/other")) is True
+
+    @pytest.mark.asyncio
+    async def test_memory_is_bounded_by_settings(self):
+        settings = SpiderSettings()
+        settings.dupefilter.bloom_capacity = 1000
+        settings.dupefilter.bloom_error_rate = 0.01
+        dupefilter = BloomDupeFilter(settings)
+        nbytes = dupefilter._bloom_filter.nbytes
+
+        for i in range(2000):
+            await dupefilter.request_seen(Request(f"https://example.com/{i}"))
+
+        assert dupefilter._bloom_filter.nbytes == nbytes
@@ -0,0 +1,83 @@
+"""
+Integration test: resume a classic crawl from the job directory using a local mock server.
+"""
+
+import typing
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import pytest
+
+from maize import Item, Request, Response, Spider
+from maize.aio.classic.crawler.crawler import CrawlerProcess
+from maize.core.engine.job_checkpoint import JobCheckpoint
+from maize.settings import SpiderSettings
+from maize.utils.log_util import set_spider_settings
+
+
+class ResumeItem(Item):
+    __table_name__: str = "resume_pages"
+    url: str = ""
+
+
+class ResumeSpider(Spider):
+    # CrawlerProcess 会重新创建爬虫实例，通过类属性传入地址、记录抓取结果
+    base_url: str = ""
+    crawled: typing.ClassVar[list[str]] = []
+
+    async def start_requests(self) -> AsyncGenerator[Request, Any]:
+        yield Request(f"{self.base_url}/")
+
+    async def parse(self, response: Response):
+        self.crawled.append(response.url)
+        for href in response.xpath("//li[contains(@class,'hotsearch-item')]/a/@href").getall():
+            yield Request(url=f"{self.base_url}{href}", callback=self.parse_page)
+
+    async def parse_page(self, response: Response):
+        self.crawled.append(response.url)
+        yield ResumeItem(url=response.url)
+
+
+async def _run(job_dir, base_url: str) -> list[str]:
+    set_spider_settings(SpiderSettings())
+    settings = SpiderSettings()
+    settings.request.request_timeout = 10
+    settings.dupefilter.enabled = True
+    settings.checkpoint.job_dir = str(job_dir)
+
+    ResumeSpider.base_url = base_url
+    ResumeSpider.crawled = []
+    process = CrawlerProcess(settings=settings, settings_path=None)
+    await process.crawl(ResumeSpider)
+    await process.start()
+    return ResumeSpider.crawled
+
+
+@pytest.mark.asyncio
+async def test_finished_job_is_not_crawled_again(mock_server: str, tmp_path):
+    assert len(await _run(tmp_path, mock_server)) == 4
+
+    # 起始请求已全部产出，没有未完成的请求
+    assert await _run(tmp_path, mock_server) == []
+
+
+@pytest.mark.asyncio
+async def test_resume_killed_job(mock_server: str, tmp_path):
+    # 模拟上次运行抓取完首页后被杀：首页的去重指纹、产出的请求和 item 已写入任务目录
+    spider = ResumeSpider()
+    checkpoint = JobCheckpoint(tmp_path / "resume_spider", SpiderSettings().checkpoint)
+    await checkpoint.open()
+    checkpoint.add_fingerprint(Request(f"{mock_server}/").fingerprint)
+    checkpoint.mark_start_requests_done()
+    checkpoint.record_output(Request(f"{mock_server}/page/2", callback=spider.parse_page))
+    checkpoint.record_output(ResumeItem(url=f"{mock_server}/page/1"))
+    await checkpoint.flush()
+    checkpoint._flush_task.cancel()
+
+    assert await _run(tmp_path, mock_server) == [f"{mock_server}/page/2"]
+
+    checkpoint = JobCheckpoint(tmp_path / "resume_spider", SpiderSettings().checkpoint)
+    await checkpoint.open()
+    assert checkpoint.recovered_requests == []
+    assert checkpoint.recovered_items == []
+    await checkpoint.close()
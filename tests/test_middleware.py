@@ -418,8 +418,7 @@ class TestRetryMiddleware:
         """Test _get_retry_count when meta is None"""
         middleware = RetryMiddleware()
 
-        request = MagicMock()
-        request.meta = None
+        request = Request(url="https://example.com")
 
         count = middleware._get_retry_count(request)
 
@@ -429,8 +428,7 @@ class TestRetryMiddleware:
         """Test _get_retry_count when meta has no retry_count"""
         middleware = RetryMiddleware()
 
-        request = MagicMock()
-        request.meta = {}
+        request = Request(url="https://example.com", meta={})
 
         count = middleware._get_retry_count(request)
 
@@ -440,8 +438,7 @@ class TestRetryMiddleware:
         """Test _get_retry_count when meta has retry_count"""
         middleware = RetryMiddleware()
 
-        request = MagicMock()
-        request.meta = {"retry_count": 3}
+        request = Request(url="https://example.com", meta={"retry_count": 3})
 
         count = middleware._get_retry_count(request)
 
@@ -451,13 +448,11 @@ class TestRetryMiddleware:
         """Test _set_retry_count creates meta if not exists"""
         middleware = RetryMiddleware()
 
-        request = MagicMock()
-        request.meta = None
-        request._meta = None
+        request = Request(url="https://example.com")
 
         middleware._set_retry_count(request, 5)
 
-        assert request._meta == {"retry_count": 5}
+        assert request.meta == {"retry_count": 5}
 
     @pytest.mark.asyncio
     async def test_calculate_delay_no_delay(self):
@@ -615,8 +610,7 @@ class TestDepthMiddleware:
         """Test _get_depth when request has no meta"""
         middleware = DepthMiddleware()
 
-        request = MagicMock()
-        request.meta = None
+        request = Request(url="https://example.com")
 
         depth = middleware._get_depth(request)
 
@@ -626,8 +620,7 @@ class TestDepthMiddleware:
         """Test _get_depth when meta has no depth key"""
         middleware = DepthMiddleware()
 
-        request = MagicMock()
-        request.meta = {}
+        request = Request(url="https://example.com", meta={})
 
         depth = middleware._get_depth(request)
 
@@ -637,13 +630,11 @@ class TestDepthMiddleware:
         """Test _set_depth creates meta if not exists"""
         middleware = DepthMiddleware()
 
-        request = MagicMock()
-        request.meta = None
-        request._meta = None
+        request = Request(url="https://example.com")
 
         middleware._set_depth(request, 5)
 
-        assert request._meta == {"depth": 5}
+        assert request.meta == {"depth": 5}
 
     @pytest.mark.asyncio
     async def test_process_start_requests_sets_depth_zero(self):
@@ -0,0 +1,142 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from maize.common.http.request import Request
+from maize.common.http.response import Response
+from maize.middlewares.downloader.http_cache_middleware import HttpCacheMiddleware, HttpCacheStorage
+from maize.settings import SpiderSettings
+
+
+def _make_middleware(tmp_path, **kwargs) -> HttpCacheMiddleware:
+    settings = SpiderSettings()
+    settings.http_cache.path = str(tmp_path)
+    for key, value in kwargs.items():
+        setattr(settings.http_cache, key, value)
+    return HttpCacheMiddleware(settings)
+
+
+def _make_response(request: Request, status: int = 200, headers: dict | None = None, body: bytes = b"<html></html>"):
+    return Response(url=request.url, headers=headers or {}, request=request, body=body, status=status)
+
+
+class TestHttpCacheMiddleware:
+    @pytest.mark.asyncio
+    async def test_miss_then_hit(self, tmp_path):
+        middleware = _make_middleware(tmp_path)
+        spider = MagicMock()
+        request = Request("https://example.com/page")
+        assert await middleware.process_request(request, spider) is request
+
+        response = _make_response(request, headers={"Content-Type": "text/html"})
+        assert await middleware.process_response(request, response, spider) is response
+
+        cached = await middleware.process_request(Request("https://example.com/page"), spider)
+        assert isinstance(cached, Response)
+        assert cached.body == b"<html></html>"
+        assert cached.headers == {"Content-Type": "text/html"}
+        assert (middleware.hit_count, middleware.miss_count) == (1, 1)
+        await middleware.close()
+
+    @pytest.mark.asyncio
+    async def test_dont_cache(self, tmp_path):
+        middleware = _make_middleware(tmp_path)
+        spider = MagicMock()
+        request = Request("https://example.com", meta={"dont_cache": True})
+        await middleware.process_response(request, _make_response(request), spider)
+        assert await middleware.process_request(Request("https://example.com"), spider) is not None
+        assert middleware.hit_count == 0
+        await middleware.close()
+
+    @pytest.mark.asyncio
+    async def test_stream_response_not_cached(self, tmp_path):
+        middleware = _make_middleware(tmp_path)
+        spider = MagicMock()
+        path = tmp_path / "stream.bin"
+        path.write_bytes(b"content")
+        request = Request("https://example.com", meta={"stream": True})
+        response = Response(url=request.url, headers={}, request=request, path=str(path))
+        assert await middleware.process_response(request, response, spider) is response
+        assert response._body_cache == b""
+
+        # 流式下载的响应通过 path 返回，非流式请求也不会命中
+        assert await middleware.process_request(Request("https://example.com"), spider) is not None
+        assert middleware.hit_count == 0
+        await middleware.close()
+
+    @pytest.mark.asyncio
+    async def test_ignore_http_codes(self, tmp_path):
+        middleware = _make_middleware(tmp_path, ignore_http_codes=[404])
+        spider = MagicMock()
+        request = Request("https://example.com")
+        await middleware.process_response(request, _make_response(request, status=404), spider)
+        assert await middleware.process_request(request, spider) is request
+        await middleware.close()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(("cache_server_errors", "cached"), [(False, False), (True, True)])
+    @pytest.mark.parametrize("status", [429, 503])
+    async def test_server_errors(self, tmp_path, status, cache_server_errors, cached):
+        middleware = _make_middleware(tmp_path, cache_server_errors=cache_server_errors)
+        spider = MagicMock()
+        request = Request("https://example.com")
+        await middleware.process_response(request, _make_response(request, status=status), spider)
+        response = await middleware.process_request(request, spider)
+        assert (response is not request) == cached
+        await middleware.close()
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_is_revalidated(self, tmp_path):
+        middleware = _make_middleware(tmp_path, expiration_secs=60)
+        spider = MagicMock()
+        request = Request("https://example.com", headers={"User-Agent": "maize"})
+        headers = {"etag": '"v1"', "last-modified": "Wed, 01 Jan 2025 00:00:00 GMT"}
+        await middleware.process_response(request, _make_response(request, headers=headers), spider)
+        middleware.storage._connect().execute("UPDATE responses SET stored_at = 0")
+
+        request = Request("https://example.com", headers={"User-Agent": "maize"})
+        assert await middleware.process_request(request, spider) is request
+        assert request.headers == {
+            "User-Agent": "maize",
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT",
+        }
+
+        # 304 只有响应头，使用缓存的响应体并刷新写入时间
+        not_modified = _make_response(request, status=304, headers={"ETag": '"v2"'}, body=b"")
+        response = await middleware.process_response(request, not_modified, spider)
+        assert response.status == 200
+        assert response.body == b"<html></html>"
+        assert middleware.revalidated_count == 1
+
+        entry = await middleware.storage.get(middleware._fingerprint(request))
+        assert entry["etag"] == '"v2"'
+        assert await middleware.process_request(Request("https://example.com"), spider) is not None
+        assert middleware.hit_count == 1
+        await middleware.close()
+
+    @pytest.mark.asyncio
+    async def test_offline(self, tmp_path):
+        middleware = _make_middleware(tmp_path, expiration_secs=1, always_use_cache=True, ignore_missing=True)
+        spider = MagicMock()
+        request = Request("https://example.com")
+        await middleware.process_response(request, _make_response(request), spider)
+        middleware.storage._connect().execute("UPDATE responses SET stored_at = 0")
+
+        assert isinstance(await middleware.process_request(Request("https://example.com"), spider), Response)
+        assert await middleware.process_request(Request("https://example.com/missing"), spider) is None
+        await middleware.close()
+
+    @pytest.mark.asyncio
+    async def test_bodies_are_deduplicated(self, tmp_path):
+        storage = HttpCacheStorage(tmp_path)
+        await storage.store("a", "https://example.com/a", 200, {}, b"same")
+        await storage.store("b", "https://example.com/b", 200, {}, b"same")
+        assert len(list((tmp_path / HttpCacheStorage.BODIES_DIR).rglob("*.gz"))) == 1
+        assert (await storage.get("b"))["body"] == b"same"
+
+        # 响应体文件丢失时按未缓存处理
+        for path in (tmp_path / HttpCacheStorage.BODIES_DIR).rglob("*.gz"):
+            path.unlink()
+        assert await storage.get("a") is None
+        await storage.close()
@@ -0,0 +1,263 @@
+"""
+Tests for DeadLetterSpool and the PipelineScheduler dead-letter integration.
+"""
+
+import asyncio
+import gzip
+import json
+import shutil
+import zlib
+from typing import ClassVar
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from maize import BasePipeline
+from maize.common.items import Item
+from maize.pipelines.dead_letter import DeadLetterSpool, replay_dead_letters
+from maize.pipelines.pipeline_scheduler import PipelineScheduler
+from maize.settings import SpiderSettings
+
+
+class DeadLetterItem(Item):
+    __table_name__: str = "test"
+    name: str = ""
+    count: int = 0
+
+
+class RecordPipeline(BasePipeline):
+    """记录写入的 item，result 控制 process_item 的返回值"""
+
+    result = True
+    items: ClassVar[list] = []
+
+    async def open(self):
+        RecordPipeline.items = []
+
+    async def close(self):
+        pass
+
+    async def process_item(self, items):
+        RecordPipeline.items.extend(items)
+        return self.result
+
+    async def process_error_item(self, items):
+        pass
+
+
+def _make_pipeline(return_value=True):
+    pipeline = MagicMock()
+    pipeline.process_item = AsyncMock(return_value=return_value)
+    pipeline.process_error_item = AsyncMock()
+    pipeline.close = AsyncMock()
+    return pipeline
+
+
+def _read_records(spool: DeadLetterSpool) -> list[dict]:
+    records = []
+    for segment in spool.segments():
+        with gzip.open(segment, "rt", encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f)
+    return records
+
+
+class TestDeadLetterSpool:
+    """Test DeadLetterSpool write/replay."""
+
+    @pytest.mark.asyncio
+    async def test_segment_finished_on_close(self, tmp_path):
+        spool = DeadLetterSpool(str(tmp_path))
+        await spool.write([DeadLetterItem(name="a", count=1)])
+
+        assert spool.segments() == []
+        assert len(list(tmp_path.glob("*.part"))) == 1
+
+        await spool.close()
+        assert len(spool.segments()) == 1
+        assert list(tmp_path.glob("*.part")) == []
+        assert _read_records(spool) == [
+            {
+                "item": f"{__name__}.DeadLetterItem",
+                "pipeline": None,
+                "data": {"name": "a", "count": 1},
+            }
+        ]
+        assert spool.write_count == 1
+
+    @pytest.mark.asyncio
+    async def test_segment_rotation(self, tmp_path):
+        spool = DeadLetterSpool(str(tmp_path), segment_max_bytes=1)
+        await spool.write([DeadLetterItem(name="a")])
+        await spool.write([DeadLetterItem(name="b")])
+        await spool.close()
+
+        assert len(spool.segments()) == 2
+
+    @pytest.mark.asyncio
+    async def test_recover_unfinished_segment(self, tmp_path):
+        # 模拟崩溃进程遗留的分段：未关闭的 gzip 文件
+        spool = DeadLetterSpool(str(tmp_path / "running"))
+        await spool.write([DeadLetterItem(name="a")])
+        await spool.write([DeadLetterItem(name="b")])
+        (part,) = (tmp_path / "running").glob("*.part")
+        (tmp_path / "crashed").mkdir()
+        shutil.copy(part, tmp_path / "crashed" / "1-99999.jsonl.gz.part")
+        await spool.close()
+
+        spool = DeadLetterSpool(str(tmp_path / "crashed"))
+        pipeline = _make_pipeline()
+        result = await spool.replay([pipeline])
+
+        assert result.success_count == 2
+        assert [item.name for item in pipeline.process_item.call_args.args[0]] == ["a", "b"]
+        assert list((tmp_path / "crashed").iterdir()) == []
+
+    def test_recover_truncated_segment(self, tmp_path):
+        line = json.dumps({"item": f"{__name__}.DeadLetterItem", "pipeline": None, "data": {"name": "a"}})
+        compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+        data = compressor.compress(f"{line}\n".encode()) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        data += compressor.compress(line[:10].encode()) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        (tmp_path / "1-99999.jsonl.gz.part").write_bytes(data[:-3])
+
+        spool = DeadLetterSpool(str(tmp_path))
+        assert spool.recover() == [tmp_path / "1-99999.jsonl.gz"]
+        assert list(tmp_path.glob("*.part")) == []
+        assert [record["data"]["name"] for record in _read_records(spool)] == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_recover_skips_open_segment(self, tmp_path):
+        spool = DeadLetterSpool(str(tmp_path))
+        await spool.write([DeadLetterItem(name="a")])
+
+        assert DeadLetterSpool(str(tmp_path)).recover() == []
+        assert len(list(tmp_path.glob("*.part"))) == 1
+        await spool.close()
+
+    @pytest.mark.asyncio
+    async def test_replay_success_removes_segments(self, tmp_path):
+        spool = DeadLetterSpool(str(tmp_path))
+        await spool.write([DeadLetterItem(name=str(i)) for i in range(5)])
+        await spool.close()
+
+        pipeline = _make_pipeline()
+        result = await spool.replay([pipeline], batch_size=2)
+
+        assert result.success_count == 5
+        assert [len(call.args[0]) for call in pipeline.process_item.call_args_list] == [2, 2, 1]
+        assert pipeline.process_item.call_args_list[0].args[0][0] == DeadLetterItem(name="0")
+        assert spool.segments() == []
+
+    @pytest.mark.asyncio
+    async def test_replay_failure_respools_for_failed_pipeline(self, tmp_path):
+        spool = DeadLetterSpool(str(tmp_path))
+        await spool.write([DeadLetterItem(name="a")])
+        await spool.close()
+
+        RecordPipeline.result = False
+        try:
+            pipeline = RecordPipeline(SpiderSettings())
+            result = await spool.replay([pipeline])
+        finally:
+            RecordPipeline.result = True
+
+        assert result.fail_count == 1
+        records = _read_records(spool)
+        assert [record["pipeline"] for record in records] == [f"{__name__}.RecordPipeline"]
+
+    @pytest.mark.asyncio
+    async def test_replay_partial_failure_respools_failed_items(self, tmp_path):
+        spool = DeadLetterSpool(str(tmp_path))
+        items = [DeadLetterItem(name="a"), DeadLetterItem(name="b")]
+        await spool.write(items)
+        await spool.close()
+
+        pipeline = _make_pipeline(return_value=[items[1]])
+        result = await spool.replay([pipeline])
+
+        assert result.success_count == 1
+        assert result.fail_count == 1
+        assert [record["data"]["name"] for record in _read_records(spool)] == ["b"]
+
+    @pytest.mark.asyncio
+    async def test_replay_only_to_recorded_pipeline(self, tmp_path):
+        spool = DeadLetterSpool(str(tmp_path))
+        other = _make_pipeline()
+        await spool.write([DeadLetterItem(name="a")], f"{__name__}.RecordPipeline")
+        await spool.close()
+
+        pipeline = RecordPipeline(SpiderSettings())
+        await pipeline.open()
+        result = await spool.replay([pipeline, other])
+
+        assert result.success_count == 1
+        assert RecordPipeline.items == [DeadLetterItem(name="a")]
+        other.process_item.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_replay_dead_letters_loads_pipelines(self, tmp_path):
+        spool = DeadLetterSpool(str(tmp_path))
+        await spool.write([DeadLetterItem(name="a"), DeadLetterItem(name="b")])
+        await spool.close()
+
+        settings = SpiderSettings()
+        settings.pipeline.pipelines = [f"{__name__}.RecordPipeline"]
+        result = await replay_dead_letters(str(tmp_path), settings)
+
+        assert result.success_count == 2
+        assert [item.name for item in RecordPipeline.items] == ["a", "b"]
+        assert spool.segments() == []
+
+
+class TestPipelineSchedulerDeadLetter:
+    """Test PipelineScheduler spills to the dead-letter spool."""
+
+    @staticmethod
+    def _make_scheduler(tmp_path, **pipeline_settings):
+        settings = SpiderSettings()
+        settings.pipeline.pipelines = []
+        settings.pipeline.dead_letter_path = str(tmp_path)
+        for key, value in pipeline_settings.items():
+            setattr(settings.pipeline, key, value)
+        return PipelineScheduler(settings)
+
+    @pytest.mark.asyncio
+    async def test_full_error_queue_does_not_block(self, tmp_path):
+        scheduler = self._make_scheduler(tmp_path, error_max_cache_count=1, error_max_retry_count=0)
+
+        await asyncio.wait_for(
+            scheduler._enqueue_retry_items([DeadLetterItem(name="a"), DeadLetterItem(name="b")]), timeout=1
+        )
+        await scheduler.dead_letter.close()
+
+        assert scheduler.error_item_queue.qsize() == 1
+        assert [record["data"]["name"] for record in _read_records(scheduler.dead_letter)] == ["b"]
+
+    @pytest.mark.asyncio
+    async def test_error_items_written_after_process_error_item(self, tmp_path):
+        scheduler = self._make_scheduler(tmp_path)
+        pipeline = _make_pipeline()
+        scheduler.item_pipelines.append(pipeline)
+        item = DeadLetterItem(name="a")
+        await scheduler.error_item_queue.put(item)
+
+        await scheduler.close()
+
+        pipeline.process_error_item.assert_awaited_once_with([item])
+        assert [record["data"]["name"] for record in _read_records(scheduler.dead_letter)] == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_fanout_error_items_recorded_per_pipeline(self, tmp_path):
+        scheduler = self._make_scheduler(tmp_path, fanout=True, error_max_retry_count=0)
+        pipeline = RecordPipeline(SpiderSettings())
+        scheduler.item_pipelines.append(pipeline)
+        await scheduler.open()
+
+        RecordPipeline.result = False
+        try:
+            await scheduler._put_item(DeadLetterItem(name="a"))
+            await scheduler.close()
+        finally:
+            RecordPipeline.result = True
+
+        records = _read_records(scheduler.dead_letter)
+        assert [record["pipeline"] for record in records] == [f"{__name__}.RecordPipeline"]
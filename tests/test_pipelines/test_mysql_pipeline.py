@@ -2,10 +2,12 @@
 Tests for MysqlPipeline.
 """
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from maize.common.constant import MysqlInsertModeEnum
 from maize.common.items import Item
 from maize.pipelines.mysql_pipeline import MysqlPipeline
 from maize.settings import SpiderSettings
@@ -96,7 +98,7 @@ class TestMysqlPipelineProcessItem:
     @pytest.mark.asyncio
     async def test_successful_process_returns_true(self):
         pipeline = MysqlPipeline(_make_settings())
-        pipeline._process_items = AsyncMock()
+        pipeline._process_items = AsyncMock(return_value=[])
         result = await pipeline.process_item([DemoItem(name="a", age=1)])
         assert result is True
         pipeline._process_items.assert_called_once()
@@ -143,3 +145,145 @@ class TestMysqlPipelineProcessItem:
 
         call_args = mock_mysql.executemany.call_args
         assert len(call_args.args[1]) == 1
+
+    @pytest.mark.asyncio
+    async def test_mixed_item_classes_grouped_by_table(self):
+        class OtherItem(Item):
+            __table_name__: str = "other"
+            title: str = ""
+
+        pipeline = MysqlPipeline(_make_settings())
+        mock_mysql = MagicMock()
+        mock_mysql.executemany = AsyncMock(return_value=1)
+        pipeline.mysql = mock_mysql
+
+        await pipeline._process_items(
+            [
+                DemoItem(name="a", age=1),
+                OtherItem(title="t"),
+                DemoItem(name="b", age=2),
+            ]
+        )
+
+        calls = {c.args[0]: c.args[1] for c in mock_mysql.executemany.call_args_list}
+        assert calls == {
+            "insert into demo (name,age) values (%s,%s)": [["a", 1], ["b", 2]],
+            "insert into other (title) values (%s)": [["t"]],
+        }
+
+    @pytest.mark.asyncio
+    async def test_insert_sql_cached_per_class(self):
+        pipeline = MysqlPipeline(_make_settings())
+        mock_mysql = MagicMock()
+        mock_mysql.executemany = AsyncMock(return_value=1)
+        pipeline.mysql = mock_mysql
+
+        await pipeline._process_items([DemoItem(name="a", age=1)])
+        cached = pipeline._insert_sql_cache[DemoItem]
+        await pipeline._process_items([DemoItem(name="b", age=2)])
+
+        assert pipeline._insert_sql_cache[DemoItem] is cached
+        assert len(pipeline._insert_sql_cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_group_returned_alone(self):
+        class OtherItem(Item):
+            __table_name__: str = "other"
+            title: str = ""
+
+        pipeline = MysqlPipeline(_make_settings())
+
+        async def executemany(sql, args):
+            if "other" in sql:
+                raise RuntimeError("db error")
+            return len(args)
+
+        pipeline.mysql = MagicMock()
+        pipeline.mysql.executemany = executemany
+
+        other = OtherItem(title="t")
+        # 已写入的 demo 表不会被重试
+        assert await pipeline.process_item([DemoItem(name="a", age=1), other]) == [other]
+
+    @pytest.mark.asyncio
+    async def test_tables_written_concurrently(self):
+        class OtherItem(Item):
+            __table_name__: str = "other"
+            title: str = ""
+
+        pipeline = MysqlPipeline(_make_settings())
+        running = 0
+        max_running = 0
+
+        async def executemany(sql, args):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return len(args)
+
+        mock_mysql = MagicMock()
+        mock_mysql.executemany = executemany
+        pipeline.mysql = mock_mysql
+
+        await pipeline._process_items([DemoItem(name="a", age=1), OtherItem(title="t")])
+        assert max_running == 2
+
+
+class TestMysqlPipelineInsertMode:
+    """Test MysqlPipeline insert modes and bulk insert."""
+
+    def test_insert_ignore_sql(self):
+        class IgnoreItem(Item):
+            __table_name__: str = "demo"
+            __insert_mode__ = MysqlInsertModeEnum.IGNORE
+            name: str = ""
+
+        pipeline = MysqlPipeline(_make_settings())
+        _, sql, _, _ = pipeline._get_insert_sql(IgnoreItem)
+        assert sql == "insert ignore into demo (name) values (%s)"
+
+    def test_upsert_sql_updates_all_fields_by_default(self):
+        class UpsertItem(Item):
+            __table_name__: str = "demo"
+            __insert_mode__ = MysqlInsertModeEnum.UPSERT
+            name: str = ""
+            age: int = 0
+
+        pipeline = MysqlPipeline(_make_settings())
+        _, sql, prefix, postfix = pipeline._get_insert_sql(UpsertItem)
+        assert prefix == "insert into demo (name,age) values "
+        assert postfix == " on duplicate key update name=values(name),age=values(age)"
+        assert sql == prefix + "(%s,%s)" + postfix
+
+    def test_upsert_sql_update_fields(self):
+        class UpsertItem(Item):
+            __table_name__: str = "demo"
+            __insert_mode__ = MysqlInsertModeEnum.UPSERT
+            __update_fields__ = ("age",)
+            name: str = ""
+            age: int = 0
+
+        pipeline = MysqlPipeline(_make_settings())
+        _, _, _, postfix = pipeline._get_insert_sql(UpsertItem)
+        assert postfix == " on duplicate key update age=values(age)"
+
+    @pytest.mark.asyncio
+    async def test_bulk_insert_mode(self):
+        settings = _make_settings()
+        settings.mysql.bulk_insert = True
+        settings.mysql.bulk_max_statement_bytes = 4096
+        pipeline = MysqlPipeline(settings)
+        mock_mysql = MagicMock()
+        mock_mysql.bulk_insert = AsyncMock(return_value=2)
+        mock_mysql.executemany = AsyncMock()
+        pipeline.mysql = mock_mysql
+
+        await pipeline._process_items([DemoItem(name="a", age=1), DemoItem(name="b", age=2)])
+
+        mock_mysql.executemany.assert_not_called()
+        mock_mysql.bulk_insert.assert_called_once_with(
+            "insert into demo (name,age) values ", [["a", 1], ["b", 2]], "", 4096
+        )
+        assert pipeline._write_stats["demo"][0] == 2
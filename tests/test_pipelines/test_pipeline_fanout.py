@@ -0,0 +1,198 @@
+"""
+Tests for PipelineScheduler fan-out mode and PipelineWorker.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from maize.common.items import Item
+from maize.pipelines.pipeline_scheduler import PipelineScheduler
+from maize.pipelines.pipeline_worker import PipelineWorker
+from maize.settings import SpiderSettings
+
+
+class FanoutItem(Item):
+    __table_name__: str = "test"
+    name: str = ""
+
+
+def _make_settings():
+    settings = SpiderSettings()
+    settings.pipeline.fanout = True
+    settings.pipeline.handle_interval = 0
+    settings.pipeline.error_handle_interval = 0
+    settings.pipeline.error_max_retry_count = 2
+    settings.pipeline.error_retry_batch_max_size = 10
+    return settings
+
+
+def _make_pipeline(process_item):
+    pipeline = MagicMock()
+    pipeline.process_item = process_item
+    pipeline.process_error_item = AsyncMock()
+    pipeline.close = AsyncMock()
+    return pipeline
+
+
+async def _open_scheduler(settings, pipelines):
+    scheduler = PipelineScheduler(settings)
+    scheduler.item_pipelines.extend(pipelines)
+    settings.pipeline.pipelines = []
+    await scheduler.open()
+    return scheduler
+
+
+class TestPipelineFanout:
+    """Test fan-out dispatch to multiple pipelines."""
+
+    @pytest.mark.asyncio
+    async def test_pipelines_run_concurrently(self):
+        started = []
+        release = asyncio.Event()
+
+        async def slow_process_item(items):
+            started.append(items)
+            await release.wait()
+            return True
+
+        pipelines = [_make_pipeline(slow_process_item), _make_pipeline(slow_process_item)]
+        scheduler = await _open_scheduler(_make_settings(), pipelines)
+        assert len(scheduler.pipeline_workers) == 2
+
+        await scheduler.process(FanoutItem(name="a"))
+        await asyncio.sleep(0)
+        # 两个管道同时在处理同一批 item
+        assert len(started) == 2
+        assert not scheduler.idle()
+
+        release.set()
+        result = await scheduler.close()
+        assert result.success_count == 2
+        assert result.fail_count == 0
+        for pipeline in pipelines:
+            pipeline.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_pipeline_retries_alone(self):
+        ok_pipeline = _make_pipeline(AsyncMock(return_value=True))
+        flaky_pipeline = _make_pipeline(AsyncMock(side_effect=[False, True]))
+        scheduler = await _open_scheduler(_make_settings(), [ok_pipeline, flaky_pipeline])
+
+        await scheduler.process(FanoutItem(name="a"))
+        result = await scheduler.close()
+
+        # 成功的管道只收到一次，失败的管道单独重试
+        assert ok_pipeline.process_item.await_count == 1
+        assert flaky_pipeline.process_item.await_count == 2
+        assert result.success_count == 2
+        assert result.fail_count == 1
+
+    @pytest.mark.asyncio
+    async def test_items_done_after_all_pipelines_finish(self):
+        settings = _make_settings()
+        settings.pipeline.error_handle_interval = 3600
+        done = []
+        ok_pipeline = _make_pipeline(AsyncMock(return_value=True))
+        flaky_pipeline = _make_pipeline(AsyncMock(side_effect=[False, False, True]))
+        scheduler = await _open_scheduler(settings, [ok_pipeline, flaky_pipeline])
+        scheduler.items_done_callback = done.extend
+
+        item = FanoutItem(name="a")
+        await scheduler.process(item)
+        for _ in range(5):
+            await asyncio.sleep(0)
+        # 一个管道入库成功、另一个管道等待下一次重试时不算处理完毕
+        assert ok_pipeline.process_item.await_count == 1
+        assert flaky_pipeline.process_item.await_count == 2
+        assert done == []
+
+        await scheduler.close()
+        assert done == [item]
+
+    @pytest.mark.asyncio
+    async def test_flush_retries_without_new_batches(self):
+        settings = _make_settings()
+        settings.pipeline.error_handle_interval = 3600
+        pipeline = _make_pipeline(AsyncMock(side_effect=[False, False, True]))
+        scheduler = await _open_scheduler(settings, [pipeline])
+        (worker,) = scheduler.pipeline_workers
+
+        await scheduler.process(FanoutItem(name="a"))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert pipeline.process_item.await_count == 2
+
+        # 重试间隔已过，没有新的 item 到达时由定时 flush 触发重试
+        worker._last_retry_time = 0
+        await scheduler.flush()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert pipeline.process_item.await_count == 3
+        assert worker.idle()
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_process_returns_accumulated_results(self):
+        pipeline = _make_pipeline(AsyncMock(return_value=True))
+        scheduler = await _open_scheduler(_make_settings(), [pipeline])
+
+        await scheduler.process(FanoutItem(name="a"))
+        await asyncio.sleep(0)
+        # 下一次分发时带回之前批次的处理结果
+        scheduler._last_handle_item_time = 0
+        result = await scheduler.process(FanoutItem(name="b"))
+        assert result.success_count == 1
+        await scheduler.close()
+
+
+class TestPipelineWorker:
+    """Test PipelineWorker retry and error accounting."""
+
+    @pytest.mark.asyncio
+    async def test_exhausted_retries_go_to_error_items(self):
+        settings = _make_settings()
+        pipeline = _make_pipeline(AsyncMock(return_value=False))
+        worker = PipelineWorker(pipeline, settings.pipeline, MagicMock())
+        worker.start()
+
+        item = FanoutItem(name="a")
+        await worker.put([item])
+        result = await worker.close()
+
+        # 首次处理 + 2 次重试
+        assert pipeline.process_item.await_count == 3
+        assert result.fail_count == 3
+        pipeline.process_error_item.assert_awaited_once_with([item])
+        assert item.__retry_count__ == 0
+
+    @pytest.mark.asyncio
+    async def test_partial_failure_retries_failed_items_only(self):
+        settings = _make_settings()
+        saved, failed = FanoutItem(name="saved"), FanoutItem(name="failed")
+        pipeline = _make_pipeline(AsyncMock(side_effect=[[failed], True]))
+        worker = PipelineWorker(pipeline, settings.pipeline, MagicMock())
+        worker.start()
+
+        await worker.put([saved, failed])
+        result = await worker.close()
+
+        assert pipeline.process_item.await_args.args[0] == [failed]
+        assert (result.success_count, result.fail_count) == (2, 1)
+
+    @pytest.mark.asyncio
+    async def test_exception_counts_as_failure(self):
+        settings = _make_settings()
+        settings.pipeline.error_max_retry_count = 0
+        pipeline = _make_pipeline(AsyncMock(side_effect=RuntimeError("db down")))
+        logger = MagicMock()
+        worker = PipelineWorker(pipeline, settings.pipeline, logger)
+        worker.start()
+
+        await worker.put([FanoutItem(name="a")])
+        result = await worker.close()
+
+        assert result.fail_count == 1
+        logger.error.assert_called()
+        pipeline.process_error_item.assert_awaited_once()
@@ -0,0 +1,126 @@
+"""
+Tests for PipelineScheduler background flush and byte thresholds.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from maize.common.items import Item
+from maize.pipelines.pipeline_scheduler import PipelineScheduler
+from maize.settings import SpiderSettings
+
+
+class FlushItem(Item):
+    __table_name__: str = "test"
+    name: str = ""
+
+
+def _make_pipeline(return_value=True):
+    pipeline = MagicMock()
+    pipeline.process_item = AsyncMock(return_value=return_value)
+    pipeline.process_error_item = AsyncMock()
+    pipeline.close = AsyncMock()
+    return pipeline
+
+
+def _make_scheduler(**pipeline_settings):
+    settings = SpiderSettings()
+    settings.pipeline.pipelines = []
+    settings.pipeline.handle_interval = 3600
+    settings.pipeline.error_handle_interval = 3600
+    for key, value in pipeline_settings.items():
+        setattr(settings.pipeline, key, value)
+    return PipelineScheduler(settings)
+
+
+class TestPipelineSchedulerFlush:
+    """Test flush() and the background flush task."""
+
+    @pytest.mark.asyncio
+    async def test_flush_respects_interval(self):
+        scheduler = _make_scheduler()
+        pipeline = _make_pipeline()
+        scheduler.item_pipelines.append(pipeline)
+        scheduler._last_handle_item_time = 10**12
+
+        await scheduler._put_item(FlushItem(name="a"))
+        result = await scheduler.flush()
+        assert result.success_count == 0
+        assert len(scheduler) == 1
+
+        result = await scheduler.flush(force=True)
+        assert result.success_count == 1
+        assert len(scheduler) == 0
+
+    @pytest.mark.asyncio
+    async def test_flush_drains_retry_and_error_queues(self):
+        scheduler = _make_scheduler(error_max_retry_count=1)
+        pipeline = _make_pipeline(return_value=False)
+        scheduler.item_pipelines.append(pipeline)
+
+        retry_item = FlushItem(name="retry")
+        error_item = FlushItem(name="error")
+        await scheduler.retry_item_queue.put(retry_item)
+        await scheduler.error_item_queue.put(error_item)
+
+        result = await scheduler.flush(force=True)
+        assert result.fail_count == 1
+        assert scheduler.retry_item_queue.empty()
+        # 重试失败后达到最大重试次数的 item 与原有的异常 item 一起交给 process_error_item
+        pipeline.process_error_item.assert_awaited_once_with([error_item, retry_item])
+
+    @pytest.mark.asyncio
+    async def test_background_task_flushes_without_new_items(self):
+        scheduler = _make_scheduler(handle_interval=0, error_handle_interval=0)
+        scheduler.result_callback = AsyncMock()
+        pipeline = _make_pipeline()
+        await scheduler.open()
+        scheduler.item_pipelines.append(pipeline)
+        scheduler._flush_tick = 0.01
+
+        # 模拟一次突发产出后爬虫变慢：item 入队但不触发 process 中的间隔判断
+        await scheduler._put_item(FlushItem(name="a"))
+        await asyncio.sleep(0.05)
+
+        pipeline.process_item.assert_awaited_once()
+        scheduler.result_callback.assert_awaited()
+        assert scheduler.result_callback.await_args.args[0].success_count == 1
+
+        await scheduler.close()
+        assert scheduler._flush_task is None
+
+
+class TestPipelineSchedulerBytes:
+    """Test byte-based cache and batch thresholds."""
+
+    @pytest.mark.asyncio
+    async def test_max_cache_bytes_triggers_flush(self):
+        item_size = len(FlushItem(name="a").model_dump_json())
+        scheduler = _make_scheduler(max_cache_bytes=item_size * 2)
+        pipeline = _make_pipeline()
+        scheduler.item_pipelines.append(pipeline)
+        scheduler._last_handle_item_time = 10**12
+
+        await scheduler.process(FlushItem(name="a"))
+        pipeline.process_item.assert_not_called()
+        assert scheduler.item_queue_bytes == item_size
+
+        result = await scheduler.process(FlushItem(name="a"))
+        assert result.success_count == 2
+        assert scheduler.item_queue_bytes == 0
+
+    @pytest.mark.asyncio
+    async def test_batch_max_bytes_splits_batches(self):
+        item_size = len(FlushItem(name="a").model_dump_json())
+        scheduler = _make_scheduler(handle_batch_max_bytes=item_size * 2)
+        pipeline = _make_pipeline()
+        scheduler.item_pipelines.append(pipeline)
+
+        for _ in range(5):
+            await scheduler._put_item(FlushItem(name="a"))
+
+        await scheduler.flush(force=True)
+        batch_sizes = [len(call.args[0]) for call in pipeline.process_item.await_args_list]
+        assert batch_sizes == [2, 2, 1]
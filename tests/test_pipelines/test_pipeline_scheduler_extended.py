@@ -202,3 +202,52 @@ class TestPipelineSchedulerRetryErrorItems:
         result, process_result = await scheduler._retry_error_items()
         assert result is True
         assert process_result.fail_count == 1
+
+
+class TestPipelineSchedulerItemsDone:
+    """Cover items_done_callback."""
+
+    @pytest.mark.asyncio
+    async def test_items_done_after_success_retry_and_error(self):
+        settings = SpiderSettings()
+        settings.pipeline.error_max_retry_count = 1
+        done = []
+        scheduler = PipelineScheduler(settings, items_done_callback=done.extend)
+        mock_pipeline = MagicMock()
+        mock_pipeline.process_item = AsyncMock(side_effect=[True, False, False])
+        mock_pipeline.process_error_item = AsyncMock()
+        scheduler.item_pipelines.append(mock_pipeline)
+
+        saved, failed = TestItem(name="saved"), TestItem(name="failed")
+        await scheduler.item_queue.put(saved)
+        await scheduler._process_item()
+        assert done == [saved]
+
+        # 入库失败的 item 在重试和交给 process_error_item 之前都不算处理完毕
+        await scheduler.item_queue.put(failed)
+        await scheduler._process_item()
+        await scheduler._retry_error_items()
+        assert done == [saved]
+
+        await scheduler.process_error_items()
+        assert done == [saved, failed]
+
+    @pytest.mark.asyncio
+    async def test_partial_failure_retries_failed_items_only(self):
+        done = []
+        scheduler = PipelineScheduler(SpiderSettings(), items_done_callback=done.extend)
+        saved, failed = TestItem(name="saved"), TestItem(name="failed")
+        mock_pipeline = MagicMock()
+        mock_pipeline.process_item = AsyncMock(side_effect=[[failed], True])
+        scheduler.item_pipelines.append(mock_pipeline)
+
+        await scheduler.item_queue.put(saved)
+        await scheduler.item_queue.put(failed)
+        result = await scheduler._process_item()
+        assert (result.success_count, result.fail_count) == (1, 1)
+        assert done == [saved]
+        assert scheduler.retry_item_queue.qsize() == 1
+
+        await scheduler._retry_error_items()
+        assert mock_pipeline.process_item.await_args.args[0] == [failed]
+        assert done == [saved, failed]
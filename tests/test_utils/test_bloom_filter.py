@@ -0,0 +1,81 @@
+"""
+Tests for bloom_filter
+"""
+
+import hashlib
+
+import pytest
+
+from maize.utils.bloom_filter import BloomFilter, ScalableBloomFilter
+
+
+def _digest(value: str) -> bytes:
+    return hashlib.md5(value.encode()).digest()
+
+
+class TestBloomFilter:
+    """Test BloomFilter"""
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            BloomFilter(capacity=0)
+        with pytest.raises(ValueError):
+            BloomFilter(capacity=10, error_rate=1)
+
+    def test_add_and_contains(self):
+        bloom_filter = BloomFilter(capacity=100)
+        digest = _digest("a")
+
+        assert digest not in bloom_filter
+        assert bloom_filter.add(digest) is False
+        assert digest in bloom_filter
+        assert bloom_filter.add(digest) is True
+        assert len(bloom_filter) == 1
+
+    def test_false_positive_rate(self):
+        """False positive rate stays close to the configured error rate at capacity"""
+        bloom_filter = BloomFilter(capacity=10000, error_rate=0.01)
+        for i in range(10000):
+            bloom_filter.add(_digest(f"in-{i}"))
+
+        false_positive = sum(_digest(f"out-{i}") in bloom_filter for i in range(10000))
+        assert false_positive < 200
+
+
+class TestScalableBloomFilter:
+    """Test ScalableBloomFilter"""
+
+    def test_grows_in_stages(self):
+        bloom_filter = ScalableBloomFilter(initial_capacity=100, error_rate=0.01)
+        for i in range(1000):
+            bloom_filter.add(_digest(str(i)))
+
+        assert bloom_filter.stage_count > 1
+        assert all(_digest(str(i)) in bloom_filter for i in range(1000))
+        assert len(bloom_filter) <= 1000
+
+    def test_add_returns_seen(self):
+        bloom_filter = ScalableBloomFilter(initial_capacity=10)
+        assert bloom_filter.add(_digest("a")) is False
+        assert bloom_filter.add(_digest("a")) is True
+
+    def test_dump_and_load(self, tmp_path):
+        path = tmp_path / "seen.bloom"
+        bloom_filter = ScalableBloomFilter(initial_capacity=50, error_rate=0.01)
+        for i in range(200):
+            bloom_filter.add(_digest(str(i)))
+        bloom_filter.dump(path)
+
+        restored = ScalableBloomFilter.load(path)
+
+        assert restored.stage_count == bloom_filter.stage_count
+        assert len(restored) == len(bloom_filter)
+        assert restored.nbytes == bloom_filter.nbytes
+        assert all(_digest(str(i)) in restored for i in range(200))
+        assert not (tmp_path / "seen.bloom.tmp").exists()
+
+    def test_load_invalid_file(self, tmp_path):
+        path = tmp_path / "invalid.bloom"
+        path.write_bytes(b"\x00" * 64)
+        with pytest.raises(ValueError):
+            ScalableBloomFilter.load(path)
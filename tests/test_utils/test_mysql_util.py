@@ -197,6 +197,80 @@ class TestMysqlUtil:
 
         mock_conn.rollback.assert_called_once()
 
+    def test_split_statements_by_bytes(self):
+        """Test split_statements chunks rows by statement size"""
+        values = [b"(1)", b"(2)", b"(3)", b"(4)"]
+        statements = list(MysqlUtil.split_statements(b"insert into t (a) values ", values, b"", 33))
+
+        assert statements == [
+            b"insert into t (a) values (1),(2)",
+            b"insert into t (a) values (3),(4)",
+        ]
+        assert all(len(sql) <= 33 for sql in statements)
+
+    def test_split_statements_oversized_row_alone(self):
+        """Test a row larger than the limit becomes its own statement"""
+        values = [b"(1)", b"('" + b"x" * 100 + b"')", b"(2)"]
+        statements = list(MysqlUtil.split_statements(b"p ", values, b" s", 20))
+
+        assert statements == [b"p (1) s", b"p ('" + b"x" * 100 + b"') s", b"p (2) s"]
+
+    def test_split_statements_empty(self):
+        """Test split_statements yields nothing without rows"""
+        assert list(MysqlUtil.split_statements(b"p ", [], b"", 100)) == []
+
+    @pytest.mark.asyncio
+    async def test_bulk_insert(self, mysql_util, mock_aiomysql):
+        """Test bulk_insert executes multi-row statements in one transaction"""
+        mock_pool = MagicMock()
+        mock_conn = MagicMock()
+        mock_conn.encoding = "utf8"
+        mock_conn.escape = lambda value: f"'{value}'" if isinstance(value, str) else str(value)
+        mock_conn.commit = AsyncMock()
+        mock_cursor = MagicMock()
+        mock_cursor.execute = AsyncMock(side_effect=[2, 1])
+
+        mock_conn.cursor.return_value.__aenter__.return_value = mock_cursor
+        mock_pool.acquire.return_value.__aenter__.return_value = mock_conn
+
+        mysql_util.pool = mock_pool
+
+        result = await mysql_util.bulk_insert(
+            "insert into users (name,age) values ",
+            [("a", 1), ("b", 2), ("c", 3)],
+            " on duplicate key update age=values(age)",
+            max_statement_bytes=95,
+        )
+
+        assert result == 3
+        statements = [call.args[0] for call in mock_cursor.execute.call_args_list]
+        assert statements == [
+            b"insert into users (name,age) values ('a',1),('b',2) on duplicate key update age=values(age)",
+            b"insert into users (name,age) values ('c',3) on duplicate key update age=values(age)",
+        ]
+        mock_conn.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_bulk_insert_rollback_on_error(self, mysql_util, mock_aiomysql):
+        """Test bulk_insert rolls back on error"""
+        mock_pool = MagicMock()
+        mock_conn = MagicMock()
+        mock_conn.encoding = "utf8"
+        mock_conn.escape = str
+        mock_conn.rollback = AsyncMock()
+        mock_cursor = MagicMock()
+        mock_cursor.execute = AsyncMock(side_effect=Exception("DB Error"))
+
+        mock_conn.cursor.return_value.__aenter__.return_value = mock_cursor
+        mock_pool.acquire.return_value.__aenter__.return_value = mock_conn
+
+        mysql_util.pool = mock_pool
+
+        with pytest.raises(Exception, match="DB Error"):
+            await mysql_util.bulk_insert("insert into users (age) values ", [(1,)])
+
+        mock_conn.rollback.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_close(self, mysql_util, mock_aiomysql):
         """Test close"""
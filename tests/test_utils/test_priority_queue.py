@@ -2,9 +2,11 @@
 Tests for priority_queue
 """
 
+import asyncio
+
 import pytest
 
-from maize.utils.priority_queue import SpiderPriorityQueue
+from maize.utils.priority_queue import PriorityBuckets, SpiderPriorityQueue
 
 
 class MockItem:
@@ -54,7 +56,7 @@ class TestSpiderPriorityQueue:
 
     @pytest.mark.asyncio
     async def test_get_empty_queue_returns_none(self, queue):
-        """Test that get returns None when queue is empty after timeout"""
+        """Test that get returns None immediately when queue is empty"""
         result = await queue.get()
 
         assert result is None
@@ -112,3 +114,74 @@ class TestSpiderPriorityQueue:
 
         # Queue should be full
         assert queue.full()
+
+    @pytest.mark.asyncio
+    async def test_get_by_priority_skips_lower_head(self, queue):
+        """Test get_by_priority reaches items behind a lower-priority head without re-insertion"""
+        await queue.put(MockItem("low", priority=1))
+        await queue.put(MockItem("mid", priority=5))
+        await queue.put(MockItem("high", priority=8))
+
+        result = await queue.get_by_priority(gte_priority=4)
+
+        assert result.value == "mid"
+        assert queue.qsize() == 2
+        assert (await queue.get()).value == "low"
+        assert (await queue.get()).value == "high"
+
+    @pytest.mark.asyncio
+    async def test_get_by_priority_frees_slot(self):
+        """Test get_by_priority wakes up a blocked putter"""
+        queue = SpiderPriorityQueue(maxsize=1)
+        await queue.put(MockItem("1", priority=5))
+
+        putter = asyncio.create_task(queue.put(MockItem("2", priority=5)))
+        await asyncio.sleep(0)
+        assert not putter.done()
+
+        assert (await queue.get_by_priority(gte_priority=5)).value == "1"
+        await asyncio.wait_for(putter, timeout=1)
+        assert queue.qsize() == 1
+
+
+class TestPriorityBuckets:
+    """Test PriorityBuckets"""
+
+    def test_fifo_within_level(self):
+        """Test items with equal priority pop in insertion order"""
+        buckets = PriorityBuckets()
+        for i in range(5):
+            buckets.push(MockItem(i, priority=3))
+
+        assert [buckets.pop().value for _ in range(5)] == [0, 1, 2, 3, 4]
+        assert len(buckets) == 0
+
+    def test_pop_order_across_levels(self):
+        """Test lower priority value pops first and empty levels are dropped"""
+        buckets = PriorityBuckets()
+        buckets.push(MockItem("a", priority=10))
+        buckets.push(MockItem("b", priority=1))
+        buckets.push(MockItem("c", priority=10))
+
+        assert [item.value for item in buckets] == ["b", "a", "c"]
+        assert buckets.pop().value == "b"
+        assert buckets._levels == [10]
+
+    def test_pop_with_threshold(self):
+        """Test pop(gte_priority) returns None when no level satisfies the threshold"""
+        buckets = PriorityBuckets()
+        buckets.push(MockItem("a", priority=1))
+
+        assert buckets.pop(gte_priority=2) is None
+        assert buckets.pop(gte_priority=1).value == "a"
+        assert buckets.pop() is None
+
+    def test_has(self):
+        """Test has(gte_priority) reports whether pop would return an item"""
+        buckets = PriorityBuckets()
+        assert not buckets.has()
+
+        buckets.push(MockItem("a", priority=3))
+        assert buckets.has()
+        assert buckets.has(gte_priority=3)
+        assert not buckets.has(gte_priority=4)
@@ -0,0 +1,326 @@
+"""
+Tests for redis_priority_queue
+"""
+
+from unittest.mock import AsyncMock
+
+import pytest
+import ujson
+
+from maize.aio.classic.scheduler.scheduler import Scheduler
+from maize.common.http.request import Request
+from maize.utils.redis_priority_queue import POP_SCRIPT, PUSH_SCRIPT, REQUEUE_SCRIPT, RedisPriorityQueue
+from maize.utils.redis_util import LEASE_HEARTBEAT_SCRIPT
+
+
+class _Spider:
+    async def parse(self, response):
+        pass
+
+
+class FakeRedis:
+    """内存中模拟队列 Lua 脚本的 Redis，多个队列共享同一个实例即模拟多个节点"""
+
+    def __init__(self):
+        self.zsets: dict[str, dict[str, float]] = {}
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.counters: dict[str, int] = {}
+        self.now = 1000
+        self.pops = 0
+        self.open = AsyncMock()
+        self.close = AsyncMock()
+
+    def zset(self, key):
+        return self.zsets.setdefault(key, {})
+
+    def hash(self, key):
+        return self.hashes.setdefault(key, {})
+
+    def push(self, keys, args):
+        self.counters[keys[2]] = self.counters.get(keys[2], 0) + 1
+        member = f"{self.counters[keys[2]]:016d}"
+        self.zset(keys[0])[member] = float(args[0])
+        self.hash(keys[1])[member] = args[1]
+        return 1
+
+    def pop(self, keys, args):
+        self.pops += 1
+        zset, requests = self.zset(keys[0]), self.hash(keys[1])
+        ordered = sorted(zset.items(), key=lambda item: (item[1], item[0]))
+        if args[1] != "":
+            ordered = [item for item in ordered if item[1] >= float(args[1])]
+        members = [member for member, _ in ordered[: int(args[0])]]
+        result = [len(zset) - len(members)]
+        for member in members:
+            del zset[member]
+            result.extend([member, requests[member]])
+            if int(args[2]) > 0:
+                self.zset(keys[2])[member] = self.now + int(args[2])
+                self.hash(keys[3])[member] = args[3]
+            else:
+                del requests[member]
+        return result
+
+    def requeue(self, keys, args):
+        leases, owners = self.zset(keys[2]), self.hash(keys[3])
+        if args[1] == "":
+            members = [member for member, expires in leases.items() if expires <= self.now]
+        else:
+            members = [member for member, owner in owners.items() if owner == args[1]]
+        members = members[: int(args[0])]
+        for member in members:
+            leases.pop(member, None)
+            owners.pop(member, None)
+            self.zset(keys[0])[member] = ujson.loads(self.hash(keys[1])[member])["priority"]
+        return [len(members), len(members)]
+
+    def heartbeat(self, keys, args):
+        leases, owners = self.zset(keys[0]), self.hash(keys[1])
+        members = [member for member in args[2:] if owners.get(member) == args[1] and member in leases]
+        for member in members:
+            leases[member] = self.now + int(args[0])
+        return len(members)
+
+    def zrem(self, key, member):
+        return self.zset(key).pop(member, None) is not None
+
+    def hdel(self, key, field):
+        return self.hash(key).pop(field, None) is not None
+
+    def register_script(self, script):
+        func = {
+            PUSH_SCRIPT: self.push,
+            POP_SCRIPT: self.pop,
+            REQUEUE_SCRIPT: self.requeue,
+            LEASE_HEARTBEAT_SCRIPT: self.heartbeat,
+        }[script]
+
+        def call(keys, args, client):
+            client.commands.append(lambda: func(keys, args))
+
+        return call
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, command):
+        def queue(*args):
+            self.commands.append(lambda: getattr(self.redis, command)(*args))
+
+        return queue
+
+    async def execute(self, raise_on_error=True):
+        return [command() for command in self.commands]
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+async def _open_queue(redis, spider=None, prefetch_size=3, node_id="", lease_ttl=0):
+    queue = RedisPriorityQueue(
+        redis,
+        spider,
+        key="maize:spider:frontier",
+        prefetch_size=prefetch_size,
+        node_id=node_id,
+        lease_ttl=lease_ttl,
+        batch_window=0,
+    )
+    await queue.open()
+    return queue
+
+
+class TestRedisPriorityQueue:
+    """Test RedisPriorityQueue"""
+
+    def test_invalid_prefetch_size(self, redis):
+        with pytest.raises(ValueError):
+            RedisPriorityQueue(redis, key="frontier", prefetch_size=0)
+
+    @pytest.mark.asyncio
+    async def test_priority_and_fifo_order(self, redis):
+        spider = _Spider()
+        queue = await _open_queue(redis, spider)
+        for i in range(4):
+            await queue.put(Request(f"https://example.com/low/{i}", priority=5, callback=spider.parse))
+        for i in range(2):
+            await queue.put(Request(f"https://example.com/high/{i}", priority=1, callback=spider.parse))
+        assert queue.qsize() == 6
+
+        urls = []
+        while (request := await queue.get()) is not None:
+            assert request.callback == spider.parse
+            urls.append(request.url)
+        await queue.close()
+
+        assert urls == [f"https://example.com/high/{i}" for i in range(2)] + [
+            f"https://example.com/low/{i}" for i in range(4)
+        ]
+        assert queue.qsize() == 0
+        assert redis.hashes["maize:spider:frontier:requests"] == {}
+
+    @pytest.mark.asyncio
+    async def test_prefetch_in_batches(self, redis):
+        queue = await _open_queue(redis, prefetch_size=3)
+        for i in range(5):
+            await queue.put(Request(f"https://example.com/{i}"))
+
+        assert (await queue.get()).url == "https://example.com/0"
+        assert redis.pops == 1
+        assert queue.prefetched_count == 2
+        assert queue.qsize() == 4
+
+        for _ in range(2):
+            await queue.get()
+        assert redis.pops == 1
+        await queue.get()
+        assert redis.pops == 2
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_get_by_priority(self, redis):
+        queue = await _open_queue(redis)
+        await queue.put(Request("https://example.com/1", priority=1))
+        await queue.put(Request("https://example.com/5", priority=5))
+
+        assert (await queue.get_by_priority(3)).url == "https://example.com/5"
+        assert await queue.get_by_priority(6) is None
+        assert (await queue.get()).url == "https://example.com/1"
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_nodes_split_frontier(self, redis):
+        """两个节点共享同一个队列，每个请求只被一个节点取出"""
+        node_a = await _open_queue(redis, prefetch_size=2)
+        node_b = await _open_queue(redis, prefetch_size=2)
+        for i in range(12):
+            await node_a.put(Request(f"https://example.com/{i}"))
+
+        urls_a, urls_b = [], []
+        while True:
+            request_a = await node_a.get()
+            request_b = await node_b.get()
+            if request_a is None and request_b is None:
+                break
+            if request_a:
+                urls_a.append(request_a.url)
+            if request_b:
+                urls_b.append(request_b.url)
+        await node_a.close()
+        await node_b.close()
+
+        assert len(urls_a) == len(urls_b) == 6
+        assert sorted(urls_a + urls_b) == sorted(f"https://example.com/{i}" for i in range(12))
+
+    @pytest.mark.asyncio
+    async def test_unserializable_request_stays_local(self, redis):
+        queue = await _open_queue(redis)
+        request = Request("https://example.com", callback=lambda _: None)
+        await queue.put(request)
+
+        assert queue.prefetched_count == 1
+        assert await queue.get() is request
+        assert redis.pops == 0
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_close_returns_prefetched_requests(self, redis):
+        queue = await _open_queue(redis, prefetch_size=10)
+        for i in range(3):
+            await queue.put(Request(f"https://example.com/{i}"))
+        await queue.get()
+        await queue.close()
+        redis.close.assert_awaited_once()
+
+        other = await _open_queue(redis)
+        urls = [(await other.get()).url for _ in range(2)]
+        assert urls == ["https://example.com/1", "https://example.com/2"]
+        await other.close()
+
+    @pytest.mark.asyncio
+    async def test_scheduler_uses_frontier(self, redis):
+        queue = await _open_queue(redis)
+        scheduler = Scheduler(frontier=queue)
+        scheduler.open()
+        assert scheduler.request_queue is queue
+
+        await scheduler.enqueue_request(Request("https://example.com"))
+        assert not scheduler.idle()
+        assert (await scheduler.next_request()).url == "https://example.com"
+        assert await scheduler.next_request() is None
+        assert scheduler.idle()
+
+        await scheduler.close()
+        redis.close.assert_awaited_once()
+
+
+class TestRedisPriorityQueueLease:
+    """Test RedisPriorityQueue leases"""
+
+    @pytest.mark.asyncio
+    async def test_ack_removes_lease(self, redis):
+        queue = await _open_queue(redis, node_id="node-a", lease_ttl=60)
+        await queue.put(Request("https://example.com"))
+        request = await queue.get()
+
+        assert redis.zsets["maize:spider:frontier:leases"] == {"0000000000000001": 1060}
+        assert redis.hashes["maize:spider:frontier:owners"] == {"0000000000000001": "node-a"}
+        assert "0000000000000001" in redis.hashes["maize:spider:frontier:requests"]
+
+        queue.ack(request)
+        await queue.close()
+        assert redis.zsets["maize:spider:frontier:leases"] == {}
+        assert redis.hashes["maize:spider:frontier:owners"] == {}
+        assert redis.hashes["maize:spider:frontier:requests"] == {}
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_extends_own_leases(self, redis):
+        queue = await _open_queue(redis, node_id="node-a", lease_ttl=60)
+        await queue.put(Request("https://example.com/1"))
+        await queue.put(Request("https://example.com/2"))
+        await queue.get()
+
+        redis.now = 1030
+        assert await queue.heartbeat() == 2
+        assert set(redis.zsets["maize:spider:frontier:leases"].values()) == {1090}
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_reap_requeues_expired_leases(self, redis):
+        """节点宕机后，其他节点回收过期租约，请求不丢失"""
+        dead = await _open_queue(redis, node_id="node-a", lease_ttl=60)
+        for i in range(3):
+            await dead.put(Request(f"https://example.com/{i}"))
+        await dead.get()
+        await dead.batcher.close()
+
+        alive = await _open_queue(redis, node_id="node-b", lease_ttl=60)
+        assert await alive.reap() == 0
+        redis.now = 1061
+        assert await alive.reap() == 3
+
+        urls = [(await alive.get()).url for _ in range(3)]
+        assert urls == [f"https://example.com/{i}" for i in range(3)]
+        await alive.close()
+
+    @pytest.mark.asyncio
+    async def test_restore_own_leases(self, redis):
+        before = await _open_queue(redis, node_id="node-a", lease_ttl=60)
+        await before.put(Request("https://example.com"))
+        await before.get()
+        await before.batcher.close()
+
+        other = await _open_queue(redis, node_id="node-b", lease_ttl=60)
+        assert await other.restore() == 0
+        restarted = await _open_queue(redis, node_id="node-a", lease_ttl=60)
+        assert await restarted.restore() == 1
+        assert (await restarted.get()).url == "https://example.com"
+        await restarted.close()
@@ -2,11 +2,12 @@
 Tests for redis_util
 """
 
-from unittest.mock import AsyncMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from maize.utils.redis_util import RedisUtil
+from maize.utils.redis_util import RedisPipelineBatcher, RedisUtil
 
 
 class TestRedisUtil:
@@ -161,3 +162,102 @@ class TestRedisUtil:
         result = await redis_util.delete("key1", "key2", "key3")
 
         assert result == 3
+
+    @pytest.mark.asyncio
+    async def test_hash_commands(self, redis_util, mock_aioredis):
+        """Test hset / hget / hdel / hlen"""
+        redis_util._redis.hset = AsyncMock(return_value=1)
+        redis_util._redis.hget = AsyncMock(return_value="value")
+        redis_util._redis.hdel = AsyncMock(return_value=2)
+        redis_util._redis.hlen = AsyncMock(return_value=0)
+
+        assert await redis_util.hset("name", "key", "value") == 1
+        redis_util._redis.hset.assert_called_once_with("name", key="key", value="value", mapping=None)
+        assert await redis_util.hget("name", "key") == "value"
+        assert await redis_util.hdel("name", "a", "b") == 2
+        redis_util._redis.hdel.assert_called_once_with("name", "a", "b")
+        assert await redis_util.hlen("name") == 0
+
+
+class FakePipeline:
+    """记录命令的 pipeline"""
+
+    def __init__(self, executed: list):
+        self.commands = []
+        self.executed = executed
+
+    def __getattr__(self, command):
+        def queue(*args, **kwargs):
+            self.commands.append((command, args))
+            return self
+
+        return queue
+
+    async def execute(self, raise_on_error=True):
+        self.executed.append(self.commands)
+        return [ValueError("error") if command == "fail" else len(self.commands) for command, _ in self.commands]
+
+
+class TestRedisPipelineBatcher:
+    """Test RedisPipelineBatcher"""
+
+    @pytest.fixture
+    def executed(self):
+        return []
+
+    @pytest.fixture
+    def redis_util(self, executed):
+        redis_util = MagicMock()
+        redis_util.pipeline.side_effect = lambda **_: FakePipeline(executed)
+        return redis_util
+
+    @pytest.mark.asyncio
+    async def test_send_is_batched_within_window(self, redis_util, executed):
+        batcher = RedisPipelineBatcher(redis_util, window=0.05)
+        await batcher.open()
+        batcher.send("hset", "queue", "a", "1")
+        batcher.send("hset", "queue", "b", "2")
+        await asyncio.sleep(0)
+        assert executed == []
+
+        await batcher.close()
+        assert executed == [[("hset", ("queue", "a", "1")), ("hset", ("queue", "b", "2"))]]
+
+    @pytest.mark.asyncio
+    async def test_call_flushes_pending_commands_in_order(self, redis_util, executed):
+        batcher = RedisPipelineBatcher(redis_util, window=10)
+        await batcher.open()
+        batcher.send("hset", "queue", "a", "1")
+        result = await asyncio.wait_for(batcher.call("hdel", "queue", "a"), 1)
+        await batcher.close()
+
+        assert result == 2
+        assert executed == [[("hset", ("queue", "a", "1")), ("hdel", ("queue", "a"))]]
+
+    @pytest.mark.asyncio
+    async def test_max_size(self, redis_util, executed):
+        batcher = RedisPipelineBatcher(redis_util, window=10, max_size=2)
+        await batcher.open()
+        for i in range(3):
+            batcher.send("hdel", "running", str(i))
+        # 达到 max_size 后不再等待 window，按 max_size 分批发送
+        await asyncio.sleep(0.01)
+        assert [len(commands) for commands in executed] == [2, 1]
+        await batcher.close()
+
+    @pytest.mark.asyncio
+    async def test_call_raises_command_error(self, redis_util):
+        batcher = RedisPipelineBatcher(redis_util, window=0)
+        await batcher.open()
+        with pytest.raises(ValueError):
+            await batcher.call("fail")
+        await batcher.close()
+
+    @pytest.mark.asyncio
+    async def test_call_script(self, redis_util, executed):
+        script = AsyncMock(side_effect=lambda keys, args, client: client.evalsha("sha", len(keys), *keys, *args))
+        batcher = RedisPipelineBatcher(redis_util, window=0)
+        await batcher.open()
+        await batcher.call_script(script, keys=["k"], args=["v"])
+        await batcher.close()
+        assert executed == [[("evalsha", ("sha", 1, "k", "v"))]]
@@ -0,0 +1,57 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from maize.utils.session_pool import SessionPool
+
+
+def _make_pool(max_size: int = 2) -> tuple[SessionPool, AsyncMock]:
+    close = AsyncMock()
+    return SessionPool(lambda key: f"session-{key}", close, max_size=max_size), close
+
+
+class TestSessionPool:
+    @pytest.mark.asyncio
+    async def test_reuse(self):
+        pool, close = _make_pool()
+        async with pool.acquire("a") as first:
+            pass
+        async with pool.acquire("a") as second:
+            pass
+        assert first == second == "session-a"
+        assert len(pool) == 1
+        close.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_evict_least_recently_used(self):
+        pool, close = _make_pool()
+        for key in ("a", "b", "a", "c"):
+            async with pool.acquire(key):
+                pass
+        close.assert_awaited_once_with("session-b")
+        assert list(pool._sessions) == ["a", "c"]
+
+    @pytest.mark.asyncio
+    async def test_sessions_in_use_are_not_evicted(self):
+        pool, close = _make_pool(max_size=1)
+        async with pool.acquire("a"):
+            async with pool.acquire("b"):
+                # a、b 都在使用，暂时超出上限
+                assert len(pool) == 2
+            # a 是最久未使用的，但仍在使用，回收空闲的 b
+            close.assert_awaited_once_with("session-b")
+            assert list(pool._sessions) == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_close(self):
+        pool, close = _make_pool()
+        async with pool.acquire("a"):
+            pass
+        async with pool.acquire("b"):
+            await pool.close()
+        assert close.await_count == 2
+        assert len(pool) == 0
+
+    def test_invalid_max_size(self):
+        with pytest.raises(ValueError):
+            SessionPool(lambda key: key, AsyncMock(), max_size=0)
@@ -0,0 +1,106 @@
+"""
+Tests for spill_priority_queue
+"""
+
+from pathlib import Path
+
+import pytest
+
+from maize.common.http.request import Request
+from maize.utils.spill_priority_queue import SpillPriorityQueue
+
+
+class _Spider:
+    async def parse(self, response):
+        pass
+
+
+class TestSpillPriorityQueue:
+    """Test SpillPriorityQueue"""
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            SpillPriorityQueue(max_memory_requests_per_priority=0)
+        with pytest.raises(ValueError):
+            SpillPriorityQueue(batch_size=0)
+
+    @pytest.mark.asyncio
+    async def test_spill_keeps_fifo_and_priority_order(self, tmp_path):
+        spider = _Spider()
+        path = tmp_path / "frontier.sqlite3"
+        queue = SpillPriorityQueue(spider, max_memory_requests_per_priority=4, batch_size=3, path=str(path))
+
+        for i in range(20):
+            await queue.put(Request(f"https://example.com/low/{i}", priority=5, callback=spider.parse))
+        for i in range(10):
+            await queue.put(Request(f"https://example.com/high/{i}", priority=1, callback=spider.parse))
+
+        assert queue.qsize() == 30
+        assert queue.memory_count == 8
+        assert queue.spilled_count == 22
+        assert path.exists()
+
+        urls = []
+        while (request := await queue.get()) is not None:
+            assert request.callback == spider.parse
+            urls.append(request.url)
+
+        assert urls == [f"https://example.com/high/{i}" for i in range(10)] + [
+            f"https://example.com/low/{i}" for i in range(20)
+        ]
+        assert queue.empty()
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_get_by_priority(self):
+        queue = SpillPriorityQueue(max_memory_requests_per_priority=1, batch_size=1)
+        for priority in (1, 5, 5):
+            await queue.put(Request(f"https://example.com/{priority}", priority=priority))
+
+        assert (await queue.get_by_priority(3)).priority == 5
+        assert (await queue.get_by_priority(6)) is None
+        assert (await queue.get()).priority == 1
+        assert (await queue.get()).priority == 5
+        assert await queue.get() is None
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_unserializable_request_stays_in_memory(self):
+        queue = SpillPriorityQueue(max_memory_requests_per_priority=1, batch_size=10)
+        await queue.put(Request("https://example.com/0"))
+
+        def callback(_response):
+            pass
+
+        await queue.put(Request("https://example.com/1", callback=callback))
+
+        assert queue.memory_count == 2
+        assert (await queue.get()).url == "https://example.com/0"
+        assert (await queue.get()).callback is callback
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_foreign_method_callback_stays_in_memory(self):
+        spider = _Spider()
+        queue = SpillPriorityQueue(spider, max_memory_requests_per_priority=1, batch_size=1)
+        await queue.put(Request("https://example.com/0", callback=spider.parse))
+
+        # 绑定到其他对象的同名方法，按方法名还原会得到 spider.parse
+        other = _Spider()
+        await queue.put(Request("https://example.com/1", callback=other.parse))
+
+        assert queue.memory_count == 2
+        assert (await queue.get()).callback == spider.parse
+        assert (await queue.get()).callback == other.parse
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_close_removes_temporary_file(self):
+        queue = SpillPriorityQueue(max_memory_requests_per_priority=1, batch_size=1)
+        await queue.put(Request("https://example.com/0"))
+        await queue.put(Request("https://example.com/1"))
+        path = queue._store.path
+        assert Path(path).exists()
+
+        await queue.close()
+        assert not Path(path).exists()